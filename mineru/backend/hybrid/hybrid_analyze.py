@@ -21,6 +21,7 @@ from mineru.utils.ocr_utils import get_adjusted_mfdetrec_res, get_ocr_result_lis
     update_det_boxes, OcrConfidence
 from mineru.utils.pdf_classify import classify
 from mineru.utils.pdf_image_tools import load_images_from_pdf
+from mineru.utils.pdf_reader import PdfDocumentHandle
 
 os.environ['PYTORCH_ENABLE_MPS_FALLBACK'] = '1'  # 让mps可以fallback
 os.environ['NO_ALBUMENTATIONS_UPDATE'] = '1'  # 禁止albumentations检查更新
@@ -399,7 +400,9 @@ def doc_analyze(
 
     # 加载图像
     load_images_start = time.time()
-    images_list, pdf_doc = load_images_from_pdf(pdf_bytes, image_type=ImageType.PIL)
+    # 每个文档只打开一次，渲染和分类共享同一个文档对象
+    pdf_handle = PdfDocumentHandle(pdf_bytes)
+    images_list, pdf_doc = load_images_from_pdf(pdf_bytes, image_type=ImageType.PIL, pdf_doc=pdf_handle.pdf_doc)
     images_pil_list = [image_dict["img_pil"] for image_dict in images_list]
     load_images_time = round(time.time() - load_images_start, 2)
     logger.debug(f"load images cost: {load_images_time}, speed: {round(len(images_pil_list)/load_images_time, 3)} images/s")
@@ -408,7 +411,7 @@ def doc_analyze(
     device = get_device()
 
     # 确定OCR配置
-    _ocr_enable = ocr_classify(pdf_bytes, parse_method=parse_method)
+    _ocr_enable = ocr_classify(pdf_handle, parse_method=parse_method)
     _vlm_ocr_enable = _should_enable_vlm_ocr(_ocr_enable, language, inline_formula_enable)
 
     infer_start = time.time()
@@ -471,7 +474,9 @@ async def aio_doc_analyze(
 
     # 加载图像
     load_images_start = time.time()
-    images_list, pdf_doc = load_images_from_pdf(pdf_bytes, image_type=ImageType.PIL)
+    # 每个文档只打开一次，渲染和分类共享同一个文档对象
+    pdf_handle = PdfDocumentHandle(pdf_bytes)
+    images_list, pdf_doc = load_images_from_pdf(pdf_bytes, image_type=ImageType.PIL, pdf_doc=pdf_handle.pdf_doc)
     images_pil_list = [image_dict["img_pil"] for image_dict in images_list]
     load_images_time = round(time.time() - load_images_start, 2)
     logger.debug(f"load images cost: {load_images_time}, speed: {round(len(images_pil_list)/load_images_time, 3)} images/s")
@@ -480,7 +485,7 @@ async def aio_doc_analyze(
     device = get_device()
 
     # 确定OCR配置
-    _ocr_enable = ocr_classify(pdf_bytes, parse_method=parse_method)
+    _ocr_enable = ocr_classify(pdf_handle, parse_method=parse_method)
     _vlm_ocr_enable = _should_enable_vlm_ocr(_ocr_enable, language, inline_formula_enable)
 
     infer_start = time.time()
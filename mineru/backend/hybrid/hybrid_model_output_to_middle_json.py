@@ -10,9 +10,8 @@ from loguru import logger
 from mineru.backend.hybrid.hybrid_magic_model import MagicModel
 from mineru.backend.utils import cross_page_table_merge
 from mineru.utils.config_reader import get_table_enable, get_llm_aided_config
-from mineru.utils.cut_image import cut_image_and_table
+from mineru.utils.cut_image import cut_image_and_table, get_page_img_id
 from mineru.utils.enum_class import ContentType
-from mineru.utils.hash_utils import bytes_md5
 from mineru.utils.ocr_utils import OcrConfidence
 from mineru.utils.pdf_image_tools import get_crop_img
 from mineru.version import __version__
@@ -47,7 +46,7 @@ def blocks_to_page_info(
 
     scale = image_dict["scale"]
     page_pil_img = image_dict["img_pil"]
-    page_img_md5 = bytes_md5(page_pil_img.tobytes())
+    page_img_id = get_page_img_id(image_dict)
     width, height = map(int, page.get_size())
 
     magic_model = MagicModel(
@@ -111,7 +110,7 @@ def blocks_to_page_info(
     # 对image/table/interline_equation的span截图
     for span in all_spans:
         if span["type"] in [ContentType.IMAGE, ContentType.TABLE, ContentType.INTERLINE_EQUATION]:
-            span = cut_image_and_table(span, page_pil_img, page_img_md5, page_index, image_writer, scale=scale)
+            span = cut_image_and_table(span, page_pil_img, page_img_id, page_index, image_writer, scale=scale)
 
     page_blocks = []
     page_blocks.extend([
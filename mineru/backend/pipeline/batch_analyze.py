@@ -108,8 +108,8 @@ class BatchAnalyze:
                                                 'wired_table_img':wired_table_img,
                                               })
 
-        # 表格识别 table recognition
-        if self.table_enable:
+        # 表格识别 table recognition, 没有表格时不加载表格相关模型
+        if self.table_enable and table_res_list_all_page:
 
             # 图片旋转批量处理
             img_orientation_cls_model = atom_model_manager.get_atom_model(
@@ -1,22 +1,17 @@
 import os
+import threading
+from collections import OrderedDict
 
-import torch
 from loguru import logger
 
 from .model_list import AtomicModel
-from ...model.layout.doclayoutyolo import DocLayoutYOLOModel
-from ...model.mfd.yolo_v8 import YOLOv8MFDModel
-from ...model.mfr.unimernet.Unimernet import UnimernetModel
-from ...model.mfr.pp_formulanet_plus_m.predict_formula import FormulaRecognizer
-from mineru.model.ocr.pytorch_paddle import PytorchPaddleOCR
-from ...model.ori_cls.paddle_ori_cls import PaddleOrientationClsModel
-from ...model.table.cls.paddle_table_cls import PaddleTableClsModel
-# from ...model.table.rec.RapidTable import RapidTableModel
-from ...model.table.rec.slanet_plus.main import RapidTableModel
-from ...model.table.rec.unet_table.main import UnetTableModel
-from ...utils.config_reader import get_device
+# 各模型类（ultralytics/doclayout_yolo/onnxruntime/transformers 等）在对应的 *_init 函数中按需导入，
+# 仅导入本模块不会触发任何模型框架的加载
+from ...utils.config_reader import get_device, get_device_slot
 from ...utils.enum_class import ModelPath
+from ...utils.model_utils import get_model_memory_blocks, clean_memory, quantize_model_for_cpu
 from ...utils.models_download_utils import auto_download_and_get_model_root_path
+from ...utils.os_env_config import get_model_cache_budget
 
 MFR_MODEL = os.getenv('MINERU_FORMULA_CH_SUPPORT', 'False')
 if MFR_MODEL.lower() in ['true', '1', 'yes']:
@@ -28,7 +23,13 @@ else:
     MFR_MODEL = "unimernet_small"
 
 
+# (det_db_box_thresh, det_db_unclip_ratio, enable_merge_det_boxes)
+OCR_BASE_DET_PARAMS = (0.3, 1.8, True)
+
+
 def img_orientation_cls_model_init():
+    from ...model.ori_cls.paddle_ori_cls import PaddleOrientationClsModel
+
     atom_model_manager = AtomModelSingleton()
     ocr_engine = atom_model_manager.get_atom_model(
         atom_model_name=AtomicModel.OCR,
@@ -42,10 +43,14 @@ def img_orientation_cls_model_init():
 
 
 def table_cls_model_init():
+    from ...model.table.cls.paddle_table_cls import PaddleTableClsModel
+
     return PaddleTableClsModel()
 
 
 def wired_table_model_init(lang=None):
+    from ...model.table.rec.unet_table.main import UnetTableModel
+
     atom_model_manager = AtomModelSingleton()
     ocr_engine = atom_model_manager.get_atom_model(
         atom_model_name=AtomicModel.OCR,
@@ -59,6 +64,9 @@ def wired_table_model_init(lang=None):
 
 
 def wireless_table_model_init(lang=None):
+    # from ...model.table.rec.RapidTable import RapidTableModel
+    from ...model.table.rec.slanet_plus.main import RapidTableModel
+
     atom_model_manager = AtomModelSingleton()
     ocr_engine = atom_model_manager.get_atom_model(
         atom_model_name=AtomicModel.OCR,
@@ -72,6 +80,9 @@ def wireless_table_model_init(lang=None):
 
 
 def mfd_model_init(weight, device='cpu'):
+    import torch
+    from ...model.mfd.yolo_v8 import YOLOv8MFDModel
+
     if str(device).startswith('npu'):
         device = torch.device(device)
     mfd_model = YOLOv8MFDModel(weight, device)
@@ -80,8 +91,10 @@ def mfd_model_init(weight, device='cpu'):
 
 def mfr_model_init(weight_dir, device='cpu'):
     if MFR_MODEL == "unimernet_small":
+        from ...model.mfr.unimernet.Unimernet import UnimernetModel
         mfr_model = UnimernetModel(weight_dir, device)
     elif MFR_MODEL == "pp_formulanet_plus_m":
+        from ...model.mfr.pp_formulanet_plus_m.predict_formula import FormulaRecognizer
         mfr_model = FormulaRecognizer(weight_dir, device)
     else:
         logger.error('MFR model name not allow')
@@ -90,6 +103,9 @@ def mfr_model_init(weight_dir, device='cpu'):
 
 
 def doclayout_yolo_model_init(weight, device='cpu'):
+    import torch
+    from ...model.layout.doclayoutyolo import DocLayoutYOLOModel
+
     if str(device).startswith('npu'):
         device = torch.device(device)
     model = DocLayoutYOLOModel(weight, device)
@@ -100,6 +116,16 @@ def ocr_model_init(det_db_box_thresh=0.3,
                    det_db_unclip_ratio=1.8,
                    enable_merge_det_boxes=True
                    ):
+    if (det_db_box_thresh, det_db_unclip_ratio, enable_merge_det_boxes) != OCR_BASE_DET_PARAMS:
+        # 不同阈值的 OCR 实例只在 DBPostProcess 参数上有区别，复用同语言基础实例的 det/rec 网络权重
+        base_ocr_model = AtomModelSingleton().get_atom_model(
+            atom_model_name=AtomicModel.OCR,
+            lang=lang,
+        )
+        return base_ocr_model.with_det_params(det_db_box_thresh, det_db_unclip_ratio, enable_merge_det_boxes)
+
+    from ...model.ocr.pytorch_paddle import PytorchPaddleOCR
+
     if lang is not None and lang != '':
         model = PytorchPaddleOCR(
             det_db_box_thresh=det_db_box_thresh,
@@ -115,12 +141,21 @@ def ocr_model_init(det_db_box_thresh=0.3,
             det_db_unclip_ratio=det_db_unclip_ratio,
             enable_merge_det_boxes=enable_merge_det_boxes,
         )
-    return model
+    # 主要作用于 rec 网络中的 Linear/LSTM 层，派生的阈值变体共享已量化的权重
+    return quantize_model_for_cpu(model, get_device())
 
 
 class AtomModelSingleton:
+    """原子模型注册表。
+
+    按 LRU 顺序缓存已构造的原子模型，并记录每个模型占用的各块内存（torch 参数 + buffers、onnxruntime 会话）。
+    通过环境变量 MINERU_MODEL_CACHE_BUDGET_MB 设置内存预算后，超出预算时会淘汰最久未使用的模型；
+    共享权重的模型（如 OCR 阈值变体与其基础模型）一同淘汰，未设置时不做淘汰，与之前的行为一致。
+    """
     _instance = None
-    _models = {}
+    _models = OrderedDict()
+    _model_blocks = {}
+    _lock = threading.RLock()
 
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
@@ -131,10 +166,14 @@ class AtomModelSingleton:
 
         lang = kwargs.get('lang', None)
 
+        # 多设备数据并行时每个设备 slot 持有各自的模型实例
+        device_slot = get_device_slot()
+
         if atom_model_name in [AtomicModel.WiredTable, AtomicModel.WirelessTable]:
             key = (
                 atom_model_name,
-                lang
+                lang,
+                device_slot
             )
         elif atom_model_name in [AtomicModel.OCR]:
             key = (
@@ -142,32 +181,117 @@ class AtomModelSingleton:
                 kwargs.get('det_db_box_thresh', 0.3),
                 lang,
                 kwargs.get('det_db_unclip_ratio', 1.8),
-                kwargs.get('enable_merge_det_boxes', True)
+                kwargs.get('enable_merge_det_boxes', True),
+                device_slot
             )
         else:
-            key = atom_model_name
+            key = (atom_model_name, device_slot)
+
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key]
+
+            atom_model = atom_model_init(model_name=atom_model_name, **kwargs)
+            self._models[key] = atom_model
+            self._model_blocks[key] = get_model_memory_blocks(atom_model)
+            logger.debug(
+                f"atom model {key} loaded, memory: {sum(self._model_blocks[key].values()) / 1024 ** 2:.1f}MB, "
+                f"total: {self.get_memory_usage() / 1024 ** 2:.1f}MB"
+            )
+            self._evict(keep=key)
+            return atom_model
+
+    def get_memory_usage(self) -> int:
+        """当前注册表中所有模型占用的内存总量(bytes)，共享的权重只计算一次"""
+        with self._lock:
+            return self._blocks_size(self._models)
+
+    def _blocks_size(self, keys) -> int:
+        blocks = {}
+        for key in keys:
+            blocks.update(self._model_blocks.get(key, {}))
+        return sum(blocks.values())
+
+    def _shared_group(self, key) -> list:
+        """与 key 直接或间接共享权重的所有缓存模型（含 key 本身），只淘汰其中一部分不会释放共享的权重"""
+        group = [key]
+        blocks = set(self._model_blocks.get(key, {}))
+        changed = True
+        while changed:
+            changed = False
+            for other in self._models:
+                if other not in group and blocks & self._model_blocks.get(other, {}).keys():
+                    group.append(other)
+                    blocks.update(self._model_blocks[other])
+                    changed = True
+        return group
+
+    def _evict(self, keep):
+        budget_mb = get_model_cache_budget()
+        if budget_mb <= 0:
+            return
+        budget = budget_mb * 1024 ** 2
+        usage = self.get_memory_usage()
+        evicted = False
+        for lru_key in list(self._models):
+            if usage <= budget:
+                break
+            if lru_key not in self._models:
+                # 已随共享权重的模型一同淘汰
+                continue
+            group = self._shared_group(lru_key)
+            if keep in group:
+                # 与刚加载的模型共享权重，淘汰后无法释放这部分内存
+                continue
+            # 共享权重的模型整体淘汰，释放量即这组模型独占的内存
+            freed = self._blocks_size(group)
+            for key in group:
+                self._models.pop(key)
+                self._model_blocks.pop(key, None)
+            usage -= freed
+            evicted = True
+            logger.info(
+                f"atom model cache exceeds budget {budget_mb}MB, "
+                f"evict {', '.join(map(str, group))} ({freed / 1024 ** 2:.1f}MB)"
+            )
+        if evicted:
+            clean_memory(get_device())
+
+def get_model_weight_path(model_path: str) -> str:
+    return str(os.path.join(auto_download_and_get_model_root_path(model_path), model_path))
+
+
+def get_mfr_model_path() -> str:
+    if MFR_MODEL == "unimernet_small":
+        return ModelPath.unimernet_small
+    elif MFR_MODEL == "pp_formulanet_plus_m":
+        return ModelPath.pp_formulanet_plus_m
+    else:
+        logger.error('MFR model name not allow')
+        exit(1)
 
-        if key not in self._models:
-            self._models[key] = atom_model_init(model_name=atom_model_name, **kwargs)
-        return self._models[key]
 
 def atom_model_init(model_name: str, **kwargs):
     atom_model = None
+    # 权重路径仅在模型真正被构造时才解析（可能触发下载）
+    device = kwargs.get('device') or get_device()
     if model_name == AtomicModel.Layout:
         atom_model = doclayout_yolo_model_init(
-            kwargs.get('doclayout_yolo_weights'),
-            kwargs.get('device')
+            kwargs.get('doclayout_yolo_weights') or get_model_weight_path(ModelPath.doclayout_yolo),
+            device
         )
     elif model_name == AtomicModel.MFD:
         atom_model = mfd_model_init(
-            kwargs.get('mfd_weights'),
-            kwargs.get('device')
+            kwargs.get('mfd_weights') or get_model_weight_path(ModelPath.yolo_v8_mfd),
+            device
         )
     elif model_name == AtomicModel.MFR:
         atom_model = mfr_model_init(
-            kwargs.get('mfr_weight_dir'),
-            kwargs.get('device')
+            kwargs.get('mfr_weight_dir') or get_model_weight_path(get_mfr_model_path()),
+            device
         )
+        atom_model = quantize_model_for_cpu(atom_model, device)
     elif model_name == AtomicModel.OCR:
         atom_model = ocr_model_init(
             kwargs.get('det_db_box_thresh', 0.3),
@@ -199,6 +323,13 @@ def atom_model_init(model_name: str, **kwargs):
 
 
 class MineruPipelineModel:
+    """pipeline 各原子模型的视图。
+
+    原子模型统一由 AtomModelSingleton 持有并在多个 MineruPipelineModel 实例间共享，
+    每个模型在首次被访问时才构造，因此不同 (lang, formula_enable, table_enable) 组合
+    不会重复加载 layout、mfd 等公共模型，未用到的模型（如文档中没有表格时的表格模型）也不会被加载。
+    """
+
     def __init__(self, **kwargs):
         self.formula_config = kwargs.get('formula_config')
         self.apply_formula = self.formula_config.get('enable', True)
@@ -206,69 +337,65 @@ class MineruPipelineModel:
         self.apply_table = self.table_config.get('enable', True)
         self.lang = kwargs.get('lang', None)
         self.device = kwargs.get('device', 'cpu')
-        logger.info(
-            'DocAnalysis init, this may take some times......'
+        self.atom_model_manager = AtomModelSingleton()
+
+    @property
+    def layout_model(self):
+        return self.atom_model_manager.get_atom_model(
+            atom_model_name=AtomicModel.Layout,
+            device=self.device,
         )
-        atom_model_manager = AtomModelSingleton()
-
-        if self.apply_formula:
-            # 初始化公式检测模型
-            self.mfd_model = atom_model_manager.get_atom_model(
-                atom_model_name=AtomicModel.MFD,
-                mfd_weights=str(
-                    os.path.join(auto_download_and_get_model_root_path(ModelPath.yolo_v8_mfd), ModelPath.yolo_v8_mfd)
-                ),
-                device=self.device,
-            )
 
-            # 初始化公式解析模型
-            if MFR_MODEL == "unimernet_small":
-                mfr_model_path = ModelPath.unimernet_small
-            elif MFR_MODEL == "pp_formulanet_plus_m":
-                mfr_model_path = ModelPath.pp_formulanet_plus_m
-            else:
-                logger.error('MFR model name not allow')
-                exit(1)
-
-            self.mfr_model = atom_model_manager.get_atom_model(
-                atom_model_name=AtomicModel.MFR,
-                mfr_weight_dir=str(os.path.join(auto_download_and_get_model_root_path(mfr_model_path), mfr_model_path)),
-                device=self.device,
-            )
+    @property
+    def mfd_model(self):
+        # 公式检测模型
+        return self.atom_model_manager.get_atom_model(
+            atom_model_name=AtomicModel.MFD,
+            device=self.device,
+        )
 
-        # 初始化layout模型
-        self.layout_model = atom_model_manager.get_atom_model(
-            atom_model_name=AtomicModel.Layout,
-            doclayout_yolo_weights=str(
-                os.path.join(auto_download_and_get_model_root_path(ModelPath.doclayout_yolo), ModelPath.doclayout_yolo)
-            ),
+    @property
+    def mfr_model(self):
+        # 公式解析模型
+        return self.atom_model_manager.get_atom_model(
+            atom_model_name=AtomicModel.MFR,
             device=self.device,
         )
-        # 初始化ocr
-        self.ocr_model = atom_model_manager.get_atom_model(
+
+    @property
+    def ocr_model(self):
+        return self.atom_model_manager.get_atom_model(
             atom_model_name=AtomicModel.OCR,
             det_db_box_thresh=0.3,
             lang=self.lang
         )
-        # init table model
-        if self.apply_table:
-            self.wired_table_model = atom_model_manager.get_atom_model(
-                atom_model_name=AtomicModel.WiredTable,
-                lang=self.lang,
-            )
-            self.wireless_table_model = atom_model_manager.get_atom_model(
-                atom_model_name=AtomicModel.WirelessTable,
-                lang=self.lang,
-            )
-            self.table_cls_model = atom_model_manager.get_atom_model(
-                atom_model_name=AtomicModel.TableCls,
-            )
-            self.img_orientation_cls_model = atom_model_manager.get_atom_model(
-                atom_model_name=AtomicModel.ImgOrientationCls,
-                lang=self.lang,
-            )
 
-        logger.info('DocAnalysis init done!')
+    @property
+    def wired_table_model(self):
+        return self.atom_model_manager.get_atom_model(
+            atom_model_name=AtomicModel.WiredTable,
+            lang=self.lang,
+        )
+
+    @property
+    def wireless_table_model(self):
+        return self.atom_model_manager.get_atom_model(
+            atom_model_name=AtomicModel.WirelessTable,
+            lang=self.lang,
+        )
+
+    @property
+    def table_cls_model(self):
+        return self.atom_model_manager.get_atom_model(
+            atom_model_name=AtomicModel.TableCls,
+        )
+
+    @property
+    def img_orientation_cls_model(self):
+        return self.atom_model_manager.get_atom_model(
+            atom_model_name=AtomicModel.ImgOrientationCls,
+            lang=self.lang,
+        )
 
 
 class HybridModelSingleton:
@@ -323,6 +450,7 @@ class MineruHybridModel:
             self.device = get_device()
 
         self.lang = lang
+        self.formula_enable = formula_enable
 
         self.enable_ocr_det_batch = ocr_det_batch_setting(self.device)
 
@@ -339,34 +467,24 @@ class MineruHybridModel:
 
         self.atom_model_manager = AtomModelSingleton()
 
-        # 初始化OCR模型
-        self.ocr_model = self.atom_model_manager.get_atom_model(
+    @property
+    def ocr_model(self):
+        return self.atom_model_manager.get_atom_model(
             atom_model_name=AtomicModel.OCR,
             det_db_box_thresh=0.3,
             lang=self.lang
         )
 
-        if formula_enable:
-            # 初始化公式检测模型
-            self.mfd_model = self.atom_model_manager.get_atom_model(
-                atom_model_name=AtomicModel.MFD,
-                mfd_weights=str(
-                    os.path.join(auto_download_and_get_model_root_path(ModelPath.yolo_v8_mfd), ModelPath.yolo_v8_mfd)
-                ),
-                device=self.device,
-            )
+    @property
+    def mfd_model(self):
+        return self.atom_model_manager.get_atom_model(
+            atom_model_name=AtomicModel.MFD,
+            device=self.device,
+        )
 
-            # 初始化公式解析模型
-            if MFR_MODEL == "unimernet_small":
-                mfr_model_path = ModelPath.unimernet_small
-            elif MFR_MODEL == "pp_formulanet_plus_m":
-                mfr_model_path = ModelPath.pp_formulanet_plus_m
-            else:
-                logger.error('MFR model name not allow')
-                exit(1)
-
-            self.mfr_model = self.atom_model_manager.get_atom_model(
-                atom_model_name=AtomicModel.MFR,
-                mfr_weight_dir=str(os.path.join(auto_download_and_get_model_root_path(mfr_model_path), mfr_model_path)),
-                device=self.device,
-            )
\ No newline at end of file
+    @property
+    def mfr_model(self):
+        return self.atom_model_manager.get_atom_model(
+            atom_model_name=AtomicModel.MFR,
+            device=self.device,
+        )
@@ -1,35 +1,56 @@
 # Copyright (c) Opendatalab. All rights reserved.
 import os
+import pickle
 import time
+from concurrent.futures import wait, ALL_COMPLETED, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
 
 from loguru import logger
 from tqdm import tqdm
 
 from mineru.backend.utils import cross_page_table_merge
 from mineru.utils.config_reader import get_device, get_llm_aided_config, get_formula_enable
+from mineru.utils.os_env_config import get_postprocess_workers
 from mineru.backend.pipeline.model_init import AtomModelSingleton
 from mineru.backend.pipeline.para_split import para_split
 from mineru.utils.block_pre_proc import prepare_block_bboxes, process_groups
-from mineru.utils.block_sort import sort_blocks_by_bbox
+from mineru.utils.block_sort import sort_blocks_by_bbox, batch_sort_blocks_by_bbox
 from mineru.utils.boxbase import calculate_overlap_area_in_bbox1_area_ratio
-from mineru.utils.cut_image import cut_image_and_table
+from mineru.utils.check_sys_env import is_windows_environment
+from mineru.utils.cut_image import cut_image_and_table, get_page_img_id
 from mineru.utils.enum_class import ContentType
-from mineru.utils.llm_aided import llm_aided_title
 from mineru.utils.model_utils import clean_memory
 from mineru.backend.pipeline.pipeline_magic_model import MagicModel
 from mineru.utils.ocr_utils import OcrConfidence
+from mineru.utils.pdf_reader import as_pdfium_input
+from mineru.utils.process_pool import SharedPdfSource, discard_process_pool, get_process_pool, open_worker_pdf
 from mineru.utils.span_block_fix import fill_spans_in_blocks, fix_discarded_block, fix_block_spans
 from mineru.utils.span_pre_proc import remove_outside_spans, remove_overlaps_low_confidence_spans, \
     remove_overlaps_min_spans, txt_spans_extract
 from mineru.version import __version__
-from mineru.utils.hash_utils import bytes_md5
 
 
 def page_model_info_to_page_info(page_model_info, image_dict, page, image_writer, page_index, ocr_enable=False, formula_enabled=True):
+    page_blocks = page_model_info_to_page_blocks(
+        page_model_info, image_dict, page, image_writer, page_index, ocr_enable=ocr_enable, formula_enabled=formula_enabled
+    )
+    if page_blocks is None:
+        return None
+    fix_blocks, footnote_blocks, fix_discarded_blocks = page_blocks
+    page_w, page_h = map(int, page.get_size())
+
+    """对block进行排序"""
+    sorted_blocks = sort_blocks_by_bbox(fix_blocks, page_w, page_h, footnote_blocks)
+
+    """构造page_info"""
+    return make_page_info_dict(sorted_blocks, page_index, page_w, page_h, fix_discarded_blocks)
+
+
+def page_model_info_to_page_blocks(page_model_info, image_dict, page, image_writer, page_index, ocr_enable=False, formula_enabled=True):
+    """处理单页模型结果，返回待排序的(fix_blocks, footnote_blocks, fix_discarded_blocks)，页面无有效内容时返回None"""
     scale = image_dict["scale"]
     page_pil_img = image_dict["img_pil"]
-    # page_img_md5 = str_md5(image_dict["img_base64"])
-    page_img_md5 = bytes_md5(page_pil_img.tobytes())
+    page_img_id = get_page_img_id(image_dict)
     page_w, page_h = map(int, page.get_size())
     magic_model = MagicModel(page_model_info, scale)
 
@@ -155,7 +176,7 @@ def page_model_info_to_page_info(page_model_info, image_dict, page, image_writer
     for span in spans:
         if span['type'] in [ContentType.IMAGE, ContentType.TABLE, ContentType.INTERLINE_EQUATION]:
             span = cut_image_and_table(
-                span, page_pil_img, page_img_md5, page_index, image_writer, scale=scale
+                span, page_pil_img, page_img_id, page_index, image_writer, scale=scale
             )
 
     """span填充进block"""
@@ -164,27 +185,140 @@ def page_model_info_to_page_info(page_model_info, image_dict, page, image_writer
     """对block进行fix操作"""
     fix_blocks = fix_block_spans(block_with_spans)
 
-    """对block进行排序"""
-    sorted_blocks = sort_blocks_by_bbox(fix_blocks, page_w, page_h, footnote_blocks)
+    return fix_blocks, footnote_blocks, fix_discarded_blocks
 
-    """构造page_info"""
-    page_info = make_page_info_dict(sorted_blocks, page_index, page_w, page_h, fix_discarded_blocks)
 
-    return page_info
+def _open_pdfium_doc(pdf_data):
+    import pypdfium2 as pdfium
+    return pdfium.PdfDocument(as_pdfium_input(pdf_data))
 
 
-def result_to_middle_json(model_list, images_list, pdf_doc, image_writer, lang=None, ocr_enable=False, formula_enabled=True):
+def _page_blocks_worker(page_model_info, pdf_source, shm_name, img_mode, img_size, image_info, image_writer, page_index, ocr_enable, formula_enabled):
+    from multiprocessing import shared_memory
+    from PIL import Image
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        page_pil_img = Image.frombytes(img_mode, img_size, bytes(shm.buf))
+    finally:
+        shm.close()
+    image_dict = {**image_info, "img_pil": page_pil_img}
+    return page_model_info_to_page_blocks(
+        page_model_info, image_dict, open_worker_pdf(pdf_source, _open_pdfium_doc)[page_index], image_writer, page_index,
+        ocr_enable=ocr_enable, formula_enabled=formula_enabled
+    )
+
+
+def _can_process_pages_in_parallel(page_num, workers, image_writer):
+    if workers <= 1 or page_num <= workers or is_windows_environment():
+        return False
+    try:
+        pickle.dumps(image_writer)
+    except Exception:
+        logger.debug(f"{type(image_writer).__name__} is not picklable, process pages sequentially")
+        return False
+    return True
+
+
+def _pages_to_page_blocks_parallel(model_list, images_list, pdf_bytes, image_writer, ocr_enable, formula_enabled, workers):
+    """多进程处理页面，结果按页码顺序返回
+
+    页面图像通过共享内存传递；PDF 经 SharedPdfSource 传给常驻进程池的子进程，
+    子进程打开后供该文档的所有页面复用
+    """
+    from multiprocessing import shared_memory
+
+    pdf_source = SharedPdfSource(pdf_bytes)
+
+    page_blocks_list = [None] * len(model_list)
+    shm_dict = {}
+    # 同时在途的页面数，限制共享内存中的页面图像数量
+    max_in_flight = workers * 2
+    executor = get_process_pool("page_postprocess", workers)
+    with tqdm(total=len(model_list), desc="Processing pages") as pbar:
+        future_to_index = {}
+
+        def collect(return_when):
+            done, _ = wait(future_to_index, return_when=return_when)
+            for future in done:
+                index = future_to_index.pop(future)
+                shm = shm_dict.pop(index)
+                shm.close()
+                shm.unlink()
+                page_blocks_list[index] = future.result()
+                pbar.update(1)
+
+        try:
+            for page_index, page_model_info in enumerate(model_list):
+                if len(future_to_index) >= max_in_flight:
+                    collect(FIRST_COMPLETED)
+                image_dict = images_list[page_index]
+                page_pil_img = image_dict["img_pil"]
+                img_bytes = page_pil_img.tobytes()
+                shm = shared_memory.SharedMemory(create=True, size=max(len(img_bytes), 1))
+                shm_dict[page_index] = shm
+                shm.buf[:len(img_bytes)] = img_bytes
+                future = executor.submit(
+                    _page_blocks_worker, page_model_info, pdf_source.source, shm.name, page_pil_img.mode, page_pil_img.size,
+                    {k: v for k, v in image_dict.items() if k != "img_pil"},
+                    image_writer, page_index, ocr_enable, formula_enabled
+                )
+                future_to_index[future] = page_index
+            collect(ALL_COMPLETED)
+        except BrokenProcessPool:
+            discard_process_pool(executor)
+            raise
+        except BaseException:
+            # 未完成的页面仍可能在读取共享内存，等待其结束后再释放
+            for future in future_to_index:
+                future.cancel()
+            wait(future_to_index)
+            raise
+        finally:
+            for shm in shm_dict.values():
+                shm.close()
+                shm.unlink()
+            pdf_source.close()
+
+    return page_blocks_list
+
+
+def result_to_middle_json(model_list, images_list, pdf_doc, image_writer, lang=None, ocr_enable=False, formula_enabled=True, pdf_bytes=None):
+    """pdf_bytes 为 pdf_doc 对应的原始PDF数据（bytes、文件映射或路径），多进程处理页面时传给子进程；
+    未提供时页面逐个在当前进程中处理
+    """
     middle_json = {"pdf_info": [], "_backend":"pipeline", "_version_name": __version__}
     formula_enabled = get_formula_enable(formula_enabled)
-    for page_index, page_model_info in tqdm(enumerate(model_list), total=len(model_list), desc="Processing pages"):
-        page = pdf_doc[page_index]
-        image_dict = images_list[page_index]
-        page_info = page_model_info_to_page_info(
-            page_model_info, image_dict, page, image_writer, page_index, ocr_enable=ocr_enable, formula_enabled=formula_enabled
+
+    """逐页构造block，页数较多时使用多进程并行处理"""
+    workers = min(get_postprocess_workers(), os.cpu_count() or 1)
+    if pdf_bytes is not None and _can_process_pages_in_parallel(len(model_list), workers, image_writer):
+        page_blocks_list = _pages_to_page_blocks_parallel(
+            model_list, images_list, pdf_bytes, image_writer, ocr_enable, formula_enabled, workers
         )
-        if page_info is None:
-            page_w, page_h = map(int, page.get_size())
+    else:
+        page_blocks_list = []
+        for page_index, page_model_info in tqdm(enumerate(model_list), total=len(model_list), desc="Processing pages"):
+            page_blocks_list.append(page_model_info_to_page_blocks(
+                page_model_info, images_list[page_index], pdf_doc[page_index], image_writer, page_index,
+                ocr_enable=ocr_enable, formula_enabled=formula_enabled
+            ))
+    page_blocks_list = [
+        (page_blocks, *map(int, pdf_doc[page_index].get_size()))
+        for page_index, page_blocks in enumerate(page_blocks_list)
+    ]
+
+    """对block进行排序，各页的line汇总后批量送入阅读顺序模型"""
+    sort_pages = [
+        (page_blocks[0], page_w, page_h, page_blocks[1])
+        for page_blocks, page_w, page_h in page_blocks_list if page_blocks is not None
+    ]
+    sorted_blocks_iter = iter(batch_sort_blocks_by_bbox(sort_pages))
+    for page_index, (page_blocks, page_w, page_h) in enumerate(page_blocks_list):
+        if page_blocks is None:
             page_info = make_page_info_dict([], page_index, page_w, page_h, [])
+        else:
+            page_info = make_page_info_dict(next(sorted_blocks_iter), page_index, page_w, page_h, page_blocks[2])
         middle_json["pdf_info"].append(page_info)
 
     """后置ocr处理"""
@@ -241,6 +375,7 @@ def result_to_middle_json(model_list, images_list, pdf_doc, image_writer, lang=N
         title_aided_config = llm_aided_config.get('title_aided', None)
         if title_aided_config is not None:
             if title_aided_config.get('enable', False):
+                from mineru.utils.llm_aided import llm_aided_title
                 llm_aided_title_start_time = time.time()
                 llm_aided_title(middle_json["pdf_info"], title_aided_config)
                 logger.info(f'llm aided title time: {round(time.time() - llm_aided_title_start_time, 2)}')
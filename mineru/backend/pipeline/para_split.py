@@ -1,7 +1,7 @@
 import copy
 from loguru import logger
 from mineru.utils.enum_class import ContentType, BlockType, SplitFlag
-from mineru.utils.language import detect_lang
+from mineru.utils.language import detect_lang_batch
 
 
 LINE_STOP_FLAG = ('.', '!', '?', '。', '！', '？', ')', '）', '"', '”', ':', '：', ';', '；')
@@ -51,7 +51,19 @@ def __process_blocks(blocks):
     return result
 
 
-def __is_list_or_index_block(block):
+def __get_lines_text_list(block):
+    lines_text_list = []
+    for line in block['lines']:
+        line_text = ''
+        for span in line['spans']:
+            if span['type'] == ContentType.TEXT:
+                line_text += span['content'].strip()
+        # 添加所有文本，包括空行，保持与block['lines']长度一致
+        lines_text_list.append(line_text)
+    return lines_text_list
+
+
+def __is_list_or_index_block(block, block_lang):
     # 一个block如果是list block 应该同时满足以下特征
     # 1.block内有多个line 2.block 内有多个line左侧顶格写 3.block内有多个line 右侧不顶格（狗牙状）
     # 1.block内有多个line 2.block 内有多个line左侧顶格写 3.多个line以endflag结尾
@@ -71,7 +83,6 @@ def __is_list_or_index_block(block):
         left_not_close_num = 0
         right_not_close_num = 0
         right_close_num = 0
-        lines_text_list = []
         center_close_num = 0
         external_sides_not_close_num = 0
         multiple_para_flag = False
@@ -91,20 +102,7 @@ def __is_list_or_index_block(block):
         ):
             multiple_para_flag = True
 
-        block_text = ''
-
-        for line in block['lines']:
-            line_text = ''
-
-            for span in line['spans']:
-                span_type = span['type']
-                if span_type == ContentType.TEXT:
-                    line_text += span['content'].strip()
-            # 添加所有文本，包括空行，保持与block['lines']长度一致
-            lines_text_list.append(line_text)
-            block_text = ''.join(lines_text_list)
-
-        block_lang = detect_lang(block_text)
+        lines_text_list = __get_lines_text_list(block)
         # logger.info(f"block_lang: {block_lang}")
 
         for line in block['lines']:
@@ -313,11 +311,22 @@ def __is_list_group(text_blocks_group):
 
 def __para_merge_page(blocks):
     page_text_blocks_groups = __process_blocks(blocks)
+
+    # 对所有需要判断list的block一次性批量检测语言
+    candidate_blocks = [
+        block for text_blocks_group in page_text_blocks_groups for block in text_blocks_group
+        if len(block['lines']) >= 2
+    ]
+    block_lang_list = detect_lang_batch(
+        [''.join(__get_lines_text_list(block)) for block in candidate_blocks]
+    )
+    block_lang_dict = {id(block): block_lang for block, block_lang in zip(candidate_blocks, block_lang_list)}
+
     for text_blocks_group in page_text_blocks_groups:
         if len(text_blocks_group) > 0:
             # 需要先在合并前对所有block判断是否为list or index block
             for block in text_blocks_group:
-                block_type = __is_list_or_index_block(block)
+                block_type = __is_list_or_index_block(block, block_lang_dict.get(id(block), ''))
                 block['type'] = block_type
                 # logger.info(f"{block['type']}:{block}")
 
@@ -352,25 +361,33 @@ def __para_merge_page(blocks):
             continue
 
 
+def __copy_block(block):
+    # 只复制block/line/span的dict和list结构，文本、bbox等叶子值与preproc_blocks共享，
+    # 后续分段、跨页表格合并及生成markdown时对para_blocks的修改不会影响preproc_blocks
+    new_block = dict(block)
+    if 'lines' in block:
+        new_block['lines'] = [
+            {**line, 'spans': [dict(span) for span in line['spans']]} for line in block['lines']
+        ]
+    if 'blocks' in block:
+        new_block['blocks'] = [__copy_block(sub_block) for sub_block in block['blocks']]
+    return new_block
+
+
 def para_split(page_info_list):
     all_blocks = []
     for page_info in page_info_list:
-        blocks = copy.deepcopy(page_info['preproc_blocks'])
-        for block in blocks:
+        page_info['para_blocks'] = [__copy_block(block) for block in page_info['preproc_blocks']]
+        for block in page_info['para_blocks']:
             block['page_num'] = page_info['page_idx']
             block['page_size'] = page_info['page_size']
-        all_blocks.extend(blocks)
+        all_blocks.extend(page_info['para_blocks'])
 
     __para_merge_page(all_blocks)
-    for page_info in page_info_list:
-        page_info['para_blocks'] = []
-        for block in all_blocks:
-            if 'page_num' in block:
-                if block['page_num'] == page_info['page_idx']:
-                    page_info['para_blocks'].append(block)
-                    # 从block中删除不需要的page_num和page_size字段
-                    del block['page_num']
-                    del block['page_size']
+    for block in all_blocks:
+        # 从block中删除不需要的page_num和page_size字段
+        del block['page_num']
+        del block['page_size']
 
 
 if __name__ == '__main__':
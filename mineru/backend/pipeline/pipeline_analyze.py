@@ -1,14 +1,18 @@
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple
 from PIL import Image
 from loguru import logger
 
 from .model_init import MineruPipelineModel
-from mineru.utils.config_reader import get_device
+from mineru.utils.config_reader import device_context, get_device, get_device_slot
+from mineru.utils.os_env_config import get_pipeline_devices
 from ...utils.enum_class import ImageType
 from ...utils.pdf_classify import classify
 from ...utils.pdf_image_tools import load_images_from_pdf
+from ...utils.pdf_reader import PdfDocumentHandle
 from ...utils.model_utils import get_vram, clean_memory
 
 
@@ -30,7 +34,8 @@ class ModelSingleton:
         formula_enable=None,
         table_enable=None,
     ):
-        key = (lang, formula_enable, table_enable)
+        # 多设备数据并行时每个设备 slot 各自持有一份模型
+        key = (lang, formula_enable, table_enable, get_device_slot())
         if key not in self._models:
             self._models[key] = custom_model_init(
                 lang=lang,
@@ -88,10 +93,13 @@ def doc_analyze(
     ocr_enabled_list = []
     load_images_start = time.time()
     for pdf_idx, pdf_bytes in enumerate(pdf_bytes_list):
+        # 每个文档只打开一次，分类和渲染共享同一个文档对象
+        pdf_handle = PdfDocumentHandle(pdf_bytes)
+
         # 确定OCR设置
         _ocr_enable = False
         if parse_method == 'auto':
-            if classify(pdf_bytes) == 'ocr':
+            if classify(pdf_handle) == 'ocr':
                 _ocr_enable = True
         elif parse_method == 'ocr':
             _ocr_enable = True
@@ -99,8 +107,10 @@ def doc_analyze(
         ocr_enabled_list.append(_ocr_enable)
         _lang = lang_list[pdf_idx]
 
-        # 收集每个数据集中的页面
-        images_list, pdf_doc = load_images_from_pdf(pdf_bytes, image_type=ImageType.PIL)
+        # 收集每个数据集中的页面，文档对象交给 all_pdf_docs 管理
+        images_list, pdf_doc = load_images_from_pdf(
+            pdf_bytes, image_type=ImageType.PIL, pdf_doc=pdf_handle.detach_pdf_doc()
+        )
         all_image_lists.append(images_list)
         all_pdf_docs.append(pdf_doc)
         for page_idx in range(len(images_list)):
@@ -114,26 +124,33 @@ def doc_analyze(
 
     # 准备批处理
     images_with_extra_info = [(info[2], info[3], info[4]) for info in all_pages_info]
+    devices = get_data_parallel_devices()
     batch_size = min_batch_inference_size
+    if len(devices) > 1:
+        # 保证每个设备都能分到batch
+        batch_size = max(1, min(batch_size, -(-len(images_with_extra_info) // len(devices))))
     batch_images = [
         images_with_extra_info[i:i + batch_size]
         for i in range(0, len(images_with_extra_info), batch_size)
     ]
 
     # 执行批处理
-    results = []
-    processed_images_count = 0
     infer_start = time.time()
-    for index, batch_image in enumerate(batch_images):
-        processed_images_count += len(batch_image)
-        logger.info(
-            f'Batch {index + 1}/{len(batch_images)}: '
-            f'{processed_images_count} pages/{len(images_with_extra_info)} pages'
-        )
-        batch_results = batch_image_analyze(batch_image, formula_enable, table_enable)
-        results.extend(batch_results)
+    if len(devices) > 1 and len(batch_images) > 1:
+        results = _data_parallel_batch_analyze(batch_images, devices, formula_enable, table_enable)
+    else:
+        results = []
+        processed_images_count = 0
+        for index, batch_image in enumerate(batch_images):
+            processed_images_count += len(batch_image)
+            logger.info(
+                f'Batch {index + 1}/{len(batch_images)}: '
+                f'{processed_images_count} pages/{len(images_with_extra_info)} pages'
+            )
+            batch_results = batch_image_analyze(batch_image, formula_enable, table_enable)
+            results.extend(batch_results)
     infer_time = round(time.time() - infer_start, 2)
-    logger.debug(f"infer finished, cost: {infer_time}, speed: {round(len(results) / infer_time, 3)} page/s")
+    logger.debug(f"infer finished, cost: {infer_time}, speed: {round(len(results) / max(infer_time, 0.01), 3)} page/s")
 
     # 构建返回结果
     infer_results = []
@@ -153,6 +170,62 @@ def doc_analyze(
     return infer_results, all_image_lists, all_pdf_docs, lang_list, ocr_enabled_list
 
 
+def get_data_parallel_devices():
+    """解析 MINERU_PIPELINE_DEVICES，返回 [(device, slot)]
+
+    - 未设置：返回空列表，使用 get_device() 单设备推理
+    - auto：全部可见的 cuda 设备
+    - cuda:0,cuda:1 等：显式指定设备列表
+    - cpu:0,cpu:1 等：cpu 虚拟设备，均在 cpu 上推理，但每个虚拟设备持有独立的模型实例
+    """
+    device_list = get_pipeline_devices()
+    if device_list == ['auto']:
+        import torch
+        device_list = [f"cuda:{i}" for i in range(torch.cuda.device_count())] if torch.cuda.is_available() else []
+
+    devices = []
+    for device in device_list:
+        if device.startswith('cpu'):
+            devices.append(('cpu', device))
+        else:
+            devices.append((device, device))
+    return devices
+
+
+def _data_parallel_batch_analyze(batch_images, devices, formula_enable=True, table_enable=True):
+    """每个设备一个工作线程，从共享队列中领取batch推理，结果按batch顺序合并"""
+    batch_results = [None] * len(batch_images)
+    next_batch = iter(range(len(batch_images)))
+    lock = threading.Lock()
+    total_pages = sum(len(batch_image) for batch_image in batch_images)
+    processed = [0]
+
+    def device_worker(device, slot):
+        with device_context(device, slot):
+            while True:
+                with lock:
+                    index = next(next_batch, None)
+                if index is None:
+                    return
+                batch_results[index] = batch_image_analyze(batch_images[index], formula_enable, table_enable)
+                with lock:
+                    processed[0] += len(batch_images[index])
+                    logger.info(
+                        f'Batch {index + 1}/{len(batch_images)} on {slot}: '
+                        f'{processed[0]} pages/{total_pages} pages'
+                    )
+
+    with ThreadPoolExecutor(max_workers=len(devices)) as executor:
+        futures = [executor.submit(device_worker, device, slot) for device, slot in devices]
+        for future in futures:
+            future.result()
+
+    results = []
+    for batch_result in batch_results:
+        results.extend(batch_result)
+    return results
+
+
 def batch_image_analyze(
         images_with_extra_info: List[Tuple[Image.Image, bool, str]],
         formula_enable=True,
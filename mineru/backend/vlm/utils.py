@@ -4,7 +4,7 @@ from loguru import logger
 from packaging import version
 
 from mineru.utils.check_sys_env import is_windows_environment, is_linux_environment
-from mineru.utils.config_reader import get_device
+from mineru.utils.config_reader import get_device, import_torch_npu
 from mineru.utils.model_utils import get_vram
 
 
@@ -12,6 +12,9 @@ def enable_custom_logits_processors() -> bool:
     import torch
     from vllm import __version__ as vllm_version
 
+    # torch.npu 由 torch_npu 导入时注册
+    import_torch_npu()
+
     if torch.cuda.is_available():
         major, minor = torch.cuda.get_device_capability()
         # 正确计算Compute Capability
@@ -1,17 +1,23 @@
 # Copyright (c) Opendatalab. All rights reserved.
+import asyncio
 import os
 import time
 import json
+from concurrent.futures import ThreadPoolExecutor
 
+import pypdfium2 as pdfium
 from loguru import logger
 
 from .utils import enable_custom_logits_processors, set_default_gpu_memory_utilization, set_default_batch_size, \
     set_lmdeploy_backend
-from .model_output_to_middle_json import result_to_middle_json
+from .model_output_to_middle_json import result_to_middle_json, blocks_to_page_info, page_infos_to_middle_json
 from ...data.data_reader_writer import DataWriter
-from mineru.utils.pdf_image_tools import load_images_from_pdf
-from ...utils.check_sys_env import is_mac_os_version_supported
+from mineru.utils.pdf_image_tools import load_images_from_pdf, pdf_page_to_image, set_page_img_ids, PageRenderPool
+from mineru.utils.pdf_reader import as_pdf_data, as_pdfium_input
+from ...utils.check_sys_env import is_mac_os_version_supported, is_windows_environment
 from ...utils.config_reader import get_device
+from ...utils.hash_utils import bytes_md5
+from ...utils.os_env_config import get_vlm_inflight_pages, get_load_images_timeout
 
 from ...utils.enum_class import ImageType
 from ...utils.models_download_utils import auto_download_and_get_model_root_path
@@ -260,6 +266,108 @@ class ModelSingleton:
         return self._models[key]
 
 
+_pdf_executor = None
+
+
+def _get_pdf_executor() -> ThreadPoolExecutor:
+    # pdfium 不是线程安全的，本进程内边渲染边推理流程的 pdfium 调用都在同一个线程中串行执行
+    global _pdf_executor
+    if _pdf_executor is None:
+        _pdf_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vlm-pdf")
+    return _pdf_executor
+
+
+def _use_inflight_pipeline(predictor: MinerUClient) -> bool:
+    # 本地推理引擎整批推理效率更高，仅远程 http-client 后端边渲染边提交
+    return predictor.backend == "http-client" and get_vlm_inflight_pages() > 0
+
+
+async def _aio_pipelined_analyze(
+    pdf_bytes,
+    image_writer: DataWriter | None,
+    predictor: MinerUClient,
+    max_inflight_pages: int,
+    dpi=200,
+):
+    """边渲染边推理：每页渲染完成后立即提交给 predictor，已提交渲染但未完成推理的页数不超过 max_inflight_pages，
+    每页推理完成后即构建页面信息并释放页面图片，结果按页码组装。
+    """
+    loop = asyncio.get_running_loop()
+    pdf_executor = _get_pdf_executor()
+    pdf_bytes = as_pdf_data(pdf_bytes)
+    pdf_doc = await loop.run_in_executor(pdf_executor, pdfium.PdfDocument, as_pdfium_input(pdf_bytes))
+    page_count = await loop.run_in_executor(pdf_executor, len, pdf_doc)
+    results = [None] * page_count
+    page_infos = [None] * page_count
+
+    render_pool = None
+    if is_windows_environment():
+        pdf_digest = bytes_md5(pdf_bytes)
+
+        def render_in_thread(index):
+            image_dict = pdf_page_to_image(pdf_doc[index], dpi=dpi, image_type=ImageType.PIL)
+            return set_page_img_ids([image_dict], pdf_digest, index, dpi)[0]
+
+        def submit_render(index):
+            return loop.run_in_executor(pdf_executor, render_in_thread, index)
+    else:
+        render_pool = PageRenderPool(pdf_bytes, dpi=dpi)
+
+        def submit_render(index):
+            return asyncio.wrap_future(render_pool.submit(index))
+
+    def to_page_info(page_blocks, image_dict, index):
+        return blocks_to_page_info(page_blocks, image_dict, pdf_doc[index], image_writer, index)
+
+    inflight = asyncio.Semaphore(max_inflight_pages)
+    # 所有页面的请求共享 predictor 的并发上限
+    request_semaphore = asyncio.Semaphore(predictor.max_concurrency)
+    render_timeout = get_load_images_timeout()
+    failed = asyncio.Event()
+
+    async def process_page(index, render_future):
+        try:
+            image_dict = await asyncio.wait_for(render_future, render_timeout)
+            results[index] = await predictor.aio_two_step_extract(image_dict["img_pil"], semaphore=request_semaphore)
+            page_infos[index] = await loop.run_in_executor(
+                pdf_executor, to_page_info, results[index], image_dict, index
+            )
+        except BaseException:
+            failed.set()
+            raise
+        finally:
+            inflight.release()
+
+    infer_start = time.time()
+    tasks = []
+    try:
+        for index in range(page_count):
+            await inflight.acquire()
+            # 已有页面失败时停止提交，由 gather 抛出异常
+            if failed.is_set():
+                break
+            tasks.append(asyncio.create_task(process_page(index, submit_render(index))))
+        await asyncio.gather(*tasks)
+    except BaseException as e:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if render_pool is not None:
+            # 只有渲染超时时才强制终止渲染进程池，其他失败只取消本文档尚未开始的渲染
+            render_pool.close(terminate=isinstance(e, asyncio.TimeoutError))
+        await loop.run_in_executor(pdf_executor, pdf_doc.close)
+        if isinstance(e, asyncio.TimeoutError):
+            raise TimeoutError(f"PDF page render timeout after {render_timeout}s") from e
+        raise
+    if render_pool is not None:
+        render_pool.close()
+    infer_time = round(time.time() - infer_start, 2)
+    logger.debug(f"pipelined render and infer finished, cost: {infer_time}, speed: {round(page_count/infer_time, 3)} page/s")
+
+    middle_json = await loop.run_in_executor(pdf_executor, page_infos_to_middle_json, page_infos, pdf_doc)
+    return middle_json, results
+
+
 def doc_analyze(
     pdf_bytes,
     image_writer: DataWriter | None,
@@ -272,6 +380,10 @@ def doc_analyze(
     if predictor is None:
         predictor = ModelSingleton().get_model(backend, model_path, server_url, **kwargs)
 
+    if _use_inflight_pipeline(predictor):
+        # 与 http-client 自身的同步接口一致，在新的事件循环中执行
+        return asyncio.run(_aio_pipelined_analyze(pdf_bytes, image_writer, predictor, get_vlm_inflight_pages()))
+
     load_images_start = time.time()
     images_list, pdf_doc = load_images_from_pdf(pdf_bytes, image_type=ImageType.PIL)
     images_pil_list = [image_dict["img_pil"] for image_dict in images_list]
@@ -299,6 +411,9 @@ async def aio_doc_analyze(
     if predictor is None:
         predictor = ModelSingleton().get_model(backend, model_path, server_url, **kwargs)
 
+    if _use_inflight_pipeline(predictor):
+        return await _aio_pipelined_analyze(pdf_bytes, image_writer, predictor, get_vlm_inflight_pages())
+
     load_images_start = time.time()
     images_list, pdf_doc = load_images_from_pdf(pdf_bytes, image_type=ImageType.PIL)
     images_pil_list = [image_dict["img_pil"] for image_dict in images_list]
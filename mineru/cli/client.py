@@ -1,6 +1,8 @@
 # Copyright (c) Opendatalab. All rights reserved.
 import os
+import queue
 import sys
+import threading
 
 import click
 from pathlib import Path
@@ -13,11 +15,170 @@ logger.add(sys.stderr, level=log_level)  # 添加新handler
 from mineru.utils.cli_parser import arg_parse
 from mineru.utils.config_reader import get_device
 from mineru.utils.guess_suffix_or_lang import guess_suffix_by_path
-from mineru.utils.model_utils import get_vram
 from ..version import __version__
 from .common import do_parse, read_fn, pdf_suffixes, image_suffixes
 
 
+# 按 200dpi 渲染一页 A4 RGB 图像约占用 12MB，用于估算文档处理时的内存占用
+RENDERED_PAGE_BYTES = 12 * 1024 ** 2
+
+
+def get_parse_dir_name(backend, method):
+    """与 do_parse 的输出目录规则保持一致"""
+    if backend == 'pipeline':
+        return method
+    elif backend.startswith('vlm-'):
+        return 'vlm'
+    else:
+        return f'hybrid_{method}'
+
+
+def _artifact_files(file_name, backend):
+    """按 _process_output 的写出顺序列出 MINERU_OUTPUT_ARTIFACTS 启用的产物文件"""
+    from mineru.utils.output_serializer import artifact_enabled
+
+    is_pipeline = backend == 'pipeline'
+    artifact_files = [
+        ('layout_pdf', f'{file_name}_layout.pdf'),
+        ('span_pdf', f'{file_name}_span.pdf'),
+        ('orig_pdf', f'{file_name}_origin.pdf'),
+        ('md', f'{file_name}.md'),
+        # vlm/hybrid 后端在 content_list 之后还会写出 content_list_v2
+        ('content_list', f'{file_name}_content_list.json' if is_pipeline else f'{file_name}_content_list_v2.json'),
+        ('middle_json', f'{file_name}_middle.json'),
+        ('model_output', f'{file_name}_model.json'),
+    ]
+    return [
+        file for artifact, file in artifact_files
+        # vlm/hybrid 后端不输出 span pdf
+        if artifact_enabled(artifact) and (is_pipeline or artifact != 'span_pdf')
+    ]
+
+
+def output_exists(output_dir, file_name, backend, method):
+    """文档最后写出的产物已存在时视为已处理完成，兼容压缩后的产物文件"""
+    from mineru.utils.output_serializer import find_output_file
+
+    files = _artifact_files(file_name, backend)
+    if not files:
+        return False
+    parse_dir = os.path.join(output_dir, file_name, get_parse_dir_name(backend, method))
+    return find_output_file(parse_dir, files[-1]) is not None
+
+
+def estimate_render_memory(path, start_page_id=0, end_page_id=None):
+    """估算解析文档时渲染页面图像的内存占用
+
+    需要用 pypdfium2 统计页数，pdfium 不支持多线程同时调用（即使是不同的文档），
+    因此只在解析文档的工作线程中调用
+    """
+    page_num = 1
+    if guess_suffix_by_path(path) in pdf_suffixes:
+        import pypdfium2 as pdfium
+        try:
+            pdf = pdfium.PdfDocument(str(path))
+            try:
+                page_num = len(pdf)
+            finally:
+                pdf.close()
+        except Exception as e:
+            logger.warning(f'Failed to count pages of {path}: {e}')
+        last_page_id = page_num - 1 if end_page_id is None else min(end_page_id, page_num - 1)
+        page_num = max(1, last_page_id - start_page_id + 1)
+    return page_num * RENDERED_PAGE_BYTES
+
+
+class InFlightBudget:
+    """限制同时驻留内存的文档数量及估算内存总量"""
+
+    def __init__(self, max_docs, max_bytes=None):
+        self.max_docs = max(1, max_docs)
+        self.max_bytes = max_bytes
+        self._docs = 0
+        self._bytes = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, cost):
+        with self._cond:
+            # 没有在途文档时总是放行，超出内存上限的单个大文档也能被处理
+            while self._docs > 0 and (
+                    self._docs >= self.max_docs
+                    or (self.max_bytes and self._bytes + cost > self.max_bytes)
+            ):
+                self._cond.wait()
+            self._docs += 1
+            self._bytes += cost
+
+    def add(self, cost):
+        """已放行的文档增加占用（如开始解析时渲染页面），不等待"""
+        with self._cond:
+            self._bytes += cost
+
+    def release(self, cost):
+        with self._cond:
+            self._docs -= 1
+            self._bytes -= cost
+            self._cond.notify_all()
+
+
+def stream_parse_docs(doc_path_list, parse_fn, load_fn=None, cost_fn=None, parse_cost_fn=None,
+                      max_in_flight=2, max_memory_bytes=None, workers=1):
+    """流式处理目录中的文档
+
+    读取线程按在途文档数和内存预算读取文档放入队列，工作线程逐个解析，
+    每个文档解析完成即写出结果并释放预算。parse_fn 中的异常只影响当前文档。
+    cost_fn 估算读取文档的内存，parse_cost_fn 估算解析时额外的内存，由工作线程在解析前调用。
+    """
+    load_fn = load_fn or read_fn
+    cost_fn = cost_fn or (lambda path: os.path.getsize(path))
+    budget = InFlightBudget(max_in_flight, max_memory_bytes)
+    workers = max(1, min(workers, max_in_flight))
+    doc_queue = queue.Queue()
+
+    def producer():
+        try:
+            for path in doc_path_list:
+                acquired = False
+                try:
+                    # 估算和读取失败（如文件在扫描后被删除）只跳过当前文档
+                    cost = cost_fn(path)
+                    budget.acquire(cost)
+                    acquired = True
+                    doc_queue.put((path, load_fn(path), cost))
+                except Exception as e:
+                    if acquired:
+                        budget.release(cost)
+                    logger.exception(f'Failed to read {path}: {e}')
+        finally:
+            for _ in range(workers):
+                doc_queue.put(None)
+
+    def worker():
+        while True:
+            item = doc_queue.get()
+            if item is None:
+                return
+            path, pdf_bytes, cost = item
+            try:
+                if parse_cost_fn is not None:
+                    parse_cost = parse_cost_fn(path)
+                    budget.add(parse_cost)
+                    cost += parse_cost
+                parse_fn(path, pdf_bytes)
+            except Exception as e:
+                logger.exception(f'Failed to parse {path}: {e}')
+            finally:
+                del pdf_bytes
+                budget.release(cost)
+
+    threads = [threading.Thread(target=producer, daemon=True)]
+    threads += [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
 @click.command(context_settings=dict(ignore_unknown_options=True, allow_extra_args=True))
 @click.pass_context
 @click.version_option(__version__,
@@ -124,6 +285,38 @@ from .common import do_parse, read_fn, pdf_suffixes, image_suffixes
     help='Enable table parsing. Default is True. ',
     default=True,
 )
+@click.option(
+    '--debug-pdf',
+    'debug_pdf_enable',
+    type=bool,
+    help='Draw layout and span bounding boxes into *_layout.pdf and *_span.pdf for debugging. Default is True. ',
+    default=True,
+)
+@click.option(
+    '--in-flight',
+    'max_in_flight',
+    type=int,
+    help='''When the input is a directory, the maximum number of documents held in memory at once.
+    Documents are read ahead and their results written as soon as each one finishes. Default is 2. ''',
+    default=2,
+)
+@click.option(
+    '--max-memory',
+    'max_memory',
+    type=int,
+    help='''When the input is a directory, the estimated memory ceiling (MB) of the documents in flight.
+    A document larger than the ceiling is still processed on its own. Unlimited by default. ''',
+    default=None,
+)
+@click.option(
+    '--skip-existing',
+    'skip_existing',
+    type=bool,
+    help="""When the input is a directory, skip documents whose last written output already exists.
+    This is the last artifact enabled by MINERU_OUTPUT_ARTIFACTS (*_model.json by default), compressed files included.
+    Default is False. """,
+    default=False,
+)
 @click.option(
     '-d',
     '--device',
@@ -154,13 +347,15 @@ from .common import do_parse, read_fn, pdf_suffixes, image_suffixes
 def main(
         ctx,
         input_path, output_dir, method, backend, lang, server_url,
-        start_page_id, end_page_id, formula_enable, table_enable,
-        device_mode, virtual_vram, model_source, **kwargs
+        start_page_id, end_page_id, formula_enable, table_enable, debug_pdf_enable,
+        max_in_flight, max_memory, skip_existing, device_mode, virtual_vram, model_source, **kwargs
 ):
 
     kwargs.update(arg_parse(ctx))
 
     if not backend.endswith('-client'):
+        from mineru.utils.model_utils import get_vram
+
         def get_device_mode() -> str:
             if device_mode is not None:
                 return device_mode
@@ -182,40 +377,56 @@ def main(
 
     os.makedirs(output_dir, exist_ok=True)
 
+    def run_do_parse(file_name_list, pdf_bytes_list):
+        do_parse(
+            output_dir=output_dir,
+            pdf_file_names=file_name_list,
+            pdf_bytes_list=pdf_bytes_list,
+            p_lang_list=[lang] * len(file_name_list),
+            backend=backend,
+            parse_method=method,
+            formula_enable=formula_enable,
+            table_enable=table_enable,
+            server_url=server_url,
+            f_draw_layout_bbox=debug_pdf_enable,
+            f_draw_span_bbox=debug_pdf_enable,
+            start_page_id=start_page_id,
+            end_page_id=end_page_id,
+            **kwargs,
+        )
+
     def parse_doc(path_list: list[Path]):
         try:
             file_name_list = []
             pdf_bytes_list = []
-            lang_list = []
             for path in path_list:
                 file_name = str(Path(path).stem)
                 pdf_bytes = read_fn(path)
                 file_name_list.append(file_name)
                 pdf_bytes_list.append(pdf_bytes)
-                lang_list.append(lang)
-            do_parse(
-                output_dir=output_dir,
-                pdf_file_names=file_name_list,
-                pdf_bytes_list=pdf_bytes_list,
-                p_lang_list=lang_list,
-                backend=backend,
-                parse_method=method,
-                formula_enable=formula_enable,
-                table_enable=table_enable,
-                server_url=server_url,
-                start_page_id=start_page_id,
-                end_page_id=end_page_id,
-                **kwargs,
-            )
+            run_do_parse(file_name_list, pdf_bytes_list)
         except Exception as e:
             logger.exception(e)
 
+    def parse_one(path, pdf_bytes):
+        run_do_parse([str(Path(path).stem)], [pdf_bytes])
+
     if os.path.isdir(input_path):
         doc_path_list = []
-        for doc_path in Path(input_path).glob('*'):
+        for doc_path in sorted(Path(input_path).glob('*')):
             if guess_suffix_by_path(doc_path) in pdf_suffixes + image_suffixes:
+                if skip_existing and output_exists(output_dir, doc_path.stem, backend, method):
+                    logger.info(f'Skip {doc_path}, output already exists')
+                    continue
                 doc_path_list.append(doc_path)
-        parse_doc(doc_path_list)
+        stream_parse_docs(
+            doc_path_list, parse_one,
+            parse_cost_fn=lambda path: estimate_render_memory(path, start_page_id, end_page_id),
+            max_in_flight=max_in_flight,
+            max_memory_bytes=max_memory * 1024 ** 2 if max_memory else None,
+            # 解析过程多处调用 pdfium，而 pdfium 不支持多线程同时调用，文档在同一个工作线程中逐个解析
+            workers=1,
+        )
     else:
         parse_doc([Path(input_path)])
 
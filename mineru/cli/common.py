@@ -1,23 +1,20 @@
 # Copyright (c) Opendatalab. All rights reserved.
-import io
-import json
 import os
 import copy
+import time
 from pathlib import Path
 
 from loguru import logger
-import pypdfium2 as pdfium
 
 from mineru.data.data_reader_writer import FileBasedDataWriter
-from mineru.utils.draw_bbox import draw_layout_bbox, draw_span_bbox, draw_line_sort_bbox
+from mineru.data.data_reader_writer.filebase import mmap_file
 from mineru.utils.engine_utils import get_vlm_engine
 from mineru.utils.enum_class import MakeMode
-from mineru.utils.guess_suffix_or_lang import guess_suffix_by_bytes
-from mineru.utils.pdf_image_tools import images_bytes_to_pdf_bytes
-from mineru.backend.vlm.vlm_middle_json_mkcontent import union_make as vlm_union_make
-from mineru.backend.vlm.vlm_analyze import doc_analyze as vlm_doc_analyze
-from mineru.backend.vlm.vlm_analyze import aio_doc_analyze as aio_vlm_doc_analyze
-from mineru.utils.pdf_page_id import get_end_page_id
+from mineru.utils.guess_suffix_or_lang import guess_suffix_by_bytes, guess_suffix_by_path
+from mineru.utils.os_env_config import get_pdf_mmap_enable
+
+# 重量级依赖（pypdfium2、draw_bbox、各后端模块）均在函数内部按需导入，
+# 避免 `mineru --help` 和 pipeline 后端承担 VLM 等无关模块的导入开销
 
 if os.getenv("MINERU_LMDEPLOY_DEVICE", "") == "maca":
     import torch
@@ -29,13 +26,25 @@ image_suffixes = ["png", "jpeg", "jp2", "webp", "gif", "bmp", "jpg", "tiff"]
 
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
-def read_fn(path):
+def read_fn(path, use_mmap=None):
+    """读取PDF或图片文件，图片会被转换为PDF
+
+    use_mmap 为 True 时（默认读取 MINERU_PDF_MMAP）PDF以内存映射方式打开，返回零拷贝的 memoryview，
+    文件类型按路径识别，不会将整个文件读入内存。
+    """
     if not isinstance(path, Path):
         path = Path(path)
+    if use_mmap is None:
+        use_mmap = get_pdf_mmap_enable()
+    if use_mmap:
+        file_suffix = guess_suffix_by_path(path)
+        if file_suffix in pdf_suffixes:
+            return mmap_file(path)
     with open(str(path), "rb") as input_file:
         file_bytes = input_file.read()
         file_suffix = guess_suffix_by_bytes(file_bytes, path)
         if file_suffix in image_suffixes:
+            from mineru.utils.pdf_image_tools import images_bytes_to_pdf_bytes
             return images_bytes_to_pdf_bytes(file_bytes)
         elif file_suffix in pdf_suffixes:
             return file_bytes
@@ -52,34 +61,14 @@ def prepare_env(output_dir, pdf_file_name, parse_method):
 
 
 def convert_pdf_bytes_to_bytes_by_pypdfium2(pdf_bytes, start_page_id=0, end_page_id=None):
-    pdf = pdfium.PdfDocument(pdf_bytes)
-    output_pdf = pdfium.PdfDocument.new()
+    """截取页码区间生成新的PDF，未截取页码区间时直接返回原始数据，不再重新序列化"""
+    from mineru.utils.pdf_reader import PdfDocumentHandle
+
+    pdf_handle = PdfDocumentHandle(pdf_bytes, start_page_id, end_page_id)
     try:
-        end_page_id = get_end_page_id(end_page_id, len(pdf))
-
-        # 逐页导入,失败则跳过
-        output_index = 0
-        for page_index in range(start_page_id, end_page_id + 1):
-            try:
-                output_pdf.import_pages(pdf, pages=[page_index])
-                output_index += 1
-            except Exception as page_error:
-                output_pdf.del_page(output_index)
-                logger.warning(f"Failed to import page {page_index}: {page_error}, skipping this page.")
-                continue
-
-        # 将新PDF保存到内存缓冲区
-        output_buffer = io.BytesIO()
-        output_pdf.save(output_buffer)
-
-        # 获取字节数据
-        output_bytes = output_buffer.getvalue()
-    except Exception as e:
-        logger.warning(f"Error in converting PDF bytes: {e}, Using original PDF bytes.")
-        output_bytes = pdf_bytes
-    pdf.close()
-    output_pdf.close()
-    return output_bytes
+        return pdf_handle.to_bytes()
+    finally:
+        pdf_handle.close()
 
 
 def _prepare_pdf_bytes(pdf_bytes_list, start_page_id, end_page_id):
@@ -110,14 +99,41 @@ def _process_output(
         model_output=None,
         is_pipeline=True
 ):
-    f_draw_line_sort_bbox = False
-    from mineru.backend.pipeline.pipeline_middle_json_mkcontent import union_make as pipeline_union_make
     """处理输出文件"""
+    from mineru.utils.output_serializer import artifact_enabled, dump_json
+
+    # MINERU_OUTPUT_ARTIFACTS 可进一步裁剪需要输出的产物，例如服务端跳过 middle/model json
+    f_draw_layout_bbox = f_draw_layout_bbox and artifact_enabled("layout_pdf")
+    f_draw_span_bbox = f_draw_span_bbox and artifact_enabled("span_pdf")
+    f_dump_orig_pdf = f_dump_orig_pdf and artifact_enabled("orig_pdf")
+    f_dump_md = f_dump_md and artifact_enabled("md")
+    f_dump_content_list = f_dump_content_list and artifact_enabled("content_list")
+    f_dump_middle_json = f_dump_middle_json and artifact_enabled("middle_json")
+    f_dump_model_output = f_dump_model_output and artifact_enabled("model_output")
+
+    f_draw_line_sort_bbox = False
+    if is_pipeline:
+        from mineru.backend.pipeline.pipeline_middle_json_mkcontent import union_make as make_func
+    else:
+        from mineru.backend.vlm.vlm_middle_json_mkcontent import union_make as make_func
+    if f_draw_layout_bbox or f_draw_span_bbox or f_draw_line_sort_bbox:
+        from mineru.utils.draw_bbox import draw_layout_bbox, draw_span_bbox, draw_line_sort_bbox
+        from mineru.utils.pdf_reader import PdfDocumentHandle
+        # 各调试pdf共享同一次解析的原始PDF
+        pdf_handle = PdfDocumentHandle(pdf_bytes)
+
+    # 记录各产物的耗时，便于评估调试pdf等产物的开销
+    timings = {}
+
     if f_draw_layout_bbox:
-        draw_layout_bbox(pdf_info, pdf_bytes, local_md_dir, f"{pdf_file_name}_layout.pdf")
+        start = time.time()
+        draw_layout_bbox(pdf_info, pdf_handle, local_md_dir, f"{pdf_file_name}_layout.pdf")
+        timings["layout_pdf"] = time.time() - start
 
     if f_draw_span_bbox:
-        draw_span_bbox(pdf_info, pdf_bytes, local_md_dir, f"{pdf_file_name}_span.pdf")
+        start = time.time()
+        draw_span_bbox(pdf_info, pdf_handle, local_md_dir, f"{pdf_file_name}_span.pdf")
+        timings["span_pdf"] = time.time() - start
 
     if f_dump_orig_pdf:
         md_writer.write(
@@ -126,45 +142,43 @@ def _process_output(
         )
 
     if f_draw_line_sort_bbox:
-        draw_line_sort_bbox(pdf_info, pdf_bytes, local_md_dir, f"{pdf_file_name}_line_sort.pdf")
+        draw_line_sort_bbox(pdf_info, pdf_handle, local_md_dir, f"{pdf_file_name}_line_sort.pdf")
 
     image_dir = str(os.path.basename(local_image_dir))
 
     if f_dump_md:
-        make_func = pipeline_union_make if is_pipeline else vlm_union_make
+        start = time.time()
         md_content_str = make_func(pdf_info, f_make_md_mode, image_dir)
         md_writer.write_string(
             f"{pdf_file_name}.md",
             md_content_str,
         )
+        timings["md"] = time.time() - start
 
     if f_dump_content_list:
-        make_func = pipeline_union_make if is_pipeline else vlm_union_make
+        start = time.time()
         content_list = make_func(pdf_info, MakeMode.CONTENT_LIST, image_dir)
-        md_writer.write_string(
-            f"{pdf_file_name}_content_list.json",
-            json.dumps(content_list, ensure_ascii=False, indent=4),
-        )
+        dump_json(md_writer, f"{pdf_file_name}_content_list.json", content_list)
         if not is_pipeline:
             content_list_v2 = make_func(pdf_info, MakeMode.CONTENT_LIST_V2, image_dir)
-            md_writer.write_string(
-                f"{pdf_file_name}_content_list_v2.json",
-                json.dumps(content_list_v2, ensure_ascii=False, indent=4),
-            )
-
+            dump_json(md_writer, f"{pdf_file_name}_content_list_v2.json", content_list_v2)
+        timings["content_list"] = time.time() - start
 
     if f_dump_middle_json:
-        md_writer.write_string(
-            f"{pdf_file_name}_middle.json",
-            json.dumps(middle_json, ensure_ascii=False, indent=4),
-        )
+        start = time.time()
+        dump_json(md_writer, f"{pdf_file_name}_middle.json", middle_json)
+        timings["middle_json"] = time.time() - start
 
     if f_dump_model_output:
-        md_writer.write_string(
-            f"{pdf_file_name}_model.json",
-            json.dumps(model_output, ensure_ascii=False, indent=4),
+        start = time.time()
+        dump_json(md_writer, f"{pdf_file_name}_model.json", model_output)
+        timings["model_output"] = time.time() - start
+
+    if timings:
+        logger.info(
+            f"{pdf_file_name} output cost: "
+            + ", ".join(f"{name} {cost:.2f}s" for name, cost in timings.items())
         )
-
     logger.info(f"local output dir is {local_md_dir}")
 
 
@@ -207,13 +221,14 @@ def _process_pipeline(
         _lang = lang_list[idx]
         _ocr_enable = ocr_enabled_list[idx]
 
+        pdf_bytes = pdf_bytes_list[idx]
+
         middle_json = pipeline_result_to_middle_json(
             model_list, images_list, pdf_doc, image_writer,
-            _lang, _ocr_enable, p_formula_enable
+            _lang, _ocr_enable, p_formula_enable, pdf_bytes=pdf_bytes
         )
 
         pdf_info = middle_json["pdf_info"]
-        pdf_bytes = pdf_bytes_list[idx]
 
         _process_output(
             pdf_info, pdf_bytes, pdf_file_name, local_md_dir, local_image_dir,
@@ -240,6 +255,8 @@ async def _async_process_vlm(
         **kwargs,
 ):
     """异步处理VLM后端逻辑"""
+    from mineru.backend.vlm.vlm_analyze import aio_doc_analyze as aio_vlm_doc_analyze
+
     parse_method = "vlm"
     f_draw_span_bbox = False
     if not backend.endswith("client"):
@@ -281,6 +298,8 @@ def _process_vlm(
         **kwargs,
 ):
     """同步处理VLM后端逻辑"""
+    from mineru.backend.vlm.vlm_analyze import doc_analyze as vlm_doc_analyze
+
     parse_method = "vlm"
     f_draw_span_bbox = False
     if not backend.endswith("client"):
@@ -25,6 +25,7 @@ from base64 import b64encode
 from mineru.cli.common import aio_do_parse, read_fn, pdf_suffixes, image_suffixes
 from mineru.utils.cli_parser import arg_parse
 from mineru.utils.guess_suffix_or_lang import guess_suffix_by_path
+from mineru.utils.output_serializer import find_output_file, read_output_text
 from mineru.version import __version__
 
 # 并发控制器
@@ -115,10 +116,9 @@ def get_infer_result(
     file_suffix_identifier: str, pdf_name: str, parse_dir: str
 ) -> Optional[str]:
     """从结果文件中读取推理结果"""
-    result_file_path = os.path.join(parse_dir, f"{pdf_name}{file_suffix_identifier}")
-    if os.path.exists(result_file_path):
-        with open(result_file_path, "r", encoding="utf-8") as fp:
-            return fp.read()
+    result_file_path = find_output_file(parse_dir, f"{pdf_name}{file_suffix_identifier}")
+    if result_file_path is not None:
+        return read_output_text(result_file_path)
     return None
 
 
@@ -187,6 +187,9 @@ async def parse_pdf(
     return_images: bool = Form(
         False, description="Return extracted images in response"
     ),
+    return_debug_pdf: bool = Form(
+        False, description="Draw layout and span bounding boxes into debug PDFs and return them in response"
+    ),
     response_format_zip: bool = Form(
         False, description="Return results as a ZIP file instead of JSON"
     ),
@@ -257,8 +260,8 @@ async def parse_pdf(
             formula_enable=formula_enable,
             table_enable=table_enable,
             server_url=server_url,
-            f_draw_layout_bbox=False,
-            f_draw_span_bbox=False,
+            f_draw_layout_bbox=return_debug_pdf,
+            f_draw_span_bbox=return_debug_pdf,
             f_dump_md=return_md,
             f_dump_middle_json=return_middle_json,
             f_dump_model_output=return_model_output,
@@ -307,35 +310,53 @@ async def parse_pdf(
                             )
 
                     if return_middle_json:
-                        path = os.path.join(parse_dir, f"{pdf_name}_middle.json")
-                        if os.path.exists(path):
+                        path = find_output_file(parse_dir, f"{pdf_name}_middle.json")
+                        if path is not None:
+                            # 启用压缩时保留 .gz/.zst 后缀
+                            compress_suffix = path[len(os.path.join(parse_dir, f"{pdf_name}_middle.json")):]
                             zf.write(
                                 path,
                                 arcname=os.path.join(
-                                    safe_pdf_name, f"{safe_pdf_name}_middle.json"
+                                    safe_pdf_name, f"{safe_pdf_name}_middle.json{compress_suffix}"
                                 ),
                             )
 
                     if return_model_output:
-                        path = os.path.join(parse_dir, f"{pdf_name}_model.json")
-                        if os.path.exists(path):
+                        path = find_output_file(parse_dir, f"{pdf_name}_model.json")
+                        if path is not None:
+                            # 启用压缩时保留 .gz/.zst 后缀
+                            compress_suffix = path[len(os.path.join(parse_dir, f"{pdf_name}_model.json")):]
                             zf.write(
                                 path,
                                 arcname=os.path.join(
-                                    safe_pdf_name, f"{safe_pdf_name}_model.json"
+                                    safe_pdf_name, f"{safe_pdf_name}_model.json{compress_suffix}"
                                 ),
                             )
 
                     if return_content_list:
-                        path = os.path.join(parse_dir, f"{pdf_name}_content_list.json")
-                        if os.path.exists(path):
+                        path = find_output_file(parse_dir, f"{pdf_name}_content_list.json")
+                        if path is not None:
+                            # 启用压缩时保留 .gz/.zst 后缀
+                            compress_suffix = path[len(os.path.join(parse_dir, f"{pdf_name}_content_list.json")):]
                             zf.write(
                                 path,
                                 arcname=os.path.join(
-                                    safe_pdf_name, f"{safe_pdf_name}_content_list.json"
+                                    safe_pdf_name, f"{safe_pdf_name}_content_list.json{compress_suffix}"
                                 ),
                             )
 
+                    # 写入调试pdf
+                    if return_debug_pdf:
+                        for suffix in ["_layout.pdf", "_span.pdf"]:
+                            path = os.path.join(parse_dir, f"{pdf_name}{suffix}")
+                            if os.path.exists(path):
+                                zf.write(
+                                    path,
+                                    arcname=os.path.join(
+                                        safe_pdf_name, f"{safe_pdf_name}{suffix}"
+                                    ),
+                                )
+
                     # 写入图片
                     if return_images:
                         images_dir = os.path.join(parse_dir, "images")
@@ -394,6 +415,11 @@ async def parse_pdf(
                         data["content_list"] = get_infer_result(
                             "_content_list.json", pdf_name, parse_dir
                         )
+                    if return_debug_pdf:
+                        for key, suffix in [("layout_pdf", "_layout.pdf"), ("span_pdf", "_span.pdf")]:
+                            path = os.path.join(parse_dir, f"{pdf_name}{suffix}")
+                            if os.path.exists(path):
+                                data[key] = f"data:application/pdf;base64,{encode_image(path)}"
                     if return_images:
                         images_dir = os.path.join(parse_dir, "images")
                         safe_pattern = os.path.join(glob.escape(images_dir), "*.jpg")
@@ -1,18 +1,55 @@
+import mmap
 import os
 
 from .base import DataReader, DataWriter
 
 
+class MappedFile(mmap.mmap):
+    """记录来源路径的文件映射
+
+    以 ACCESS_COPY（写时复制）方式映射，映射区可写，因此能零拷贝地交给 ctypes/pdfium 使用，
+    且任何写入都不会回写到文件。需要跨进程传递时只传递 path，由子进程自行打开。
+    """
+
+    path: str
+
+
+def mmap_file(path: str) -> memoryview:
+    """将整个文件映射到内存，返回零拷贝的 memoryview
+
+    映射在所有引用它的 memoryview（包括切片）释放后自动解除，调用方无需显式关闭。
+    """
+    path = os.fspath(path)
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # 空文件无法映射
+            return memoryview(b'')
+        mapped = MappedFile(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    mapped.path = os.path.abspath(path)
+    return memoryview(mapped)
+
+
+def mapped_file_path(data) -> str | None:
+    """data 是某个文件完整映射的 memoryview 时返回文件路径，否则返回 None"""
+    if isinstance(data, memoryview) and isinstance(data.obj, MappedFile) and data.nbytes == len(data.obj):
+        return data.obj.path
+    return None
+
+
 class FileBasedDataReader(DataReader):
-    def __init__(self, parent_dir: str = ''):
+    def __init__(self, parent_dir: str = '', use_mmap: bool = False):
         """Initialized with parent_dir.
 
         Args:
             parent_dir (str, optional): the parent directory that may be used within methods. Defaults to ''.
+            use_mmap (bool, optional): return zero-copy memoryviews over a memory mapped file instead of
+                reading the content into new bytes objects. Pages are loaded lazily from the page cache,
+                which keeps peak memory low for large files. Defaults to False.
         """
         self._parent_dir = parent_dir
+        self._use_mmap = use_mmap
 
-    def read_at(self, path: str, offset: int = 0, limit: int = -1) -> bytes:
+    def read_at(self, path: str, offset: int = 0, limit: int = -1) -> bytes | memoryview:
         """Read at offset and limit.
 
         Args:
@@ -21,12 +58,18 @@ class FileBasedDataReader(DataReader):
             limit (int, optional): the length of bytes want to read. Defaults to -1.
 
         Returns:
-            bytes: the content of file
+            bytes | memoryview: the content of file, a memoryview when use_mmap is enabled
         """
         fn_path = path
         if not os.path.isabs(fn_path) and len(self._parent_dir) > 0:
             fn_path = os.path.join(self._parent_dir, path)
 
+        if self._use_mmap:
+            view = mmap_file(fn_path)
+            if offset == 0 and limit == -1:
+                return view
+            return view[offset:] if limit == -1 else view[offset:offset + limit]
+
         with open(fn_path, 'rb') as f:
             f.seek(offset)
             if limit == -1:
@@ -51,6 +94,18 @@ class FileBasedDataWriter(DataWriter):
             path (str): the path of file, if the path is relative path, it will be joined with parent_dir.
             data (bytes): the data want to write
         """
+        with self.open(path) as f:
+            f.write(data)
+
+    def open(self, path: str):
+        """Open file for streaming write, the caller is responsible for closing it.
+
+        Args:
+            path (str): the path of file, if the path is relative path, it will be joined with parent_dir.
+
+        Returns:
+            the binary file object opened for writing
+        """
         fn_path = path
         if not os.path.isabs(fn_path) and len(self._parent_dir) > 0:
             fn_path = os.path.join(self._parent_dir, path)
@@ -58,5 +113,4 @@ class FileBasedDataWriter(DataWriter):
         if not os.path.exists(os.path.dirname(fn_path)) and os.path.dirname(fn_path) != "":
             os.makedirs(os.path.dirname(fn_path), exist_ok=True)
 
-        with open(fn_path, 'wb') as f:
-            f.write(data)
+        return open(fn_path, 'wb')
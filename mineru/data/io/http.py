@@ -1,37 +1,375 @@
-
+import hashlib
 import io
+import json
+import os
+import tempfile
+import time
+import uuid
 
-import requests
+from loguru import logger
 
 from .base import IOReader, IOWriter
 
+# 服务端临时不可用时可以重试的状态码
+RETRY_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+CHUNK_SIZE = 1 << 20
+
+
+class _RetryableStatus(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f'retryable http status {status_code}')
+        self.status_code = status_code
+
+
+class _HttpClient:
+    def __init__(
+        self,
+        timeout: float | tuple[float, float] = (10, 60),
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        pool_maxsize: int = 16,
+        headers: dict | None = None,
+        session=None,
+    ):
+        """Shared http session settings.
+
+        Args:
+            timeout (float | tuple, optional): (connect, read) timeout in seconds. Defaults to (10, 60).
+            max_retries (int, optional): retries for connection errors, interrupted bodies and 429/5xx
+                responses. Defaults to 3.
+            backoff_factor (float, optional): retry n sleeps backoff_factor * 2 ** n seconds. Defaults to 0.5.
+            pool_maxsize (int, optional): max pooled connections per host. Defaults to 16.
+            headers (dict, optional): extra headers sent with every request.
+            session (requests.Session, optional): reuse an existing session instead of creating one.
+        """
+        self._timeout = timeout
+        self._max_retries = max_retries
+        self._backoff_factor = backoff_factor
+        self._pool_maxsize = pool_maxsize
+        self._headers = dict(headers or {})
+        self._session = session
+
+    @property
+    def session(self):
+        # requests 仅在真正发起 http 请求时导入
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self._pool_maxsize, pool_maxsize=self._pool_maxsize)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update(self._headers)
+            self._session = session
+        return self._session
+
+    def _request(self, method: str, url: str, consume, body_factory=None, **kwargs):
+        """Send a request and consume the streamed response, retrying with
+        exponential backoff on connection errors, interrupted bodies and
+        retryable status codes.
+
+        Args:
+            method (str): http method
+            url (str): request url
+            consume (callable): called with the response, its return value is returned. It may be
+                called once per attempt, so it must not keep state between calls.
+            body_factory (callable, optional): returns (data, headers) of the request body, invoked
+                per attempt so that a streamed body is sent from the beginning on retry.
+            **kwargs: passed to requests.Session.request
+
+        Returns:
+            the return value of consume
+        """
+        import requests
+
+        headers = kwargs.pop('headers', None) or {}
+        for attempt in range(self._max_retries + 1):
+            kwargs['headers'] = headers
+            if body_factory is not None:
+                kwargs['data'], body_headers = body_factory()
+                kwargs['headers'] = {**headers, **body_headers}
+            try:
+                with self.session.request(method, url, stream=True, timeout=self._timeout, **kwargs) as response:
+                    if response.status_code in RETRY_STATUS_CODES and attempt < self._max_retries:
+                        raise _RetryableStatus(response.status_code)
+                    response.raise_for_status()
+                    return consume(response)
+            except (requests.ConnectionError, requests.Timeout,
+                    requests.exceptions.ChunkedEncodingError, _RetryableStatus) as e:
+                if attempt >= self._max_retries:
+                    raise
+                delay = self._backoff_factor * (2 ** attempt)
+                logger.warning(f'{method} {url} failed ({e}), retrying in {delay:.1f}s')
+                time.sleep(delay)
 
-class HttpReader(IOReader):
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _write_stream(response, f, chunk_size: int) -> int:
+    size = 0
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        f.write(chunk)
+        size += len(chunk)
+    return size
+
+
+class HttpReader(_HttpClient, IOReader):
+    def __init__(self, cache_dir: str | None = None, chunk_size: int = CHUNK_SIZE, **kwargs):
+        """Http reader with a pooled session, streaming, retries and an
+        optional local cache.
+
+        Args:
+            cache_dir (str, optional): cache downloaded content in this directory. Cached entries are
+                keyed by url and revalidated with the server ETag (If-None-Match). Responses without an
+                ETag are not cached. Defaults to None (no cache).
+            chunk_size (int, optional): streaming chunk size in bytes. Defaults to 1MB.
+            **kwargs: session settings, see _HttpClient.
+        """
+        super().__init__(**kwargs)
+        self._cache_dir = cache_dir
+        self._chunk_size = chunk_size
 
     def read(self, url: str) -> bytes:
         """Read the file.
 
         Args:
-            path (str): file path to read
+            url (str): file url to read
 
         Returns:
             bytes: the content of the file
         """
-        return requests.get(url).content
+        if self._cache_dir:
+            return self._cached_read(url)
+
+        def consume(response):
+            buffer = io.BytesIO()
+            _write_stream(response, buffer, self._chunk_size)
+            return buffer.getvalue()
+
+        return self._request('GET', url, consume)
+
+    def read_to_file(self, url: str, path: str) -> int:
+        """Stream the file to local disk without holding it in memory.
+
+        Args:
+            url (str): file url to read
+            path (str): local file path, written atomically
+
+        Returns:
+            int: the number of bytes written
+        """
+        dir_name = os.path.dirname(os.path.abspath(path))
+        os.makedirs(dir_name, exist_ok=True)
 
-    def read_at(self, path: str, offset: int = 0, limit: int = -1) -> bytes:
-        """Not Implemented."""
-        raise NotImplementedError
+        def consume(response):
+            fd, tmp_path = tempfile.mkstemp(dir=dir_name, prefix='.download-')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    size = _write_stream(response, f, self._chunk_size)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            return size
 
+        return self._request('GET', url, consume)
+
+    def read_at(self, url: str, offset: int = 0, limit: int = -1) -> bytes:
+        """Read at offset and limit with a http Range request.
+
+        Args:
+            url (str): file url to read
+            offset (int, optional): the number of bytes skipped. Defaults to 0.
+            limit (int, optional): the length of bytes want to read. Defaults to -1.
+
+        Returns:
+            bytes: the content of file
+        """
+        if limit == 0:
+            return b''
+        if limit > -1:
+            range_header = f'bytes={offset}-{offset + limit - 1}'
+        else:
+            range_header = f'bytes={offset}-'
+
+        def consume(response):
+            buffer = io.BytesIO()
+            if response.status_code == 206:
+                _write_stream(response, buffer, self._chunk_size)
+                return buffer.getvalue()
+            # 服务端不支持 Range 时返回完整内容，边读边跳过 offset 之前的数据
+            skipped = 0
+            for chunk in response.iter_content(chunk_size=self._chunk_size):
+                if skipped < offset:
+                    take = min(len(chunk), offset - skipped)
+                    skipped += take
+                    chunk = chunk[take:]
+                buffer.write(chunk)
+                if -1 < limit <= buffer.tell():
+                    break
+            data = buffer.getvalue()
+            return data if limit == -1 else data[:limit]
+
+        import requests
+
+        try:
+            return self._request('GET', url, consume, headers={'Range': range_header})
+        except requests.HTTPError as e:
+            # offset 超出文件大小
+            if e.response is not None and e.response.status_code == 416:
+                return b''
+            raise
+
+    def _cache_paths(self, url: str) -> tuple[str, str]:
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self._cache_dir, f'{key}.data'), os.path.join(self._cache_dir, f'{key}.json')
+
+    def _cached_read(self, url: str) -> bytes:
+        """Read url through the local cache, revalidating the cached copy with its ETag."""
+        os.makedirs(self._cache_dir, exist_ok=True)
+        data_path, meta_path = self._cache_paths(url)
+        etag = None
+        if os.path.exists(data_path) and os.path.exists(meta_path):
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                if meta.get('url') == url:
+                    etag = meta.get('etag')
+            except ValueError:
+                etag = None
+
+        def consume(response):
+            if response.status_code == 304:
+                with open(data_path, 'rb') as f:
+                    return f.read()
+            new_etag = response.headers.get('ETag')
+            if new_etag is None:
+                # 无法校验是否过期的内容不缓存
+                buffer = io.BytesIO()
+                _write_stream(response, buffer, self._chunk_size)
+                return buffer.getvalue()
+            # 不同进程可能同时下载同一 url，各自写入临时文件后原子替换
+            suffix = f'{os.getpid()}.{uuid.uuid4().hex[:8]}'
+            tmp_path = f'{data_path}.{suffix}'
+            try:
+                with open(tmp_path, 'wb') as f:
+                    _write_stream(response, f, self._chunk_size)
+                with open(tmp_path, 'rb') as f:
+                    data = f.read()
+                os.replace(tmp_path, data_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            with open(f'{meta_path}.{suffix}', 'w', encoding='utf-8') as f:
+                json.dump({'url': url, 'etag': new_etag}, f)
+            os.replace(f'{meta_path}.{suffix}', meta_path)
+            return data
+
+        headers = {'If-None-Match': etag} if etag else {}
+        return self._request('GET', url, consume, headers=headers)
+
+
+class _MultipartStream:
+    """A multipart/form-data body streamed from a file object, with a known
+    length so that requests sends it with Content-Length instead of holding
+    the encoded body in memory."""
+
+    def __init__(self, field: str, file_name: str, fileobj, size: int, chunk_size: int = CHUNK_SIZE):
+        self.boundary = uuid.uuid4().hex
+        self._head = (
+            f'--{self.boundary}\r\n'
+            f'Content-Disposition: form-data; name="{field}"; filename="{file_name}"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n'
+        ).encode('utf-8')
+        self._tail = f'\r\n--{self.boundary}--\r\n'.encode('utf-8')
+        self._size = size
+        self._chunk_size = chunk_size
+        self._parts = [io.BytesIO(self._head), fileobj, io.BytesIO(self._tail)]
+
+    @property
+    def content_type(self) -> str:
+        return f'multipart/form-data; boundary={self.boundary}'
+
+    def __len__(self) -> int:
+        return len(self._head) + self._size + len(self._tail)
+
+    def read(self, size: int = -1) -> bytes:
+        chunks = []
+        while self._parts and (size < 0 or size > 0):
+            chunk = self._parts[0].read(size)
+            if not chunk:
+                self._parts.pop(0)
+                continue
+            chunks.append(chunk)
+            if size > 0:
+                size -= len(chunk)
+        return b''.join(chunks)
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(self._chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+class HttpWriter(_HttpClient, IOWriter):
+    def __init__(self, field: str = 'file', chunk_size: int = CHUNK_SIZE, **kwargs):
+        """Http writer posting multipart/form-data with a pooled session,
+        streaming bodies and retries.
+
+        Args:
+            field (str, optional): form field name of the file. Defaults to 'file'.
+            chunk_size (int, optional): streaming chunk size in bytes. Defaults to 1MB.
+            **kwargs: session settings, see _HttpClient.
+        """
+        super().__init__(**kwargs)
+        self._field = field
+        self._chunk_size = chunk_size
 
-class HttpWriter(IOWriter):
     def write(self, url: str, data: bytes) -> None:
         """Write file with data.
 
         Args:
-            path (str): the path of file, if the path is relative path, it will be joined with parent_dir.
+            url (str): the url to post the file to
             data (bytes): the data want to write
         """
-        files = {'file': io.BytesIO(data)}
-        response = requests.post(url, files=files)
-        assert 300 > response.status_code and response.status_code > 199
+        self._post(url, lambda: io.BytesIO(data), len(data), 'file')
+
+    def write_file(self, url: str, path: str) -> None:
+        """Stream a local file to url without loading it into memory.
+
+        Args:
+            url (str): the url to post the file to
+            path (str): local file path
+        """
+        opened = []
+
+        def open_file():
+            # 每次重试重新打开文件，从头发送
+            opened.append(open(path, 'rb'))
+            return opened[-1]
+
+        try:
+            self._post(url, open_file, os.path.getsize(path), os.path.basename(path))
+        finally:
+            for f in opened:
+                f.close()
+
+    def _post(self, url: str, open_body, size: int, file_name: str) -> None:
+        def body_factory():
+            body = _MultipartStream(self._field, file_name, open_body(), size, self._chunk_size)
+            return body, {'Content-Type': body.content_type}
+
+        self._request('POST', url, lambda response: None, body_factory=body_factory)
@@ -1,10 +1,62 @@
-import boto3
-from botocore.config import Config
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from ..io.base import IOReader, IOWriter
+from ...utils.os_env_config import (
+    get_s3_io_concurrency,
+    get_s3_max_pool_connections,
+    get_s3_multipart_threshold,
+    get_s3_part_size,
+)
 
+MB = 1024 * 1024
+# s3 分段上传要求除最后一段外每段不小于 5MB，且最多 10000 段
+MIN_UPLOAD_PART_SIZE = 5 * MB
+MAX_UPLOAD_PARTS = 10000
 
-class S3Reader(IOReader):
+_s3_clients: dict = {}
+_executors: dict = {}
+_lock = threading.Lock()
+
+
+def _create_s3_client(ak: str, sk: str, endpoint_url: str, addressing_style: str,
+                      max_pool_connections: int | None = None):
+    """相同配置的客户端在所有 bucket 和 reader/writer 实例间共享，boto3 客户端是线程安全的"""
+    if max_pool_connections is None:
+        max_pool_connections = get_s3_max_pool_connections()
+    key = (ak, sk, endpoint_url, addressing_style, max_pool_connections)
+    with _lock:
+        client = _s3_clients.get(key)
+        if client is None:
+            # boto3 导入耗时较长，仅在真正使用 s3 时导入
+            import boto3
+            from botocore.config import Config
+
+            client = boto3.client(
+                service_name='s3',
+                aws_access_key_id=ak,
+                aws_secret_access_key=sk,
+                endpoint_url=endpoint_url,
+                config=Config(
+                    s3={'addressing_style': addressing_style},
+                    retries={'max_attempts': 5, 'mode': 'standard'},
+                    max_pool_connections=max_pool_connections,
+                ),
+            )
+            _s3_clients[key] = client
+    return client
+
+
+def _get_executor(max_workers: int) -> ThreadPoolExecutor:
+    with _lock:
+        executor = _executors.get(max_workers)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='mineru-s3')
+            _executors[max_workers] = executor
+    return executor
+
+
+class _S3Client:
     def __init__(
         self,
         bucket: str,
@@ -12,8 +64,12 @@ class S3Reader(IOReader):
         sk: str,
         endpoint_url: str,
         addressing_style: str = 'auto',
+        max_pool_connections: int | None = None,
+        part_size: int | None = None,
+        multipart_threshold: int | None = None,
+        max_concurrency: int | None = None,
     ):
-        """s3 reader client.
+        """s3 client settings shared by reader and writer.
 
         Args:
             bucket (str): bucket name
@@ -22,21 +78,25 @@ class S3Reader(IOReader):
             endpoint_url (str): endpoint url of s3
             addressing_style (str, optional): Defaults to 'auto'. Other valid options here are 'path' and 'virtual'
             refer to https://boto3.amazonaws.com/v1/documentation/api/1.9.42/guide/s3.html
+            max_pool_connections (int, optional): connection pool size of the client. Defaults to
+                MINERU_S3_MAX_POOL_CONNECTIONS (32).
+            part_size (int, optional): part size in bytes of ranged reads and multipart uploads. Defaults to
+                MINERU_S3_PART_SIZE_MB (16MB).
+            multipart_threshold (int, optional): objects larger than this (bytes) are read with concurrent
+                ranged GETs and written with multipart uploads. Defaults to MINERU_S3_MULTIPART_THRESHOLD_MB (32MB).
+            max_concurrency (int, optional): concurrent requests per object. Defaults to
+                MINERU_S3_IO_CONCURRENCY (8).
         """
         self._bucket = bucket
         self._ak = ak
         self._sk = sk
-        self._s3_client = boto3.client(
-            service_name='s3',
-            aws_access_key_id=ak,
-            aws_secret_access_key=sk,
-            endpoint_url=endpoint_url,
-            config=Config(
-                s3={'addressing_style': addressing_style},
-                retries={'max_attempts': 5, 'mode': 'standard'},
-            ),
-        )
+        self._s3_client = _create_s3_client(ak, sk, endpoint_url, addressing_style, max_pool_connections)
+        self._part_size = part_size or get_s3_part_size() * MB
+        self._multipart_threshold = multipart_threshold or get_s3_multipart_threshold() * MB
+        self._max_concurrency = max_concurrency or get_s3_io_concurrency()
+
 
+class S3Reader(_S3Client, IOReader):
     def read(self, key: str) -> bytes:
         """Read the file.
 
@@ -48,9 +108,17 @@ class S3Reader(IOReader):
         """
         return self.read_at(key)
 
+    def _get_range(self, key: str, start: int, end: int) -> dict:
+        return self._s3_client.get_object(Bucket=self._bucket, Key=key, Range=f'bytes={start}-{end}')
+
     def read_at(self, key: str, offset: int = 0, limit: int = -1) -> bytes:
         """Read at offset and limit.
 
+        Requests no longer than multipart_threshold are served by a single
+        ranged GET. Larger or open-ended requests read the first part to
+        learn the object size, then fetch the remaining parts with
+        concurrent ranged GETs.
+
         Args:
             path (str): the path of file, if the path is relative path, it will be joined with parent_dir.
             offset (int, optional): the number of bytes skipped. Defaults to 0.
@@ -59,56 +127,75 @@ class S3Reader(IOReader):
         Returns:
             bytes: the content of file
         """
+        if limit == 0:
+            return b''
+        if -1 < limit <= self._multipart_threshold:
+            return self._get_range(key, offset, offset + limit - 1)['Body'].read()
+
+        first_end = offset + self._part_size - 1
         if limit > -1:
-            range_header = f'bytes={offset}-{offset+limit-1}'
-            res = self._s3_client.get_object(
-                Bucket=self._bucket, Key=key, Range=range_header
-            )
-        else:
-            res = self._s3_client.get_object(
-                Bucket=self._bucket, Key=key, Range=f'bytes={offset}-'
-            )
-        return res['Body'].read()
+            first_end = min(first_end, offset + limit - 1)
+        res = self._get_range(key, offset, first_end)
+        first = res['Body'].read()
+        content_range = res.get('ContentRange')
+        if not content_range:
+            # 服务端忽略了 Range，返回的就是完整对象
+            return first[offset:] if limit == -1 else first[offset:offset + limit]
 
+        total = int(content_range.rsplit('/', 1)[1])
+        end = total - 1 if limit == -1 else min(offset + limit, total) - 1
+        start = offset + len(first)
+        if start > end:
+            return first
 
-class S3Writer(IOWriter):
-    def __init__(
-        self,
-        bucket: str,
-        ak: str,
-        sk: str,
-        endpoint_url: str,
-        addressing_style: str = 'auto',
-    ):
-        """s3 reader client.
+        ranges = [(s, min(s + self._part_size - 1, end)) for s in range(start, end + 1, self._part_size)]
+        if self._max_concurrency <= 1 or len(ranges) == 1:
+            parts = [self._get_range(key, s, e)['Body'].read() for s, e in ranges]
+        else:
+            executor = _get_executor(self._max_concurrency)
+            parts = list(executor.map(lambda r: self._get_range(key, *r)['Body'].read(), ranges))
+        return b''.join([first, *parts])
 
-        Args:
-            bucket (str): bucket name
-            ak (str): access key
-            sk (str): secret key
-            endpoint_url (str): endpoint url of s3
-            addressing_style (str, optional): Defaults to 'auto'. Other valid options here are 'path' and 'virtual'
-            refer to https://boto3.amazonaws.com/v1/documentation/api/1.9.42/guide/s3.html
-        """
-        self._bucket = bucket
-        self._ak = ak
-        self._sk = sk
-        self._s3_client = boto3.client(
-            service_name='s3',
-            aws_access_key_id=ak,
-            aws_secret_access_key=sk,
-            endpoint_url=endpoint_url,
-            config=Config(
-                s3={'addressing_style': addressing_style},
-                retries={'max_attempts': 5, 'mode': 'standard'},
-            ),
-        )
 
+class S3Writer(_S3Client, IOWriter):
     def write(self, key: str, data: bytes):
         """Write file with data.
 
+        Data larger than multipart_threshold is sent with a concurrent
+        multipart upload.
+
         Args:
             path (str): the path of file, if the path is relative path, it will be joined with parent_dir.
             data (bytes): the data want to write
         """
-        self._s3_client.put_object(Bucket=self._bucket, Key=key, Body=data)
+        if len(data) <= self._multipart_threshold:
+            self._s3_client.put_object(Bucket=self._bucket, Key=key, Body=data)
+        else:
+            self._multipart_upload(key, data)
+
+    def _multipart_upload(self, key: str, data: bytes):
+        part_size = max(self._part_size, MIN_UPLOAD_PART_SIZE, -(-len(data) // MAX_UPLOAD_PARTS))
+        view = memoryview(data)
+        upload_id = self._s3_client.create_multipart_upload(Bucket=self._bucket, Key=key)['UploadId']
+
+        def upload_part(args):
+            part_number, start = args
+            res = self._s3_client.upload_part(
+                Bucket=self._bucket, Key=key, UploadId=upload_id, PartNumber=part_number,
+                Body=bytes(view[start:start + part_size]),
+            )
+            return {'ETag': res['ETag'], 'PartNumber': part_number}
+
+        part_args = list(enumerate(range(0, len(data), part_size), start=1))
+        try:
+            if self._max_concurrency <= 1:
+                parts = [upload_part(args) for args in part_args]
+            else:
+                parts = list(_get_executor(self._max_concurrency).map(upload_part, part_args))
+            self._s3_client.complete_multipart_upload(
+                Bucket=self._bucket, Key=key, UploadId=upload_id, MultipartUpload={'Parts': parts},
+            )
+        except BaseException:
+            # 未完成的分段会持续占用存储，失败时显式中止
+            self._s3_client.abort_multipart_upload(Bucket=self._bucket, Key=key, UploadId=upload_id)
+            raise
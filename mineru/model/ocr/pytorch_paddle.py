@@ -186,6 +186,16 @@ class PytorchPaddleOCR(TextSystem):
 
         super().__init__(args)
 
+    def with_det_params(self, det_db_box_thresh, det_db_unclip_ratio, enable_merge_det_boxes=True):
+        """创建仅检测后处理参数不同的 OCR 实例，det/rec 网络权重与当前实例共享"""
+        ocr_model = copy.copy(self)
+        ocr_model.text_detector = self.text_detector.with_postprocess_params(
+            box_thresh=det_db_box_thresh,
+            unclip_ratio=det_db_unclip_ratio,
+        )
+        ocr_model.enable_merge_det_boxes = enable_merge_det_boxes
+        return ocr_model
+
     def ocr(self,
             img,
             det=True,
@@ -1,3 +1,4 @@
+import copy
 import sys
 
 import numpy as np
@@ -107,6 +108,7 @@ class TextDetector(BaseOCRV20):
             sys.exit(0)
 
         self.preprocess_op = create_operators(pre_process_list)
+        self.postprocess_params = postprocess_params
         self.postprocess_op = build_post_process(postprocess_params)
 
         self.weights_path = args.det_model_path
@@ -120,6 +122,23 @@ class TextDetector(BaseOCRV20):
             if hasattr(module, 'rep'):
                 module.rep()
 
+    def with_postprocess_params(self, **params):
+        """
+            返回与当前检测器共享同一检测网络权重、仅后处理参数不同的检测器
+
+            Args:
+                params: 需要覆盖的后处理参数，如 box_thresh、unclip_ratio
+
+            Returns:
+                detector: 新的检测器视图
+            """
+        postprocess_params = dict(self.postprocess_params)
+        postprocess_params.update(params)
+        detector = copy.copy(self)
+        detector.postprocess_params = postprocess_params
+        detector.postprocess_op = build_post_process(postprocess_params)
+        return detector
+
     def _batch_process_same_size(self, img_list):
         """
             对相同尺寸的图像进行批处理
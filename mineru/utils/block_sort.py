@@ -4,37 +4,51 @@ import os
 import statistics
 import warnings
 from typing import List
-import torch
 from loguru import logger
 
 from mineru.utils.config_reader import get_device
 from mineru.utils.enum_class import BlockType, ModelPath
+from mineru.utils.model_utils import quantize_model_for_cpu
+from mineru.utils.os_env_config import get_layoutreader_batch_size
 from mineru.utils.models_download_utils import auto_download_and_get_model_root_path
 
 
 def sort_blocks_by_bbox(blocks, page_w, page_h, footnote_blocks):
+    return batch_sort_blocks_by_bbox([(blocks, page_w, page_h, footnote_blocks)])[0]
 
-    """获取所有line并计算正文line的高度"""
-    line_height = get_line_height(blocks)
 
-    """获取所有line并对line排序"""
-    sorted_bboxes = sort_lines_by_model(blocks, page_w, page_h, line_height, footnote_blocks)
+def batch_sort_blocks_by_bbox(pages):
+    """对多页的block排序，pages为[(blocks, page_w, page_h, footnote_blocks), ...]，
+    各页的line会汇总后批量送入layoutreader，按页返回排序后的blocks"""
 
-    """根据line的中位数算block的序列关系"""
-    blocks = cal_block_index(blocks, sorted_bboxes)
+    """获取所有line并计算正文line的高度，对line排序"""
+    page_line_groups_list = []
+    for blocks, page_w, page_h, footnote_blocks in pages:
+        line_height = get_line_height(blocks)
+        page_line_groups_list.append(get_page_line_groups(blocks, page_w, page_h, line_height, footnote_blocks))
+    sorted_bboxes_list = batch_sort_lines_by_model(
+        page_line_groups_list, [(page_w, page_h) for _, page_w, page_h, _ in pages]
+    )
 
-    """将image和table的block还原回group形式参与后续流程"""
-    blocks = revert_group_blocks(blocks)
+    sorted_blocks_list = []
+    for (blocks, _, _, _), sorted_bboxes in zip(pages, sorted_bboxes_list):
+        """根据line的中位数算block的序列关系"""
+        blocks = cal_block_index(blocks, sorted_bboxes)
 
-    """重排block"""
-    sorted_blocks = sorted(blocks, key=lambda b: b['index'])
+        """将image和table的block还原回group形式参与后续流程"""
+        blocks = revert_group_blocks(blocks)
 
-    """block内重排(img和table的block内多个caption或footnote的排序)"""
-    for block in sorted_blocks:
-        if block['type'] in [BlockType.IMAGE, BlockType.TABLE]:
-            block['blocks'] = sorted(block['blocks'], key=lambda b: b['index'])
+        """重排block"""
+        sorted_blocks = sorted(blocks, key=lambda b: b['index'])
 
-    return sorted_blocks
+        """block内重排(img和table的block内多个caption或footnote的排序)"""
+        for block in sorted_blocks:
+            if block['type'] in [BlockType.IMAGE, BlockType.TABLE]:
+                block['blocks'] = sorted(block['blocks'], key=lambda b: b['index'])
+
+        sorted_blocks_list.append(sorted_blocks)
+
+    return sorted_blocks_list
 
 
 def get_line_height(blocks):
@@ -55,14 +69,20 @@ def get_line_height(blocks):
 
 
 def sort_lines_by_model(fix_blocks, page_w, page_h, line_height, footnote_blocks):
-    page_line_list = []
+    page_line_groups = get_page_line_groups(fix_blocks, page_w, page_h, line_height, footnote_blocks)
+    return batch_sort_lines_by_model([page_line_groups], [(page_w, page_h)])[0]
+
+
+def get_page_line_groups(fix_blocks, page_w, page_h, line_height, footnote_blocks):
+    """收集页面中参与排序的line，按block分组返回[[line_bbox, ...], ...]"""
+    page_line_groups = []
 
     def add_lines_to_block(b):
         line_bboxes = insert_lines_into_block(b['bbox'], line_height, page_w, page_h)
         b['lines'] = []
         for line_bbox in line_bboxes:
             b['lines'].append({'bbox': line_bbox, 'spans': []})
-        page_line_list.extend(line_bboxes)
+        page_line_groups.append(line_bboxes)
 
     for block in fix_blocks:
         if block['type'] in [
@@ -76,9 +96,7 @@ def sort_lines_by_model(fix_blocks, page_w, page_h, line_height, footnote_blocks
                 block['real_lines'] = copy.deepcopy(block['lines'])
                 add_lines_to_block(block)
             else:
-                for line in block['lines']:
-                    bbox = line['bbox']
-                    page_line_list.append(bbox)
+                page_line_groups.append([line['bbox'] for line in block['lines']])
         elif block['type'] in [BlockType.IMAGE_BODY, BlockType.TABLE_BODY, BlockType.INTERLINE_EQUATION]:
             block['real_lines'] = copy.deepcopy(block['lines'])
             add_lines_to_block(block)
@@ -87,15 +105,69 @@ def sort_lines_by_model(fix_blocks, page_w, page_h, line_height, footnote_blocks
         footnote_block = {'bbox': block[:4]}
         add_lines_to_block(footnote_block)
 
-    if len(page_line_list) > 200:  # layoutreader最高支持512line
-        return None
-
-    # 使用layoutreader排序
+    return page_line_groups
+
+
+def batch_sort_lines_by_model(page_line_groups_list, page_size_list):
+    """批量使用layoutreader对多页的line排序，返回每页排序后的line bbox列表
+
+    line数超过layoutreader上限(510)的页面先对block排序，再按block顺序展开其中的line；
+    block数仍超过上限时返回None，由调用方回退到xycut排序。
+    """
+    from mineru.model.reading_order.layout_reader import MAX_LEN
+
+    samples = []
+    for page_line_groups, (page_w, page_h) in zip(page_line_groups_list, page_size_list):
+        page_line_list = [bbox for group in page_line_groups for bbox in group]
+        if len(page_line_list) <= MAX_LEN:
+            samples.append((page_line_list, scale_boxes_for_model(page_line_list, page_w, page_h), False))
+            continue
+        page_line_groups = [group for group in page_line_groups if len(group) > 0]
+        if len(page_line_groups) > MAX_LEN:
+            samples.append(None)
+            continue
+        group_bboxes = [
+            [
+                min(bbox[0] for bbox in group), min(bbox[1] for bbox in group),
+                max(bbox[2] for bbox in group), max(bbox[3] for bbox in group),
+            ]
+            for group in page_line_groups
+        ]
+        samples.append((page_line_groups, scale_boxes_for_model(group_bboxes, page_w, page_h), True))
+
+    boxes_list = [sample[1] for sample in samples if sample is not None and len(sample[1]) > 0]
+    if len(boxes_list) > 0:
+        model_manager = ModelSingleton()
+        model = model_manager.get_model('layoutreader')
+        import torch
+        with torch.no_grad():
+            orders_list = batch_predict(boxes_list, model, get_layoutreader_batch_size())
+    else:
+        orders_list = []
+
+    sorted_bboxes_list = []
+    orders_iter = iter(orders_list)
+    for sample in samples:
+        if sample is None:
+            sorted_bboxes_list.append(None)
+            continue
+        items, boxes, by_group = sample
+        orders = next(orders_iter) if len(boxes) > 0 else []
+        sorted_items = [items[i] for i in orders]
+        if by_group:
+            # 按block排序的页面，展开为line
+            sorted_items = [bbox for group in sorted_items for bbox in group]
+        sorted_bboxes_list.append(sorted_items)
+
+    return sorted_bboxes_list
+
+
+def scale_boxes_for_model(bboxes, page_w, page_h):
     x_scale = 1000.0 / page_w
     y_scale = 1000.0 / page_h
     boxes = []
-    # logger.info(f"Scale: {x_scale}, {y_scale}, Boxes len: {len(page_line_list)}")
-    for left, top, right, bottom in page_line_list:
+    # logger.info(f"Scale: {x_scale}, {y_scale}, Boxes len: {len(bboxes)}")
+    for left, top, right, bottom in bboxes:
         if left < 0:
             logger.warning(
                 f'left < 0, left: {left}, right: {right}, top: {top}, bottom: {bottom}, page_w: {page_w}, page_h: {page_h}'
@@ -125,13 +197,7 @@ def sort_lines_by_model(fix_blocks, page_w, page_h, line_height, footnote_blocks
             1000 >= right >= left >= 0 and 1000 >= bottom >= top >= 0
         ), f'Invalid box. right: {right}, left: {left}, bottom: {bottom}, top: {top}'  # noqa: E126, E121
         boxes.append([left, top, right, bottom])
-    model_manager = ModelSingleton()
-    model = model_manager.get_model('layoutreader')
-    with torch.no_grad():
-        orders = do_predict(boxes, model)
-    sorted_bboxes = [page_line_list[i] for i in orders]
-
-    return sorted_bboxes
+    return boxes
 
 
 def insert_lines_into_block(block_bbox, line_height, page_w, page_h):
@@ -177,6 +243,7 @@ def insert_lines_into_block(block_bbox, line_height, page_w, page_h):
 
 
 def model_init(model_name: str):
+    import torch
     from transformers import LayoutLMv3ForTokenClassification
     device_name = get_device()
     device = torch.device(device_name)
@@ -221,12 +288,17 @@ def model_init(model_name: str):
             model.to(device).eval().bfloat16()
         else:
             model.to(device).eval()
+            model = quantize_model_for_cpu(model, device_name)
     else:
         logger.error('model name not allow')
         exit(1)
     return model
 
 
+# layoutreader批量推理时按line数分桶的粒度
+LAYOUTREADER_BUCKET_SIZE = 64
+
+
 class ModelSingleton:
     _instance = None
     _models = {}
@@ -255,6 +327,38 @@ def do_predict(boxes: List[List[int]], model) -> List[int]:
     return parse_logits(logits, len(boxes))
 
 
+def batch_predict(boxes_list: List[List[List[int]]], model, batch_size: int) -> List[List[int]]:
+    """按长度分桶批量推理，返回与boxes_list一一对应的orders"""
+    from mineru.model.reading_order.layout_reader import (
+        batch_boxes2inputs, parse_logits, prepare_inputs)
+
+    # 按长度排序后切分batch，同一batch内的长度相近，减少padding
+    index_list = sorted(range(len(boxes_list)), key=lambda i: len(boxes_list[i]))
+    orders_list = [None] * len(boxes_list)
+
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=FutureWarning, module="transformers")
+
+        batch = []
+        for pos, index in enumerate(index_list):
+            batch.append(index)
+            is_last = pos == len(index_list) - 1
+            if not is_last:
+                next_bucket = len(boxes_list[index_list[pos + 1]]) // LAYOUTREADER_BUCKET_SIZE
+                same_bucket = next_bucket == len(boxes_list[batch[0]]) // LAYOUTREADER_BUCKET_SIZE
+                if same_bucket and len(batch) < batch_size:
+                    continue
+
+            inputs = batch_boxes2inputs([boxes_list[i] for i in batch])
+            inputs = prepare_inputs(inputs, model)
+            logits = model(**inputs).logits.float().cpu()
+            for batch_index, i in enumerate(batch):
+                orders_list[i] = parse_logits(logits[batch_index], len(boxes_list[i]))
+            batch = []
+
+    return orders_list
+
+
 def cal_block_index(fix_blocks, sorted_bboxes):
 
     if sorted_bboxes is not None:
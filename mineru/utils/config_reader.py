@@ -1,13 +1,11 @@
 # Copyright (c) Opendatalab. All rights reserved.
+import functools
 import json
 import os
-from loguru import logger
+import threading
+from contextlib import contextmanager
 
-try:
-    import torch
-    import torch_npu
-except ImportError:
-    pass
+from loguru import logger
 
 
 # 定义配置文件名常量
@@ -72,17 +70,68 @@ def parse_bucket_key(s3_full_path: str):
     return bucket, key
 
 
+# 数据并行时每个工作线程绑定的设备，见 device_context
+_device_local = threading.local()
+
+
+@contextmanager
+def device_context(device, slot=None):
+    """在当前线程内将 get_device() 指定为 device
+
+    slot 用于区分同一物理设备上的多个虚拟设备（如 cpu:0、cpu:1），
+    模型缓存按 slot 隔离，每个 slot 持有独立的模型实例。
+    """
+    prev_device = getattr(_device_local, 'device', None)
+    prev_slot = getattr(_device_local, 'slot', None)
+    _device_local.device = device
+    _device_local.slot = slot or device
+    if str(device).startswith('cuda'):
+        import torch
+        torch.cuda.set_device(device)
+    try:
+        yield
+    finally:
+        _device_local.device = prev_device
+        _device_local.slot = prev_slot
+
+
+def get_device_slot():
+    """当前线程的模型缓存 slot，未进入 device_context 时与 get_device() 相同"""
+    slot = getattr(_device_local, 'slot', None)
+    if slot is not None:
+        return slot
+    return get_device()
+
+
+@functools.lru_cache(maxsize=None)
+def import_torch_npu():
+    """导入 torch_npu，其导入时会向 torch 注册 npu 后端（torch.npu），使用 npu 设备前需先调用"""
+    try:
+        import torch_npu
+    except ImportError:
+        pass
+
+
 def get_device():
+    device = getattr(_device_local, 'device', None)
+    if device is not None:
+        if str(device).startswith('npu'):
+            import_torch_npu()
+        return device
     device_mode = os.getenv('MINERU_DEVICE_MODE', None)
     if device_mode is not None:
+        if device_mode.startswith('npu'):
+            import_torch_npu()
         return device_mode
     else:
+        import torch
         if torch.cuda.is_available():
             return "cuda"
         elif torch.backends.mps.is_available():
             return "mps"
         else:
             try:
+                import torch_npu
                 if torch_npu.npu.is_available():
                     return "npu"
             except Exception as e:
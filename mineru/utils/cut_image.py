@@ -1,12 +1,21 @@
 from loguru import logger
 
+from .hash_utils import bytes_md5
 from .pdf_image_tools import cut_image
 
 
-def cut_image_and_table(span, page_pil_img, page_img_md5, page_id, image_writer, scale=2):
+def get_page_img_id(image_dict) -> str:
+    """页面图片标识，优先使用渲染时记录的(pdf摘要, 页码, dpi)，缺失时退回为对页面像素计算md5"""
+    img_id = image_dict.get("img_id")
+    if img_id is None:
+        img_id = bytes_md5(image_dict["img_pil"].tobytes())
+    return img_id
+
+
+def cut_image_and_table(span, page_pil_img, page_img_id, page_id, image_writer, scale=2):
 
     def return_path(path_type):
-        return f"{path_type}/{page_img_md5}"
+        return f"{path_type}/{page_img_id}"
 
     span_type = span["type"]
 
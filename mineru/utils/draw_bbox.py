@@ -1,11 +1,18 @@
 import json
+import os
+from concurrent.futures import wait
+from concurrent.futures.process import BrokenProcessPool
 from io import BytesIO
 
 from loguru import logger
 from pypdf import PdfReader, PdfWriter, PageObject
 from reportlab.pdfgen import canvas
 
+from .check_sys_env import is_windows_environment
 from .enum_class import BlockType, ContentType, SplitFlag
+from .os_env_config import get_draw_bbox_workers
+from .pdf_reader import PdfDocumentHandle, open_pdf_stream
+from .process_pool import SharedPdfSource, discard_process_pool, get_process_pool, open_worker_pdf
 
 
 def cal_canvas_rect(page, bbox):
@@ -117,6 +124,100 @@ def draw_bbox_with_number(i, bbox_list, page, c, rgb_config, fill_config, draw_b
     return c
 
 
+def _draw_page_overlay(page, page_ops):
+    """按绘制指令在单页上绘制bbox，返回叠加了bbox的新页面
+
+    page_ops: [(bbox_list, rgb_config, fill_config, with_number, draw_bbox)]
+    """
+    # 获取原始页面尺寸
+    page_width, page_height = float(page.cropbox[2]), float(page.cropbox[3])
+    custom_page_size = (page_width, page_height)
+
+    packet = BytesIO()
+    # 使用原始PDF的尺寸创建canvas
+    c = canvas.Canvas(packet, pagesize=custom_page_size)
+
+    for bbox_list, rgb_config, fill_config, with_number, draw_bbox in page_ops:
+        if with_number:
+            c = draw_bbox_with_number(0, [bbox_list], page, c, rgb_config, fill_config, draw_bbox=draw_bbox)
+        else:
+            c = draw_bbox_without_number(0, [bbox_list], page, c, rgb_config, fill_config)
+
+    c.save()
+    packet.seek(0)
+    overlay_pdf = PdfReader(packet)
+
+    # 添加检查确保overlay_pdf.pages不为空
+    if len(overlay_pdf.pages) > 0:
+        new_page = PageObject(pdf=None)
+        new_page.update(page)
+        page = new_page
+        page.merge_page(overlay_pdf.pages[0])
+
+    return page
+
+
+def _open_pdf_reader(pdf_data):
+    return PdfReader(open_pdf_stream(pdf_data))
+
+
+def _draw_pages_worker(pdf_source, start_page, page_ops_list):
+    """子进程中绘制一段连续页面，返回这段页面组成的pdf"""
+    pdf_reader = open_worker_pdf(pdf_source, _open_pdf_reader)
+    output_pdf = PdfWriter()
+    for i, page_ops in enumerate(page_ops_list):
+        output_pdf.add_page(_draw_page_overlay(pdf_reader.pages[start_page + i], page_ops))
+    output = BytesIO()
+    output_pdf.write(output)
+    return output.getvalue()
+
+
+def draw_pages_to_pdf(pdf, page_ops_list, out_path, filename, workers=None):
+    """将每页的绘制指令叠加到原始PDF上并保存
+
+    pdf 为PDF字节数据或 PdfDocumentHandle，传入句柄时多个调试pdf共享同一次解析结果。
+    页数较多时按连续页段分给常驻进程池中的多个进程绘制（bbox绘制和页面合并均为纯python计算），
+    最后按顺序一次性拼接各段结果。
+    """
+    pdf_handle = pdf if isinstance(pdf, PdfDocumentHandle) else PdfDocumentHandle(pdf)
+    pdf_bytes = pdf_handle.pdf_bytes
+    pdf_docs = pdf_handle.pypdf_reader
+    page_num = len(pdf_docs.pages)
+    page_ops_list = list(page_ops_list)[:page_num]
+    page_ops_list += [[] for _ in range(page_num - len(page_ops_list))]
+
+    if workers is None:
+        workers = min(get_draw_bbox_workers(), os.cpu_count() or 1)
+    output_pdf = PdfWriter()
+
+    if workers > 1 and page_num > workers and not is_windows_environment():
+        chunk_size = (page_num + workers - 1) // workers
+        executor = get_process_pool("draw_bbox", workers)
+        with SharedPdfSource(pdf_bytes) as pdf_source:
+            futures = [
+                executor.submit(_draw_pages_worker, pdf_source.source, start, page_ops_list[start:start + chunk_size])
+                for start in range(0, page_num, chunk_size)
+            ]
+            try:
+                for future in futures:
+                    output_pdf.append(PdfReader(BytesIO(future.result())))
+            except BrokenProcessPool:
+                discard_process_pool(executor)
+                raise
+            finally:
+                # 子进程可能仍在读取共享内存中的PDF，等其结束后再释放
+                for future in futures:
+                    future.cancel()
+                wait(futures)
+    else:
+        for i, page in enumerate(pdf_docs.pages):
+            output_pdf.add_page(_draw_page_overlay(page, page_ops_list[i]))
+
+    # 保存结果
+    with open(f"{out_path}/{filename}", "wb") as f:
+        output_pdf.write(f)
+
+
 def draw_layout_bbox(pdf_info, pdf_bytes, out_path, filename):
     dropped_bbox_list = []
     tables_body_list, tables_caption_list, tables_footnote_list = [], [], []
@@ -237,56 +338,28 @@ def draw_layout_bbox(pdf_info, pdf_bytes, out_path, filename):
 
         layout_bbox_list.append(page_block_list)
 
-    pdf_bytes_io = BytesIO(pdf_bytes)
-    pdf_docs = PdfReader(pdf_bytes_io)
-    output_pdf = PdfWriter()
-
-    for i, page in enumerate(pdf_docs.pages):
-        # 获取原始页面尺寸
-        page_width, page_height = float(page.cropbox[2]), float(page.cropbox[3])
-        custom_page_size = (page_width, page_height)
-
-        packet = BytesIO()
-        # 使用原始PDF的尺寸创建canvas
-        c = canvas.Canvas(packet, pagesize=custom_page_size)
-
-        c = draw_bbox_without_number(i, codes_body_list, page, c, [102, 0, 204], True)
-        c = draw_bbox_without_number(i, codes_caption_list, page, c, [204, 153, 255], True)
-        c = draw_bbox_without_number(i, dropped_bbox_list, page, c, [158, 158, 158], True)
-        c = draw_bbox_without_number(i, tables_body_list, page, c, [204, 204, 0], True)
-        c = draw_bbox_without_number(i, tables_caption_list, page, c, [255, 255, 102], True)
-        c = draw_bbox_without_number(i, tables_footnote_list, page, c, [229, 255, 204], True)
-        c = draw_bbox_without_number(i, imgs_body_list, page, c, [153, 255, 51], True)
-        c = draw_bbox_without_number(i, imgs_caption_list, page, c, [102, 178, 255], True)
-        c = draw_bbox_without_number(i, imgs_footnote_list, page, c, [255, 178, 102], True)
-        c = draw_bbox_without_number(i, titles_list, page, c, [102, 102, 255], True)
-        c = draw_bbox_without_number(i, texts_list, page, c, [153, 0, 76], True)
-        c = draw_bbox_without_number(i, interequations_list, page, c, [0, 255, 0], True)
-        c = draw_bbox_without_number(i, lists_list, page, c, [40, 169, 92], True)
-        c = draw_bbox_without_number(i, list_items_list, page, c, [40, 169, 92], False)
-        c = draw_bbox_without_number(i, indexs_list, page, c, [40, 169, 92], True)
-        c = draw_bbox_with_number(i, layout_bbox_list, page, c, [255, 0, 0], False, draw_bbox=False)
-
-        c.save()
-        packet.seek(0)
-        overlay_pdf = PdfReader(packet)
-
-        # 添加检查确保overlay_pdf.pages不为空
-        if len(overlay_pdf.pages) > 0:
-            new_page = PageObject(pdf=None)
-            new_page.update(page)
-            page = new_page
-            page.merge_page(overlay_pdf.pages[0])
-        else:
-            # 记录日志并继续处理下一个页面
-            # logger.warning(f"layout.pdf: 第{i + 1}页未能生成有效的overlay PDF")
-            pass
-
-        output_pdf.add_page(page)
-
-    # 保存结果
-    with open(f"{out_path}/{filename}", "wb") as f:
-        output_pdf.write(f)
+    page_ops_list = []
+    for i in range(len(pdf_info)):
+        page_ops_list.append([
+            (codes_body_list[i], [102, 0, 204], True, False, True),
+            (codes_caption_list[i], [204, 153, 255], True, False, True),
+            (dropped_bbox_list[i], [158, 158, 158], True, False, True),
+            (tables_body_list[i], [204, 204, 0], True, False, True),
+            (tables_caption_list[i], [255, 255, 102], True, False, True),
+            (tables_footnote_list[i], [229, 255, 204], True, False, True),
+            (imgs_body_list[i], [153, 255, 51], True, False, True),
+            (imgs_caption_list[i], [102, 178, 255], True, False, True),
+            (imgs_footnote_list[i], [255, 178, 102], True, False, True),
+            (titles_list[i], [102, 102, 255], True, False, True),
+            (texts_list[i], [153, 0, 76], True, False, True),
+            (interequations_list[i], [0, 255, 0], True, False, True),
+            (lists_list[i], [40, 169, 92], True, False, True),
+            (list_items_list[i], [40, 169, 92], False, False, True),
+            (indexs_list[i], [40, 169, 92], True, False, True),
+            (layout_bbox_list[i], [255, 0, 0], False, True, False),
+        ])
+
+    draw_pages_to_pdf(pdf_bytes, page_ops_list, out_path, filename)
 
 
 def draw_span_bbox(pdf_info, pdf_bytes, out_path, filename):
@@ -349,47 +422,18 @@ def draw_span_bbox(pdf_info, pdf_bytes, out_path, filename):
         image_list.append(page_image_list)
         table_list.append(page_table_list)
 
-    pdf_bytes_io = BytesIO(pdf_bytes)
-    pdf_docs = PdfReader(pdf_bytes_io)
-    output_pdf = PdfWriter()
+    page_ops_list = []
+    for i in range(len(pdf_info)):
+        page_ops_list.append([
+            (text_list[i], [255, 0, 0], False, False, True),
+            (inline_equation_list[i], [0, 255, 0], False, False, True),
+            (interline_equation_list[i], [0, 0, 255], False, False, True),
+            (image_list[i], [255, 204, 0], False, False, True),
+            (table_list[i], [204, 0, 255], False, False, True),
+            (dropped_list[i], [158, 158, 158], False, False, True),
+        ])
 
-    for i, page in enumerate(pdf_docs.pages):
-        # 获取原始页面尺寸
-        page_width, page_height = float(page.cropbox[2]), float(page.cropbox[3])
-        custom_page_size = (page_width, page_height)
-
-        packet = BytesIO()
-        # 使用原始PDF的尺寸创建canvas
-        c = canvas.Canvas(packet, pagesize=custom_page_size)
-
-        # 获取当前页面的数据
-        draw_bbox_without_number(i, text_list, page, c,[255, 0, 0], False)
-        draw_bbox_without_number(i, inline_equation_list, page, c, [0, 255, 0], False)
-        draw_bbox_without_number(i, interline_equation_list, page, c, [0, 0, 255], False)
-        draw_bbox_without_number(i, image_list, page, c, [255, 204, 0], False)
-        draw_bbox_without_number(i, table_list, page, c, [204, 0, 255], False)
-        draw_bbox_without_number(i, dropped_list, page, c, [158, 158, 158], False)
-
-        c.save()
-        packet.seek(0)
-        overlay_pdf = PdfReader(packet)
-
-        # 添加检查确保overlay_pdf.pages不为空
-        if len(overlay_pdf.pages) > 0:
-            new_page = PageObject(pdf=None)
-            new_page.update(page)
-            page = new_page
-            page.merge_page(overlay_pdf.pages[0])
-        else:
-            # 记录日志并继续处理下一个页面
-            # logger.warning(f"span.pdf: 第{i + 1}页未能生成有效的overlay PDF")
-            pass
-
-        output_pdf.add_page(page)
-
-    # Save the PDF
-    with open(f"{out_path}/{filename}", "wb") as f:
-        output_pdf.write(f)
+    draw_pages_to_pdf(pdf_bytes, page_ops_list, out_path, filename)
 
 
 def draw_line_sort_bbox(pdf_info, pdf_bytes, out_path, filename):
@@ -434,43 +478,10 @@ def draw_line_sort_bbox(pdf_info, pdf_bytes, out_path, filename):
                             index = line['index']
                             page_line_list.append({'index': index, 'bbox': bbox})
         sorted_bboxes = sorted(page_line_list, key=lambda x: x['index'])
-        layout_bbox_list.append(sorted_bbox['bbox'] for sorted_bbox in sorted_bboxes)
-    pdf_bytes_io = BytesIO(pdf_bytes)
-    pdf_docs = PdfReader(pdf_bytes_io)
-    output_pdf = PdfWriter()
-
-    for i, page in enumerate(pdf_docs.pages):
-        # 获取原始页面尺寸
-        page_width, page_height = float(page.cropbox[2]), float(page.cropbox[3])
-        custom_page_size = (page_width, page_height)
-
-        packet = BytesIO()
-        # 使用原始PDF的尺寸创建canvas
-        c = canvas.Canvas(packet, pagesize=custom_page_size)
-
-        # 获取当前页面的数据
-        draw_bbox_with_number(i, layout_bbox_list, page, c, [255, 0, 0], False)
+        layout_bbox_list.append([sorted_bbox['bbox'] for sorted_bbox in sorted_bboxes])
 
-        c.save()
-        packet.seek(0)
-        overlay_pdf = PdfReader(packet)
-
-        # 添加检查确保overlay_pdf.pages不为空
-        if len(overlay_pdf.pages) > 0:
-            new_page = PageObject(pdf=None)
-            new_page.update(page)
-            page = new_page
-            page.merge_page(overlay_pdf.pages[0])
-        else:
-            # 记录日志并继续处理下一个页面
-            # logger.warning(f"span.pdf: 第{i + 1}页未能生成有效的overlay PDF")
-            pass
-
-        output_pdf.add_page(page)
-
-    # Save the PDF
-    with open(f"{out_path}/{filename}", "wb") as f:
-        output_pdf.write(f)
+    page_ops_list = [[(page_bboxes, [255, 0, 0], False, True, True)] for page_bboxes in layout_bbox_list]
+    draw_pages_to_pdf(pdf_bytes, page_ops_list, out_path, filename)
 
 
 if __name__ == "__main__":
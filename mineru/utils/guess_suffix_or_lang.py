@@ -1,21 +1,28 @@
+from functools import lru_cache
 from pathlib import Path
 
 from loguru import logger
-from magika import Magika
 
 
 DEFAULT_LANG = "txt"
 PDF_SIG_BYTES = b'%PDF'
-magika = Magika()
+
+
+@lru_cache(maxsize=1)
+def get_magika():
+    # Magika 初始化会加载 onnxruntime 模型，延迟到首次使用时再创建
+    from magika import Magika
+    return Magika()
+
 
 def guess_language_by_text(code):
     codebytes = code.encode(encoding="utf-8")
-    lang = magika.identify_bytes(codebytes).prediction.output.label
+    lang = get_magika().identify_bytes(codebytes).prediction.output.label
     return lang if lang != "unknown" else DEFAULT_LANG
 
 
 def guess_suffix_by_bytes(file_bytes, file_path=None) -> str:
-    suffix = magika.identify_bytes(file_bytes).prediction.output.label
+    suffix = get_magika().identify_bytes(file_bytes).prediction.output.label
     if file_path and suffix in ["ai", "html"] and Path(file_path).suffix.lower() in [".pdf"] and file_bytes[:4] == PDF_SIG_BYTES:
         suffix = "pdf"
     return suffix
@@ -24,7 +31,7 @@ def guess_suffix_by_bytes(file_bytes, file_path=None) -> str:
 def guess_suffix_by_path(file_path) -> str:
     if not isinstance(file_path, Path):
         file_path = Path(file_path)
-    suffix = magika.identify_path(file_path).prediction.output.label
+    suffix = get_magika().identify_path(file_path).prediction.output.label
     if suffix in ["ai", "html"] and file_path.suffix.lower() in [".pdf"]:
         try:
             with open(file_path, 'rb') as f:
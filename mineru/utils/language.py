@@ -10,6 +10,8 @@ if not os.getenv("FTLANG_CACHE"):
     # print(os.getenv("FTLANG_CACHE"))
 
 from fast_langdetect import detect_language
+from fast_langdetect.ft_detect import is_japanese
+from fast_langdetect.ft_detect.infer import load_model
 
 
 def remove_invalid_surrogates(text):
@@ -39,6 +41,42 @@ def detect_lang(text: str) -> str:
     return lang
 
 
+def detect_lang_batch(text_list: list[str]) -> list[str]:
+    """批量检测语言，结果与逐条调用 detect_lang 一致；相同文本只检测一次，并尽量用一次模型调用完成"""
+    lang_list = [""] * len(text_list)
+    text_to_indices = {}
+    for index, text in enumerate(text_list):
+        if len(text) == 0:
+            continue
+        text = remove_invalid_surrogates(text.replace("\n", ""))
+        text_to_indices.setdefault(text, []).append(index)
+    if not text_to_indices:
+        return lang_list
+
+    texts = list(text_to_indices)
+    labels = None
+    try:
+        # fasttext 与 fasttext-predict 的多行预测返回格式不同，前者为(labels, probs)
+        result = load_model(low_memory=True).f.multilinePredict(texts, 1, 0.0, "strict")
+        if isinstance(result, tuple):
+            result = result[0]
+        if len(result) == len(texts):
+            labels = [label[0].replace("__label__", "").upper() if label else "" for label in result]
+    except Exception:
+        labels = None
+
+    for text_index, text in enumerate(texts):
+        if labels is None or not labels[text_index]:
+            lang = detect_lang(text)
+        else:
+            lang = labels[text_index].lower()
+            if lang == "ja" and not is_japanese(text):
+                lang = "zh"
+        for index in text_to_indices[text]:
+            lang_list[index] = lang
+    return lang_list
+
+
 if __name__ == '__main__':
     print(os.getenv("FTLANG_CACHE"))
     print(detect_lang("This is a test."))
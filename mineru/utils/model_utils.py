@@ -1,4 +1,5 @@
 import os
+import sys
 import time
 import gc
 from PIL import Image
@@ -6,12 +7,7 @@ from loguru import logger
 import numpy as np
 
 from mineru.utils.boxbase import get_minbox_if_overlap_by_ratio
-
-try:
-    import torch
-    import torch_npu
-except ImportError:
-    pass
+from mineru.utils.os_env_config import get_cpu_quantize_enable
 
 
 def crop_img(input_res, input_img, crop_paste_x=0, crop_paste_y=0):
@@ -413,12 +409,117 @@ def get_res_list_from_layout_res(layout_res, iou_threshold=0.7, overlap_threshol
     return ocr_res_list, filtered_table_res_list, single_page_mfdetrec_res
 
 
+def _collect_torch_modules(obj, modules: dict, visited: set, nn_module_cls, depth=0, max_depth=6):
+    if depth > max_depth or id(obj) in visited:
+        return
+    if obj is None or isinstance(obj, (str, bytes, int, float, bool, np.ndarray)):
+        return
+    visited.add(id(obj))
+    if isinstance(obj, nn_module_cls):
+        modules[id(obj)] = obj
+        return
+    if isinstance(obj, dict):
+        children = obj.values()
+    elif isinstance(obj, (list, tuple, set)):
+        children = obj
+    elif hasattr(obj, '__dict__'):
+        children = vars(obj).values()
+    else:
+        return
+    for child in children:
+        _collect_torch_modules(child, modules, visited, nn_module_cls, depth + 1, max_depth)
+
+
+def _onnx_session_size(session) -> int:
+    """onnxruntime 推理会话的权重无法直接统计，按模型文件大小估算"""
+    model_path = getattr(session, '_model_path', None)
+    if model_path and os.path.isfile(model_path):
+        return os.path.getsize(model_path)
+    model_bytes = getattr(session, '_model_bytes', None)
+    return len(model_bytes) if model_bytes is not None else 0
+
+
+def get_model_memory_blocks(*models) -> dict:
+    """统计模型对象占用的各块内存，返回 {存储标识: bytes}。
+
+    会沿对象属性递归查找 torch.nn.Module 和 onnxruntime 推理会话：torch 模块按参数和 buffers 的存储统计，
+    被多个模型共享的张量对应同一个标识；推理会话按模型文件大小估算。
+    """
+    model_classes = []
+    try:
+        import torch
+        model_classes.append(torch.nn.Module)
+    except ImportError:
+        torch = None
+    # 只有已加载 onnxruntime 时才可能存在推理会话
+    ort = sys.modules.get('onnxruntime')
+    if ort is not None and hasattr(ort, 'InferenceSession'):
+        model_classes.append(ort.InferenceSession)
+    if not model_classes:
+        return {}
+
+    model_objects = {}
+    visited = set()
+    for model in models:
+        _collect_torch_modules(model, model_objects, visited, tuple(model_classes))
+
+    blocks = {}
+    for obj in model_objects.values():
+        if torch is not None and isinstance(obj, torch.nn.Module):
+            for tensor in list(obj.parameters()) + list(obj.buffers()):
+                blocks[(str(tensor.device), tensor.data_ptr())] = tensor.numel() * tensor.element_size()
+        else:
+            blocks[('onnxruntime', id(obj))] = _onnx_session_size(obj)
+    return blocks
+
+
+def get_model_memory_size(*models) -> int:
+    """统计模型对象占用的内存(bytes)，被多个模型共享的张量只计算一次"""
+    return sum(get_model_memory_blocks(*models).values())
+
+
+def quantize_model_for_cpu(model, device):
+    """CPU 性能模式：对模型中的 Linear/LSTM/GRU 层做 int8 动态量化（原地替换）。
+
+    仅在设备为 cpu 且设置了 MINERU_CPU_QUANTIZE 时生效，卷积网络（如 YOLO、OCR det）
+    不包含可动态量化的层，不受影响。
+    """
+    if not str(device).startswith("cpu") or not get_cpu_quantize_enable():
+        return model
+
+    import torch
+
+    modules = {}
+    _collect_torch_modules(model, modules, set(), torch.nn.Module)
+    # 只量化最外层模块，避免对同一子模块重复替换
+    sub_module_ids = set()
+    for module in modules.values():
+        sub_module_ids.update(id(m) for m in module.modules() if m is not module)
+    for module in modules.values():
+        if id(module) in sub_module_ids:
+            continue
+        torch.ao.quantization.quantize_dynamic(
+            module,
+            {torch.nn.Linear, torch.nn.LSTM, torch.nn.GRU},
+            dtype=torch.qint8,
+            inplace=True,
+        )
+    logger.info(f"{type(model).__name__} quantized to int8 for cpu inference")
+    return model
+
+
 def clean_memory(device='cuda'):
+    try:
+        import torch
+    except ImportError:
+        gc.collect()
+        return
     if str(device).startswith("cuda"):
         if torch.cuda.is_available():
             torch.cuda.empty_cache()
             torch.cuda.ipc_collect()
     elif str(device).startswith("npu"):
+        import torch_npu
         if torch_npu.npu.is_available():
             torch_npu.npu.empty_cache()
     elif str(device).startswith("mps"):
@@ -461,10 +562,12 @@ def get_vram(device) -> int:
                 f"MINERU_VIRTUAL_VRAM_SIZE value '{env_vram}' is not a valid integer, falling back to auto-detection")
 
     # 环境变量未配置或配置错误,根据device自动获取
+    import torch
     total_memory = 1
     if torch.cuda.is_available() and str(device).startswith("cuda"):
         total_memory = round(torch.cuda.get_device_properties(device).total_memory / (1024 ** 3))  # 将字节转换为 GB
     elif str(device).startswith("npu"):
+        import torch_npu
         if torch_npu.npu.is_available():
             total_memory = round(torch_npu.npu.get_device_properties(device).total_memory / (1024 ** 3))  # 转为 GB
     elif str(device).startswith("gcu"):
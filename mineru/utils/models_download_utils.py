@@ -1,6 +1,4 @@
 import os
-from huggingface_hub import snapshot_download as hf_snapshot_download
-from modelscope import snapshot_download as ms_snapshot_download
 
 from mineru.utils.config_reader import get_local_models_dir
 from mineru.utils.enum_class import ModelPath
@@ -44,10 +42,11 @@ def auto_download_and_get_model_root_path(relative_path: str, repo_mode='pipelin
     repo = repo_mapping[repo_mode].get(model_source, repo_mapping[repo_mode]['default'])
 
 
+    # modelscope/huggingface_hub 导入较慢，仅在实际需要下载时导入对应的一个
     if model_source == "huggingface":
-        snapshot_download = hf_snapshot_download
+        from huggingface_hub import snapshot_download
     elif model_source == "modelscope":
-        snapshot_download = ms_snapshot_download
+        from modelscope import snapshot_download
     else:
         raise ValueError(f"未知的仓库类型: {model_source}")
 
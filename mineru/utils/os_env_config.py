@@ -16,6 +16,101 @@ def get_load_images_threads() -> int:
     return get_value_from_string(env_value, 4)
 
 
+def get_postprocess_workers() -> int:
+    env_value = os.getenv('MINERU_POSTPROCESS_WORKERS', None)
+    return get_value_from_string(env_value, 4)
+
+
+def get_draw_bbox_workers() -> int:
+    """绘制 layout/span 调试pdf的进程数"""
+    env_value = os.getenv('MINERU_DRAW_BBOX_WORKERS', None)
+    return get_value_from_string(env_value, 4)
+
+
+def get_pipeline_devices() -> list[str]:
+    """pipeline 后端数据并行使用的设备列表，如 cuda:0,cuda:1；auto 表示全部可见的 cuda 设备"""
+    env_value = os.getenv('MINERU_PIPELINE_DEVICES', '')
+    return [device.strip() for device in env_value.split(',') if device.strip()]
+
+
+def get_model_cache_budget() -> int:
+    """原子模型缓存的内存预算(MB)，-1 表示不限制"""
+    env_value = os.getenv('MINERU_MODEL_CACHE_BUDGET_MB', None)
+    return get_value_from_string(env_value, -1)
+
+
+def get_layoutreader_batch_size() -> int:
+    """layoutreader 阅读顺序模型单次前向的最大页数"""
+    env_value = os.getenv('MINERU_LAYOUTREADER_BATCH_SIZE', None)
+    return get_value_from_string(env_value, 16)
+
+
+def get_cpu_quantize_enable() -> bool:
+    """是否在 CPU 上对 pipeline 模型启用 int8 动态量化"""
+    env_value = os.getenv('MINERU_CPU_QUANTIZE', 'false')
+    return env_value.lower() in ['true', '1', 'yes']
+
+
+def get_output_json_compact() -> bool:
+    """输出的 json 产物是否使用紧凑格式（无缩进）"""
+    env_value = os.getenv('MINERU_OUTPUT_JSON_COMPACT', 'false')
+    return env_value.lower() in ['true', '1', 'yes']
+
+
+def get_output_compression() -> str:
+    """输出的 json 产物的压缩格式，可选 gzip、zstd，默认不压缩"""
+    env_value = os.getenv('MINERU_OUTPUT_COMPRESSION', '').lower()
+    if env_value in ['gzip', 'zstd']:
+        return env_value
+    return ''
+
+
+def get_output_artifacts() -> set[str] | None:
+    """需要输出的产物集合，未设置时输出全部产物"""
+    env_value = os.getenv('MINERU_OUTPUT_ARTIFACTS', None)
+    if env_value is None:
+        return None
+    return {artifact.strip().lower() for artifact in env_value.split(',') if artifact.strip()}
+
+
+def get_s3_max_pool_connections() -> int:
+    """每个 s3 客户端的连接池大小"""
+    env_value = os.getenv('MINERU_S3_MAX_POOL_CONNECTIONS', None)
+    return get_value_from_string(env_value, 32)
+
+
+def get_s3_io_concurrency() -> int:
+    """单个 s3 对象分段读写的并发数"""
+    env_value = os.getenv('MINERU_S3_IO_CONCURRENCY', None)
+    return get_value_from_string(env_value, 8)
+
+
+def get_s3_part_size() -> int:
+    """s3 分段读写的分段大小(MB)"""
+    env_value = os.getenv('MINERU_S3_PART_SIZE_MB', None)
+    return get_value_from_string(env_value, 16)
+
+
+def get_s3_multipart_threshold() -> int:
+    """超过该大小(MB)的 s3 对象使用并发分段下载和分段上传"""
+    env_value = os.getenv('MINERU_S3_MULTIPART_THRESHOLD_MB', None)
+    return get_value_from_string(env_value, 32)
+
+
+def get_pdf_mmap_enable() -> bool:
+    """读取本地PDF时是否使用内存映射（零拷贝），大文件可显著降低峰值内存"""
+    env_value = os.getenv('MINERU_PDF_MMAP', 'false')
+    return env_value.lower() in ['true', '1', 'yes']
+
+
+def get_vlm_inflight_pages() -> int:
+    """http-client 后端边渲染边提交时，已渲染但未完成推理的最大页数；设为0时先渲染全部页面再统一推理"""
+    env_value = os.getenv('MINERU_VLM_INFLIGHT_PAGES', None)
+    if env_value is not None and env_value.strip() == '0':
+        return 0
+    return get_value_from_string(env_value, 32)
+
+
 def get_value_from_string(env_value: str, default_value: int) -> int:
     if env_value is not None:
         try:
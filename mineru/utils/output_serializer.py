@@ -0,0 +1,124 @@
+# Copyright (c) Opendatalab. All rights reserved.
+import gzip
+import io
+import json
+import os
+
+from mineru.data.data_reader_writer import DataWriter, FileBasedDataWriter
+from mineru.utils.os_env_config import get_output_artifacts, get_output_compression, get_output_json_compact
+
+# 可通过 MINERU_OUTPUT_ARTIFACTS 选择的产物
+OUTPUT_ARTIFACTS = ["md", "content_list", "middle_json", "model_output", "orig_pdf", "layout_pdf", "span_pdf"]
+
+COMPRESSION_SUFFIXES = {
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+
+def artifact_enabled(artifact: str) -> bool:
+    """产物是否在 MINERU_OUTPUT_ARTIFACTS 配置的集合中，未配置时全部输出"""
+    artifacts = get_output_artifacts()
+    return artifacts is None or artifact in artifacts
+
+
+def _compress_stream(f, compression):
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=f, mode="wb", compresslevel=6)
+    elif compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("zstd compression requires the zstandard package, please install it with `pip install zstandard`")
+        return zstandard.ZstdCompressor().stream_writer(f, closefd=False)
+    return None
+
+
+def _dump_compact_bytes(obj) -> bytes:
+    try:
+        import orjson
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            # 超出 64 位的整数等 orjson 不支持的类型，回退到标准库
+            pass
+    except ImportError:
+        pass
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _dump_to_stream(obj, stream, compact):
+    if compact:
+        stream.write(_dump_compact_bytes(obj))
+    else:
+        # json.dump 逐块写出，避免先在内存中拼出完整的缩进字符串
+        text_stream = io.TextIOWrapper(stream, encoding="utf-8", write_through=False)
+        try:
+            json.dump(obj, text_stream, ensure_ascii=False, indent=4)
+        finally:
+            text_stream.flush()
+            text_stream.detach()
+
+
+def dump_json(writer: DataWriter, file_name: str, obj, compact: bool = None, compression: str = None) -> str:
+    """将 json 产物写入 writer
+
+    Args:
+        writer: 输出目标，FileBasedDataWriter 直接流式写入文件，其他 writer 一次性写入
+        file_name: 文件名，启用压缩时会追加 .gz/.zst 后缀
+        obj: 需要序列化的对象
+        compact: 是否使用紧凑格式，默认读取 MINERU_OUTPUT_JSON_COMPACT
+        compression: 压缩格式(gzip/zstd)，默认读取 MINERU_OUTPUT_COMPRESSION
+
+    Returns:
+        str: 实际写入的文件名
+    """
+    if compact is None:
+        compact = get_output_json_compact()
+    if compression is None:
+        compression = get_output_compression()
+    file_name += COMPRESSION_SUFFIXES.get(compression, "")
+
+    if isinstance(writer, FileBasedDataWriter):
+        with writer.open(file_name) as f:
+            stream = _compress_stream(f, compression)
+            if stream is None:
+                _dump_to_stream(obj, f, compact)
+            else:
+                with stream:
+                    _dump_to_stream(obj, stream, compact)
+    else:
+        buffer = io.BytesIO()
+        stream = _compress_stream(buffer, compression)
+        if stream is None:
+            _dump_to_stream(obj, buffer, compact)
+        else:
+            with stream:
+                _dump_to_stream(obj, stream, compact)
+        writer.write(file_name, buffer.getvalue())
+
+    return file_name
+
+
+def find_output_file(parse_dir: str, file_name: str) -> str | None:
+    """查找产物文件，兼容启用压缩后带 .gz/.zst 后缀的文件"""
+    for suffix in [""] + list(COMPRESSION_SUFFIXES.values()):
+        path = os.path.join(parse_dir, file_name + suffix)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def read_output_text(path: str) -> str:
+    """读取产物文件内容，按后缀自动解压"""
+    if path.endswith(COMPRESSION_SUFFIXES["gzip"]):
+        with gzip.open(path, "rb") as f:
+            data = f.read()
+    elif path.endswith(COMPRESSION_SUFFIXES["zstd"]):
+        import zstandard
+        with open(path, "rb") as f:
+            data = zstandard.ZstdDecompressor().stream_reader(f).read()
+    else:
+        with open(path, "rb") as f:
+            data = f.read()
+    return data.decode("utf-8")
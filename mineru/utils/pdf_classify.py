@@ -13,21 +13,27 @@ from pdfminer.pdfinterp import PDFPageInterpreter
 from pdfminer.layout import LAParams, LTImage, LTFigure
 from pdfminer.converter import PDFPageAggregator
 
+from mineru.utils.pdf_reader import PdfDocumentHandle, as_pdfium_input, open_pdf_stream
+
 
 def classify(pdf_bytes):
     """
     判断PDF文件是可以直接提取文本还是需要OCR
 
     Args:
-        pdf_bytes: PDF文件的字节数据
+        pdf_bytes: PDF文件的字节数据、文件映射的 memoryview、文件路径，或已打开的 PdfDocumentHandle
 
     Returns:
         str: 'txt' 表示可以直接提取文本，'ocr' 表示需要OCR
     """
+    pdf_handle = pdf_bytes if isinstance(pdf_bytes, PdfDocumentHandle) else PdfDocumentHandle(pdf_bytes)
 
-    # 从字节数据加载PDF
-    sample_pdf_bytes = extract_pages(pdf_bytes)
-    pdf = pdfium.PdfDocument(sample_pdf_bytes)
+    # 抽样页面；不超过10页时直接使用原文档，不再重新序列化
+    sample_pdf_bytes = extract_pages(pdf_handle)
+    if sample_pdf_bytes is pdf_handle.pdf_bytes:
+        pdf = pdf_handle.pdf_doc
+    else:
+        pdf = pdfium.PdfDocument(as_pdfium_input(sample_pdf_bytes))
     try:
         # 获取PDF页数
         page_count = len(pdf)
@@ -58,8 +64,11 @@ def classify(pdf_bytes):
         return 'ocr'
 
     finally:
-        # 无论执行哪个路径，都确保PDF被关闭
-        pdf.close()
+        # 无论执行哪个路径，都确保PDF被关闭；传入的句柄由调用方管理
+        if pdf is not pdf_handle.pdf_doc:
+            pdf.close()
+        if pdf_handle is not pdf_bytes:
+            pdf_handle.close()
 
 
 def get_avg_cleaned_chars_per_page(pdf_doc, pages_to_check):
@@ -88,8 +97,8 @@ def get_avg_cleaned_chars_per_page(pdf_doc, pages_to_check):
 
 
 def get_high_image_coverage_ratio(sample_pdf_bytes, pages_to_check):
-    # 创建内存文件对象
-    pdf_stream = BytesIO(sample_pdf_bytes)
+    # 创建文件对象，memoryview 不会被复制
+    pdf_stream = open_pdf_stream(sample_pdf_bytes)
 
     # 创建PDF解析器
     parser = PDFParser(pdf_stream)
@@ -176,32 +185,44 @@ def get_high_image_coverage_ratio(sample_pdf_bytes, pages_to_check):
     return high_coverage_ratio
 
 
-def extract_pages(src_pdf_bytes: bytes) -> bytes:
+def extract_pages(src_pdf_bytes) -> bytes:
     """
     从PDF字节数据中随机提取最多10页，返回新的PDF字节数据
 
     Args:
-        src_pdf_bytes: PDF文件的字节数据
+        src_pdf_bytes: PDF文件的字节数据，或已打开的 PdfDocumentHandle
 
     Returns:
-        bytes: 提取页面后的PDF字节数据
+        bytes: 提取页面后的PDF字节数据，不超过10页时直接返回原始数据
     """
+    if isinstance(src_pdf_bytes, PdfDocumentHandle):
+        pdf_handle = src_pdf_bytes
+    else:
+        pdf_handle = PdfDocumentHandle(src_pdf_bytes)
+
+    try:
+        return _extract_sample_pages(pdf_handle)
+    finally:
+        # 传入的句柄由调用方管理
+        if pdf_handle is not src_pdf_bytes:
+            pdf_handle.close()
 
-    # 从字节数据加载PDF
-    pdf = pdfium.PdfDocument(src_pdf_bytes)
 
-    # 获取PDF页数
+def _extract_sample_pages(pdf_handle: PdfDocumentHandle) -> bytes:
+    # 复用句柄中已打开的文档获取PDF页数
+    pdf = pdf_handle.pdf_doc
     total_page = len(pdf)
     if total_page == 0:
         # 如果PDF没有页面，直接返回空文档
         logger.warning("PDF is empty, return empty document")
         return b''
 
-    # 选择最多10页
-    select_page_cnt = min(10, total_page)
+    # 不超过10页时抽样结果就是整个文档，无需重新序列化
+    if total_page <= 10:
+        return pdf_handle.pdf_bytes
 
-    # 从总页数中随机选择页面
-    page_indices = np.random.choice(total_page, select_page_cnt, replace=False).tolist()
+    # 从总页数中随机选择10页
+    page_indices = np.random.choice(total_page, 10, replace=False).tolist()
 
     # 创建一个新的PDF文档
     sample_docs = pdfium.PdfDocument.new()
@@ -209,7 +230,6 @@ def extract_pages(src_pdf_bytes: bytes) -> bytes:
     try:
         # 将选择的页面导入新文档
         sample_docs.import_pages(pdf, page_indices)
-        pdf.close()
 
         # 将新PDF保存到内存缓冲区
         output_buffer = BytesIO()
@@ -218,9 +238,10 @@ def extract_pages(src_pdf_bytes: bytes) -> bytes:
         # 获取字节数据
         return output_buffer.getvalue()
     except Exception as e:
-        pdf.close()
         logger.exception(e)
         return b''  # 出错时返回空字节
+    finally:
+        sample_docs.close()
 
 
 def detect_invalid_chars(sample_pdf_bytes: bytes) -> bool:
@@ -229,7 +250,7 @@ def detect_invalid_chars(sample_pdf_bytes: bytes) -> bool:
     """
     '''pdfminer比较慢,需要先随机抽取10页左右的sample'''
     # sample_pdf_bytes = extract_pages(src_pdf_bytes)
-    sample_pdf_file_like_object = BytesIO(sample_pdf_bytes)
+    sample_pdf_file_like_object = open_pdf_stream(sample_pdf_bytes)
     laparams = LAParams(
         line_overlap=0.5,
         char_margin=2.0,
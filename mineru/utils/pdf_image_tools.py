@@ -12,9 +12,17 @@ from PIL import Image, ImageOps
 from mineru.data.data_reader_writer import FileBasedDataWriter
 from mineru.utils.check_sys_env import is_windows_environment
 from mineru.utils.os_env_config import get_load_images_timeout, get_load_images_threads
-from mineru.utils.pdf_reader import image_to_b64str, image_to_bytes, page_to_image
+from mineru.utils.pdf_reader import (
+    as_pdf_data,
+    as_pdfium_input,
+    image_to_b64str,
+    image_to_bytes,
+    page_to_image,
+    pdf_worker_source,
+)
+from mineru.utils.process_pool import SharedPdfSource, discard_process_pool, get_process_pool, open_worker_pdf
 from mineru.utils.enum_class import ImageType
-from mineru.utils.hash_utils import str_sha256
+from mineru.utils.hash_utils import bytes_md5, str_sha256
 from mineru.utils.pdf_page_id import get_end_page_id
 
 from concurrent.futures import ProcessPoolExecutor, wait, ALL_COMPLETED
@@ -30,6 +38,7 @@ def pdf_page_to_image(page: pdfium.PdfPage, dpi=200, image_type=ImageType.PIL) -
 
     Returns:
         dict:  {'img_base64': str, 'img_pil': pil_img, 'scale': float }
+        load_images_from_pdf 还会为每页补充 'img_id': str
     """
     pil_img, scale = page_to_image(page, dpi=dpi)
     image_dict = {
@@ -53,38 +62,46 @@ def _load_images_from_pdf_worker(
 
 
 def load_images_from_pdf(
-    pdf_bytes: bytes,
+    pdf_bytes,
     dpi=200,
     start_page_id=0,
     end_page_id=None,
     image_type=ImageType.PIL,
     timeout=None,
     threads=None,
+    pdf_doc: pdfium.PdfDocument | None = None,
 ):
     """带超时控制的 PDF 转图片函数,支持多进程加速
 
     Args:
-        pdf_bytes (bytes): PDF 文件的 bytes
+        pdf_bytes (bytes | memoryview | str): PDF 文件的 bytes、文件映射的 memoryview 或文件路径
         dpi (int, optional): reset the dpi of dpi. Defaults to 200.
         start_page_id (int, optional): 起始页码. Defaults to 0.
         end_page_id (int | None, optional): 结束页码. Defaults to None.
         image_type (ImageType, optional): 图片类型. Defaults to ImageType.PIL.
         timeout (int | None, optional): 超时时间(秒)。如果为 None，则从环境变量 MINERU_PDF_RENDER_TIMEOUT 读取，若未设置则默认为 300 秒。
         threads (int): 进程数, 如果为 None，则从环境变量 MINERU_PDF_RENDER_THREADS 读取，若未设置则默认为 4.
+        pdf_doc (pdfium.PdfDocument | None, optional): 已打开的同一文档，传入时不再重复打开. Defaults to None.
 
     Raises:
         TimeoutError: 当转换超时时抛出
     """
-    pdf_doc = pdfium.PdfDocument(pdf_bytes)
+    pdf_bytes = as_pdf_data(pdf_bytes)
+    if pdf_doc is None:
+        pdf_doc = pdfium.PdfDocument(as_pdfium_input(pdf_bytes))
+    # 每个文档只对pdf字节计算一次摘要，页面及截图的标识由(摘要, 页码, dpi, bbox)构成
+    pdf_digest = bytes_md5(pdf_bytes)
     if is_windows_environment():
         # Windows 环境下不使用多进程
-        return load_images_from_pdf_core(
+        images_list = load_images_from_pdf_core(
             pdf_bytes,
             dpi,
             start_page_id,
             get_end_page_id(end_page_id, len(pdf_doc)),
             image_type,
-        ), pdf_doc
+            pdf_doc=pdf_doc,
+        )
+        return set_page_img_ids(images_list, pdf_digest, start_page_id, dpi), pdf_doc
     else:
         if timeout is None:
             timeout = get_load_images_timeout()
@@ -115,6 +132,8 @@ def load_images_from_pdf(
 
         logger.debug(f"PDF to images using {actual_threads} processes, page ranges: {page_ranges}")
 
+        # 文件映射只向子进程传递路径，子进程直接从文件加载
+        worker_source = pdf_worker_source(pdf_bytes)
         executor = ProcessPoolExecutor(max_workers=actual_threads)
         try:
             # 提交所有任务
@@ -123,7 +142,7 @@ def load_images_from_pdf(
             for range_start, range_end in page_ranges:
                 future = executor.submit(
                     _load_images_from_pdf_worker,
-                    pdf_bytes,
+                    worker_source,
                     dpi,
                     range_start,
                     range_end,
@@ -156,7 +175,7 @@ def load_images_from_pdf(
             for _, imgs in all_results:
                 images_list.extend(imgs)
 
-            return images_list, pdf_doc
+            return set_page_img_ids(images_list, pdf_digest, start_page_id, dpi), pdf_doc
 
         except Exception as e:
             # 发生任何异常时，确保清理子进程
@@ -169,6 +188,62 @@ def load_images_from_pdf(
             executor.shutdown(wait=False, cancel_futures=True)
 
 
+def _open_pdfium_doc(pdf_data):
+    return pdfium.PdfDocument(as_pdfium_input(pdf_data))
+
+
+def _render_page_worker(pdf_source, page_index, dpi, image_type, pdf_digest):
+    pdf_doc = open_worker_pdf(pdf_source, _open_pdfium_doc)
+    image_dict = pdf_page_to_image(pdf_doc[page_index], dpi=dpi, image_type=image_type)
+    return set_page_img_ids([image_dict], pdf_digest, page_index, dpi)[0]
+
+
+class PageRenderPool:
+    """逐页渲染单个PDF，submit 立即返回单页渲染结果的 Future，
+    结果与 load_images_from_pdf 中对应页一致（含 img_id），供边渲染边推理的流程使用。
+
+    渲染在跨文档复用的常驻进程池中进行，文档随每个任务传给子进程，子进程打开后供该文档后续页面复用。
+    Windows 环境不使用多进程，由调用方自行在线程中渲染。
+    """
+
+    def __init__(self, pdf_bytes, dpi=200, image_type=ImageType.PIL, threads=None):
+        pdf_bytes = as_pdf_data(pdf_bytes)
+        self.pdf_digest = bytes_md5(pdf_bytes)
+        self.dpi = dpi
+        self.image_type = image_type
+        if threads is None:
+            threads = get_load_images_threads()
+        self.executor = get_process_pool("page_render", max(1, min(os.cpu_count() or 1, threads)))
+        self.pdf_source = SharedPdfSource(pdf_bytes)
+        self._futures = []
+
+    def submit(self, page_index):
+        future = self.executor.submit(
+            _render_page_worker, self.pdf_source.source, page_index, self.dpi, self.image_type, self.pdf_digest
+        )
+        self._futures.append(future)
+        return future
+
+    def close(self, terminate=False):
+        """取消尚未开始的渲染；terminate 时（如渲染超时）强制终止进程池，之后的文档使用新的进程池"""
+        for future in self._futures:
+            future.cancel()
+        if terminate:
+            _terminate_executor_processes(self.executor)
+            discard_process_pool(self.executor)
+        else:
+            # 子进程可能仍在读取共享内存中的PDF，等其结束后再释放
+            wait(self._futures)
+        self._futures = []
+        self.pdf_source.close()
+
+
+def set_page_img_ids(images_list, pdf_digest, start_page_id, dpi):
+    for page_index, image_dict in enumerate(images_list, start=start_page_id):
+        image_dict["img_id"] = f"{pdf_digest}_{page_index}_{dpi}"
+    return images_list
+
+
 def _terminate_executor_processes(executor):
     """强制终止 ProcessPoolExecutor 中的所有子进程"""
     if hasattr(executor, '_processes'):
@@ -193,14 +268,18 @@ def _terminate_executor_processes(executor):
 
 
 def load_images_from_pdf_core(
-    pdf_bytes: bytes,
+    pdf_bytes,
     dpi=200,
     start_page_id=0,
     end_page_id=None,
     image_type=ImageType.PIL,  # PIL or BASE64
+    pdf_doc: pdfium.PdfDocument | None = None,
 ):
     images_list = []
-    pdf_doc = pdfium.PdfDocument(pdf_bytes)
+    # 传入已打开的文档时由调用方负责关闭
+    owns_pdf_doc = pdf_doc is None
+    if owns_pdf_doc:
+        pdf_doc = pdfium.PdfDocument(as_pdfium_input(pdf_bytes))
     pdf_page_num = len(pdf_doc)
     end_page_id = get_end_page_id(end_page_id, pdf_page_num)
 
@@ -210,7 +289,8 @@ def load_images_from_pdf_core(
         image_dict = pdf_page_to_image(page, dpi=dpi, image_type=image_type)
         images_list.append(image_dict)
 
-    pdf_doc.close()
+    if owns_pdf_doc:
+        pdf_doc.close()
 
     return images_list
 
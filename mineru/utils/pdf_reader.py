@@ -1,11 +1,196 @@
 # Copyright (c) Opendatalab. All rights reserved.
 import base64
+import ctypes
+import io
+import os
 from io import BytesIO
+from pathlib import Path
 
 from loguru import logger
 from PIL import Image
 from pypdfium2 import PdfBitmap, PdfDocument, PdfPage
 
+from mineru.data.data_reader_writer.filebase import mapped_file_path, mmap_file
+from mineru.utils.pdf_page_id import get_end_page_id
+
+
+def as_pdf_data(pdf) -> bytes | memoryview:
+    """统一PDF输入：bytes/memoryview 原样返回，文件路径映射为零拷贝的 memoryview"""
+    if isinstance(pdf, (str, os.PathLike)):
+        return mmap_file(pdf)
+    return pdf
+
+
+def as_pdfium_input(pdf_data):
+    """转换为 pypdfium2 可直接加载的输入，避免复制PDF数据
+
+    pypdfium2 不接受 memoryview：可写的连续 memoryview（如 ACCESS_COPY 映射）包装为共享内存的 ctypes 数组，
+    文件路径交给 pdfium 直接读取文件，只读的 memoryview 只能复制为 bytes。
+    """
+    if isinstance(pdf_data, (str, os.PathLike)):
+        return Path(pdf_data)
+    if isinstance(pdf_data, memoryview):
+        if pdf_data.nbytes == 0:
+            return b''
+        if not pdf_data.readonly and pdf_data.c_contiguous:
+            return (ctypes.c_char * pdf_data.nbytes).from_buffer(pdf_data.cast('B'))
+        return pdf_data.tobytes()
+    return pdf_data
+
+
+class _MemoryViewReader(io.RawIOBase):
+    """memoryview 上的只读流，供 pypdf、pdfminer 等需要文件对象的库读取，不复制整份数据"""
+
+    def __init__(self, view: memoryview):
+        self._view = view.cast('B')
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), len(self._view) - self._pos)
+        if size <= 0:
+            return 0
+        buffer[:size] = self._view[self._pos:self._pos + size]
+        self._pos += size
+        return size
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = len(self._view) + offset
+        else:
+            raise ValueError(f"invalid whence ({whence})")
+        if self._pos < 0:
+            raise ValueError(f"negative seek position {self._pos}")
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+
+def open_pdf_stream(pdf_data):
+    """以文件对象形式打开PDF数据，memoryview 和文件路径都不会整体读入内存"""
+    if isinstance(pdf_data, (str, os.PathLike)):
+        return open(pdf_data, 'rb')
+    if isinstance(pdf_data, memoryview):
+        return io.BufferedReader(_MemoryViewReader(pdf_data))
+    return BytesIO(pdf_data)
+
+
+def pdf_worker_source(pdf_data):
+    """传给子进程的PDF数据：文件映射传递文件路径，由子进程自行打开，避免序列化整份PDF"""
+    if isinstance(pdf_data, (str, os.PathLike)):
+        return Path(pdf_data)
+    path = mapped_file_path(pdf_data)
+    if path is not None:
+        return Path(path)
+    if isinstance(pdf_data, memoryview):
+        # memoryview 无法被 pickle
+        return pdf_data.tobytes()
+    return pdf_data
+
+
+class PdfDocumentHandle:
+    """PDF 文档句柄
+
+    PDF 只用 pypdfium2 打开一次，classify、页面渲染、调试pdf绘制等环节共享同一个文档对象，
+    并以 [start_page_id, end_page_id] 提供页码区间视图；只有确实截取了页码区间时才重新序列化出新的 PDF。
+    pdf_bytes 可以是 bytes、文件映射的 memoryview 或文件路径（路径会被映射为 memoryview），均不复制PDF数据。
+    """
+
+    def __init__(self, pdf_bytes, start_page_id: int = 0, end_page_id: int | None = None):
+        self.pdf_bytes = as_pdf_data(pdf_bytes)
+        self.start_page_id = start_page_id
+        self._end_page_id = end_page_id
+        self._pdf_doc = None
+        self._pypdf_reader = None
+
+    @property
+    def pdf_doc(self) -> PdfDocument:
+        if self._pdf_doc is None:
+            self._pdf_doc = PdfDocument(as_pdfium_input(self.pdf_bytes))
+        return self._pdf_doc
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pdf_doc)
+
+    @property
+    def end_page_id(self) -> int:
+        if self._end_page_id is None or self._end_page_id < 0 or self._end_page_id > self.page_count - 1:
+            self._end_page_id = get_end_page_id(self._end_page_id, self.page_count)
+        return self._end_page_id
+
+    def page_range(self) -> range:
+        return range(self.start_page_id, self.end_page_id + 1)
+
+    def is_full_document(self) -> bool:
+        return self.start_page_id == 0 and self.end_page_id == self.page_count - 1
+
+    def pages(self):
+        for page_index in self.page_range():
+            yield self.pdf_doc[page_index]
+
+    @property
+    def pypdf_reader(self):
+        """同一文档的 pypdf 读取器，用于调试pdf的绘制"""
+        if self._pypdf_reader is None:
+            from pypdf import PdfReader
+            self._pypdf_reader = PdfReader(open_pdf_stream(self.pdf_bytes))
+        return self._pypdf_reader
+
+    def to_bytes(self) -> bytes | memoryview:
+        """页码区间对应的 PDF 字节数据，未截取页码区间时直接返回原始数据"""
+        try:
+            if self.is_full_document():
+                return self.pdf_bytes
+        except Exception as e:
+            logger.warning(f"Error in opening PDF bytes: {e}, Using original PDF bytes.")
+            return self.pdf_bytes
+
+        output_pdf = PdfDocument.new()
+        try:
+            # 逐页导入,失败则跳过
+            output_index = 0
+            for page_index in self.page_range():
+                try:
+                    output_pdf.import_pages(self.pdf_doc, pages=[page_index])
+                    output_index += 1
+                except Exception as page_error:
+                    output_pdf.del_page(output_index)
+                    logger.warning(f"Failed to import page {page_index}: {page_error}, skipping this page.")
+                    continue
+
+            # 将新PDF保存到内存缓冲区
+            output_buffer = BytesIO()
+            output_pdf.save(output_buffer)
+            return output_buffer.getvalue()
+        except Exception as e:
+            logger.warning(f"Error in converting PDF bytes: {e}, Using original PDF bytes.")
+            return self.pdf_bytes
+        finally:
+            output_pdf.close()
+
+    def detach_pdf_doc(self) -> PdfDocument:
+        """将已打开的文档对象交给调用方管理（由调用方负责关闭）"""
+        pdf_doc = self.pdf_doc
+        self._pdf_doc = None
+        return pdf_doc
+
+    def close(self):
+        if self._pdf_doc is not None:
+            self._pdf_doc.close()
+            self._pdf_doc = None
+        self._pypdf_reader = None
+
 
 def page_to_image(
     page: PdfPage,
@@ -65,7 +250,7 @@ def pdf_to_images(
     start_page_id: int = 0,
     end_page_id: int | None = None,
 ) -> list[Image.Image]:
-    doc = pdf if isinstance(pdf, PdfDocument) else PdfDocument(pdf)
+    doc = pdf if isinstance(pdf, PdfDocument) else PdfDocument(as_pdfium_input(pdf))
     page_num = len(doc)
 
     end_page_id = end_page_id if end_page_id is not None and end_page_id >= 0 else page_num - 1
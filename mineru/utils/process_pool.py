@@ -0,0 +1,101 @@
+# Copyright (c) Opendatalab. All rights reserved.
+import multiprocessing
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from mineru.utils.pdf_reader import pdf_worker_source
+
+# 常驻进程池：{(名称, 进程数): ProcessPoolExecutor}
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_process_pool(name: str, workers: int) -> ProcessPoolExecutor:
+    """获取在多个文档间复用的常驻进程池
+
+    调用方进程中通常已有推理、HTTP 客户端等线程在运行，fork 出的子进程可能继承被占用的锁而死锁，
+    因此使用 forkserver（不可用时使用 spawn）启动子进程。同名不同进程数的进程池互不影响，
+    不会关闭其他线程正在使用的进程池。
+    """
+    key = (name, workers)
+    with _executors_lock:
+        executor = _executors.get(key)
+        if executor is None:
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(start_method))
+            _executors[key] = executor
+        return executor
+
+
+def discard_process_pool(executor: ProcessPoolExecutor):
+    """子进程异常退出或被强制终止后进程池不可再用，之后的调用重新创建"""
+    with _executors_lock:
+        for key, cached in list(_executors.items()):
+            if cached is executor:
+                del _executors[key]
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+class SharedPdfSource:
+    """将一份PDF数据交给常驻进程池的子进程
+
+    文件映射的PDF只传递文件路径，其余PDF数据放入一次共享内存。每个实例带有唯一标识，
+    子进程据此判断缓存的文档是否仍是当前文档，路径或共享内存名被复用时也不会读到旧文档。
+    """
+
+    def __init__(self, pdf_data):
+        source = pdf_worker_source(pdf_data)
+        self._shm = None
+        if isinstance(source, Path):
+            self.source = (uuid.uuid4().hex, str(source), None)
+        else:
+            from multiprocessing import shared_memory
+
+            self._shm = shared_memory.SharedMemory(create=True, size=max(len(source), 1))
+            self._shm.buf[:len(source)] = source
+            self.source = (uuid.uuid4().hex, self._shm.name, len(source))
+
+    def close(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# 子进程当前打开的文档：(SharedPdfSource 标识, 文档对象)
+_worker_doc = (None, None)
+
+
+def _read_shared_bytes(shm_name, size):
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        return bytes(shm.buf[:size])
+    finally:
+        shm.close()
+
+
+def open_worker_pdf(source, open_fn):
+    """子进程中按需打开 SharedPdfSource.source 对应的文档，同一文档的后续任务复用已打开的文档对象
+
+    open_fn 接收文件路径（Path）或PDF字节数据，返回打开的文档
+    """
+    global _worker_doc
+    token, location, size = source
+    if _worker_doc[0] != token:
+        old_doc = _worker_doc[1]
+        _worker_doc = (None, None)
+        if old_doc is not None and hasattr(old_doc, "close"):
+            old_doc.close()
+        pdf_data = Path(location) if size is None else _read_shared_bytes(location, size)
+        _worker_doc = (token, open_fn(pdf_data))
+    return _worker_doc[1]
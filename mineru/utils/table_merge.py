@@ -1,6 +1,4 @@
 # Copyright (c) Opendatalab. All rights reserved.
-from copy import deepcopy
-
 from loguru import logger
 from bs4 import BeautifulSoup
 
@@ -25,112 +23,115 @@ CONTINUATION_INLINE_MARKERS = [
 ]
 
 
-def calculate_table_total_columns(soup):
-    """计算表格的总列数，通过分析整个表格结构来处理rowspan和colspan
-
-    Args:
-        soup: BeautifulSoup解析的表格
-
-    Returns:
-        int: 表格的总列数
-    """
-    rows = soup.find_all("tr")
-    if not rows:
-        return 0
-
-    # 创建一个矩阵来跟踪每个位置的占用情况
-    max_cols = 0
-    occupied = {}  # {row_idx: {col_idx: True}}
+class TableCell:
+    """表格单元格，缓存colspan/rowspan及文本，修改colspan时同步到HTML标签"""
+    __slots__ = ("tag", "colspan", "rowspan", "_text")
 
-    for row_idx, row in enumerate(rows):
-        col_idx = 0
-        cells = row.find_all(["td", "th"])
+    def __init__(self, tag):
+        self.tag = tag
+        self.colspan = int(tag.get("colspan", 1))
+        self.rowspan = int(tag.get("rowspan", 1))
+        self._text = None
 
-        if row_idx not in occupied:
-            occupied[row_idx] = {}
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = self.tag.get_text()
+        return self._text
 
-        for cell in cells:
-            # 找到下一个未被占用的列位置
-            while col_idx in occupied[row_idx]:
-                col_idx += 1
+    def set_colspan(self, colspan):
+        self.colspan = colspan
+        self.tag["colspan"] = str(colspan)
 
-            colspan = int(cell.get("colspan", 1))
-            rowspan = int(cell.get("rowspan", 1))
 
-            # 标记被这个单元格占用的所有位置
-            for r in range(row_idx, row_idx + rowspan):
-                if r not in occupied:
-                    occupied[r] = {}
-                for c in range(col_idx, col_idx + colspan):
-                    occupied[r][c] = True
+class TableRow:
+    __slots__ = ("tag", "cells")
 
-            col_idx += colspan
-            max_cols = max(max_cols, col_idx)
+    def __init__(self, tag):
+        self.tag = tag
+        self.cells = [TableCell(cell) for cell in tag.find_all(["td", "th"])]
 
-    return max_cols
 
+class TableGrid:
+    """表格的行/单元格网格
 
-def build_table_occupied_matrix(soup):
-    """构建表格的占用矩阵，返回每行的有效列数
-
-    Args:
-        soup: BeautifulSoup解析的表格
-
-    Returns:
-        dict: {row_idx: effective_columns} 每行的有效列数（考虑rowspan占用）
+    HTML只解析一次，跨页合并时直接在网格上计算列数、移动行和调整colspan，
+    所有合并完成后再统一渲染为HTML。
     """
-    rows = soup.find_all("tr")
-    if not rows:
-        return {}
-
-    occupied = {}  # {row_idx: {col_idx: True}}
-    row_effective_cols = {}  # {row_idx: effective_columns}
-
-    for row_idx, row in enumerate(rows):
-        col_idx = 0
-        cells = row.find_all(["td", "th"])
 
-        if row_idx not in occupied:
-            occupied[row_idx] = {}
-
-        for cell in cells:
-            # 找到下一个未被占用的列位置
-            while col_idx in occupied[row_idx]:
-                col_idx += 1
-
-            colspan = int(cell.get("colspan", 1))
-            rowspan = int(cell.get("rowspan", 1))
-
-            # 标记被这个单元格占用的所有位置
-            for r in range(row_idx, row_idx + rowspan):
-                if r not in occupied:
-                    occupied[r] = {}
-                for c in range(col_idx, col_idx + colspan):
-                    occupied[r][c] = True
-
-            col_idx += colspan
-
-        # 该行的有效列数为已占用的最大列索引+1
-        if occupied[row_idx]:
-            row_effective_cols[row_idx] = max(occupied[row_idx].keys()) + 1
+    def __init__(self, html):
+        self.soup = BeautifulSoup(html, "html.parser")
+        self.rows = [TableRow(tr) for tr in self.soup.find_all("tr")]
+        self._total_columns = None
+        self._row_effective_cols = None
+
+    def invalidate(self):
+        self._total_columns = None
+        self._row_effective_cols = None
+
+    def _build_occupied_matrix(self):
+        # 通过占用矩阵处理rowspan和colspan，同时得到总列数和每行的有效列数
+        max_cols = 0
+        occupied = {}  # {row_idx: {col_idx: True}}
+        row_effective_cols = {}  # {row_idx: effective_columns}
+
+        for row_idx, row in enumerate(self.rows):
+            col_idx = 0
+
+            if row_idx not in occupied:
+                occupied[row_idx] = {}
+
+            for cell in row.cells:
+                # 找到下一个未被占用的列位置
+                while col_idx in occupied[row_idx]:
+                    col_idx += 1
+
+                # 标记被这个单元格占用的所有位置
+                for r in range(row_idx, row_idx + cell.rowspan):
+                    if r not in occupied:
+                        occupied[r] = {}
+                    for c in range(col_idx, col_idx + cell.colspan):
+                        occupied[r][c] = True
+
+                col_idx += cell.colspan
+                max_cols = max(max_cols, col_idx)
+
+            # 该行的有效列数为已占用的最大列索引+1
+            if occupied[row_idx]:
+                row_effective_cols[row_idx] = max(occupied[row_idx].keys()) + 1
+            else:
+                row_effective_cols[row_idx] = 0
+
+        self._total_columns = max_cols
+        self._row_effective_cols = row_effective_cols
+
+    def total_columns(self):
+        """表格的总列数"""
+        if self._total_columns is None:
+            self._build_occupied_matrix()
+        return self._total_columns
+
+    def row_effective_columns(self):
+        """{row_idx: effective_columns} 每行的有效列数（考虑rowspan占用）"""
+        if self._row_effective_cols is None:
+            self._build_occupied_matrix()
+        return self._row_effective_cols
+
+    def append_rows(self, rows):
+        """将其他表格的行移动到本表格的tbody（没有tbody时为table）末尾"""
+        container = self.soup.find("tbody") or self.soup.find("table")
+        for row in rows:
+            row.tag.extract()
+            container.append(row.tag)
+        if self.rows and not any(parent is container for parent in self.rows[-1].tag.parents):
+            # 容器之后还有其他行，按文档顺序重建行索引
+            self.rows = [TableRow(tr) for tr in self.soup.find_all("tr")]
         else:
-            row_effective_cols[row_idx] = 0
-
-    return row_effective_cols
+            self.rows.extend(rows)
+        self.invalidate()
 
-
-def calculate_row_effective_columns(soup, row_idx):
-    """计算指定行的有效列数（考虑rowspan占用）
-
-    Args:
-        soup: BeautifulSoup解析的表格
-        row_idx: 行索引
-
-    Returns:
-        int: 该行的有效列数
-    """
-    row_effective_cols = build_table_occupied_matrix(soup)
-    return row_effective_cols.get(row_idx, 0)
+    def render(self):
+        return str(self.soup)
 
 
 def calculate_row_columns(row):
@@ -138,19 +139,12 @@ def calculate_row_columns(row):
     计算表格行的实际列数，考虑colspan属性
 
     Args:
-        row: BeautifulSoup的tr元素对象
+        row: TableRow
 
     Returns:
         int: 行的实际列数
     """
-    cells = row.find_all(["td", "th"])
-    column_count = 0
-
-    for cell in cells:
-        colspan = int(cell.get("colspan", 1))
-        column_count += colspan
-
-    return column_count
+    return sum(cell.colspan for cell in row.cells)
 
 
 def calculate_visual_columns(row):
@@ -158,33 +152,37 @@ def calculate_visual_columns(row):
     计算表格行的视觉列数（实际td/th单元格数量，不考虑colspan）
 
     Args:
-        row: BeautifulSoup的tr元素对象
+        row: TableRow
 
     Returns:
         int: 行的视觉列数（实际单元格数）
     """
-    cells = row.find_all(["td", "th"])
-    return len(cells)
+    return len(row.cells)
+
+
+def _cell_compare_text(cell):
+    # 去除所有空白字符（包括空格、换行、制表符等）
+    return ''.join(full_to_half(cell.text).split())
 
 
-def detect_table_headers(soup1, soup2, max_header_rows=5):
+def detect_table_headers(grid1, grid2, max_header_rows=5):
     """
     检测并比较两个表格的表头
 
     Args:
-        soup1: 第一个表格的BeautifulSoup对象
-        soup2: 第二个表格的BeautifulSoup对象
+        grid1: 第一个表格的TableGrid
+        grid2: 第二个表格的TableGrid
         max_header_rows: 最大可能的表头行数
 
     Returns:
         tuple: (表头行数, 表头是否一致, 表头文本列表)
     """
-    rows1 = soup1.find_all("tr")
-    rows2 = soup2.find_all("tr")
+    rows1 = grid1.rows
+    rows2 = grid2.rows
 
-    # 构建两个表格的有效列数矩阵
-    effective_cols1 = build_table_occupied_matrix(soup1)
-    effective_cols2 = build_table_occupied_matrix(soup2)
+    # 两个表格的有效列数矩阵
+    effective_cols1 = grid1.row_effective_columns()
+    effective_cols2 = grid2.row_effective_columns()
 
     min_rows = min(len(rows1), len(rows2), max_header_rows)
     header_rows = 0
@@ -193,8 +191,8 @@ def detect_table_headers(soup1, soup2, max_header_rows=5):
 
     for i in range(min_rows):
         # 提取当前行的所有单元格
-        cells1 = rows1[i].find_all(["td", "th"])
-        cells2 = rows2[i].find_all(["td", "th"])
+        cells1 = rows1[i].cells
+        cells2 = rows2[i].cells
 
         # 检查两行的结构和内容是否一致
         structure_match = True
@@ -209,22 +207,17 @@ def detect_table_headers(soup1, soup2, max_header_rows=5):
             else:
                 # 然后检查单元格的属性和内容
                 for cell1, cell2 in zip(cells1, cells2):
-                    colspan1 = int(cell1.get("colspan", 1))
-                    rowspan1 = int(cell1.get("rowspan", 1))
-                    colspan2 = int(cell2.get("colspan", 1))
-                    rowspan2 = int(cell2.get("rowspan", 1))
-
-                    # 去除所有空白字符（包括空格、换行、制表符等）
-                    text1 = ''.join(full_to_half(cell1.get_text()).split())
-                    text2 = ''.join(full_to_half(cell2.get_text()).split())
-
-                    if colspan1 != colspan2 or rowspan1 != rowspan2 or text1 != text2:
+                    if (
+                        cell1.colspan != cell2.colspan
+                        or cell1.rowspan != cell2.rowspan
+                        or _cell_compare_text(cell1) != _cell_compare_text(cell2)
+                    ):
                         structure_match = False
                         break
 
         if structure_match:
             header_rows += 1
-            row_texts = [full_to_half(cell.get_text().strip()) for cell in cells1]
+            row_texts = [full_to_half(cell.text.strip()) for cell in cells1]
             header_texts.append(row_texts)  # 添加表头文本
         else:
             headers_match = header_rows > 0  # 只有当至少匹配了一行时，才认为表头匹配
@@ -232,28 +225,29 @@ def detect_table_headers(soup1, soup2, max_header_rows=5):
 
     # 如果严格匹配失败，尝试视觉一致性匹配（只比较文本内容）
     if header_rows == 0:
-        header_rows, headers_match, header_texts = _detect_table_headers_visual(soup1, soup2, rows1, rows2, max_header_rows)
+        header_rows, headers_match, header_texts = _detect_table_headers_visual(grid1, grid2, max_header_rows)
 
     return header_rows, headers_match, header_texts
 
 
-def _detect_table_headers_visual(soup1, soup2, rows1, rows2, max_header_rows=5):
+def _detect_table_headers_visual(grid1, grid2, max_header_rows=5):
     """
     基于视觉一致性检测表头（只比较文本内容，忽略colspan/rowspan差异）
 
     Args:
-        soup1: 第一个表格的BeautifulSoup对象
-        soup2: 第二个表格的BeautifulSoup对象
-        rows1: 第一个表格的行列表
-        rows2: 第二个表格的行列表
+        grid1: 第一个表格的TableGrid
+        grid2: 第二个表格的TableGrid
         max_header_rows: 最大可能的表头行数
 
     Returns:
         tuple: (表头行数, 表头是否一致, 表头文本列表)
     """
-    # 构建两个表格的有效列数矩阵
-    effective_cols1 = build_table_occupied_matrix(soup1)
-    effective_cols2 = build_table_occupied_matrix(soup2)
+    rows1 = grid1.rows
+    rows2 = grid2.rows
+
+    # 两个表格的有效列数矩阵
+    effective_cols1 = grid1.row_effective_columns()
+    effective_cols2 = grid2.row_effective_columns()
 
     min_rows = min(len(rows1), len(rows2), max_header_rows)
     header_rows = 0
@@ -261,18 +255,18 @@ def _detect_table_headers_visual(soup1, soup2, rows1, rows2, max_header_rows=5):
     header_texts = []
 
     for i in range(min_rows):
-        cells1 = rows1[i].find_all(["td", "th"])
-        cells2 = rows2[i].find_all(["td", "th"])
+        cells1 = rows1[i].cells
+        cells2 = rows2[i].cells
 
         # 提取每行的文本内容列表（去除空白字符）
-        texts1 = [''.join(full_to_half(cell.get_text()).split()) for cell in cells1]
-        texts2 = [''.join(full_to_half(cell.get_text()).split()) for cell in cells2]
+        texts1 = [_cell_compare_text(cell) for cell in cells1]
+        texts2 = [_cell_compare_text(cell) for cell in cells2]
 
         # 检查视觉一致性：文本内容完全相同，且有效列数一致
         effective_cols_match = effective_cols1.get(i, 0) == effective_cols2.get(i, 0)
         if texts1 == texts2 and effective_cols_match:
             header_rows += 1
-            row_texts = [full_to_half(cell.get_text().strip()) for cell in cells1]
+            row_texts = [full_to_half(cell.text.strip()) for cell in cells1]
             header_texts.append(row_texts)
         else:
             headers_match = header_rows > 0
@@ -284,8 +278,11 @@ def _detect_table_headers_visual(soup1, soup2, rows1, rows2, max_header_rows=5):
     return header_rows, headers_match, header_texts
 
 
-def can_merge_tables(current_table_block, previous_table_block):
-    """判断两个表格是否可以合并"""
+def can_merge_tables(current_table_block, previous_table_block, table_grids):
+    """判断两个表格是否可以合并，可以合并时同时返回两个表格的网格
+
+    table_grids: {id(table_body_span): TableGrid}，每个表格只解析一次，在多次合并之间复用
+    """
     # 检查表格是否有caption和footnote
     # 计算previous_table_block中的footnote数量
     footnote_count = sum(1 for block in previous_table_block["blocks"] if block["type"] == BlockType.TABLE_FOOTNOTE)
@@ -305,29 +302,21 @@ def can_merge_tables(current_table_block, previous_table_block):
 
         # 如果所有caption都不包含续表标识，则不允许合并
         if not has_continuation_marker:
-            return False, None, None, None, None
+            return False, None, None
 
         # 如果current_table_block的caption存在续标识,放宽footnote的限制允许previous_table_block有最多一条footnote
         if footnote_count > 1:
-            return False, None, None, None, None
+            return False, None, None
     else:
         if footnote_count > 0:
-            return False, None, None, None, None
-
-    # 获取两个表格的HTML内容
-    current_html = ""
-    previous_html = ""
+            return False, None, None
 
-    for block in current_table_block["blocks"]:
-        if (block["type"] == BlockType.TABLE_BODY and block["lines"] and block["lines"][0]["spans"]):
-            current_html = block["lines"][0]["spans"][0].get("html", "")
-
-    for block in previous_table_block["blocks"]:
-        if (block["type"] == BlockType.TABLE_BODY and block["lines"] and block["lines"][0]["spans"]):
-            previous_html = block["lines"][0]["spans"][0].get("html", "")
+    # 获取两个表格的HTML所在span
+    current_span = get_table_body_span(current_table_block)
+    previous_span = get_table_body_span(previous_table_block)
 
-    if not current_html or not previous_html:
-        return False, None, None, None, None
+    if not (current_span and current_span.get("html", "")) or not (previous_span and previous_span.get("html", "")):
+        return False, None, None
 
     # 检查表格宽度差异
     x0_t1, y0_t1, x1_t1, y1_t1 = current_table_block["bbox"]
@@ -336,28 +325,45 @@ def can_merge_tables(current_table_block, previous_table_block):
     table2_width = x1_t2 - x0_t2
 
     if abs(table1_width - table2_width) / min(table1_width, table2_width) >= 0.1:
-        return False, None, None, None, None
+        return False, None, None
 
-    # 解析HTML并检查表格结构
-    soup1 = BeautifulSoup(previous_html, "html.parser")
-    soup2 = BeautifulSoup(current_html, "html.parser")
+    # 获取（首次使用时解析）两个表格的网格
+    grid1 = get_table_grid(previous_span, table_grids)
+    grid2 = get_table_grid(current_span, table_grids)
 
     # 检查整体列数匹配
-    table_cols1 = calculate_table_total_columns(soup1)
-    table_cols2 = calculate_table_total_columns(soup2)
+    table_cols1 = grid1.total_columns()
+    table_cols2 = grid2.total_columns()
     # logger.debug(f"Table columns - Previous: {table_cols1}, Current: {table_cols2}")
     tables_match = table_cols1 == table_cols2
 
     # 检查首末行列数匹配
-    rows_match = check_rows_match(soup1, soup2)
+    rows_match = check_rows_match(grid1, grid2)
 
-    return (tables_match or rows_match), soup1, soup2, current_html, previous_html
+    return (tables_match or rows_match), grid1, grid2
 
 
-def check_rows_match(soup1, soup2):
+def get_table_body_span(table_block):
+    """返回表格block中保存html的span，取最后一个有内容的table_body"""
+    table_span = None
+    for block in table_block["blocks"]:
+        if (block["type"] == BlockType.TABLE_BODY and block["lines"] and block["lines"][0]["spans"]):
+            table_span = block["lines"][0]["spans"][0]
+    return table_span
+
+
+def get_table_grid(table_span, table_grids):
+    grid = table_grids.get(id(table_span))
+    if grid is None:
+        grid = TableGrid(table_span.get("html", ""))
+        table_grids[id(table_span)] = grid
+    return grid
+
+
+def check_rows_match(grid1, grid2):
     """检查表格行是否匹配"""
-    rows1 = soup1.find_all("tr")
-    rows2 = soup2.find_all("tr")
+    rows1 = grid1.rows
+    rows2 = grid2.rows
 
     if not (rows1 and rows2):
         return False
@@ -366,13 +372,13 @@ def check_rows_match(soup1, soup2):
     last_row_idx = None
     last_row = None
     for idx in range(len(rows1) - 1, -1, -1):
-        if rows1[idx].find_all(["td", "th"]):
+        if rows1[idx].cells:
             last_row_idx = idx
             last_row = rows1[idx]
             break
 
     # 检测表头行数，以便获取第二个表的首个数据行
-    header_count, _, _ = detect_table_headers(soup1, soup2)
+    header_count, _, _ = detect_table_headers(grid1, grid2)
 
     # 获取第二个表的首个数据行
     first_data_row_idx = None
@@ -385,8 +391,8 @@ def check_rows_match(soup1, soup2):
         return False
 
     # 计算有效列数（考虑rowspan和colspan）
-    last_row_effective_cols = calculate_row_effective_columns(soup1, last_row_idx)
-    first_row_effective_cols = calculate_row_effective_columns(soup2, first_data_row_idx)
+    last_row_effective_cols = grid1.row_effective_columns().get(last_row_idx, 0)
+    first_row_effective_cols = grid2.row_effective_columns().get(first_data_row_idx, 0)
 
     # 计算实际列数（仅考虑colspan）和视觉列数
     last_row_cols = calculate_row_columns(last_row)
@@ -402,28 +408,23 @@ def check_rows_match(soup1, soup2):
             last_row_visual_cols == first_row_visual_cols)
 
 
-def check_row_columns_match(row1, row2):
+def check_row_columns_match(row, reference_colspans):
     # 逐个cell检测colspan属性是否一致
-    cells1 = row1.find_all(["td", "th"])
-    cells2 = row2.find_all(["td", "th"])
-    if len(cells1) != len(cells2):
+    if len(row.cells) != len(reference_colspans):
         return False
-    for cell1, cell2 in zip(cells1, cells2):
-        colspan1 = int(cell1.get("colspan", 1))
-        colspan2 = int(cell2.get("colspan", 1))
-        if colspan1 != colspan2:
+    for cell, reference_colspan in zip(row.cells, reference_colspans):
+        if cell.colspan != reference_colspan:
             return False
     return True
 
 
-def adjust_table_rows_colspan(soup, rows, start_idx, end_idx,
+def adjust_table_rows_colspan(grid, start_idx, end_idx,
                               reference_structure, reference_visual_cols,
                               target_cols, current_cols, reference_row):
     """调整表格行的colspan属性以匹配目标列数
 
     Args:
-        soup: BeautifulSoup解析的表格对象（用于计算有效列数）
-        rows: 表格行列表
+        grid: 表格的TableGrid
         start_idx: 起始行索引
         end_idx: 结束行索引（不包含）
         reference_structure: 参考行的colspan结构列表
@@ -432,14 +433,15 @@ def adjust_table_rows_colspan(soup, rows, start_idx, end_idx,
         current_cols: 当前总列数
         reference_row: 参考行对象
     """
-    reference_row_copy = deepcopy(reference_row)
+    # 参考行本身也可能被调整，先记录其原始colspan结构
+    reference_colspans = [cell.colspan for cell in reference_row.cells]
 
-    # 构建有效列数矩阵
-    effective_cols_matrix = build_table_occupied_matrix(soup)
+    # 有效列数矩阵
+    effective_cols_matrix = grid.row_effective_columns()
 
     for i in range(start_idx, end_idx):
-        row = rows[i]
-        cells = row.find_all(["td", "th"])
+        row = grid.rows[i]
+        cells = row.cells
         if not cells:
             continue
 
@@ -452,36 +454,33 @@ def adjust_table_rows_colspan(soup, rows, start_idx, end_idx,
             continue
 
         # 检查是否与参考行结构匹配
-        if calculate_visual_columns(row) == reference_visual_cols and check_row_columns_match(row, reference_row_copy):
+        if calculate_visual_columns(row) == reference_visual_cols and check_row_columns_match(row, reference_colspans):
             # 尝试应用参考结构
             if len(cells) <= len(reference_structure):
                 for j, cell in enumerate(cells):
                     if j < len(reference_structure) and reference_structure[j] > 1:
-                        cell["colspan"] = str(reference_structure[j])
+                        cell.set_colspan(reference_structure[j])
         else:
             # 扩展最后一个单元格以填补列数差异
             # 使用有效列数来计算差异
             cols_diff = target_cols - current_row_effective_cols
             if cols_diff > 0:
                 last_cell = cells[-1]
-                current_last_span = int(last_cell.get("colspan", 1))
-                last_cell["colspan"] = str(current_last_span + cols_diff)
+                last_cell.set_colspan(last_cell.colspan + cols_diff)
+
+    grid.invalidate()
 
 
-def perform_table_merge(soup1, soup2, previous_table_block, wait_merge_table_footnotes):
-    """执行表格合并操作"""
+def perform_table_merge(grid1, grid2, previous_table_block, wait_merge_table_footnotes):
+    """执行表格合并操作，将grid2的数据行合并到grid1"""
     # 检测表头有几行，并确认表头内容是否一致
-    header_count, headers_match, header_texts = detect_table_headers(soup1, soup2)
+    header_count, headers_match, header_texts = detect_table_headers(grid1, grid2)
     # logger.debug(f"检测到表头行数: {header_count}, 表头匹配: {headers_match}")
     # logger.debug(f"表头内容: {header_texts}")
 
-    # 找到第一个表格的tbody，如果没有则查找table元素
-    tbody1 = soup1.find("tbody") or soup1.find("table")
-
     # 获取表1和表2的所有行
-    rows1 = soup1.find_all("tr")
-    rows2 = soup2.find_all("tr")
-
+    rows1 = grid1.rows
+    rows2 = grid2.rows
 
     if rows1 and rows2 and header_count < len(rows2):
         # 获取表1最后一行和表2第一个非表头行
@@ -489,36 +488,35 @@ def perform_table_merge(soup1, soup2, previous_table_block, wait_merge_table_foo
         first_data_row2 = rows2[header_count]
 
         # 计算表格总列数
-        table_cols1 = calculate_table_total_columns(soup1)
-        table_cols2 = calculate_table_total_columns(soup2)
+        table_cols1 = grid1.total_columns()
+        table_cols2 = grid2.total_columns()
         if table_cols1 >= table_cols2:
-            reference_structure = [int(cell.get("colspan", 1)) for cell in last_row1.find_all(["td", "th"])]
+            reference_structure = [cell.colspan for cell in last_row1.cells]
             reference_visual_cols = calculate_visual_columns(last_row1)
             # 以表1的最后一行为参考，调整表2的行
             adjust_table_rows_colspan(
-                soup2, rows2, header_count, len(rows2),
+                grid2, header_count, len(rows2),
                 reference_structure, reference_visual_cols,
                 table_cols1, table_cols2, first_data_row2
             )
 
         else:  # table_cols2 > table_cols1
-            reference_structure = [int(cell.get("colspan", 1)) for cell in first_data_row2.find_all(["td", "th"])]
+            reference_structure = [cell.colspan for cell in first_data_row2.cells]
             reference_visual_cols = calculate_visual_columns(first_data_row2)
             # 以表2的第一个数据行为参考，调整表1的行
             adjust_table_rows_colspan(
-                soup1, rows1, 0, len(rows1),
+                grid1, 0, len(rows1),
                 reference_structure, reference_visual_cols,
                 table_cols2, table_cols1, last_row1
             )
 
-    # 将第二个表格的行添加到第一个表格中
-    if tbody1:
-        tbody2 = soup2.find("tbody") or soup2.find("table")
-        if tbody2:
-            # 将第二个表格的行添加到第一个表格中（跳过表头行）
-            for row in rows2[header_count:]:
-                row.extract()
-                tbody1.append(row)
+    # 将第二个表格的行添加到第一个表格中（跳过表头行）
+    if grid1.soup.find("tbody") or grid1.soup.find("table"):
+        if grid2.soup.find("tbody") or grid2.soup.find("table"):
+            moved_rows = rows2[header_count:]
+            grid2.rows = rows2[:header_count]
+            grid2.invalidate()
+            grid1.append_rows(moved_rows)
 
     # 清空previous_table_block的footnote
     previous_table_block["blocks"] = [
@@ -531,11 +529,11 @@ def perform_table_merge(soup1, soup2, previous_table_block, wait_merge_table_foo
         temp_table_footnote[SplitFlag.CROSS_PAGE] = True
         previous_table_block["blocks"].append(temp_table_footnote)
 
-    return str(soup1)
-
 
 def merge_table(page_info_list):
     """合并跨页表格"""
+    table_grids = {}
+    merged_spans = {}
     # 倒序遍历每一页
     for page_idx in range(len(page_info_list) - 1, -1, -1):
         # 跳过第一页，因为它没有前一页
@@ -564,25 +562,25 @@ def merge_table(page_info_list):
         ]
 
         # 检查两个表格是否可以合并
-        can_merge, soup1, soup2, current_html, previous_html = can_merge_tables(
-            current_table_block, previous_table_block
+        can_merge, grid1, grid2 = can_merge_tables(
+            current_table_block, previous_table_block, table_grids
         )
 
         if not can_merge:
             continue
 
         # 执行表格合并
-        merged_html = perform_table_merge(
-            soup1, soup2, previous_table_block, wait_merge_table_footnotes
+        perform_table_merge(
+            grid1, grid2, previous_table_block, wait_merge_table_footnotes
         )
-
-        # 更新previous_table_block的html
-        for block in previous_table_block["blocks"]:
-            if (block["type"] == BlockType.TABLE_BODY and block["lines"] and block["lines"][0]["spans"]):
-                block["lines"][0]["spans"][0]["html"] = merged_html
-                break
+        merged_spans[id(get_table_body_span(previous_table_block))] = get_table_body_span(previous_table_block)
+        merged_spans.pop(id(get_table_body_span(current_table_block)), None)
 
         # 删除当前页的table
         for block in current_table_block["blocks"]:
             block['lines'] = []
             block[SplitFlag.LINES_DELETED] = True
+
+    # 所有合并完成后，将合并过的表格统一渲染为html
+    for table_span in merged_spans.values():
+        table_span["html"] = table_grids[id(table_span)].render()
@@ -2,6 +2,7 @@
 
 import asyncio
 import os
+import random
 import zipfile
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
@@ -23,6 +24,95 @@ def singleton_func(cls):
     return _singleton
 
 
+# 下载结果时的流式读取块大小
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+
+def _status_signature(status_info: Dict[str, Any]):
+    """批次状态的摘要，用于判断两次轮询之间任务是否有进展"""
+    extract_result = (status_info.get("data") or {}).get("extract_result") or []
+    return tuple(
+        (
+            result.get("file_name"),
+            result.get("state"),
+            (result.get("extract_progress") or {}).get("extracted_pages"),
+        )
+        for result in extract_result
+    )
+
+
+class BatchStatusPoller:
+    """
+    批量任务状态轮询器。
+
+    并发的工具调用各自等待自己的批次，轮询器每一轮把所有等待中的批次一起查询
+    （每个批次一次请求即可返回其中全部文件的状态），而不是每个调用各自按固定间隔轮询。
+    轮询间隔按指数退避增长并加入随机抖动，任一批次有进展（文件状态或已解析页数变化）时回到最小间隔。
+    """
+
+    def __init__(self, fetch_status, min_interval: float, max_interval: float):
+        """
+        Args:
+            fetch_status: 查询单个批次状态的协程函数
+            min_interval: 最小轮询间隔 (秒)
+            max_interval: 最大轮询间隔 (秒)
+        """
+        self._fetch_status = fetch_status
+        self._min_interval = min_interval
+        self._max_interval = max(max_interval, min_interval)
+        self._interval = min_interval
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        self._signatures: Dict[str, Any] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def wait_status(self, batch_id: str) -> Dict[str, Any]:
+        """等待下一轮轮询，返回该批次的最新状态"""
+        if batch_id not in self._signatures:
+            # 新提交的批次尽快开始查询
+            self._interval = self._min_interval
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(batch_id, []).append(future)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return await future
+
+    def forget(self, batch_id: str):
+        """批次处理结束后清理记录"""
+        self._signatures.pop(batch_id, None)
+
+    async def _run(self):
+        while self._waiters:
+            # 在 [interval/2, interval] 之间随机抖动，避免大量客户端同时请求
+            await asyncio.sleep(random.uniform(self._interval / 2, self._interval))
+            waiters, self._waiters = self._waiters, {}
+            batch_ids = list(waiters)
+            results = await asyncio.gather(
+                *(self._fetch_status(batch_id) for batch_id in batch_ids),
+                return_exceptions=True,
+            )
+
+            progressed = False
+            for batch_id, result in zip(batch_ids, results):
+                if not isinstance(result, BaseException):
+                    signature = _status_signature(result)
+                    if signature != self._signatures.get(batch_id):
+                        progressed = True
+                        self._signatures[batch_id] = signature
+                for future in waiters[batch_id]:
+                    if future.done():
+                        # 等待方已超时取消
+                        continue
+                    if isinstance(result, BaseException):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+
+            if progressed:
+                self._interval = self._min_interval
+            else:
+                self._interval = min(self._interval * 2, self._max_interval)
+
+
 @singleton_func
 class MinerUClient:
     """
@@ -49,6 +139,85 @@ class MinerUClient:
                 "或者，在项目根目录的 `.env` 文件中定义该变量。"
             )
 
+        # 连接池会话和状态轮询器在所有工具调用间共享，首次使用时在当前事件循环中创建
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._poller: Optional[BatchStatusPoller] = None
+        self._upload_session: Optional[requests.Session] = None
+
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # 会话和轮询器都绑定事件循环，事件循环变化时重新创建
+            self._loop = loop
+            self._session = None
+            self._poller = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """获取共享的连接池会话"""
+        self._bind_loop()
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=config.HTTP_POOL_SIZE,
+                ttl_dns_cache=300,
+                keepalive_timeout=60,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(sock_connect=30, sock_read=300),
+            )
+        return self._session
+
+    def _get_upload_session(self) -> requests.Session:
+        """获取上传文件用的会话；aiohttp 会自动补充 Content-Type，与 OSS 预签名地址不兼容，因此上传仍使用 requests"""
+        if self._upload_session is None:
+            self._upload_session = requests.Session()
+        return self._upload_session
+
+    def _get_poller(self) -> BatchStatusPoller:
+        """获取共享的批量任务状态轮询器"""
+        self._bind_loop()
+        if self._poller is None:
+            self._poller = BatchStatusPoller(
+                self.get_batch_task_status,
+                config.POLL_MIN_INTERVAL,
+                config.POLL_MAX_INTERVAL,
+            )
+        return self._poller
+
+    async def aclose(self):
+        """关闭共享的连接池会话"""
+        if self._upload_session is not None:
+            self._upload_session.close()
+            self._upload_session = None
+        session, self._session, self._poller = self._session, None, None
+        if session is not None and not session.closed:
+            await session.close()
+
+    def close(self):
+        """同步关闭连接池会话，供服务退出时清理资源"""
+        if self._upload_session is not None:
+            self._upload_session.close()
+            self._upload_session = None
+        session = self._session
+        if session is None or session.closed:
+            return
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            # 事件循环已结束，连接随之释放
+            self._session, self._poller = None, None
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is loop:
+            loop.create_task(self.aclose())
+        elif not loop.is_running():
+            loop.run_until_complete(self.aclose())
+        else:
+            asyncio.run_coroutine_threadsafe(self.aclose(), loop)
+
     async def _request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
         """
         向 MinerU API 发出请求。
@@ -81,14 +250,13 @@ class MinerUClient:
         config.logger.debug(f"API请求: {method} {url}")
         config.logger.debug(f"请求参数: {log_kwargs}")
 
-        async with aiohttp.ClientSession() as session:
-            async with session.request(method, url, **kwargs) as response:
-                response.raise_for_status()
-                response_json = await response.json()
+        async with self._get_session().request(method, url, **kwargs) as response:
+            response.raise_for_status()
+            response_json = await response.json()
 
-                config.logger.debug(f"API响应: {response_json}")
+            config.logger.debug(f"API响应: {response_json}")
 
-                return response_json
+            return response_json
 
     async def submit_file_url_task(
         self,
@@ -401,7 +569,10 @@ class MinerUClient:
             try:
                 with open(file_path, "rb") as f:
                     # 重要：不设置Content-Type，让OSS自动处理
-                    response = requests.put(upload_url, data=f)
+                    # 复用上传会话的连接，在线程中流式上传，不阻塞事件循环
+                    response = await asyncio.to_thread(
+                        self._get_upload_session().put, upload_url, data=f
+                    )
 
                     if response.status_code != 200:
                         raise ValueError(
@@ -440,6 +611,96 @@ class MinerUClient:
 
         return response
 
+    async def download_file(self, url: str, target_path: Path) -> int:
+        """
+        流式下载文件到本地，不在内存中缓存完整内容。
+
+        Args:
+            url: 文件下载地址
+            target_path: 保存路径，下载完成后原子替换
+
+        Returns:
+            int: 下载的字节数
+        """
+        tmp_path = target_path.with_name(f"{target_path.name}.part")
+        size = 0
+        try:
+            async with self._get_session().get(
+                url,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+            ) as response:
+                response.raise_for_status()
+                with open(tmp_path, "wb") as f:
+                    async for chunk in response.content.iter_chunked(
+                        DOWNLOAD_CHUNK_SIZE
+                    ):
+                        f.write(chunk)
+                        size += len(chunk)
+            tmp_path.replace(target_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        return size
+
+    async def _download_result(
+        self,
+        file_name: str,
+        download_url: str,
+        output_path: Path,
+        extract_dir: Path,
+        batch_id: str,
+    ) -> Dict[str, Any]:
+        """下载并解压单个文件的处理结果，返回该文件的结果信息"""
+        try:
+            config.logger.debug(f"下载文件处理结果: {file_name}")
+
+            # 从下载URL中提取zip文件名作为子目录名
+            zip_file_name = download_url.split("/")[-1]
+            # 去掉.zip扩展名
+            zip_dir_name = os.path.splitext(zip_file_name)[0]
+
+            file_extract_dir = extract_dir / zip_dir_name
+            file_extract_dir.mkdir(exist_ok=True)
+
+            # 下载ZIP文件
+            zip_path = output_path / f"{batch_id}_{zip_file_name}"
+            await self.download_file(download_url, zip_path)
+
+            # 解压到子文件夹，解压在线程中进行，不阻塞其他工具调用
+            def extract_zip():
+                with zipfile.ZipFile(zip_path, "r") as zip_ref:
+                    zip_ref.extractall(file_extract_dir)
+                # 解压后删除ZIP文件
+                zip_path.unlink()
+
+            await asyncio.to_thread(extract_zip)
+
+            # 尝试读取Markdown内容
+            markdown_content = ""
+            markdown_files = list(file_extract_dir.glob("*.md"))
+            if markdown_files:
+                with open(markdown_files[0], "r", encoding="utf-8") as f:
+                    markdown_content = f.read()
+
+            config.logger.debug(f"文件 {file_name} 的结果已解压到: {file_extract_dir}")
+
+            # 成功结果
+            return {
+                "filename": file_name,
+                "status": "success",
+                "content": markdown_content,
+                "extract_path": str(file_extract_dir),
+            }
+
+        except Exception as e:
+            # 下载失败，返回错误结果
+            error_msg = f"下载结果失败: {str(e)}"
+            config.logger.error(f"文件 {file_name} {error_msg}")
+            return {
+                "filename": file_name,
+                "status": "error",
+                "error_message": error_msg,
+            }
+
     async def process_file_to_markdown(
         self,
         task_fn,
@@ -461,8 +722,9 @@ class MinerUClient:
                     - 包含多个文件配置的字典列表
             enable_ocr: 是否启用 OCR
             output_dir: 结果的输出目录
-            max_retries: 最大状态检查重试次数
-            retry_interval: 状态检查之间的时间间隔 (秒)
+            max_retries: 与 retry_interval 共同决定等待任务完成的总时长 (max_retries * retry_interval 秒)
+            retry_interval: 见 max_retries；实际轮询间隔由共享轮询器按
+                MINERU_POLL_MIN_INTERVAL/MINERU_POLL_MAX_INTERVAL 自适应调整
 
         Returns:
             Union[str, Dict[str, Any]]:
@@ -504,107 +766,122 @@ class MinerUClient:
             # 准备输出路径
             output_path = config.ensure_output_dir(output_dir)
 
-            # 轮询任务完成情况
-            for i in range(max_retries):
-                status_info = await self.get_batch_task_status(batch_id)
+            # 轮询任务完成情况：由共享的轮询器按自适应间隔查询，
+            # 总等待时间不超过 max_retries * retry_interval 秒
+            poller = self._get_poller()
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + max_retries * retry_interval
+            poll_count = 0
+            finished = False
+            try:
+                while True:
+                    try:
+                        status_info = await asyncio.wait_for(
+                            poller.wait_status(batch_id),
+                            max(deadline - loop.time(), 0),
+                        )
+                    except asyncio.TimeoutError:
+                        break
+                    poll_count += 1
 
-                config.logger.debug(f"轮训结果：{status_info}")
+                    config.logger.debug(f"轮训结果：{status_info}")
 
-                if (
-                    "data" not in status_info
-                    or "extract_result" not in status_info["data"]
-                ):
-                    config.logger.error(f"获取批量任务状态失败: {status_info}")
-                    await asyncio.sleep(retry_interval)
-                    continue
+                    if (
+                        "data" not in status_info
+                        or "extract_result" not in status_info["data"]
+                    ):
+                        config.logger.error(f"获取批量任务状态失败: {status_info}")
+                        continue
 
-                # 检查所有文件的状态
-                all_done = True
-                has_progress = False
+                    # 检查所有文件的状态
+                    all_done = True
+                    has_progress = False
 
-                for result in status_info["data"]["extract_result"]:
-                    file_name = result.get("file_name")
+                    for result in status_info["data"]["extract_result"]:
+                        file_name = result.get("file_name")
 
-                    if not file_name:
-                        continue
+                        if not file_name:
+                            continue
 
-                    # 初始化状态，如果之前没有记录
-                    if file_name not in files_status:
-                        files_status[file_name] = "pending"
+                        # 初始化状态，如果之前没有记录
+                        if file_name not in files_status:
+                            files_status[file_name] = "pending"
 
-                    state = result.get("state")
-                    files_status[file_name] = state
+                        state = result.get("state")
+                        files_status[file_name] = state
 
-                    if state == "done":
-                        # 保存下载链接
-                        full_zip_url = result.get("full_zip_url")
-                        if full_zip_url:
-                            files_download_urls[file_name] = full_zip_url
-                            config.logger.info(f"文件 {file_name} 处理完成")
+                        if state == "done":
+                            # 保存下载链接
+                            full_zip_url = result.get("full_zip_url")
+                            if full_zip_url:
+                                files_download_urls[file_name] = full_zip_url
+                                config.logger.info(f"文件 {file_name} 处理完成")
+                            else:
+                                config.logger.debug(
+                                    f"文件 {file_name} 标记为完成但没有下载链接"
+                                )
+                                all_done = False
+                        elif state in ["failed", "error"]:
+                            err_msg = result.get("err_msg", "未知错误")
+                            failed_files[file_name] = err_msg
+                            config.logger.warning(f"文件 {file_name} 处理失败: {err_msg}")
+                            # 不抛出异常，继续处理其他文件
                         else:
-                            config.logger.debug(
-                                f"文件 {file_name} 标记为完成但没有下载链接"
-                            )
                             all_done = False
-                    elif state in ["failed", "error"]:
-                        err_msg = result.get("err_msg", "未知错误")
-                        failed_files[file_name] = err_msg
-                        config.logger.warning(f"文件 {file_name} 处理失败: {err_msg}")
-                        # 不抛出异常，继续处理其他文件
-                    else:
-                        all_done = False
-                        # 显示进度信息
-                        if state == "running" and "extract_progress" in result:
-                            has_progress = True
-                            progress = result["extract_progress"]
-                            extracted = progress.get("extracted_pages", 0)
-                            total = progress.get("total_pages", 0)
-                            if total > 0:
-                                percent = (extracted / total) * 100
-                                config.logger.info(
-                                    f"处理进度: {file_name} "
-                                    + f"{extracted}/{total} 页 "
-                                    + f"({percent:.1f}%)"
-                                )
-
-                # 检查是否所有文件都已经处理完成
-                expected_file_count = len(uploaded_files)
-                processed_file_count = len(files_status)
-                completed_file_count = len(files_download_urls) + len(failed_files)
-
-                # 记录当前状态
-                config.logger.debug(
-                    f"文件处理状态: all_done={all_done}, "
-                    + f"files_status数量={processed_file_count}, "
-                    + f"上传文件数量={expected_file_count}, "
-                    + f"下载链接数量={len(files_download_urls)}, "
-                    + f"失败文件数量={len(failed_files)}"
-                )
+                            # 显示进度信息
+                            if state == "running" and "extract_progress" in result:
+                                has_progress = True
+                                progress = result["extract_progress"]
+                                extracted = progress.get("extracted_pages", 0)
+                                total = progress.get("total_pages", 0)
+                                if total > 0:
+                                    percent = (extracted / total) * 100
+                                    config.logger.info(
+                                        f"处理进度: {file_name} "
+                                        + f"{extracted}/{total} 页 "
+                                        + f"({percent:.1f}%)"
+                                    )
+
+                    # 检查是否所有文件都已经处理完成
+                    expected_file_count = len(uploaded_files)
+                    processed_file_count = len(files_status)
+                    completed_file_count = len(files_download_urls) + len(failed_files)
+
+                    # 记录当前状态
+                    config.logger.debug(
+                        f"文件处理状态: all_done={all_done}, "
+                        + f"files_status数量={processed_file_count}, "
+                        + f"上传文件数量={expected_file_count}, "
+                        + f"下载链接数量={len(files_download_urls)}, "
+                        + f"失败文件数量={len(failed_files)}"
+                    )
 
-                # 判断是否所有文件都已完成（包括成功和失败的）
-                if (
-                    processed_file_count > 0
-                    and processed_file_count >= expected_file_count
-                    and completed_file_count >= processed_file_count
-                ):
-                    if files_download_urls or failed_files:
-                        config.logger.info("文件处理完成")
-                        if failed_files:
-                            config.logger.warning(
-                                f"有 {len(failed_files)} 个文件处理失败"
-                            )
-                        break
-                    else:
-                        # 这种情况不应该发生，但保险起见
-                        all_done = False
+                    # 判断是否所有文件都已完成（包括成功和失败的）
+                    if (
+                        processed_file_count > 0
+                        and processed_file_count >= expected_file_count
+                        and completed_file_count >= processed_file_count
+                    ):
+                        if files_download_urls or failed_files:
+                            config.logger.info("文件处理完成")
+                            if failed_files:
+                                config.logger.warning(
+                                    f"有 {len(failed_files)} 个文件处理失败"
+                                )
+                            finished = True
+                            break
+                        else:
+                            # 这种情况不应该发生，但保险起见
+                            all_done = False
 
-                # 如果没有进度信息，只显示简单的等待消息
-                if not has_progress:
-                    config.logger.info(f"等待文件处理完成... ({i+1}/{max_retries})")
+                    # 如果没有进度信息，只显示简单的等待消息
+                    if not has_progress:
+                        config.logger.info(f"等待文件处理完成... (第 {poll_count} 次查询)")
+            finally:
+                poller.forget(batch_id)
 
-                await asyncio.sleep(retry_interval)
-            else:
-                # 如果超过最大重试次数，检查是否有部分文件完成
+            if not finished:
+                # 如果超过允许的等待时间，检查是否有部分文件完成
                 if not files_download_urls and not failed_files:
                     raise TimeoutError(f"批量任务 {batch_id} 未在允许的时间内完成")
                 else:
@@ -616,74 +893,17 @@ class MinerUClient:
             extract_dir = output_path / batch_id
             extract_dir.mkdir(exist_ok=True)
 
-            # 准备结果列表
-            results = []
-
-            # 下载并解压每个成功的文件的结果
-            for file_name, download_url in files_download_urls.items():
-                try:
-                    config.logger.debug
-                    (f"下载文件处理结果: {file_name}")
-
-                    # 从下载URL中提取zip文件名作为子目录名
-                    zip_file_name = download_url.split("/")[-1]
-                    # 去掉.zip扩展名
-                    zip_dir_name = os.path.splitext(zip_file_name)[0]
-
-                    file_extract_dir = extract_dir / zip_dir_name
-                    file_extract_dir.mkdir(exist_ok=True)
-
-                    # 下载ZIP文件
-                    zip_path = output_path / f"{batch_id}_{zip_file_name}"
-
-                    async with aiohttp.ClientSession() as session:
-                        async with session.get(
-                            download_url,
-                            headers={"Authorization": f"Bearer {self.api_key}"},
-                        ) as response:
-                            response.raise_for_status()
-                            with open(zip_path, "wb") as f:
-                                f.write(await response.read())
-
-                    # 解压到子文件夹
-                    with zipfile.ZipFile(zip_path, "r") as zip_ref:
-                        zip_ref.extractall(file_extract_dir)
-
-                    # 解压后删除ZIP文件
-                    zip_path.unlink()
-
-                    # 尝试读取Markdown内容
-                    markdown_content = ""
-                    markdown_files = list(file_extract_dir.glob("*.md"))
-                    if markdown_files:
-                        with open(markdown_files[0], "r", encoding="utf-8") as f:
-                            markdown_content = f.read()
-
-                    # 添加成功结果
-                    results.append(
-                        {
-                            "filename": file_name,
-                            "status": "success",
-                            "content": markdown_content,
-                            "extract_path": str(file_extract_dir),
-                        }
-                    )
-
-                    config.logger.debug(
-                        f"文件 {file_name} 的结果已解压到: {file_extract_dir}"
-                    )
-
-                except Exception as e:
-                    # 下载失败，添加错误结果
-                    error_msg = f"下载结果失败: {str(e)}"
-                    config.logger.error(f"文件 {file_name} {error_msg}")
-                    results.append(
-                        {
-                            "filename": file_name,
-                            "status": "error",
-                            "error_message": error_msg,
-                        }
+            # 并发下载并解压每个成功的文件的结果，并发数受连接池大小限制
+            results = list(
+                await asyncio.gather(
+                    *(
+                        self._download_result(
+                            file_name, download_url, output_path, extract_dir, batch_id
+                        )
+                        for file_name, download_url in files_download_urls.items()
                     )
+                )
+            )
 
             # 添加处理失败的文件到结果
             for file_name, error_msg in failed_files.items():
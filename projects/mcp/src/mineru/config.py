@@ -16,6 +16,11 @@ MINERU_API_KEY = os.getenv("MINERU_API_KEY", "")
 USE_LOCAL_API = os.getenv("USE_LOCAL_API", "").lower() in ["true", "1", "yes"]
 LOCAL_MINERU_API_BASE = os.getenv("LOCAL_MINERU_API_BASE", "http://localhost:8080")
 
+# 远程 API 客户端配置：连接池大小，以及任务状态轮询的最小/最大间隔（秒）
+HTTP_POOL_SIZE = int(os.getenv("MINERU_HTTP_POOL_SIZE", "16"))
+POLL_MIN_INTERVAL = float(os.getenv("MINERU_POLL_MIN_INTERVAL", "1"))
+POLL_MAX_INTERVAL = float(os.getenv("MINERU_POLL_MAX_INTERVAL", "10"))
+
 # 转换后文件的默认输出目录
 DEFAULT_OUTPUT_DIR = os.getenv("OUTPUT_DIR", "./downloads")
 
@@ -1,5 +1,6 @@
 """MinerU File转Markdown转换的FastMCP服务器实现。"""
 
+import asyncio
 import json
 import re
 import traceback
@@ -831,112 +832,125 @@ async def parse_documents(
                 )
 
     else:
-        # 在远程API模式下，分别处理URL和本地文件路径
-        if url_paths:
-            config.logger.info(f"使用远程API处理 {len(url_paths)} 个文件URL")
+        # 在远程API模式下，URL和本地文件分别提交为两个批次并发处理，
+        # 两个批次的状态由客户端的轮询器在同一轮中查询
+        async def process_url_paths() -> List[Dict[str, Any]]:
+            url_results = []
+            if url_paths:
+                config.logger.info(f"使用远程API处理 {len(url_paths)} 个文件URL")
 
-            try:
-                # 调用convert_file_url处理URLs
-                url_result = await convert_file_url(
-                    url=",".join(url_paths),
-                    enable_ocr=enable_ocr,
-                    language=language,
-                    page_ranges=page_ranges,
-                )
+                try:
+                    # 调用convert_file_url处理URLs
+                    url_result = await convert_file_url(
+                        url=",".join(url_paths),
+                        enable_ocr=enable_ocr,
+                        language=language,
+                        page_ranges=page_ranges,
+                    )
 
-                if url_result["status"] == "success":
-                    # 为每个URL生成对应的结果
-                    for url in url_paths:
-                        result_item = await _process_conversion_result(
-                            url_result, url, is_url=True
-                        )
-                        results.append(result_item)
-                else:
-                    # 转换失败，为所有URL添加错误结果
+                    if url_result["status"] == "success":
+                        # 为每个URL生成对应的结果
+                        for url in url_paths:
+                            result_item = await _process_conversion_result(
+                                url_result, url, is_url=True
+                            )
+                            url_results.append(result_item)
+                    else:
+                        # 转换失败，为所有URL添加错误结果
+                        for url in url_paths:
+                            url_results.append(
+                                {
+                                    "filename": url.split("/")[-1].split("?")[0],
+                                    "source_url": url,
+                                    "status": "error",
+                                    "error_message": url_result.get("error", "URL处理失败"),
+                                }
+                            )
+
+                except Exception as e:
+                    config.logger.error(f"处理URL时出现错误: {str(e)}")
                     for url in url_paths:
-                        results.append(
+                        url_results.append(
                             {
                                 "filename": url.split("/")[-1].split("?")[0],
                                 "source_url": url,
                                 "status": "error",
-                                "error_message": url_result.get("error", "URL处理失败"),
+                                "error_message": f"处理URL时出现异常: {str(e)}",
                             }
                         )
 
-            except Exception as e:
-                config.logger.error(f"处理URL时出现错误: {str(e)}")
-                for url in url_paths:
-                    results.append(
-                        {
-                            "filename": url.split("/")[-1].split("?")[0],
-                            "source_url": url,
-                            "status": "error",
-                            "error_message": f"处理URL时出现异常: {str(e)}",
-                        }
-                    )
+            return url_results
 
-        if file_paths:
-            config.logger.info(f"使用远程API处理 {len(file_paths)} 个本地文件")
+        async def process_file_paths() -> List[Dict[str, Any]]:
+            path_results = []
+            if file_paths:
+                config.logger.info(f"使用远程API处理 {len(file_paths)} 个本地文件")
 
-            # 过滤出存在的文件
-            existing_files = []
-            for file_path in file_paths:
-                if not Path(file_path).exists():
-                    results.append(
-                        {
-                            "filename": Path(file_path).name,
-                            "source_path": file_path,
-                            "status": "error",
-                            "error_message": f"文件不存在: {file_path}",
-                        }
-                    )
-                else:
-                    existing_files.append(file_path)
+                # 过滤出存在的文件
+                existing_files = []
+                for file_path in file_paths:
+                    if not Path(file_path).exists():
+                        path_results.append(
+                            {
+                                "filename": Path(file_path).name,
+                                "source_path": file_path,
+                                "status": "error",
+                                "error_message": f"文件不存在: {file_path}",
+                            }
+                        )
+                    else:
+                        existing_files.append(file_path)
 
-            if existing_files:
-                try:
-                    # 调用convert_file_path处理本地文件
-                    file_result = await convert_file_path(
-                        file_path=",".join(existing_files),
-                        enable_ocr=enable_ocr,
-                        language=language,
-                        page_ranges=page_ranges,
-                    )
+                if existing_files:
+                    try:
+                        # 调用convert_file_path处理本地文件
+                        file_result = await convert_file_path(
+                            file_path=",".join(existing_files),
+                            enable_ocr=enable_ocr,
+                            language=language,
+                            page_ranges=page_ranges,
+                        )
 
-                    config.logger.debug(f"file_result: {file_result}")
+                        config.logger.debug(f"file_result: {file_result}")
+
+                        if file_result["status"] == "success":
+                            # 为每个文件生成对应的结果
+                            for file_path in existing_files:
+                                result_item = await _process_conversion_result(
+                                    file_result, file_path, is_url=False
+                                )
+                                path_results.append(result_item)
+                        else:
+                            # 转换失败，为所有文件添加错误结果
+                            for file_path in existing_files:
+                                path_results.append(
+                                    {
+                                        "filename": Path(file_path).name,
+                                        "source_path": file_path,
+                                        "status": "error",
+                                        "error_message": file_result.get(
+                                            "error", "文件处理失败"
+                                        ),
+                                    }
+                                )
 
-                    if file_result["status"] == "success":
-                        # 为每个文件生成对应的结果
-                        for file_path in existing_files:
-                            result_item = await _process_conversion_result(
-                                file_result, file_path, is_url=False
-                            )
-                            results.append(result_item)
-                    else:
-                        # 转换失败，为所有文件添加错误结果
+                    except Exception as e:
+                        config.logger.error(f"处理本地文件时出现错误: {str(e)}")
                         for file_path in existing_files:
-                            results.append(
+                            path_results.append(
                                 {
                                     "filename": Path(file_path).name,
                                     "source_path": file_path,
                                     "status": "error",
-                                    "error_message": file_result.get(
-                                        "error", "文件处理失败"
-                                    ),
+                                    "error_message": f"处理文件时出现异常: {str(e)}",
                                 }
                             )
+            return path_results
 
-                except Exception as e:
-                    config.logger.error(f"处理本地文件时出现错误: {str(e)}")
-                    for file_path in existing_files:
-                        results.append(
-                            {
-                                "filename": Path(file_path).name,
-                                "source_path": file_path,
-                                "status": "error",
-                                "error_message": f"处理文件时出现异常: {str(e)}",
-                            }
-                        )
+        for batch_results in await asyncio.gather(
+            process_url_paths(), process_file_paths()
+        ):
+            results.extend(batch_results)
 
     # 处理结果为空的情况
     if not results:
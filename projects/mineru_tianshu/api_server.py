@@ -4,22 +4,29 @@ MinerU Tianshu - API Server
 
 提供RESTful API接口用于任务提交、查询和管理
 """
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import tempfile
 from pathlib import Path
 from loguru import logger
 import uvicorn
-from typing import Optional
+from typing import Dict, Optional
 from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor
+import mimetypes
 import os
 import re
-import uuid
 import json
+import shutil
+import threading
 from minio import Minio
 
-from task_db import TaskDB
+from task_db import TaskDB, split_page_ranges
+from result_manifest import (
+    find_entry, get_entries, get_entry, iter_file_range, load_manifest,
+    parse_range, read_entry_text, write_manifest,
+)
 
 # 初始化 FastAPI 应用
 app = FastAPI(
@@ -44,6 +51,9 @@ db = TaskDB()
 OUTPUT_DIR = Path('/tmp/mineru_tianshu_output')
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+# 超过该页数的 PDF 在提交时按页码区间拆分为多个子任务，0 表示不拆分
+SUBTASK_PAGES = int(os.getenv('TIANSHU_SUBTASK_PAGES', '100'))
+
 # MinIO 配置
 MINIO_CONFIG = {
     'endpoint': os.getenv('MINIO_ENDPOINT', ''),
@@ -64,66 +74,131 @@ def get_minio_client():
     )
 
 
-def process_markdown_images(md_content: str, image_dir: Path, upload_images: bool = False):
+# 已上传图片的 URL 记录（{结果目录}/image_urls.json），每个任务的图片只上传一次
+IMAGE_URLS_NAME = 'image_urls.json'
+
+# 图片在后台线程中上传到 MinIO，不阻塞查询请求
+_upload_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('MINIO_UPLOAD_WORKERS', '4')),
+    thread_name_prefix='minio-upload'
+)
+_upload_futures: Dict[str, Future] = {}
+_upload_lock = threading.Lock()
+
+
+def get_result_manifest(result_dir: Path) -> Dict:
+    """
+    读取任务结果清单
+
+    清单由 Worker 在任务完成时写入；旧版本 Worker 产生的结果没有清单，首次查询时补建一次
+    """
+    manifest = load_manifest(result_dir)
+    if manifest is None:
+        logger.info(f"📋 Building result manifest for {result_dir}")
+        manifest = write_manifest(result_dir)
+    return manifest
+
+
+def get_file_url(task_id: str, rel_path: str) -> str:
+    """结果文件的下载地址（支持 Range 分段下载）"""
+    return f"/api/v1/tasks/{task_id}/files/{rel_path}"
+
+
+def _upload_task_images(task_id: str, result_dir: Path, image_entries: list) -> Dict[str, str]:
+    """上传任务的全部图片到 MinIO，返回 {相对路径: URL} 并记录到结果目录"""
+    minio_client = get_minio_client()
+    bucket_name = MINIO_CONFIG['bucket_name']
+    scheme = 'https' if MINIO_CONFIG['secure'] else 'http'
+
+    image_urls = {}
+    for entry in image_entries:
+        # 对象名由任务ID和内容摘要决定，重复上传会覆盖同一对象
+        object_name = f"images/{task_id}/{entry['sha256'][:16]}{Path(entry['path']).suffix}"
+        minio_client.fput_object(bucket_name=bucket_name, object_name=object_name,
+                                 file_path=str(result_dir / entry['path']))
+        image_urls[entry['path']] = f"{scheme}://{MINIO_CONFIG['endpoint']}/{bucket_name}/{object_name}"
+
+    tmp_file = result_dir / f'.{IMAGE_URLS_NAME}.tmp'
+    tmp_file.write_text(json.dumps(image_urls), encoding='utf-8')
+    os.replace(tmp_file, result_dir / IMAGE_URLS_NAME)
+    logger.info(f"🖼️  Uploaded {len(image_urls)} images of task {task_id} to MinIO")
+    return image_urls
+
+
+def get_image_urls(task_id: str, result_dir: Path, manifest: Dict) -> Optional[Dict[str, str]]:
+    """
+    获取任务图片在 MinIO 中的 URL
+
+    图片已上传时返回 {相对路径: URL}；否则在后台开始上传（同一任务只提交一次）并返回 None，
+    客户端稍后再次查询即可拿到 URL
+    """
+    urls_file = result_dir / IMAGE_URLS_NAME
+    if urls_file.exists():
+        return read_json_file(urls_file)
+
+    image_entries = get_entries(manifest, 'image')
+    if not image_entries:
+        return {}
+
+    with _upload_lock:
+        future = _upload_futures.get(task_id)
+        if future is not None and future.done():
+            _upload_futures.pop(task_id)
+            if future.exception() is None:
+                return future.result()
+            logger.error(f"Failed to upload images of task {task_id} to MinIO: {future.exception()}")
+            future = None
+        if future is None:
+            _upload_futures[task_id] = _upload_executor.submit(
+                _upload_task_images, task_id, result_dir, image_entries
+            )
+    return None
+
+
+def process_markdown_images(md_content: str, md_path: str, image_urls: Optional[Dict[str, str]]):
     """
     处理 Markdown 中的图片引用
     
     Args:
         md_content: Markdown 内容
-        image_dir: 图片所在目录
-        upload_images: 是否上传图片到 MinIO 并替换链接
+        md_path: Markdown 文件在结果目录中的相对路径
+        image_urls: 已上传图片的 {相对路径: URL}，为空时不替换
         
     Returns:
         处理后的 Markdown 内容
     """
-    if not upload_images:
+    if not image_urls:
         return md_content
     
+    md_dir = Path(md_path).parent
+    # 查找所有 markdown 格式的图片
+    img_pattern = r'!\[([^\]]*)\]\(([^)]+)\)'
+    
+    def replace_image(match):
+        alt_text = match.group(1)
+        image_path = match.group(2)
+        minio_url = image_urls.get((md_dir / image_path).as_posix())
+        if minio_url:
+            # 返回 HTML 格式的 img 标签
+            return f'<img src="{minio_url}" alt="{alt_text}">'
+        return match.group(0)
+    
+    # 替换所有图片引用
+    return re.sub(img_pattern, replace_image, md_content)
+
+
+def get_pdf_page_count(file_path: str) -> int:
+    """读取 PDF 页数，无法解析时返回 0（交给 Worker 按普通任务处理并报告错误）"""
+    import pypdfium2 as pdfium
     try:
-        minio_client = get_minio_client()
-        bucket_name = MINIO_CONFIG['bucket_name']
-        minio_endpoint = MINIO_CONFIG['endpoint']
-        
-        # 查找所有 markdown 格式的图片
-        img_pattern = r'!\[([^\]]*)\]\(([^)]+)\)'
-        
-        def replace_image(match):
-            alt_text = match.group(1)
-            image_path = match.group(2)
-            
-            # 构建完整的本地图片路径
-            full_image_path = image_dir / Path(image_path).name
-            
-            if full_image_path.exists():
-                # 获取文件后缀
-                file_extension = full_image_path.suffix
-                # 生成 UUID 作为新文件名
-                new_filename = f"{uuid.uuid4()}{file_extension}"
-                
-                try:
-                    # 上传到 MinIO
-                    object_name = f"images/{new_filename}"
-                    minio_client.fput_object(bucket_name=bucket_name, object_name=object_name, file_path=str(full_image_path))
-                    
-                    # 生成 MinIO 访问 URL
-                    scheme = 'https' if MINIO_CONFIG['secure'] else 'http'
-                    minio_url = f"{scheme}://{minio_endpoint}/{bucket_name}/{object_name}"
-                    
-                    # 返回 HTML 格式的 img 标签
-                    return f'<img src="{minio_url}" alt="{alt_text}">'
-                except Exception as e:
-                    logger.error(f"Failed to upload image to MinIO: {e}")
-                    return match.group(0)  # 上传失败，保持原样
-            
-            return match.group(0)
-        
-        # 替换所有图片引用
-        new_content = re.sub(img_pattern, replace_image, md_content)
-        return new_content
-        
+        pdf = pdfium.PdfDocument(file_path)
     except Exception as e:
-        logger.error(f"Error processing markdown images: {e}")
-        return md_content  # 出错时返回原内容
+        logger.warning(f"Failed to count pages of {file_path}: {e}")
+        return 0
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
 
 
 def read_json_file(file_path: Path):
@@ -144,87 +219,61 @@ def read_json_file(file_path: Path):
         return None
 
 
-def get_file_metadata(file_path: Path):
+def get_file_metadata(task_id: str, result_dir: Path, entry: Dict):
     """
     获取文件元数据
 
     Args:
-        file_path: 文件路径
+        task_id: 任务ID
+        result_dir: 结果目录
+        entry: 结果清单中的文件记录
 
     Returns:
         包含文件元数据的字典
     """
+    file_path = result_dir / entry['path']
     if not file_path.exists():
         return None
 
     stat = file_path.stat()
     return {
-        'size': stat.st_size,
+        'size': entry['size'],
+        'sha256': entry['sha256'],
+        'encoding': entry['encoding'],
+        'url': get_file_url(task_id, entry['path']),
         'created_at': datetime.fromtimestamp(stat.st_ctime).isoformat(),
         'modified_at': datetime.fromtimestamp(stat.st_mtime).isoformat()
     }
 
 
-def get_images_info(image_dir: Path, upload_to_minio: bool = False):
+def get_images_info(task_id: str, manifest: Dict, image_urls: Optional[Dict[str, str]] = None):
     """
-    获取图片目录信息
+    获取图片信息
 
     Args:
-        image_dir: 图片目录路径
-        upload_to_minio: 是否上传到 MinIO
+        task_id: 任务ID
+        manifest: 结果清单
+        image_urls: 已上传图片的 {相对路径: URL}，None 表示未上传
 
     Returns:
         图片信息字典
     """
-    if not image_dir.exists() or not image_dir.is_dir():
-        return {
-            'count': 0,
-            'list': [],
-            'uploaded_to_minio': False
-        }
-
-    # 支持的图片格式
-    image_extensions = {'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp', '.svg'}
-    image_files = [f for f in image_dir.iterdir() if f.is_file() and f.suffix.lower() in image_extensions]
-
     images_list = []
-
-    for img_file in sorted(image_files):
-        img_info = {
-            'name': img_file.name,
-            'size': img_file.stat().st_size,
-            'path': str(img_file.relative_to(image_dir.parent))
-        }
-
-        # 如果需要上传到 MinIO
-        if upload_to_minio:
-            try:
-                minio_client = get_minio_client()
-                bucket_name = MINIO_CONFIG['bucket_name']
-                minio_endpoint = MINIO_CONFIG['endpoint']
-
-                # 生成 UUID 作为新文件名
-                file_extension = img_file.suffix
-                new_filename = f"{uuid.uuid4()}{file_extension}"
-                object_name = f"images/{new_filename}"
-
-                # 上传到 MinIO
-                minio_client.fput_object(bucket_name=bucket_name, object_name=object_name, file_path=str(img_file))
-
-                # 生成访问 URL
-                scheme = 'https' if MINIO_CONFIG['secure'] else 'http'
-                img_info['url'] = f"{scheme}://{minio_endpoint}/{bucket_name}/{object_name}"
-
-            except Exception as e:
-                logger.error(f"Failed to upload image {img_file.name} to MinIO: {e}")
-                img_info['url'] = None
-
-        images_list.append(img_info)
+    for entry in get_entries(manifest, 'image'):
+        rel_path = Path(entry['path'])
+        images_list.append({
+            'name': rel_path.name,
+            'size': entry['size'],
+            'sha256': entry['sha256'],
+            'path': f"{rel_path.parent.name}/{rel_path.name}",
+            'download_url': get_file_url(task_id, entry['path']),
+            'url': image_urls.get(entry['path']) if image_urls is not None else None,
+        })
 
     return {
         'count': len(images_list),
         'list': images_list,
-        'uploaded_to_minio': upload_to_minio
+        'uploaded_to_minio': image_urls is not None
     }
 
 
@@ -248,11 +297,13 @@ async def submit_task(
     formula_enable: bool = Form(True, description="是否启用公式识别"),
     table_enable: bool = Form(True, description="是否启用表格识别"),
     priority: int = Form(0, description="优先级，数字越大越优先"),
+    split_pages: int = Form(SUBTASK_PAGES, description="PDF 超过该页数时按页码区间拆分并行处理，0 表示不拆分"),
 ):
     """
     提交文档解析任务
     
-    立即返回 task_id，任务在后台异步处理
+    立即返回 task_id，任务在后台异步处理。
+    页数超过 split_pages 的 PDF 拆分为多个页码区间子任务，由多个 Worker 并行解析后合并结果
     """
     try:
         # 保存上传的文件到临时目录
@@ -267,26 +318,43 @@ async def submit_task(
         
         temp_file.close()
         
+        options = {
+            'lang': lang,
+            'method': method,
+            'formula_enable': formula_enable,
+            'table_enable': table_enable,
+        }
+        page_ranges = []
+        if split_pages > 0 and Path(file.filename).suffix.lower() == '.pdf':
+            page_ranges = split_page_ranges(get_pdf_page_count(temp_file.name), split_pages)
+        
         # 创建任务
-        task_id = db.create_task(
-            file_name=file.filename,
-            file_path=temp_file.name,
-            backend=backend,
-            options={
-                'lang': lang,
-                'method': method,
-                'formula_enable': formula_enable,
-                'table_enable': table_enable,
-            },
-            priority=priority
-        )
+        if len(page_ranges) > 1:
+            task_id = db.create_split_task(
+                file_name=file.filename,
+                file_path=temp_file.name,
+                page_ranges=page_ranges,
+                backend=backend,
+                options=options,
+                priority=priority
+            )
+            status = 'waiting'
+        else:
+            task_id = db.create_task(
+                file_name=file.filename,
+                file_path=temp_file.name,
+                backend=backend,
+                options=options,
+                priority=priority
+            )
+            status = 'pending'
         
-        logger.info(f"✅ Task submitted: {task_id} - {file.filename} (priority: {priority})")
+        logger.info(f"✅ Task submitted: {task_id} - {file.filename} (priority: {priority}, subtasks: {len(page_ranges) if status == 'waiting' else 0})")
         
         return {
             'success': True,
             'task_id': task_id,
-            'status': 'pending',
+            'status': status,
             'message': 'Task submitted successfully',
             'file_name': file.filename,
             'created_at': datetime.now().isoformat()
@@ -297,15 +365,29 @@ async def submit_task(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# include_fields 字段 -> 结果清单中的产物类型
+JSON_FIELDS = {
+    'content_list': 'content_list',
+    'middle_json': 'middle_json',
+    'model_output': 'model_output',
+}
+PDF_FIELDS = {
+    'layout_pdf': 'layout_pdf',
+    'span_pdf': 'span_pdf',
+    'origin_pdf': 'origin_pdf',
+}
+
+
 @app.get("/api/v1/tasks/{task_id}/data")
-async def get_task_data(
+def get_task_data(
     task_id: str,
     include_fields: str = Query(
         "md,content_list,middle_json,model_output,images",
         description="需要返回的字段，逗号分隔：md,content_list,middle_json,model_output,images,layout_pdf,span_pdf,origin_pdf"
     ),
-    upload_images: bool = Query(False, description="是否上传图片到MinIO并返回URL"),
-    include_metadata: bool = Query(True, description="是否包含文件元数据")
+    upload_images: bool = Query(False, description="是否上传图片到MinIO并返回URL（后台上传，完成前返回本地下载地址）"),
+    include_metadata: bool = Query(True, description="是否包含文件元数据"),
+    inline: bool = Query(True, description="是否内联返回文件内容，false 时只返回下载地址，可通过文件接口流式/分段下载")
 ):
     """
     按需获取任务的解析数据
@@ -318,7 +400,7 @@ async def get_task_data(
     - 图片列表
     - 其他辅助文件（layout PDF、span PDF、origin PDF）
 
-    通过 include_fields 参数按需选择需要返回的字段
+    通过 include_fields 参数按需选择需要返回的字段，文件位置来自 Worker 写入的结果清单
     """
     # 获取任务信息
     task = db.get_task(task_id)
@@ -360,147 +442,65 @@ async def get_task_data(
 
     logger.info(f"📦 Getting complete data for task {task_id}, fields: {fields}")
 
-    # 查找文件（递归搜索，MinerU 输出结构：task_id/filename/auto/*.md）
     try:
+        manifest = get_result_manifest(result_dir)
+        image_urls = None
+        if upload_images and ('md' in fields or 'images' in fields):
+            image_urls = get_image_urls(task_id, result_dir, manifest)
+
+        def describe(entry):
+            item = {
+                'file_name': Path(entry['path']).name,
+                'path': entry['path'],
+                'url': get_file_url(task_id, entry['path'])
+            }
+            if include_metadata:
+                metadata = get_file_metadata(task_id, result_dir, entry)
+                if metadata:
+                    item['metadata'] = metadata
+            return item
+
         # 1. 处理 Markdown 文件
         if 'md' in fields:
-            md_files = list(result_dir.rglob('*.md'))
-            # 排除带特殊后缀的 md 文件
-            md_files = [f for f in md_files if not any(f.stem.endswith(suffix) for suffix in ['_layout', '_span', '_origin'])] 
-
-            if md_files:
-                md_file = md_files[0]
-                logger.info(f"📄 Reading markdown file: {md_file}")
-
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    md_content = f.read()
-
-                # 处理图片（如果需要上传）
-                image_dir = md_file.parent / 'images'
-                if upload_images and image_dir.exists():
-                    md_content = process_markdown_images(md_content, image_dir, upload_images)
-
-                response['data']['markdown'] = {
-                    'content': md_content,
-                    'file_name': md_file.name
-                }
-
-                if include_metadata:
-                    metadata = get_file_metadata(md_file)
-                    if metadata:
-                        response['data']['markdown']['metadata'] = metadata
-
-        # 2. 处理 Content List JSON
-        if 'content_list' in fields:
-            content_list_files = list(result_dir.rglob('*_content_list.json'))
-            if content_list_files:
-                content_list_file = content_list_files[0]
-                logger.info(f"📄 Reading content list file: {content_list_file}")
-
-                content_data = read_json_file(content_list_file)
-                if content_data is not None:
-                    response['data']['content_list'] = {
-                        'content': content_data,
-                        'file_name': content_list_file.name
-                    }
-
-                    if include_metadata:
-                        metadata = get_file_metadata(content_list_file)
-                        if metadata:
-                            response['data']['content_list']['metadata'] = metadata
-
-        # 3. 处理 Middle JSON
-        if 'middle_json' in fields:
-            middle_json_files = list(result_dir.rglob('*_middle.json'))
-            if middle_json_files:
-                middle_json_file = middle_json_files[0]
-                logger.info(f"📄 Reading middle json file: {middle_json_file}")
-
-                middle_data = read_json_file(middle_json_file)
-                if middle_data is not None:
-                    response['data']['middle_json'] = {
-                        'content': middle_data,
-                        'file_name': middle_json_file.name
-                    }
-
-                    if include_metadata:
-                        metadata = get_file_metadata(middle_json_file)
-                        if metadata:
-                            response['data']['middle_json']['metadata'] = metadata
-
-        # 4. 处理 Model Output JSON
-        if 'model_output' in fields:
-            model_output_files = list(result_dir.rglob('*_model.json'))
-            if model_output_files:
-                model_output_file = model_output_files[0]
-                logger.info(f"📄 Reading model output file: {model_output_file}")
-
-                model_data = read_json_file(model_output_file)
-                if model_data is not None:
-                    response['data']['model_output'] = {
-                        'content': model_data,
-                        'file_name': model_output_file.name
-                    }
-
-                    if include_metadata:
-                        metadata = get_file_metadata(model_output_file)
-                        if metadata:
-                            response['data']['model_output']['metadata'] = metadata
+            md_entry = get_entry(manifest, 'md')
+            if md_entry:
+                response['data']['markdown'] = describe(md_entry)
+                response['data']['markdown']['images_uploaded'] = image_urls is not None
+                if inline:
+                    logger.info(f"📄 Reading markdown file: {md_entry['path']}")
+                    md_content = read_entry_text(result_dir, md_entry)
+                    # 图片上传完成后替换为 MinIO 链接
+                    response['data']['markdown']['content'] = process_markdown_images(
+                        md_content, md_entry['path'], image_urls
+                    )
+
+        # 2-4. 处理 Content List / Middle JSON / Model Output JSON
+        for field, kind in JSON_FIELDS.items():
+            if field not in fields:
+                continue
+            entry = get_entry(manifest, kind)
+            if entry is None:
+                continue
+            response['data'][field] = describe(entry)
+            if inline:
+                logger.info(f"📄 Reading {field} file: {entry['path']}")
+                try:
+                    response['data'][field]['content'] = json.loads(read_entry_text(result_dir, entry))
+                except Exception as e:
+                    logger.error(f"Failed to read JSON file {entry['path']}: {e}")
+                    response['data'].pop(field)
 
         # 5. 处理图片
         if 'images' in fields:
-            image_dirs = list(result_dir.rglob('images'))
-            if image_dirs:
-                image_dir = image_dirs[0]
-                logger.info(f"🖼️  Getting images info from: {image_dir}")
-
-                images_info = get_images_info(image_dir, upload_images)
-                response['data']['images'] = images_info
-
-        # 6. 处理 Layout PDF
-        if 'layout_pdf' in fields:
-            layout_pdf_files = list(result_dir.rglob('*_layout.pdf'))
-            if layout_pdf_files:
-                layout_pdf_file = layout_pdf_files[0]
-                response['data']['layout_pdf'] = {
-                    'file_name': layout_pdf_file.name,
-                    'path': str(layout_pdf_file.relative_to(result_dir))
-                }
-
-                if include_metadata:
-                    metadata = get_file_metadata(layout_pdf_file)
-                    if metadata:
-                        response['data']['layout_pdf']['metadata'] = metadata
-
-        # 7. 处理 Span PDF
-        if 'span_pdf' in fields:
-            span_pdf_files = list(result_dir.rglob('*_span.pdf'))
-            if span_pdf_files:
-                span_pdf_file = span_pdf_files[0]
-                response['data']['span_pdf'] = {
-                    'file_name': span_pdf_file.name,
-                    'path': str(span_pdf_file.relative_to(result_dir))
-                }
-
-                if include_metadata:
-                    metadata = get_file_metadata(span_pdf_file)
-                    if metadata:
-                        response['data']['span_pdf']['metadata'] = metadata
-
-        # 8. 处理 Origin PDF
-        if 'origin_pdf' in fields:
-            origin_pdf_files = list(result_dir.rglob('*_origin.pdf'))
-            if origin_pdf_files:
-                origin_pdf_file = origin_pdf_files[0]
-                response['data']['origin_pdf'] = {
-                    'file_name': origin_pdf_file.name,
-                    'path': str(origin_pdf_file.relative_to(result_dir))
-                }
-
-                if include_metadata:
-                    metadata = get_file_metadata(origin_pdf_file)
-                    if metadata:
-                        response['data']['origin_pdf']['metadata'] = metadata
+            response['data']['images'] = get_images_info(task_id, manifest, image_urls)
+
+        # 6-8. 处理 Layout / Span / Origin PDF（只返回下载地址）
+        for field, kind in PDF_FIELDS.items():
+            if field not in fields:
+                continue
+            entry = get_entry(manifest, kind)
+            if entry is not None:
+                response['data'][field] = describe(entry)
 
         logger.info(f"✅ Complete data retrieved successfully for task {task_id}")
 
@@ -512,8 +512,57 @@ async def get_task_data(
     return response
 
 
+@app.get("/api/v1/tasks/{task_id}/files/{file_path:path}")
+def get_task_file(task_id: str, file_path: str, request: Request):
+    """
+    下载任务结果文件
+
+    只能访问结果清单中登记的文件；支持 Range 分段下载和 If-None-Match 缓存校验（ETag 为文件的 sha256）
+    """
+    task = db.get_task(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if task['status'] != 'completed' or not task['result_path']:
+        raise HTTPException(status_code=404, detail="Task result not available")
+
+    result_dir = Path(task['result_path'])
+    if not result_dir.exists():
+        raise HTTPException(status_code=404, detail="Result directory does not exist")
+
+    entry = find_entry(get_result_manifest(result_dir), file_path)
+    full_path = result_dir / file_path
+    if entry is None or not full_path.is_file():
+        raise HTTPException(status_code=404, detail="File not found")
+
+    etag = f'"{entry["sha256"]}"'
+    headers = {'ETag': etag, 'Accept-Ranges': 'bytes'}
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers=headers)
+
+    # 压缩产物按原始字节返回，由客户端根据 metadata.encoding 解压
+    media_type = 'application/octet-stream'
+    if not entry['encoding']:
+        media_type = mimetypes.guess_type(full_path.name)[0] or media_type
+
+    size = entry['size']
+    try:
+        byte_range = parse_range(request.headers.get('range'), size)
+    except ValueError:
+        return Response(status_code=416, headers={'Content-Range': f'bytes */{size}'})
+
+    if byte_range is None:
+        headers['Content-Length'] = str(size)
+        return StreamingResponse(iter_file_range(full_path), media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+    headers['Content-Length'] = str(end - start + 1)
+    return StreamingResponse(iter_file_range(full_path, start, end), status_code=206,
+                             media_type=media_type, headers=headers)
+
+
 @app.get("/api/v1/tasks/{task_id}")
-async def get_task_status(
+def get_task_status(
     task_id: str,
     upload_images: bool = Query(False, description="是否上传图片到MinIO并替换链接（仅当任务完成时有效）")
 ):
@@ -542,6 +591,15 @@ async def get_task_status(
         'worker_id': task['worker_id'],
         'retry_count': task['retry_count']
     }
+    if task['subtask_count']:
+        # 拆分任务：返回各页码区间子任务的进度
+        subtasks = db.get_subtasks(task_id)
+        response['subtasks'] = {
+            'total': len(subtasks),
+            'completed': sum(1 for sub in subtasks if sub['status'] == 'completed'),
+            'processing': sum(1 for sub in subtasks if sub['status'] == 'processing'),
+            'page_ranges': [[sub['start_page_id'], sub['end_page_id']] for sub in subtasks],
+        }
     logger.info(f"✅ Task status: {task['status']} - (result_path: {task['result_path']})")
     
     # 如果任务已完成，尝试返回解析内容
@@ -553,52 +611,42 @@ async def get_task_status(
             return response
         
         result_dir = Path(task['result_path'])
-        logger.info(f"📂 Checking result directory: {result_dir}")
         
         if result_dir.exists():
-            logger.info(f"✅ Result directory exists")
-            # 递归查找 Markdown 文件（MinerU 输出结构：task_id/filename/auto/*.md）
-            md_files = list(result_dir.rglob('*.md'))
-            logger.info(f"📄 Found {len(md_files)} markdown files: {[f.relative_to(result_dir) for f in md_files]}")
-            
-            if md_files:
-                try:
-                    # 读取 Markdown 内容
-                    md_file = md_files[0]
-                    logger.info(f"📖 Reading markdown file: {md_file}")
-                    with open(md_file, 'r', encoding='utf-8') as f:
-                        md_content = f.read()
-                    
+            try:
+                # 按结果清单定位 Markdown 文件（MinerU 输出结构：task_id/filename/auto/*.md）
+                manifest = get_result_manifest(result_dir)
+                md_entry = get_entry(manifest, 'md')
+                
+                if md_entry:
+                    md_content = read_entry_text(result_dir, md_entry)
                     logger.info(f"✅ Markdown content loaded, length: {len(md_content)} characters")
                     
-                    # 查找图片目录（在 markdown 文件的同级目录下）
-                    image_dir = md_file.parent / 'images'
-                    
-                    # 处理图片（如果需要）
-                    if upload_images and image_dir.exists():
-                        logger.info(f"🖼️  Processing images for task {task_id}, upload_images={upload_images}")
-                        md_content = process_markdown_images(md_content, image_dir, upload_images)
+                    has_images = bool(get_entries(manifest, 'image'))
+                    image_urls = None
+                    if upload_images and has_images:
+                        # 图片在后台上传，完成后的查询返回替换为 MinIO 链接的内容
+                        image_urls = get_image_urls(task_id, result_dir, manifest)
+                        md_content = process_markdown_images(md_content, md_entry['path'], image_urls)
                     
                     # 添加 data 字段
                     response['data'] = {
-                        'markdown_file': md_file.name,
+                        'markdown_file': Path(md_entry['path']).name,
+                        'markdown_url': get_file_url(task_id, md_entry['path']),
                         'content': md_content,
-                        'images_uploaded': upload_images,
-                        'has_images': image_dir.exists() if not upload_images else None
+                        'images_uploaded': image_urls is not None if upload_images else False,
+                        'has_images': has_images
                     }
-                    logger.info(f"✅ Response data field added successfully")
+                else:
+                    logger.warning(f"⚠️  No markdown files found in {result_dir}")
                     
-                except Exception as e:
-                    logger.error(f"❌ Failed to read markdown content: {e}")
-                    logger.exception(e)
-                    # 读取失败不影响状态查询，只是不返回 data
-                    response['data'] = None
-            else:
-                logger.warning(f"⚠️  No markdown files found in {result_dir}")
+            except Exception as e:
+                logger.error(f"❌ Failed to read markdown content: {e}")
+                logger.exception(e)
+                # 读取失败不影响状态查询，只是不返回 data
+                response['data'] = None
         else:
             logger.error(f"❌ Result directory does not exist: {result_dir}")
-    elif task['status'] == 'completed':
-        logger.warning(f"⚠️  Task completed but result_path is empty")
     else:
         logger.info(f"ℹ️  Task status is {task['status']}, skipping content loading")
     
@@ -608,20 +656,26 @@ async def get_task_status(
 @app.delete("/api/v1/tasks/{task_id}")
 async def cancel_task(task_id: str):
     """
-    取消任务（仅限 pending 状态）
+    取消任务（仅限 pending 状态，或尚未开始合并结果的拆分任务）
     """
     task = db.get_task(task_id)
     
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    if task['status'] == 'pending':
-        db.update_task_status(task_id, 'cancelled')
+    if task['status'] in ('pending', 'waiting') and not task['parent_task_id']:
+        if task['subtask_count']:
+            # 未开始的子任务一并取消，正在处理的子任务完成后不会再被合并
+            db.close_split_task(task_id, 'cancelled')
+        else:
+            db.update_task_status(task_id, 'cancelled')
         
-        # 删除临时文件
-        file_path = Path(task['file_path'])
-        if file_path.exists():
-            file_path.unlink()
+        # 删除临时文件；仍有子任务在处理时由最后完成子任务的 Worker 清理
+        if not task['subtask_count'] or db.count_processing_subtasks(task_id) == 0:
+            shutil.rmtree(OUTPUT_DIR / f"{task_id}_parts", ignore_errors=True)
+            file_path = Path(task['file_path'])
+            if file_path.exists():
+                file_path.unlink()
         
         logger.info(f"⏹️  Task cancelled: {task_id}")
         return {
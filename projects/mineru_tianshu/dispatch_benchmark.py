@@ -0,0 +1,109 @@
+"""
+MinerU Tianshu - Dispatch Latency Benchmark
+天枢任务派发延迟测试
+
+对比 Worker 轮询与任务通知两种派发方式下，任务从提交到被 Worker 开始处理的延迟
+"""
+import argparse
+import json
+import multiprocessing
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from loguru import logger
+
+from task_db import TaskDB
+from task_notify import notify_task_available
+
+
+def _percentile(values, percent):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def _worker(db_path, notify, poll_interval, process_time, stop_event, result_queue):
+    """模拟 LitServeWorker._worker_loop：认领任务、记录派发延迟、模拟处理耗时"""
+    db = TaskDB(db_path, notify=notify)
+    listener = db.listen()
+    worker_id = f'bench-{multiprocessing.current_process().pid}'
+    wait_timeout = max(poll_interval, 5.0) if listener.enabled else poll_interval
+    latencies = []
+    try:
+        while not stop_event.is_set():
+            tasks = db.wait_for_tasks(worker_id, listener, wait_timeout)
+            if not tasks:
+                continue
+            task = tasks[0]
+            latencies.append(time.time() - json.loads(task['options'])['submitted_at'])
+            time.sleep(process_time)
+            db.update_task_status(task['task_id'], 'completed', worker_id=worker_id)
+    finally:
+        listener.close()
+        db.close()
+        result_queue.put(latencies)
+
+
+def run_benchmark(notify, tasks, workers, poll_interval, submit_interval, process_time):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = str(Path(tmp_dir) / 'dispatch.db')
+        db = TaskDB(db_path, notify=notify)
+
+        ctx = multiprocessing.get_context('spawn')
+        stop_event = ctx.Event()
+        result_queue = ctx.Queue()
+        processes = [
+            ctx.Process(target=_worker,
+                        args=(db_path, notify, poll_interval, process_time, stop_event, result_queue))
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        # 等待 worker 进入空闲等待状态
+        time.sleep(2)
+
+        for i in range(tasks):
+            # 随机间隔提交，模拟零散到达的请求
+            time.sleep(random.uniform(0, submit_interval * 2))
+            db.create_task(f'doc_{i}.pdf', f'/tmp/doc_{i}.pdf', options={'submitted_at': time.time()})
+
+        while db.get_queue_stats().get('completed', 0) < tasks:
+            time.sleep(0.1)
+        stop_event.set()
+        # 唤醒仍在等待通知的 worker
+        notify_task_available(db.notify_dir)
+        latencies = [latency for _ in processes for latency in result_queue.get()]
+        for process in processes:
+            process.join()
+        db.close()
+
+    mode = 'notify' if notify else f'poll {poll_interval}s'
+    logger.info(
+        f"{mode}: {len(latencies)} tasks, {workers} workers, submit->start latency "
+        f"p50 {_percentile(latencies, 50) * 1000:.1f}ms, "
+        f"p99 {_percentile(latencies, 99) * 1000:.1f}ms, "
+        f"max {max(latencies) * 1000:.1f}ms"
+    )
+    return latencies
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='MinerU Tianshu - 任务派发延迟测试')
+    parser.add_argument('--tasks', type=int, default=200, help='任务数量 (默认: 200)')
+    parser.add_argument('--workers', type=int, default=4, help='Worker 进程数 (默认: 4)')
+    parser.add_argument('--poll-interval', type=float, default=0.5, help='轮询模式的拉取间隔，秒 (默认: 0.5)')
+    parser.add_argument('--submit-interval', type=float, default=0.05, help='平均提交间隔，秒 (默认: 0.05)')
+    parser.add_argument('--process-time', type=float, default=0.01, help='模拟每个任务的处理耗时，秒 (默认: 0.01)')
+    args = parser.parse_args()
+
+    for notify in (False, True):
+        run_benchmark(notify, args.tasks, args.workers, args.poll_interval,
+                      args.submit_interval, args.process_time)
+
+
+if __name__ == '__main__':
+    main()
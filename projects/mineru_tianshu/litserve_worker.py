@@ -9,6 +9,7 @@ import os
 import json
 import sys
 import time
+import shutil
 import threading
 import signal
 import atexit
@@ -20,7 +21,9 @@ from loguru import logger
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from task_db import TaskDB
-from mineru.cli.common import do_parse, read_fn
+from result_merger import merge_split_results
+from result_manifest import write_manifest
+from mineru.cli.common import do_parse, read_fn, convert_pdf_bytes_to_bytes_by_pypdfium2
 from mineru.utils.config_reader import get_device
 from mineru.utils.model_utils import get_vram, clean_memory
 
@@ -51,18 +54,23 @@ class MinerUWorkerAPI(ls.LitAPI):
     # 其他所有格式都使用 MarkItDown 解析
     
     def __init__(self, output_dir='/tmp/mineru_tianshu_output', worker_id_prefix='tianshu', 
-                 poll_interval=0.5, enable_worker_loop=True):
+                 poll_interval=0.5, enable_worker_loop=True, notify_fallback_interval=5.0,
+                 claim_batch_size=1):
         super().__init__()
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.worker_id_prefix = worker_id_prefix
-        self.poll_interval = poll_interval  # Worker 拉取任务的间隔（秒）
+        self.poll_interval = poll_interval  # Worker 拉取任务的间隔（秒），任务通知不可用时使用
+        self.notify_fallback_interval = notify_fallback_interval  # 任务通知可用时的兜底轮询间隔（秒）
         self.enable_worker_loop = enable_worker_loop  # 是否启用 worker 循环拉取
+        # 一次最多认领的同一文档的页码区间子任务数量，默认每次一个，避免单个 Worker 认领整篇文档
+        self.claim_batch_size = claim_batch_size
         self.db = TaskDB()
         self.worker_id = None
         self.markitdown = None
         self.running = False  # Worker 运行状态
         self.worker_thread = None  # Worker 线程
+        self.task_listener = None  # 任务通知监听器
     
     def setup(self, device):
         """
@@ -138,6 +146,9 @@ class MinerUWorkerAPI(ls.LitAPI):
         if self.enable_worker_loop and self.worker_thread and self.worker_thread.is_alive():
             logger.info(f"🛑 Shutting down worker {self.worker_id}...")
             self.running = False
+            # 唤醒正在等待任务通知的 worker 线程
+            if self.task_listener is not None:
+                self.task_listener.wake()
             
             # 等待线程完成当前任务（最多等待 poll_interval * 2 秒）
             timeout = self.poll_interval * 2
@@ -153,34 +164,37 @@ class MinerUWorkerAPI(ls.LitAPI):
         Worker 主循环：持续拉取并处理任务
         
         这个方法在独立线程中运行，让每个 worker 主动拉取任务
-        而不是被动等待调度器触发
+        而不是被动等待调度器触发。队列为空时阻塞等待 create_task 的通知，
+        新任务提交后立即被唤醒；通知不可用时回退到按 poll_interval 轮询
         """
-        logger.info(f"🔁 {self.worker_id} started task polling loop")
+        self.task_listener = self.db.listen()
+        if self.task_listener.enabled:
+            wait_timeout = max(self.poll_interval, self.notify_fallback_interval)
+            logger.info(f"🔁 {self.worker_id} started task loop (notify, fallback poll {wait_timeout}s)")
+        else:
+            wait_timeout = self.poll_interval
+            logger.info(f"🔁 {self.worker_id} started task polling loop")
         
         idle_count = 0
         while self.running:
             try:
-                # 从数据库获取任务
-                task = self.db.get_next_task(self.worker_id)
+                # 从数据库获取任务，队列为空时等待新任务通知
+                tasks = self.db.wait_for_tasks(
+                    self.worker_id, self.task_listener, wait_timeout, batch_size=self.claim_batch_size
+                )
                 
-                if task:
+                if tasks:
                     idle_count = 0  # 重置空闲计数
                     
                     # 处理任务
-                    task_id = task['task_id']
-                    logger.info(f"🔄 {self.worker_id} picked up task {task_id}")
+                    task_ids = [task['task_id'] for task in tasks]
+                    logger.info(f"🔄 {self.worker_id} picked up task {', '.join(task_ids)}")
                     
                     try:
-                        self._process_task(task)
+                        self._dispatch_tasks(tasks)
                     except Exception as e:
-                        logger.error(f"❌ {self.worker_id} failed to process task {task_id}: {e}")
-                        success = self.db.update_task_status(
-                            task_id, 'failed', 
-                            error_message=str(e), 
-                            worker_id=self.worker_id
-                        )
-                        if not success:
-                            logger.warning(f"⚠️  Task {task_id} was modified by another process during failure update")
+                        logger.error(f"❌ {self.worker_id} failed to process task {', '.join(task_ids)}: {e}")
+                        self._fail_tasks(tasks, str(e))
                     
                 else:
                     # 没有任务时，增加空闲计数
@@ -190,15 +204,154 @@ class MinerUWorkerAPI(ls.LitAPI):
                     if idle_count == 1:
                         logger.debug(f"💤 {self.worker_id} is idle, waiting for tasks...")
                     
-                    # 空闲时等待一段时间再拉取
-                    time.sleep(self.poll_interval)
-                    
             except Exception as e:
                 logger.error(f"❌ {self.worker_id} loop error: {e}")
                 time.sleep(self.poll_interval)
         
+        self.task_listener.close()
         logger.info(f"⏹️  {self.worker_id} stopped task polling loop")
     
+    def _dispatch_tasks(self, tasks: list):
+        """
+        按任务类型分发认领到的任务
+        
+        - 普通任务：完整解析
+        - 页码区间子任务：同一文档的一批子任务合并为一次解析
+        - 父任务（所有子任务已完成）：合并各子任务的解析结果
+        """
+        task = tasks[0]
+        if task['subtask_count']:
+            self._finalize_task(task)
+        elif task['parent_task_id']:
+            self._process_subtasks(tasks)
+        else:
+            self._process_task(task)
+    
+    def _fail_tasks(self, tasks: list, error_message: str):
+        """将处理失败的任务标记为 failed，子任务失败时整个拆分任务失败"""
+        for task in tasks:
+            success = self.db.update_task_status(
+                task['task_id'], 'failed', 
+                error_message=error_message, 
+                worker_id=self.worker_id
+            )
+            if not success:
+                logger.warning(f"⚠️  Task {task['task_id']} was modified by another process during failure update")
+        
+        task = tasks[0]
+        parent_task_id = task['task_id'] if task['subtask_count'] else task['parent_task_id']
+        if parent_task_id:
+            self.db.close_split_task(parent_task_id, 'failed', error_message)
+            self._clean_closed_split_files(parent_task_id, task['file_path'])
+    
+    def _clean_closed_split_files(self, parent_task_id: str, file_path: str):
+        """
+        拆分任务失败或取消后清理其文件
+        
+        其他 Worker 可能仍在处理同一文档的子任务，此时由最后一个结束的子任务负责清理
+        """
+        if self.db.count_processing_subtasks(parent_task_id) == 0:
+            self._clean_split_files(parent_task_id, file_path)
+    
+    def _clean_split_files(self, parent_task_id: str, file_path: str):
+        """清理拆分任务的中间结果和上传文件"""
+        shutil.rmtree(self.output_dir / f"{parent_task_id}_parts", ignore_errors=True)
+        try:
+            if Path(file_path).exists():
+                Path(file_path).unlink()
+        except Exception as e:
+            logger.warning(f"Failed to clean up temp file {file_path}: {e}")
+    
+    def _process_subtasks(self, tasks: list):
+        """
+        处理同一文档的一批页码区间子任务
+        
+        源文件只读取一次，各页码区间截取为独立的 PDF 后在一次 do_parse 中批量解析，
+        结果写入 {parent_task_id}_parts/{subtask_id}，由 finalizer 合并。
+        源文件由 finalizer 清理，子任务不删除
+        
+        Args:
+            tasks: 子任务列表（属于同一父任务，按页码排序）
+        """
+        parent_task_id = tasks[0]['parent_task_id']
+        file_path = tasks[0]['file_path']
+        options = json.loads(tasks[0]['options'])
+        parts_path = self.output_dir / f"{parent_task_id}_parts"
+        
+        page_ranges = ', '.join(f"{task['start_page_id']}-{task['end_page_id']}" for task in tasks)
+        logger.info(f"🔄 Processing pages {page_ranges} of task {parent_task_id}: {tasks[0]['file_name']}")
+        
+        try:
+            pdf_bytes = read_fn(Path(file_path))
+            do_parse(
+                output_dir=str(parts_path),
+                pdf_file_names=[task['task_id'] for task in tasks],
+                pdf_bytes_list=[
+                    convert_pdf_bytes_to_bytes_by_pypdfium2(pdf_bytes, task['start_page_id'], task['end_page_id'])
+                    for task in tasks
+                ],
+                p_lang_list=[options.get('lang', 'ch')] * len(tasks),
+                backend=tasks[0]['backend'],
+                parse_method=options.get('method', 'auto'),
+                formula_enable=options.get('formula_enable', True),
+                table_enable=options.get('table_enable', True),
+            )
+        finally:
+            try:
+                clean_memory()
+            except Exception as e:
+                logger.debug(f"Memory cleanup failed for task {parent_task_id}: {e}")
+        
+        for task in tasks:
+            success = self.db.update_task_status(
+                task['task_id'], 'completed',
+                result_path=str(parts_path / task['task_id']),
+                worker_id=self.worker_id
+            )
+            if not success:
+                logger.warning(f"⚠️  Subtask {task['task_id']} was modified by another process")
+        logger.info(f"✅ Pages {page_ranges} of task {parent_task_id} completed by {self.worker_id}")
+        
+        # 处理期间父任务已失败或被取消，结果不会再被合并
+        parent = self.db.get_task(parent_task_id)
+        if parent and parent['status'] in ('failed', 'cancelled'):
+            self._clean_closed_split_files(parent_task_id, file_path)
+    
+    def _finalize_task(self, task: dict):
+        """
+        合并拆分任务各子任务的解析结果
+        
+        Args:
+            task: 父任务字典（所有子任务均已完成）
+        """
+        task_id = task['task_id']
+        output_path = self.output_dir / task_id
+        
+        subtasks = self.db.get_subtasks(task_id)
+        logger.info(f"🧩 Merging {len(subtasks)} page-range results of task {task_id}: {task['file_name']}")
+        merge_split_results(
+            parts=[(sub['start_page_id'], sub['task_id'], Path(sub['result_path'])) for sub in subtasks],
+            output_path=output_path,
+            file_stem=Path(task['file_name']).stem,
+        )
+        # 记录合并结果的清单
+        write_manifest(output_path)
+        
+        success = self.db.update_task_status(
+            task_id, 'completed',
+            result_path=str(output_path),
+            worker_id=self.worker_id
+        )
+        if success:
+            logger.info(f"✅ Task {task_id} completed by {self.worker_id}")
+            logger.info(f"   Output: {output_path}")
+        else:
+            logger.warning(
+                f"⚠️  Task {task_id} was modified by another process. "
+                f"Worker {self.worker_id} merged the results but status update was rejected."
+            )
+        self._clean_split_files(task_id, task['file_path'])
+    
     def _process_task(self, task: dict):
         """
         处理单个任务
@@ -243,6 +396,9 @@ class MinerUWorkerAPI(ls.LitAPI):
                 )
                 parse_method = 'MarkItDown'
             
+            # 记录结果清单，API 按清单定位和校验结果文件
+            write_manifest(output_path)
+            
             # 更新状态为成功
             success = self.db.update_task_status(
                 task_id, 'completed', 
@@ -380,9 +536,9 @@ class MinerUWorkerAPI(ls.LitAPI):
         elif action == 'poll':
             if not self.enable_worker_loop:
                 # 兼容模式：手动触发任务拉取
-                task = self.db.get_next_task(self.worker_id)
+                tasks = self.db.get_next_tasks(self.worker_id, batch_size=self.claim_batch_size)
                 
-                if not task:
+                if not tasks:
                     return {
                         'status': 'idle',
                         'message': 'No pending tasks in queue',
@@ -390,16 +546,17 @@ class MinerUWorkerAPI(ls.LitAPI):
                     }
                 
                 try:
-                    self._process_task(task)
+                    self._dispatch_tasks(tasks)
                     return {
                         'status': 'completed',
-                        'task_id': task['task_id'],
+                        'task_id': tasks[0]['task_id'],
                         'worker_id': self.worker_id
                     }
                 except Exception as e:
+                    self._fail_tasks(tasks, str(e))
                     return {
                         'status': 'failed',
-                        'task_id': task['task_id'],
+                        'task_id': tasks[0]['task_id'],
                         'error': str(e),
                         'worker_id': self.worker_id
                     }
@@ -431,7 +588,8 @@ def start_litserve_workers(
     workers_per_device=1,
     port=9000,
     poll_interval=0.5,
-    enable_worker_loop=True
+    enable_worker_loop=True,
+    claim_batch_size=1
 ):
     """
     启动 LitServe Worker Pool
@@ -444,6 +602,7 @@ def start_litserve_workers(
         port: 服务端口
         poll_interval: Worker 拉取任务的间隔（秒）
         enable_worker_loop: 是否启用 worker 自动循环拉取任务
+        claim_batch_size: 一次最多认领的同一文档的页码区间子任务数量
     """
     logger.info("=" * 60)
     logger.info("🚀 Starting MinerU Tianshu LitServe Worker Pool")
@@ -462,7 +621,8 @@ def start_litserve_workers(
     api = MinerUWorkerAPI(
         output_dir=output_dir,
         poll_interval=poll_interval,
-        enable_worker_loop=enable_worker_loop
+        enable_worker_loop=enable_worker_loop,
+        claim_batch_size=claim_batch_size
     )
     server = ls.LitServer(
         api,
@@ -519,6 +679,8 @@ if __name__ == '__main__':
                        help='Server port')
     parser.add_argument('--poll-interval', type=float, default=0.5,
                        help='Worker poll interval in seconds (default: 0.5)')
+    parser.add_argument('--claim-batch-size', type=int, default=1,
+                       help='Max page-range subtasks of one document claimed at once (default: 1)')
     parser.add_argument('--disable-worker-loop', action='store_true',
                        help='Disable worker auto-loop mode (use scheduler-driven mode)')
     
@@ -540,7 +702,8 @@ if __name__ == '__main__':
         workers_per_device=args.workers_per_device,
         port=args.port,
         poll_interval=args.poll_interval,
-        enable_worker_loop=not args.disable_worker_loop
+        enable_worker_loop=not args.disable_worker_loop,
+        claim_batch_size=args.claim_batch_size
     )
 
 
@@ -0,0 +1,202 @@
+"""
+MinerU Tianshu - Result Manifest
+天枢任务结果清单
+
+Worker 完成任务时遍历一次结果目录，记录每个产物的相对路径、类型、大小和校验和，
+写入 {result_dir}/manifest.json。API 直接按清单定位文件，不再对每个请求做多次 rglob
+"""
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+CHUNK_SIZE = 1 << 20
+
+# 压缩产物的后缀（与 mineru.utils.output_serializer 保持一致）
+COMPRESSION_SUFFIXES = {
+    '.gz': 'gzip',
+    '.zst': 'zstd',
+}
+
+# 产物类型 -> 文件名后缀（去掉压缩后缀后匹配），按顺序匹配
+ARTIFACT_SUFFIXES = [
+    ('content_list_v2', '_content_list_v2.json'),
+    ('content_list', '_content_list.json'),
+    ('middle_json', '_middle.json'),
+    ('model_output', '_model.json'),
+    ('layout_pdf', '_layout.pdf'),
+    ('span_pdf', '_span.pdf'),
+    ('origin_pdf', '_origin.pdf'),
+    ('md', '.md'),
+]
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp', '.svg'}
+
+
+def _classify(rel_path: str) -> Tuple[Optional[str], Optional[str]]:
+    """返回 (产物类型, 压缩格式)，无法识别的文件返回 (None, None)"""
+    name = rel_path
+    encoding = None
+    for suffix, compression in COMPRESSION_SUFFIXES.items():
+        if name.endswith(suffix):
+            name, encoding = name[:-len(suffix)], compression
+            break
+    parts = Path(name).parts
+    if len(parts) > 1 and parts[-2] == 'images' and Path(name).suffix.lower() in IMAGE_EXTENSIONS:
+        return 'image', encoding
+    for kind, suffix in ARTIFACT_SUFFIXES:
+        if name.endswith(suffix):
+            return kind, encoding
+    return None, None
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_manifest(result_dir: Path) -> Dict:
+    """
+    遍历一次结果目录生成清单
+
+    Args:
+        result_dir: 任务结果目录
+
+    Returns:
+        dict: {'version', 'created_at', 'files': [{'path', 'kind', 'size', 'sha256', 'encoding'}]}
+    """
+    files = []
+    for root, dirs, names in os.walk(result_dir):
+        dirs.sort()
+        for name in sorted(names):
+            full_path = os.path.join(root, name)
+            rel_path = Path(os.path.relpath(full_path, result_dir)).as_posix()
+            kind, encoding = _classify(rel_path)
+            if kind is None:
+                continue
+            files.append({
+                'path': rel_path,
+                'kind': kind,
+                'size': os.path.getsize(full_path),
+                'sha256': _sha256(full_path),
+                'encoding': encoding,
+            })
+    return {
+        'version': MANIFEST_VERSION,
+        'created_at': datetime.now().isoformat(),
+        'files': files,
+    }
+
+
+def write_manifest(result_dir: Path) -> Dict:
+    """生成清单并原子写入 {result_dir}/manifest.json"""
+    manifest = build_manifest(result_dir)
+    fd, tmp_path = tempfile.mkstemp(dir=result_dir, prefix='.manifest-', suffix='.json')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, Path(result_dir) / MANIFEST_NAME)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+    return manifest
+
+
+def load_manifest(result_dir: Path) -> Optional[Dict]:
+    """读取清单，不存在或版本不兼容时返回 None"""
+    try:
+        with open(Path(result_dir) / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if manifest.get('version') != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def get_entries(manifest: Dict, kind: str) -> List[Dict]:
+    """返回清单中指定类型的全部文件"""
+    return [entry for entry in manifest['files'] if entry['kind'] == kind]
+
+
+def get_entry(manifest: Dict, kind: str) -> Optional[Dict]:
+    """返回清单中指定类型的第一个文件"""
+    for entry in manifest['files']:
+        if entry['kind'] == kind:
+            return entry
+    return None
+
+
+def find_entry(manifest: Dict, rel_path: str) -> Optional[Dict]:
+    """按相对路径查找清单中的文件，只允许访问清单中登记过的文件"""
+    for entry in manifest['files']:
+        if entry['path'] == rel_path:
+            return entry
+    return None
+
+
+def read_entry_text(result_dir: Path, entry: Dict) -> str:
+    """读取文本产物，按清单记录的压缩格式解压"""
+    path = Path(result_dir) / entry['path']
+    if entry['encoding'] == 'gzip':
+        with gzip.open(path, 'rb') as f:
+            data = f.read()
+    elif entry['encoding'] == 'zstd':
+        import zstandard
+        with open(path, 'rb') as f:
+            data = zstandard.ZstdDecompressor().stream_reader(f).read()
+    else:
+        with open(path, 'rb') as f:
+            data = f.read()
+    return data.decode('utf-8')
+
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    解析单段 HTTP Range 请求头
+
+    Returns:
+        (start, end): 闭区间；未指定 Range 或无法解析（按完整文件返回）时为 None
+
+    Raises:
+        ValueError: 范围超出文件大小（应返回 416）
+    """
+    if not range_header or not range_header.startswith('bytes=') or ',' in range_header:
+        return None
+    start_text, _, end_text = range_header[len('bytes='):].strip().partition('-')
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+        else:
+            # bytes=-N 表示最后 N 个字节
+            start = max(size - int(end_text), 0)
+            end = size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        raise ValueError(f'Range {range_header} not satisfiable for size {size}')
+    return start, min(end, size - 1)
+
+
+def iter_file_range(path: Path, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+    """按块读取文件的 [start, end] 区间，用于流式响应"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = None if end is None else end - start + 1
+        while remaining is None or remaining > 0:
+            chunk = f.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
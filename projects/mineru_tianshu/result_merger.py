@@ -0,0 +1,138 @@
+"""
+MinerU Tianshu - Split Task Result Merger
+天枢分片任务结果合并
+
+大文档在提交时按页码区间拆分为多个子任务，各子任务独立解析后，
+由 finalizer 将各区间的 middle.json / markdown / content_list 等结果按页码顺序合并为一份完整结果
+"""
+import json
+import shutil
+from pathlib import Path
+from typing import List, Tuple
+
+from loguru import logger
+
+from mineru.data.data_reader_writer import FileBasedDataWriter
+from mineru.utils.enum_class import MakeMode
+from mineru.utils.output_serializer import dump_json, find_output_file, read_output_text
+
+# 需要按页拼接的调试 PDF
+DEBUG_PDF_SUFFIXES = ['_layout.pdf', '_span.pdf', '_origin.pdf']
+
+
+def find_parse_dir(part_dir: Path, part_name: str) -> Path:
+    """子任务输出目录结构为 part_dir/{method}/{part_name}.md，返回 {method} 目录"""
+    for candidate in sorted(part_dir.iterdir()):
+        if candidate.is_dir() and (
+            find_output_file(str(candidate), f'{part_name}_middle.json')
+            or (candidate / f'{part_name}.md').exists()
+        ):
+            return candidate
+    raise FileNotFoundError(f'No parse result found in {part_dir}')
+
+
+def _read_json(parse_dir: Path, file_name: str):
+    path = find_output_file(str(parse_dir), file_name)
+    if path is None:
+        return None
+    return json.loads(read_output_text(path))
+
+
+def _merge_model_output(model_outputs, start_page_ids):
+    merged = []
+    for model_output, start_page_id in zip(model_outputs, start_page_ids):
+        for page in model_output:
+            # pipeline 的模型输出每页带有 page_info.page_no，需要换算为原文档页码
+            if isinstance(page, dict) and isinstance(page.get('page_info'), dict):
+                page['page_info']['page_no'] += start_page_id
+            merged.append(page)
+    return merged
+
+
+def _merge_pdfs(pdf_paths: List[Path], output_file: Path):
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for pdf_path in pdf_paths:
+        writer.append(str(pdf_path))
+    with open(output_file, 'wb') as f:
+        writer.write(f)
+    writer.close()
+
+
+def merge_split_results(parts: List[Tuple[int, str, Path]], output_path: Path, file_stem: str,
+                        f_make_md_mode=MakeMode.MM_MD) -> Path:
+    """
+    按页码顺序合并各子任务的解析结果
+
+    Args:
+        parts: [(start_page_id, part_name, part_dir), ...]，part_dir 为子任务的输出目录
+        output_path: 父任务的结果目录
+        file_stem: 原始文件名（不含后缀），用作合并结果的文件名
+        f_make_md_mode: markdown 生成模式
+
+    Returns:
+        Path: 合并结果所在的目录 output_path/{file_stem}/{method}
+    """
+    parts = sorted(parts, key=lambda part: part[0])
+    parse_dirs = [find_parse_dir(part_dir, part_name) for _, part_name, part_dir in parts]
+    # 各子任务使用相同的解析参数，解析方法目录（auto/vlm/hybrid_auto 等）一致
+    local_md_dir = output_path / file_stem / parse_dirs[0].name
+    local_image_dir = local_md_dir / 'images'
+    local_image_dir.mkdir(parents=True, exist_ok=True)
+    md_writer = FileBasedDataWriter(str(local_md_dir))
+
+    # 图片文件名由分片PDF的摘要和页码计算得到，各子任务之间不会重名，直接移动到同一目录
+    for parse_dir in parse_dirs:
+        part_image_dir = parse_dir / 'images'
+        if part_image_dir.is_dir():
+            for image_file in part_image_dir.iterdir():
+                shutil.move(str(image_file), str(local_image_dir / image_file.name))
+
+    middle_jsons = [_read_json(parse_dir, f'{part_name}_middle.json')
+                    for parse_dir, (_, part_name, _) in zip(parse_dirs, parts)]
+    start_page_ids = [start_page_id for start_page_id, _, _ in parts]
+
+    if all(middle_json is not None for middle_json in middle_jsons):
+        middle_json = middle_jsons[0]
+        pdf_info = []
+        for part_middle_json, start_page_id in zip(middle_jsons, start_page_ids):
+            for page_info in part_middle_json['pdf_info']:
+                page_info['page_idx'] += start_page_id
+                pdf_info.append(page_info)
+        middle_json['pdf_info'] = pdf_info
+
+        if middle_json.get('_backend') == 'pipeline':
+            from mineru.backend.pipeline.pipeline_middle_json_mkcontent import union_make as make_func
+        else:
+            from mineru.backend.vlm.vlm_middle_json_mkcontent import union_make as make_func
+
+        image_dir = local_image_dir.name
+        md_writer.write_string(f'{file_stem}.md', make_func(pdf_info, f_make_md_mode, image_dir))
+        dump_json(md_writer, f'{file_stem}_content_list.json', make_func(pdf_info, MakeMode.CONTENT_LIST, image_dir))
+        if middle_json.get('_backend') != 'pipeline':
+            dump_json(md_writer, f'{file_stem}_content_list_v2.json',
+                      make_func(pdf_info, MakeMode.CONTENT_LIST_V2, image_dir))
+        dump_json(md_writer, f'{file_stem}_middle.json', middle_json)
+    else:
+        # 未输出 middle.json 时（如通过 MINERU_OUTPUT_ARTIFACTS 裁剪），按顺序拼接 markdown
+        logger.warning(f'middle json is missing for some parts of {file_stem}, concatenating markdown only')
+        md_contents = []
+        for parse_dir, (_, part_name, _) in zip(parse_dirs, parts):
+            md_file = parse_dir / f'{part_name}.md'
+            if md_file.exists():
+                md_contents.append(md_file.read_text(encoding='utf-8'))
+        md_writer.write_string(f'{file_stem}.md', '\n\n'.join(md_contents))
+
+    model_outputs = [_read_json(parse_dir, f'{part_name}_model.json')
+                     for parse_dir, (_, part_name, _) in zip(parse_dirs, parts)]
+    if all(model_output is not None for model_output in model_outputs):
+        dump_json(md_writer, f'{file_stem}_model.json', _merge_model_output(model_outputs, start_page_ids))
+
+    for suffix in DEBUG_PDF_SUFFIXES:
+        pdf_paths = [parse_dir / f'{part_name}{suffix}' for parse_dir, (_, part_name, _) in zip(parse_dirs, parts)]
+        if all(pdf_path.exists() for pdf_path in pdf_paths):
+            _merge_pdfs(pdf_paths, local_md_dir / f'{file_stem}{suffix}')
+
+    logger.info(f'Merged {len(parts)} page-range results into {local_md_dir}')
+    return local_md_dir
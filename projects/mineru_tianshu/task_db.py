@@ -4,39 +4,203 @@ MinerU Tianshu - SQLite Task Database Manager
 
 负责任务的持久化存储、状态管理和原子性操作
 """
+import os
 import sqlite3
 import json
+import threading
 import uuid
 from contextlib import contextmanager
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 from pathlib import Path
 
+from task_notify import TaskListener, notify_task_available
+
+
+# 认领任务：只读覆盖索引 idx_status_priority_created 即可定位下一个任务
+CLAIM_NEXT_TASK_SQL = '''
+    UPDATE tasks
+    SET status = 'processing',
+        started_at = CURRENT_TIMESTAMP,
+        worker_id = ?
+    WHERE task_id = (
+        SELECT task_id FROM tasks
+        WHERE status = 'pending'
+        ORDER BY priority DESC, created_at ASC
+        LIMIT 1
+    ) AND status = 'pending'
+    RETURNING *
+'''
+
+SELECT_NEXT_TASK_SQL = '''
+    SELECT * FROM tasks 
+    WHERE status = 'pending' 
+    ORDER BY priority DESC, created_at ASC 
+    LIMIT 1
+'''
+
+MARK_TASK_PROCESSING_SQL = '''
+    UPDATE tasks 
+    SET status = 'processing', 
+        started_at = CURRENT_TIMESTAMP, 
+        worker_id = ?
+    WHERE task_id = ? AND status = 'pending'
+'''
+
+# 认领同一父任务下的一批子任务（按页码顺序）
+CLAIM_SUBTASK_BATCH_SQL = '''
+    UPDATE tasks
+    SET status = 'processing',
+        started_at = CURRENT_TIMESTAMP,
+        worker_id = ?
+    WHERE task_id IN (
+        SELECT task_id FROM tasks
+        WHERE parent_task_id = ? AND status = 'pending'
+        ORDER BY start_page_id
+        LIMIT ?
+    ) AND status = 'pending'
+    RETURNING *
+'''
+
+SELECT_SUBTASK_BATCH_SQL = '''
+    SELECT * FROM tasks
+    WHERE parent_task_id = ? AND status = 'pending'
+    ORDER BY start_page_id
+    LIMIT ?
+'''
+
+# 所有子任务都已完成、等待合并结果的父任务
+SELECT_READY_PARENT_SQL = '''
+    SELECT * FROM tasks AS parent
+    WHERE parent.status = 'waiting'
+    AND NOT EXISTS (
+        SELECT 1 FROM tasks AS sub
+        WHERE sub.parent_task_id = parent.task_id AND sub.status != 'completed'
+    )
+    ORDER BY parent.priority DESC, parent.created_at ASC
+    LIMIT 1
+'''
+
+CLAIM_READY_PARENT_SQL = f'''
+    UPDATE tasks
+    SET status = 'processing',
+        started_at = CURRENT_TIMESTAMP,
+        worker_id = ?
+    WHERE task_id = (
+        SELECT task_id FROM ({SELECT_READY_PARENT_SQL})
+    ) AND status = 'waiting'
+    RETURNING *
+'''
+
+MARK_PARENT_PROCESSING_SQL = '''
+    UPDATE tasks 
+    SET status = 'processing', 
+        started_at = CURRENT_TIMESTAMP, 
+        worker_id = ?
+    WHERE task_id = ? AND status = 'waiting'
+'''
+
+# 新增的列：(列名, 定义)，旧数据库启动时自动补齐
+TASK_COLUMNS_ADDED = [
+    ('parent_task_id', 'TEXT'),
+    ('start_page_id', 'INTEGER'),
+    ('end_page_id', 'INTEGER'),
+    ('subtask_count', 'INTEGER DEFAULT 0'),
+]
+
+# UPDATE ... RETURNING 需要 SQLite 3.35+
+SUPPORTS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+
+def split_page_ranges(page_count: int, pages_per_task: int) -> List[Tuple[int, int]]:
+    """
+    将文档按固定页数拆分为页码区间
+    
+    Returns:
+        list: [(start_page_id, end_page_id), ...]，页码从0开始，区间两端都包含
+    """
+    if pages_per_task <= 0 or page_count <= pages_per_task:
+        return [(0, max(page_count - 1, 0))]
+    return [
+        (start, min(start + pages_per_task, page_count) - 1)
+        for start in range(0, page_count, pages_per_task)
+    ]
+
 
 class TaskDB:
     """任务数据库管理类"""
     
-    def __init__(self, db_path='mineru_tianshu.db'):
+    journal_mode = 'WAL'
+    
+    def __init__(self, db_path='mineru_tianshu.db', busy_timeout: float = 30.0,
+                 cached_statements: int = 256, notify: bool = True):
         self.db_path = db_path
+        # 与数据库文件同目录的任务通知通道，共享同一数据库的组件共享同一通道
+        self.notify_dir = f'{db_path}.notify' if notify else None
+        self.busy_timeout = busy_timeout
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._conns_lock = threading.Lock()
+        self._conns = []
         self._init_db()
     
-    def _get_conn(self):
-        """获取数据库连接（每次创建新连接，避免 pickle 问题）
-        
-        并发安全说明：
-            - 使用 check_same_thread=False 是安全的，因为：
-              1. 每次调用都创建新连接，不跨线程共享
-              2. 连接使用完立即关闭（在 get_cursor 上下文管理器中）
-              3. 不使用连接池，避免线程间共享同一连接
-            - timeout=30.0 防止死锁，如果锁等待超过30秒会抛出异常
-        """
+    def __getstate__(self):
+        # 连接不能跨进程传递，反序列化后在新进程中按需重新建立
+        state = self.__dict__.copy()
+        for key in ('_local', '_conns_lock', '_conns'):
+            state.pop(key, None)
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+        self._conns_lock = threading.Lock()
+        self._conns = []
+    
+    def _connect(self):
         conn = sqlite3.connect(
-            self.db_path, 
+            self.db_path,
             check_same_thread=False,
-            timeout=30.0
+            timeout=self.busy_timeout,
+            cached_statements=self.cached_statements,
         )
         conn.row_factory = sqlite3.Row
+        # WAL 下 NORMAL 只在 checkpoint 时 fsync，提交不再每次落盘
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout * 1000)}')
+        return conn
+    
+    def _get_conn(self):
+        """获取当前线程的持久连接
+        
+        并发安全说明：
+            - 每个线程（每个进程）持有自己的连接，连接不跨线程共享，
+              fork 或 pickle 到新进程后会重新建立连接
+            - 连接复用后 sqlite3 会缓存已编译的语句（cached_statements），
+              相同的 SQL 不再重复解析
+            - 数据库使用 WAL 模式，读操作不会被认领任务的写事务阻塞
+            - busy_timeout 防止死锁，如果锁等待超过 busy_timeout 秒会抛出异常
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            with self._conns_lock:
+                self._conns.append(conn)
         return conn
     
+    def close(self):
+        """关闭当前进程中由该实例建立的所有连接"""
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                # 连接属于 fork 前的父进程
+                pass
+        self._local = threading.local()
+    
     @contextmanager
     def get_cursor(self):
         """上下文管理器，自动提交和错误处理"""
@@ -49,11 +213,13 @@ class TaskDB:
             conn.rollback()
             raise e
         finally:
-            conn.close()  # 关闭连接
+            cursor.close()
     
     def _init_db(self):
         """初始化数据库表"""
         with self.get_cursor() as cursor:
+            # WAL 模式持久化在数据库文件中，读写互不阻塞
+            cursor.execute(f'PRAGMA journal_mode={self.journal_mode}')
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS tasks (
                     task_id TEXT PRIMARY KEY,
@@ -69,15 +235,33 @@ class TaskDB:
                     started_at TIMESTAMP,
                     completed_at TIMESTAMP,
                     worker_id TEXT,
-                    retry_count INTEGER DEFAULT 0
+                    retry_count INTEGER DEFAULT 0,
+                    parent_task_id TEXT,
+                    start_page_id INTEGER,
+                    end_page_id INTEGER,
+                    subtask_count INTEGER DEFAULT 0
                 )
             ''')
             
+            # 补齐旧数据库缺少的列
+            cursor.execute('PRAGMA table_info(tasks)')
+            existing_columns = {row['name'] for row in cursor.fetchall()}
+            for column, definition in TASK_COLUMNS_ADDED:
+                if column not in existing_columns:
+                    cursor.execute(f'ALTER TABLE tasks ADD COLUMN {column} {definition}')
+            
             # 创建索引加速查询
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_status ON tasks(status)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_priority ON tasks(priority DESC)')
+            # 认领任务按 (status, priority DESC, created_at) 排序，末尾带上 task_id 使索引完全覆盖该查询
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_status_priority_created '
+                'ON tasks(status, priority DESC, created_at, task_id)'
+            )
+            # 单列索引已被复合索引覆盖，删除以减少写放大
+            cursor.execute('DROP INDEX IF EXISTS idx_status')
+            cursor.execute('DROP INDEX IF EXISTS idx_priority')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_created_at ON tasks(created_at)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_worker_id ON tasks(worker_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_parent_task ON tasks(parent_task_id, status)')
     
     def create_task(self, file_name: str, file_path: str, 
                    backend: str = 'pipeline', options: dict = None,
@@ -101,6 +285,47 @@ class TaskDB:
                 INSERT INTO tasks (task_id, file_name, file_path, backend, options, priority)
                 VALUES (?, ?, ?, ?, ?, ?)
             ''', (task_id, file_name, file_path, backend, json.dumps(options or {}), priority))
+        # 事务提交后再唤醒等待中的 Worker，保证 Worker 被唤醒时能看到该任务
+        notify_task_available(self.notify_dir)
+        return task_id
+    
+    def create_split_task(self, file_name: str, file_path: str, page_ranges: List[Tuple[int, int]],
+                          backend: str = 'pipeline', options: dict = None,
+                          priority: int = 0) -> str:
+        """
+        创建按页码区间拆分的任务
+        
+        父任务处于 waiting 状态，不会被直接认领；每个页码区间生成一个 pending 子任务，
+        所有子任务完成后父任务变为可认领状态，由认领到它的 Worker 合并各区间结果
+        
+        Args:
+            file_name: 文件名
+            file_path: 文件路径（所有子任务共享）
+            page_ranges: [(start_page_id, end_page_id), ...]
+            backend: 处理后端
+            options: 处理选项 (dict)
+            priority: 优先级，数字越大越优先
+            
+        Returns:
+            task_id: 父任务ID
+        """
+        task_id = str(uuid.uuid4())
+        options_json = json.dumps(options or {})
+        with self.get_cursor() as cursor:
+            cursor.execute('''
+                INSERT INTO tasks (task_id, file_name, file_path, status, backend, options, priority, subtask_count)
+                VALUES (?, ?, ?, 'waiting', ?, ?, ?, ?)
+            ''', (task_id, file_name, file_path, backend, options_json, priority, len(page_ranges)))
+            cursor.executemany('''
+                INSERT INTO tasks (task_id, file_name, file_path, backend, options, priority,
+                                   parent_task_id, start_page_id, end_page_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [
+                (str(uuid.uuid4()), file_name, file_path, backend, options_json, priority,
+                 task_id, start_page_id, end_page_id)
+                for start_page_id, end_page_id in page_ranges
+            ])
+        notify_task_available(self.notify_dir)
         return task_id
     
     def get_next_task(self, worker_id: str, max_retries: int = 3) -> Optional[Dict]:
@@ -113,36 +338,72 @@ class TaskDB:
             
         Returns:
             task: 任务字典，如果没有任务返回 None
+        """
+        tasks = self.get_next_tasks(worker_id, batch_size=1, max_retries=max_retries)
+        return tasks[0] if tasks else None
+    
+    def get_next_tasks(self, worker_id: str, batch_size: int = 1, max_retries: int = 3) -> List[Dict]:
+        """
+        在一个事务中认领下一批任务
+        
+        认领顺序：
+            1. 所有子任务都已完成的父任务（返回单个父任务，由 Worker 合并结果）
+            2. 按优先级和创建时间排序的下一个 pending 任务；
+               如果它是子任务，同时认领同一父任务下最多 batch_size 个 pending 子任务
+        
+        Args:
+            worker_id: Worker ID
+            batch_size: 一次最多认领的子任务数量
+            max_retries: 当任务被其他 worker 抢走时的最大重试次数（默认3次）
+            
+        Returns:
+            tasks: 任务列表（子任务按页码排序），没有任务时返回空列表
             
         并发安全说明：
-            1. 使用 BEGIN IMMEDIATE 立即获取写锁
-            2. UPDATE 时检查 status = 'pending' 防止重复拉取
-            3. 检查 rowcount 确保更新成功
-            4. 如果任务被抢走，立即重试而不是返回 None（避免不必要的等待）
+            1. SQLite 3.35+ 使用 UPDATE ... RETURNING 原子地选取并标记任务
+            2. 低版本使用 BEGIN IMMEDIATE 立即获取写锁
+            3. UPDATE 时检查 status 防止重复拉取
+            4. 检查 rowcount 确保更新成功
+            5. 如果任务被抢走，立即重试而不是返回空列表（避免不必要的等待）
         """
+        if SUPPORTS_RETURNING:
+            # 每条语句都完成选取和标记，写锁只持有几次索引查找的时间
+            with self.get_cursor() as cursor:
+                cursor.execute(CLAIM_READY_PARENT_SQL, (worker_id,))
+                parent = cursor.fetchone()
+                if parent:
+                    return [dict(parent)]
+                
+                cursor.execute(CLAIM_NEXT_TASK_SQL, (worker_id,))
+                task = cursor.fetchone()
+                if not task:
+                    return []
+                tasks = [dict(task)]
+                if task['parent_task_id'] and batch_size > 1:
+                    cursor.execute(CLAIM_SUBTASK_BATCH_SQL, (worker_id, task['parent_task_id'], batch_size - 1))
+                    tasks += [dict(row) for row in cursor.fetchall()]
+                return sorted(tasks, key=lambda t: t['start_page_id'] or 0)
+        
         for attempt in range(max_retries):
             with self.get_cursor() as cursor:
                 # 使用事务确保原子性
                 cursor.execute('BEGIN IMMEDIATE')
                 
+                cursor.execute(SELECT_READY_PARENT_SQL)
+                parent = cursor.fetchone()
+                if parent:
+                    cursor.execute(MARK_PARENT_PROCESSING_SQL, (worker_id, parent['task_id']))
+                    if cursor.rowcount == 0:
+                        continue
+                    return [dict(parent)]
+                
                 # 按优先级和创建时间获取任务
-                cursor.execute('''
-                    SELECT * FROM tasks 
-                    WHERE status = 'pending' 
-                    ORDER BY priority DESC, created_at ASC 
-                    LIMIT 1
-                ''')
+                cursor.execute(SELECT_NEXT_TASK_SQL)
                 
                 task = cursor.fetchone()
                 if task:
                     # 立即标记为 processing，并确保状态仍是 pending
-                    cursor.execute('''
-                        UPDATE tasks 
-                        SET status = 'processing', 
-                            started_at = CURRENT_TIMESTAMP, 
-                            worker_id = ?
-                        WHERE task_id = ? AND status = 'pending'
-                    ''', (worker_id, task['task_id']))
+                    cursor.execute(MARK_TASK_PROCESSING_SQL, (worker_id, task['task_id']))
                     
                     # 检查是否更新成功（防止被其他 worker 抢走）
                     if cursor.rowcount == 0:
@@ -150,13 +411,45 @@ class TaskDB:
                         # 因为队列中可能还有其他待处理任务
                         continue
                     
-                    return dict(task)
+                    tasks = [dict(task)]
+                    if task['parent_task_id'] and batch_size > 1:
+                        cursor.execute(SELECT_SUBTASK_BATCH_SQL, (task['parent_task_id'], batch_size - 1))
+                        for sibling in cursor.fetchall():
+                            cursor.execute(MARK_TASK_PROCESSING_SQL, (worker_id, sibling['task_id']))
+                            if cursor.rowcount > 0:
+                                tasks.append(dict(sibling))
+                    return sorted(tasks, key=lambda t: t['start_page_id'] or 0)
                 else:
-                    # 队列中没有待处理任务，返回 None
-                    return None
+                    # 队列中没有待处理任务，返回空列表
+                    return []
             
         # 重试次数用尽，仍未获取到任务（高并发场景）
-        return None
+        return []
+    
+    def listen(self) -> TaskListener:
+        """创建任务通知监听器（每个 Worker 一个），通知不可用时监听器退化为轮询"""
+        return TaskListener(self.notify_dir)
+    
+    def wait_for_tasks(self, worker_id: str, listener: TaskListener, timeout: float,
+                       batch_size: int = 1) -> List[Dict]:
+        """
+        认领下一批任务，队列为空时阻塞等待新任务通知
+        
+        Args:
+            worker_id: Worker ID
+            listener: listen() 返回的监听器
+            timeout: 最长等待时间（秒），通知不可用时即为轮询间隔
+            batch_size: 一次最多认领的子任务数量
+            
+        Returns:
+            tasks: 任务列表，等待超时仍没有任务返回空列表
+        """
+        # 先丢弃积压的通知，之后提交的任务一定会再次触发通知
+        listener.drain()
+        tasks = self.get_next_tasks(worker_id, batch_size)
+        if not tasks and listener.wait(timeout):
+            tasks = self.get_next_tasks(worker_id, batch_size)
+        return tasks
     
     def _build_update_clauses(self, status: str, result_path: str = None, 
                              error_message: str = None, worker_id: str = None, 
@@ -275,6 +568,71 @@ class TaskDB:
             task = cursor.fetchone()
             return dict(task) if task else None
     
+    def get_subtasks(self, parent_task_id: str) -> List[Dict]:
+        """
+        查询父任务的所有子任务
+        
+        Args:
+            parent_task_id: 父任务ID
+            
+        Returns:
+            tasks: 按页码排序的子任务列表
+        """
+        with self.get_cursor() as cursor:
+            cursor.execute('''
+                SELECT * FROM tasks 
+                WHERE parent_task_id = ? 
+                ORDER BY start_page_id
+            ''', (parent_task_id,))
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def count_processing_subtasks(self, parent_task_id: str) -> int:
+        """
+        统计父任务下仍在处理中的子任务数量
+        
+        Args:
+            parent_task_id: 父任务ID
+            
+        Returns:
+            count: processing 状态的子任务数量
+        """
+        with self.get_cursor() as cursor:
+            cursor.execute('''
+                SELECT COUNT(*) FROM tasks 
+                WHERE parent_task_id = ? AND status = 'processing'
+            ''', (parent_task_id,))
+            return cursor.fetchone()[0]
+    
+    def close_split_task(self, parent_task_id: str, status: str, error_message: str = None) -> bool:
+        """
+        结束尚未完成的拆分任务（子任务失败或用户取消）
+        
+        父任务标记为 status，尚未开始的子任务标记为 cancelled
+        
+        Args:
+            parent_task_id: 父任务ID
+            status: 父任务的新状态 (failed/cancelled)
+            error_message: 错误信息（可选）
+            
+        Returns:
+            bool: 父任务状态是否被更新
+        """
+        with self.get_cursor() as cursor:
+            cursor.execute('''
+                UPDATE tasks 
+                SET status = ?, 
+                    error_message = COALESCE(?, error_message), 
+                    completed_at = CURRENT_TIMESTAMP
+                WHERE task_id = ? AND status IN ('waiting', 'processing')
+            ''', (status, error_message, parent_task_id))
+            success = cursor.rowcount > 0
+            cursor.execute('''
+                UPDATE tasks 
+                SET status = 'cancelled'
+                WHERE parent_task_id = ? AND status = 'pending'
+            ''', (parent_task_id,))
+            return success
+    
     def get_queue_stats(self) -> Dict[str, int]:
         """
         获取队列统计信息
@@ -396,16 +754,19 @@ class TaskDB:
             timeout_minutes: 超时时间（分钟）
         """
         with self.get_cursor() as cursor:
+            # 合并结果超时的父任务恢复为 waiting，重新等待 Worker 认领合并
             cursor.execute('''
                 UPDATE tasks 
-                SET status = 'pending',
+                SET status = CASE WHEN subtask_count > 0 THEN 'waiting' ELSE 'pending' END,
                     worker_id = NULL,
                     retry_count = retry_count + 1
                 WHERE status = 'processing' 
                 AND started_at < datetime('now', '-' || ? || ' minutes')
             ''', (timeout_minutes,))
             reset_count = cursor.rowcount
-            return reset_count
+        if reset_count > 0:
+            notify_task_available(self.notify_dir)
+        return reset_count
 
 
 if __name__ == '__main__':
@@ -431,6 +792,8 @@ if __name__ == '__main__':
     print(f"Queue stats: {stats}")
     
     # 清理测试数据库
-    Path('test_tianshu.db').unlink(missing_ok=True)
+    db.close()
+    for suffix in ('', '-wal', '-shm'):
+        Path(f'test_tianshu.db{suffix}').unlink(missing_ok=True)
     print("Test completed!")
 
@@ -0,0 +1,203 @@
+"""
+MinerU Tianshu - TaskDB Load Test
+天枢任务数据库压测脚本
+
+在本地数据库文件上模拟大量并发的任务认领者（worker）和状态查询者（API），
+统计吞吐、延迟、锁错误，并校验没有任务被重复认领
+"""
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from loguru import logger
+
+from task_db import MARK_TASK_PROCESSING_SQL, SELECT_NEXT_TASK_SQL, TaskDB
+
+
+class LegacyTaskDB(TaskDB):
+    """对照组：每次操作新建连接、回滚日志模式、BEGIN IMMEDIATE 认领（旧实现的行为）"""
+
+    journal_mode = 'DELETE'
+
+    def _get_conn(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=self.busy_timeout)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def get_cursor(self):
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        try:
+            yield cursor
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            conn.close()
+
+    def get_next_task(self, worker_id: str, max_retries: int = 3):
+        for attempt in range(max_retries):
+            with self.get_cursor() as cursor:
+                cursor.execute('BEGIN IMMEDIATE')
+                cursor.execute(SELECT_NEXT_TASK_SQL)
+                task = cursor.fetchone()
+                if task is None:
+                    return None
+                cursor.execute(MARK_TASK_PROCESSING_SQL, (worker_id, task['task_id']))
+                if cursor.rowcount == 0:
+                    continue
+                return dict(task)
+        return None
+
+
+def _percentile(values, percent):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def _run_process(db_cls, db_path, claimers, readers, task_ids, deadline, result_queue):
+    """一个进程内运行若干认领线程和状态查询线程，模拟 LitServe worker 进程 / API 进程"""
+    lock = threading.Lock()
+    stats = {'claimed': [], 'claim_latency': [], 'read_latency': [], 'reads': 0, 'errors': 0}
+    try:
+        db = db_cls(db_path)
+    except sqlite3.OperationalError as e:
+        logger.error(f'failed to open task db: {e}')
+        stats['errors'] += 1
+        result_queue.put(stats)
+        return
+
+    def claimer(index):
+        worker_id = f'{os.getpid()}-{index}'
+        while time.time() < deadline:
+            start = time.time()
+            try:
+                task = db.get_next_task(worker_id)
+                with lock:
+                    stats['claim_latency'].append(time.time() - start)
+                if task is None:
+                    return
+                db.update_task_status(task['task_id'], 'completed', result_path='/tmp/result', worker_id=worker_id)
+            except sqlite3.OperationalError as e:
+                logger.warning(f'claim error: {e}')
+                with lock:
+                    stats['errors'] += 1
+                continue
+            with lock:
+                stats['claimed'].append(task['task_id'])
+
+    def reader(index):
+        step = 0
+        while time.time() < deadline:
+            start = time.time()
+            try:
+                if step % 5 == 0:
+                    queue_stats = db.get_queue_stats()
+                    # 所有任务都已认领完成时结束
+                    if not queue_stats.get('pending') and not queue_stats.get('processing'):
+                        return
+                else:
+                    db.get_task(task_ids[(index * 7919 + step) % len(task_ids)])
+            except sqlite3.OperationalError as e:
+                logger.warning(f'read error: {e}')
+                with lock:
+                    stats['errors'] += 1
+                continue
+            step += 1
+            with lock:
+                stats['read_latency'].append(time.time() - start)
+                stats['reads'] += 1
+            # 模拟客户端轮询间隔
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=claimer, args=(i,)) for i in range(claimers)]
+    threads += [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            thread.join()
+    finally:
+        db.close()
+        result_queue.put(stats)
+
+
+def run_load_test(db_cls, db_path, tasks, processes, claimers, readers, duration):
+    db = db_cls(db_path)
+    task_ids = [
+        db.create_task(f'doc_{i}.pdf', f'/tmp/doc_{i}.pdf', priority=i % 3)
+        for i in range(tasks)
+    ]
+    db.close()
+
+    ctx = multiprocessing.get_context('spawn')
+    result_queue = ctx.Queue()
+    deadline = time.time() + duration
+    start = time.time()
+    workers = [
+        ctx.Process(target=_run_process,
+                    args=(db_cls, db_path, claimers, readers, task_ids, deadline, result_queue))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    results = [result_queue.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    cost = time.time() - start
+
+    claimed = [task_id for stats in results for task_id in stats['claimed']]
+    claim_latency = [t for stats in results for t in stats['claim_latency']]
+    read_latency = [t for stats in results for t in stats['read_latency']]
+    errors = sum(stats['errors'] for stats in results)
+    duplicated = len(claimed) - len(set(claimed))
+
+    logger.info(
+        f"{db_cls.__name__}: {processes} processes x ({claimers} claimers + {readers} readers), "
+        f"claimed {len(claimed)}/{tasks} tasks in {cost:.2f}s ({len(claimed) / cost:.1f} tasks/s), "
+        f"{sum(stats['reads'] for stats in results)} status reads, "
+        f"claim p50/p99 {_percentile(claim_latency, 50) * 1000:.1f}/{_percentile(claim_latency, 99) * 1000:.1f}ms, "
+        f"read p50/p99 {_percentile(read_latency, 50) * 1000:.1f}/{_percentile(read_latency, 99) * 1000:.1f}ms, "
+        f"lock errors {errors}, duplicated claims {duplicated}"
+    )
+    return len(claimed), duplicated, errors
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='MinerU Tianshu - TaskDB 压测脚本')
+    parser.add_argument('--tasks', type=int, default=5000, help='任务数量 (默认: 5000)')
+    parser.add_argument('--processes', type=int, default=8, help='进程数 (默认: 8)')
+    parser.add_argument('--claimers', type=int, default=25, help='每个进程的认领线程数 (默认: 25)')
+    parser.add_argument('--readers', type=int, default=25, help='每个进程的状态查询线程数 (默认: 25)')
+    parser.add_argument('--duration', type=float, default=60, help='最长运行时间，秒 (默认: 60)')
+    parser.add_argument('--legacy', action='store_true', help='同时压测旧实现作为对照')
+    args = parser.parse_args()
+
+    db_classes = [TaskDB, LegacyTaskDB] if args.legacy else [TaskDB]
+    failed = False
+    for db_cls in db_classes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            claimed, duplicated, _ = run_load_test(
+                db_cls, str(Path(tmp_dir) / 'load_test.db'), args.tasks,
+                args.processes, args.claimers, args.readers, args.duration,
+            )
+        if duplicated:
+            logger.error(f'{db_cls.__name__}: {duplicated} tasks were claimed more than once')
+            failed = True
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
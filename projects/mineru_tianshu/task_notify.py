@@ -0,0 +1,135 @@
+"""
+MinerU Tianshu - Task Notification Channel
+天枢任务通知通道
+
+create_task 提交后通过本地 Unix 数据报套接字唤醒空闲的 Worker，
+Worker 不必再按固定间隔轮询数据库；不支持 Unix 套接字的平台回退到轮询
+"""
+import os
+import socket
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+NOTIFY_SUPPORTED = hasattr(socket, 'AF_UNIX')
+SOCKET_SUFFIX = '.sock'
+
+
+class TaskListener:
+    """Worker 侧的任务通知监听器
+
+    每个监听器在通知目录下绑定一个独立的数据报套接字，
+    发布方向目录下的所有套接字各发送一个字节即可唤醒全部空闲 Worker
+    """
+
+    def __init__(self, notify_dir: Optional[str] = None):
+        self.notify_dir = Path(notify_dir) if notify_dir else None
+        self.path = None
+        self.sock = None
+        if self.notify_dir is None or not NOTIFY_SUPPORTED:
+            return
+        try:
+            self.notify_dir.mkdir(parents=True, exist_ok=True)
+            path = self.notify_dir / f'{os.getpid()}-{uuid.uuid4().hex[:8]}{SOCKET_SUFFIX}'
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sock.bind(str(path))
+            self.path, self.sock = path, sock
+        except OSError as e:
+            # 例如路径超过 Unix 套接字长度限制，回退到轮询
+            logger.warning(f"Task notification unavailable, falling back to polling: {e}")
+
+    @property
+    def enabled(self) -> bool:
+        return self.sock is not None
+
+    def wait(self, timeout: float) -> bool:
+        """等待新任务通知
+
+        Returns:
+            bool: 收到通知返回 True，超时（或通知不可用时轮询间隔到期）返回 False
+        """
+        if self.sock is None:
+            time.sleep(timeout)
+            return False
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.recv(64)
+        except socket.timeout:
+            return False
+        except OSError:
+            # 套接字已被 close() 关闭
+            return False
+        self.drain()
+        return True
+
+    def drain(self):
+        """丢弃已积压的通知（Worker 忙碌期间收到的通知不再需要）"""
+        if self.sock is None:
+            return
+        self.sock.setblocking(False)
+        try:
+            while True:
+                self.sock.recv(64)
+        except (BlockingIOError, OSError):
+            pass
+
+    def wake(self):
+        """唤醒当前监听器（用于关闭时让 wait 立即返回）"""
+        if self.sock is not None:
+            _send(str(self.path))
+
+    def close(self):
+        sock, self.sock = self.sock, None
+        if sock is not None:
+            sock.close()
+        if self.path is not None:
+            self.path.unlink(missing_ok=True)
+            self.path = None
+
+
+def _send(path: str, sender: Optional[socket.socket] = None) -> bool:
+    own_sender = sender is None
+    if own_sender:
+        sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sender.setblocking(False)
+    try:
+        sender.sendto(b'1', path)
+        return True
+    except BlockingIOError:
+        # 接收缓冲区已满，说明该 Worker 已有未处理的通知
+        return True
+    except (ConnectionRefusedError, FileNotFoundError):
+        # 监听进程已退出，清理残留的套接字文件
+        Path(path).unlink(missing_ok=True)
+        return False
+    except OSError:
+        return False
+    finally:
+        if own_sender:
+            sender.close()
+
+
+def notify_task_available(notify_dir: Optional[str]) -> int:
+    """通知所有监听中的 Worker 有新任务可认领
+
+    Returns:
+        int: 成功发送通知的监听器数量
+    """
+    if not notify_dir or not NOTIFY_SUPPORTED:
+        return 0
+    try:
+        entries = [entry.path for entry in os.scandir(notify_dir) if entry.name.endswith(SOCKET_SUFFIX)]
+    except FileNotFoundError:
+        return 0
+    if not entries:
+        return 0
+
+    sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sender.setblocking(False)
+    try:
+        return sum(_send(path, sender) for path in entries)
+    finally:
+        sender.close()
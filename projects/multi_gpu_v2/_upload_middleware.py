@@ -0,0 +1,154 @@
+import asyncio
+import json
+import os
+import re
+import shutil
+import uuid
+from urllib.parse import parse_qsl
+
+UPLOAD_CHUNK_SIZE = 1 << 20
+UPLOAD_ID_PATTERN = re.compile(r'[0-9a-f]{32}')
+
+
+def parse_option(value):
+    """Form and query values are strings, decode JSON literals such as true/false/1 where possible"""
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def get_upload_path(upload_dir, upload_id):
+    """Path of an uploaded file, only ids generated by the middleware are accepted"""
+    if not isinstance(upload_id, str) or not UPLOAD_ID_PATTERN.fullmatch(upload_id):
+        raise ValueError(f'Invalid upload_id: {upload_id!r}')
+    return os.path.join(upload_dir, upload_id)
+
+
+class StreamingUploadMiddleware:
+    """
+    Stream file uploads to disk before they reach litserve.
+
+    POST requests to `path` with a raw body (any Content-Type other than JSON or
+    urlencoded form) or multipart/form-data are written to `upload_dir` chunk by chunk,
+    then replaced with a small JSON body {"upload_id", "filename", "options"}.
+    Only the id crosses litserve's worker queue; the worker parses the file from disk.
+
+    - raw body: options and `filename` are passed as query parameters
+    - multipart: the file is the `file` field, other fields are options
+      (or a JSON `options` field)
+    JSON requests with a base64 `file` are passed through unchanged.
+    """
+
+    def __init__(self, app, upload_dir, path='/predict'):
+        self.app = app
+        self.upload_dir = upload_dir
+        self.path = path
+        os.makedirs(upload_dir, exist_ok=True)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['method'] != 'POST' or scope['path'] != self.path:
+            await self.app(scope, receive, send)
+            return
+
+        headers = [(k, v) for k, v in scope['headers'] if k not in (b'content-type', b'content-length')]
+        content_type = dict(scope['headers']).get(b'content-type', b'').decode('latin-1').lower()
+        if content_type.startswith(('application/json', 'application/x-www-form-urlencoded')):
+            await self.app(scope, receive, send)
+            return
+
+        upload_id = uuid.uuid4().hex
+        upload_path = get_upload_path(self.upload_dir, upload_id)
+        try:
+            try:
+                if content_type.startswith('multipart/form-data'):
+                    filename, options = await self._save_multipart(scope, receive, upload_path)
+                else:
+                    filename, options = await self._save_body(scope, receive, upload_path)
+            except ValueError as e:
+                # malformed `options` form field
+                await self._send_error(send, 400, f'invalid options: {e}')
+                return
+            if filename is None:
+                await self._send_error(send, 400, 'missing file field')
+                return
+
+            body = json.dumps({'upload_id': upload_id, 'filename': filename, 'options': options}).encode('utf-8')
+            headers += [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]
+            body_sent = False
+
+            async def receive_json():
+                nonlocal body_sent
+                if not body_sent:
+                    body_sent = True
+                    return {'type': 'http.request', 'body': body, 'more_body': False}
+                return await receive()
+
+            await self.app({**scope, 'headers': headers}, receive_json, send)
+        except ConnectionError:
+            # client disconnected during upload, nothing to respond
+            pass
+        finally:
+            # the worker removes the file after parsing; this covers requests rejected before that
+            if os.path.exists(upload_path):
+                os.remove(upload_path)
+
+    async def _save_body(self, scope, receive, upload_path):
+        options = {k: parse_option(v) for k, v in parse_qsl(scope.get('query_string', b'').decode('utf-8'))}
+        filename = options.pop('filename', 'upload.pdf')
+        # disk writes run in a thread so that a large upload does not stall other requests,
+        # small ASGI messages are batched into UPLOAD_CHUNK_SIZE writes
+        buffer = bytearray()
+        with open(upload_path, 'wb') as f:
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    raise ConnectionError('client disconnected during upload')
+                buffer += message.get('body', b'')
+                more_body = message.get('more_body', False)
+                if len(buffer) >= UPLOAD_CHUNK_SIZE or not more_body:
+                    await asyncio.to_thread(f.write, bytes(buffer))
+                    buffer.clear()
+                if not more_body:
+                    break
+        return str(filename), options
+
+    async def _save_multipart(self, scope, receive, upload_path):
+        # starlette is installed with litserve, only needed for multipart uploads
+        from starlette.datastructures import UploadFile
+        from starlette.requests import Request
+
+        form = await Request(scope, receive).form()
+        try:
+            options = {}
+            filename = None
+            for key, value in form.multi_items():
+                if isinstance(value, UploadFile):
+                    if key == 'file' and filename is None:
+                        filename = value.filename or 'upload.pdf'
+                        await asyncio.to_thread(self._copy_file, value.file, upload_path)
+                elif key == 'options':
+                    parsed = json.loads(value)
+                    if not isinstance(parsed, dict):
+                        raise ValueError('options must be a JSON object')
+                    options.update(parsed)
+                else:
+                    options[key] = parse_option(value)
+            return filename, options
+        finally:
+            await form.close()
+
+    @staticmethod
+    def _copy_file(src, upload_path):
+        with open(upload_path, 'wb') as f:
+            shutil.copyfileobj(src, f, UPLOAD_CHUNK_SIZE)
+
+    @staticmethod
+    async def _send_error(send, status, detail):
+        body = json.dumps({'detail': detail}).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())],
+        })
+        await send({'type': 'http.response.body', 'body': body})
@@ -1,4 +1,5 @@
 import base64
+import json
 import os
 from loguru import logger
 import asyncio
@@ -34,6 +35,34 @@ async def mineru_parse_async(session, file_path, url='http://127.0.0.1:8000/pred
         return {'error': str(e)}
 
 
+async def mineru_parse_stream_async(session, file_path, url='http://127.0.0.1:8000/predict', **options):
+    """
+    Upload the raw file as a stream instead of a base64 JSON payload.
+    Options are sent as query parameters, set return_inline=True to get the results in the response.
+    """
+    try:
+        params = {'filename': os.path.basename(file_path)}
+        params.update({k: v if isinstance(v, str) else json.dumps(v) for k, v in options.items() if v is not None})
+
+        # aiohttp streams the file object in chunks, the file is never fully loaded in memory
+        with open(file_path, 'rb') as f:
+            async with session.post(
+                url, data=f, params=params, headers={'Content-Type': 'application/octet-stream'}
+            ) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    logger.info(f"✅ Processed: {file_path} -> {result.get('output_dir', 'inline')}")
+                    return result
+                else:
+                    error_text = await response.text()
+                    logger.error(f"❌ Server error for {file_path}: {error_text}")
+                    return {'error': error_text}
+
+    except Exception as e:
+        logger.error(f"❌ Failed to process {file_path}: {e}")
+        return {'error': str(e)}
+
+
 async def main():
     """
     Main function to run all parsing tasks concurrently.
@@ -67,8 +96,14 @@ async def main():
 
         custom_tasks = [mineru_parse_async(session, file_path, **custom_options) for file_path in existing_files[2:]]
 
+        # === Streaming Upload, results returned inline ===
+        stream_tasks = [
+            mineru_parse_stream_async(session, file_path, return_inline=True, return_images=False)
+            for file_path in existing_files[:1]
+        ]
+
         # Start all tasks
-        all_tasks = basic_tasks + custom_tasks
+        all_tasks = basic_tasks + custom_tasks + stream_tasks
 
         all_results = await asyncio.gather(*all_tasks)
 
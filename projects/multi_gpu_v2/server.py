@@ -1,5 +1,8 @@
 import os
+import re
+import json
 import base64
+import shutil
 import tempfile
 from pathlib import Path
 import litserve as ls
@@ -9,12 +12,16 @@ from loguru import logger
 from mineru.cli.common import do_parse, read_fn
 from mineru.utils.config_reader import get_device
 from mineru.utils.model_utils import get_vram
+from mineru.utils.output_serializer import find_output_file, read_output_text
 from _config_endpoint import config_endpoint
+from _upload_middleware import StreamingUploadMiddleware, get_upload_path
 
 class MinerUAPI(ls.LitAPI):
-    def __init__(self, output_dir='/tmp'):
+    def __init__(self, output_dir='/tmp', upload_dir=None):
         super().__init__()
         self.output_dir = output_dir
+        # files streamed by StreamingUploadMiddleware, shared with the workers through the local filesystem
+        self.upload_dir = upload_dir or os.path.join(output_dir, '.uploads')
 
     def setup(self, device):
         """Setup environment variables exactly like MinerU CLI does"""
@@ -38,16 +45,33 @@ class MinerUAPI(ls.LitAPI):
 
 
     def decode_request(self, request):
-        """Decode file and options from request"""
-        file_b64 = request['file']
+        """Decode file and options from request
+
+        Streamed uploads arrive as the upload_id of a file already written to upload_dir,
+        JSON requests with a base64 encoded file are still supported.
+        """
         options = request.get('options', {})
-        
-        file_bytes = base64.b64decode(file_b64)
-        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp:
-            temp.write(file_bytes)
-            temp_file = Path(temp.name)
+
+        if 'upload_id' in request:
+            try:
+                input_path = get_upload_path(self.upload_dir, request['upload_id'])
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            # keep the original file name readable and unique between concurrent requests
+            stem = re.sub(r'[^\w.-]', '_', Path(request.get('filename') or 'upload.pdf').stem)[:100]
+            file_name = f"{stem}_{request['upload_id'][:8]}"
+        else:
+            file_bytes = base64.b64decode(request['file'])
+            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp:
+                temp.write(file_bytes)
+                input_path = temp.name
+            file_name = Path(input_path).stem
         return {
-            'input_path': str(temp_file),
+            'input_path': str(input_path),
+            'file_name': file_name,
+            'return_inline': options.get('return_inline', False),
+            'return_images': options.get('return_images', True),
+            'return_middle_json': options.get('return_middle_json', False),
             'backend': options.get('backend', 'pipeline'),
             'method': options.get('method', 'auto'),
             'lang': options.get('lang', 'ch'),
@@ -61,14 +85,30 @@ class MinerUAPI(ls.LitAPI):
     def predict(self, inputs):
         """Call MinerU's do_parse - same as CLI"""
         input_path = inputs['input_path']
+        file_name = inputs['file_name']
+        return_inline = inputs['return_inline']
         output_dir = Path(self.output_dir)
 
         try:
             os.makedirs(output_dir, exist_ok=True)
-            
-            file_name = Path(input_path).stem
-            pdf_bytes = read_fn(Path(input_path))
-            
+            if return_inline:
+                # results are returned in the response, parse into a private directory removed afterwards
+                output_dir = Path(tempfile.mkdtemp(prefix='inline_', dir=output_dir))
+
+            # memory map the uploaded file instead of reading it into memory
+            pdf_bytes = read_fn(Path(input_path), use_mmap=True)
+
+            inline_kwargs = {}
+            if return_inline:
+                # skip artifacts that are not returned inline
+                inline_kwargs = dict(
+                    f_draw_layout_bbox=False,
+                    f_draw_span_bbox=False,
+                    f_dump_orig_pdf=False,
+                    f_dump_model_output=False,
+                    f_dump_middle_json=inputs['return_middle_json'],
+                )
+
             do_parse(
                 output_dir=str(output_dir),
                 pdf_file_names=[file_name],
@@ -80,10 +120,13 @@ class MinerUAPI(ls.LitAPI):
                 table_enable=inputs['table_enable'],
                 server_url=inputs['server_url'],
                 start_page_id=inputs['start_page_id'],
-                end_page_id=inputs['end_page_id']
+                end_page_id=inputs['end_page_id'],
+                **inline_kwargs,
             )
 
-            return str(output_dir/Path(input_path).stem)
+            if return_inline:
+                return self._read_inline_results(output_dir / file_name, file_name, inputs)
+            return {'output_dir': str(output_dir / file_name)}
 
         except Exception as e:
             logger.error(f"Processing failed: {e}")
@@ -92,17 +135,48 @@ class MinerUAPI(ls.LitAPI):
             # Cleanup temp file
             if Path(input_path).exists():
                 Path(input_path).unlink()
+            if return_inline and output_dir != Path(self.output_dir):
+                shutil.rmtree(output_dir, ignore_errors=True)
+
+    @staticmethod
+    def _read_inline_results(doc_dir, file_name, inputs):
+        """Collect markdown, content list and images of a parsed document"""
+        # do_parse writes into {file_name}/{method|vlm|hybrid_method}
+        parse_dir = next(path for path in doc_dir.iterdir() if path.is_dir())
+
+        def read_json(suffix):
+            path = find_output_file(str(parse_dir), f'{file_name}{suffix}')
+            return json.loads(read_output_text(path)) if path else None
+
+        md_path = find_output_file(str(parse_dir), f'{file_name}.md')
+        result = {
+            'file_name': file_name,
+            'md_content': read_output_text(md_path) if md_path else None,
+            'content_list': read_json('_content_list.json'),
+        }
+        if inputs['return_middle_json']:
+            result['middle_json'] = read_json('_middle.json')
+        if inputs['return_images']:
+            images_dir = parse_dir / 'images'
+            result['images'] = {
+                path.name: base64.b64encode(path.read_bytes()).decode('utf-8')
+                for path in sorted(images_dir.glob('*')) if path.is_file()
+            } if images_dir.exists() else {}
+        return result
 
     def encode_response(self, response):
-        return {'output_dir': response}
+        return response
 
 if __name__ == '__main__':
+    api = MinerUAPI(output_dir='/tmp/mineru_output')
     server = ls.LitServer(
-        MinerUAPI(output_dir='/tmp/mineru_output'),
+        api,
         accelerator='auto',
         devices='auto',
         workers_per_device=1,
-        timeout=False
+        timeout=False,
+        # stream binary/multipart uploads to disk, only the upload id goes through the worker queue
+        middlewares=[(StreamingUploadMiddleware, {'upload_dir': api.upload_dir})],
     )
     logger.info("Starting MinerU server on port 8000")
     server.run(port=8000, generate_client_file=False) 
@@ -0,0 +1,172 @@
+"""
+Compare upload paths of the multi-GPU server: base64 JSON vs raw stream vs multipart.
+
+The server runs a dry-run MinerUAPI whose predict only maps the uploaded file and
+checks its size, so the numbers measure the transport and not the parsing.
+
+    python upload_benchmark.py --size-mb 100 --rounds 3
+
+Peak RSS of the server process tree is read from /proc (Linux only).
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import aiohttp
+import litserve as ls
+from loguru import logger
+
+from mineru.cli.common import read_fn
+from client import mineru_parse_async, mineru_parse_stream_async
+from server import MinerUAPI
+from _upload_middleware import StreamingUploadMiddleware
+
+
+class DryRunAPI(MinerUAPI):
+    """Skip model setup and parsing, only map the uploaded file"""
+
+    def setup(self, device):
+        pass
+
+    def predict(self, inputs):
+        try:
+            data = read_fn(Path(inputs['input_path']), use_mmap=True)
+            return {'size': len(data)}
+        finally:
+            Path(inputs['input_path']).unlink(missing_ok=True)
+
+
+def serve(port, output_dir):
+    api = DryRunAPI(output_dir=output_dir)
+    server = ls.LitServer(
+        api, accelerator='cpu', devices=1, workers_per_device=1, timeout=False,
+        middlewares=[(StreamingUploadMiddleware, {'upload_dir': api.upload_dir})],
+    )
+    server.run(port=port, generate_client_file=False)
+
+
+def _process_tree(pid):
+    pids = [pid]
+    for task in os.listdir(f'/proc/{pid}/task'):
+        with open(f'/proc/{pid}/task/{task}/children') as f:
+            for child in f.read().split():
+                pids += _process_tree(int(child))
+    return pids
+
+
+def _peak_rss_mb(pid):
+    """Sum of VmHWM over the server process and its workers"""
+    total = 0
+    for p in _process_tree(pid):
+        try:
+            with open(f'/proc/{p}/status') as f:
+                total += next(int(line.split()[1]) for line in f if line.startswith('VmHWM:'))
+        except (FileNotFoundError, StopIteration):
+            pass
+    return total / 1024
+
+
+def _reset_peak_rss(pid):
+    for p in _process_tree(pid):
+        try:
+            with open(f'/proc/{p}/clear_refs', 'w') as f:
+                f.write('5')
+        except OSError:
+            pass
+
+
+def _write_pdf(file_path, size):
+    """A one page PDF padded with an incompressible attachment of `size` bytes"""
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    writer.add_blank_page(595, 842)
+    writer.add_attachment('padding.bin', os.urandom(size))
+    with open(file_path, 'wb') as f:
+        writer.write(f)
+
+
+async def _upload_multipart(session, file_path, url):
+    with open(file_path, 'rb') as f:
+        form = aiohttp.FormData()
+        form.add_field('file', f, filename=os.path.basename(file_path), content_type='application/pdf')
+        async with session.post(url, data=form) as response:
+            return await response.json()
+
+
+async def _wait_ready(session, url, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(url) as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.5)
+    raise TimeoutError('server did not start')
+
+
+async def run(args):
+    work_dir = tempfile.mkdtemp(prefix='mineru_upload_bench_')
+    file_path = os.path.join(work_dir, 'payload.pdf')
+    _write_pdf(file_path, args.size_mb * 1024 * 1024)
+    size = os.path.getsize(file_path)
+
+    # the server runs in its own process so that its memory can be measured separately
+    server = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--serve', '--port', str(args.port), '--output-dir', work_dir],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True,
+    )
+    url = f'http://127.0.0.1:{args.port}/predict'
+    modes = {
+        'base64 json': lambda session: mineru_parse_async(session, file_path, url),
+        'raw stream': lambda session: mineru_parse_stream_async(session, file_path, url),
+        'multipart': lambda session: _upload_multipart(session, file_path, url),
+    }
+    try:
+        timeout = aiohttp.ClientTimeout(total=None)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            await _wait_ready(session, f'http://127.0.0.1:{args.port}/health')
+            # the base64 request also measures the client-side encoding, as client.py does it
+            print(f'{"mode":<12} {"seconds":>8} {"MB/s":>8} {"server peak RSS MB":>20}')
+            for name, request in modes.items():
+                elapsed = []
+                _reset_peak_rss(server.pid)
+                base_rss = _peak_rss_mb(server.pid)
+                for _ in range(args.rounds):
+                    start = time.perf_counter()
+                    result = await request(session)
+                    elapsed.append(time.perf_counter() - start)
+                    assert result.get('size') == size, result
+                best = min(elapsed)
+                peak = _peak_rss_mb(server.pid) - base_rss
+                print(f'{name:<12} {best:>8.2f} {args.size_mb / best:>8.1f} {peak:>20.0f}')
+    finally:
+        # litserve spawns its own workers, stop the whole process group
+        os.killpg(server.pid, signal.SIGTERM)
+        server.wait()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size-mb', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--output-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.port, args.output_dir)
+    else:
+        # per request logs of client.py
+        logger.disable('client')
+        asyncio.run(run(args))
@@ -0,0 +1,81 @@
+# Copyright (c) Opendatalab. All rights reserved.
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from mineru.utils import block_sort
+from mineru.utils.enum_class import BlockType
+
+
+class FakeLayoutReader:
+    """按box的top坐标给出阅读顺序的layoutreader替身，记录每次前向的batch大小"""
+    device = torch.device("cpu")
+    dtype = torch.float32
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def __call__(self, bbox, attention_mask, input_ids):
+        self.batch_sizes.append(bbox.shape[0])
+        seq_len = bbox.shape[1]
+        targets = bbox[:, :, 1].float().unsqueeze(-1)
+        positions = torch.arange(seq_len, dtype=torch.float32).view(1, 1, -1)
+        logits = -(positions - targets).abs()
+
+        class Output:
+            pass
+
+        output = Output()
+        output.logits = logits
+        return output
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    model = FakeLayoutReader()
+    monkeypatch.setattr(block_sort.ModelSingleton, "_models", {"layoutreader": model})
+    return model
+
+
+def _text_block(tops):
+    lines = [{"bbox": [0, top, 10, top + 1], "spans": []} for top in tops]
+    return {
+        "type": BlockType.TEXT,
+        "bbox": [0, min(tops), 10, max(tops) + 1],
+        "lines": lines,
+    }
+
+
+def test_batch_predict_matches_single_page(fake_model):
+    boxes_list = [
+        [[0, top, 10, top + 1] for top in reversed(range(n))]
+        for n in [3, 70, 5, 130, 8]
+    ]
+    batched = block_sort.batch_predict(boxes_list, fake_model, batch_size=16)
+    single = [block_sort.batch_predict([boxes], fake_model, batch_size=1)[0] for boxes in boxes_list]
+
+    assert batched == single
+    # 长度分桶后 [3, 5, 8] / [70] / [130] 各一次前向
+    assert fake_model.batch_sizes[:3] == [3, 1, 1]
+
+
+def test_batch_sort_lines_across_pages(fake_model):
+    pages = [[[[0, top, 10, top + 1] for top in [2, 0, 1]]], [[[0, 5, 10, 6]]]]
+    sorted_bboxes_list = block_sort.batch_sort_lines_by_model(pages, [(1000, 1000), (1000, 1000)])
+
+    assert len(fake_model.batch_sizes) == 1
+    assert sorted_bboxes_list[1] == [[0, 5, 10, 6]]
+    assert len(sorted_bboxes_list[0]) == 3
+
+
+def test_pages_over_model_limit_sorted_by_block(fake_model):
+    # 两个block共600行，超出单次推理的510上限
+    blocks = [_text_block(range(300, 600)), _text_block(range(0, 300))]
+    sorted_bboxes = block_sort.sort_lines_by_model(blocks, 1000, 1000, 1, [])
+
+    assert sorted_bboxes is not None
+    assert len(sorted_bboxes) == 600
+    first_block_lines = [line["bbox"] for line in blocks[0]["lines"]]
+    second_block_lines = [line["bbox"] for line in blocks[1]["lines"]]
+    # 同一block的line保持连续
+    assert sorted_bboxes in (first_block_lines + second_block_lines, second_block_lines + first_block_lines)
@@ -0,0 +1,128 @@
+# Copyright (c) Opendatalab. All rights reserved.
+import threading
+import time
+
+from mineru.cli.client import output_exists, stream_parse_docs
+
+
+class _Tracker:
+    """记录同时在途（已读取、尚未解析完成）的文档数量和内存"""
+
+    def __init__(self, costs):
+        self.costs = costs
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.in_flight_bytes = 0
+        self.max_in_flight = 0
+        self.max_in_flight_bytes = 0
+        self.parsed = []
+
+    def load(self, path):
+        with self.lock:
+            self.in_flight += 1
+            self.in_flight_bytes += self.costs[path]
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.max_in_flight_bytes = max(self.max_in_flight_bytes, self.in_flight_bytes)
+        return path.encode()
+
+    def parse(self, path, pdf_bytes):
+        time.sleep(0.01)
+        if path == "bad":
+            raise ValueError("broken document")
+        with self.lock:
+            self.parsed.append(path)
+            self.in_flight -= 1
+            self.in_flight_bytes -= self.costs[path]
+
+
+def test_stream_parse_bounds_in_flight_documents():
+    costs = {f"doc{i}": 10 for i in range(20)}
+    tracker = _Tracker(costs)
+
+    stream_parse_docs(list(costs), tracker.parse, tracker.load, costs.get, max_in_flight=3, workers=2)
+
+    assert sorted(tracker.parsed) == sorted(costs)
+    assert tracker.max_in_flight <= 3
+
+
+def test_stream_parse_respects_memory_ceiling():
+    costs = {"a": 40, "b": 40, "c": 40, "huge": 500, "d": 40}
+    tracker = _Tracker(costs)
+
+    stream_parse_docs(list(costs), tracker.parse, tracker.load, costs.get,
+                      max_in_flight=10, max_memory_bytes=100, workers=4)
+
+    assert sorted(tracker.parsed) == sorted(costs)
+    # 超过上限的文档单独处理，其余时刻在途内存不超过上限
+    assert tracker.max_in_flight_bytes <= 500
+    assert tracker.max_in_flight <= 2
+
+
+def test_stream_parse_continues_after_failure():
+    costs = {"a": 1, "bad": 1, "b": 1}
+    tracker = _Tracker(costs)
+
+    stream_parse_docs(list(costs), tracker.parse, tracker.load, costs.get, max_in_flight=2)
+
+    assert sorted(tracker.parsed) == ["a", "b"]
+
+
+def test_output_exists(tmp_path):
+    assert not output_exists(str(tmp_path), "doc", "pipeline", "auto")
+    parse_dir = tmp_path / "doc" / "auto"
+    parse_dir.mkdir(parents=True)
+    (parse_dir / "doc_model.json").write_text("[]")
+    assert output_exists(str(tmp_path), "doc", "pipeline", "auto")
+    assert not output_exists(str(tmp_path), "doc", "vlm-http-client", "auto")
+
+
+def test_stream_parse_skips_unreadable_cost():
+    costs = {"a": 1, "b": 1}
+    tracker = _Tracker(costs)
+
+    def cost_fn(path):
+        if path == "gone":
+            raise FileNotFoundError(path)
+        return costs[path]
+
+    stream_parse_docs(["a", "gone", "b"], tracker.parse, tracker.load, cost_fn, max_in_flight=1)
+
+    assert sorted(tracker.parsed) == ["a", "b"]
+
+
+def test_output_exists_checks_last_enabled_artifact(tmp_path, monkeypatch):
+    parse_dir = tmp_path / "doc" / "vlm"
+    parse_dir.mkdir(parents=True)
+    (parse_dir / "doc.md").write_text("# doc")
+    # 全部产物启用时 model json 最后写出，仅有 markdown 说明文档未处理完成
+    assert not output_exists(str(tmp_path), "doc", "vlm-http-client", "auto")
+    (parse_dir / "doc_model.json").write_text("[]")
+    assert output_exists(str(tmp_path), "doc", "vlm-http-client", "auto")
+
+    monkeypatch.setenv("MINERU_OUTPUT_ARTIFACTS", "content_list")
+    assert not output_exists(str(tmp_path), "doc", "vlm-http-client", "auto")
+    (parse_dir / "doc_content_list_v2.json.gz").write_bytes(b"")
+    assert output_exists(str(tmp_path), "doc", "vlm-http-client", "auto")
+
+
+def test_stream_parse_estimates_parse_cost_in_worker():
+    costs = {"a": 10, "b": 10, "c": 10}
+    tracker = _Tracker(costs)
+    producer_threads = set()
+    parse_cost_threads = set()
+
+    def cost_fn(path):
+        producer_threads.add(threading.current_thread())
+        return costs[path]
+
+    def parse_cost_fn(path):
+        # pdfium 不能多线程同时调用，统计页数与解析在同一个工作线程中进行
+        parse_cost_threads.add(threading.current_thread())
+        return 50
+
+    stream_parse_docs(list(costs), tracker.parse, tracker.load, cost_fn, parse_cost_fn,
+                      max_in_flight=3, max_memory_bytes=70)
+
+    assert sorted(tracker.parsed) == ["a", "b", "c"]
+    assert len(parse_cost_threads) == 1
+    assert not parse_cost_threads & producer_threads
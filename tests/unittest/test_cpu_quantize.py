@@ -0,0 +1,111 @@
+# Copyright (c) Opendatalab. All rights reserved.
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import pytest
+from loguru import logger
+
+torch = pytest.importorskip("torch")
+
+from mineru.utils.model_utils import quantize_model_for_cpu
+
+
+class _Wrapper:
+    """模拟 pipeline 中持有 torch 网络的模型封装类"""
+    def __init__(self):
+        self.net = torch.nn.Sequential(
+            torch.nn.Linear(16, 32),
+            torch.nn.ReLU(),
+            torch.nn.Linear(32, 4),
+        ).eval()
+        # 同一网络的子模块被其他属性引用时不应重复量化
+        self.head = self.net[2]
+
+
+def test_quantize_disabled_by_default(monkeypatch):
+    monkeypatch.delenv("MINERU_CPU_QUANTIZE", raising=False)
+    model = _Wrapper()
+    quantize_model_for_cpu(model, "cpu")
+    assert isinstance(model.net[0], torch.nn.Linear)
+
+
+def test_quantize_skipped_on_accelerator(monkeypatch):
+    monkeypatch.setenv("MINERU_CPU_QUANTIZE", "true")
+    model = _Wrapper()
+    quantize_model_for_cpu(model, "cuda")
+    assert isinstance(model.net[0], torch.nn.Linear)
+
+
+def test_quantize_linear_layers_on_cpu(monkeypatch):
+    monkeypatch.setenv("MINERU_CPU_QUANTIZE", "true")
+    model = _Wrapper()
+    x = torch.randn(8, 16)
+    with torch.no_grad():
+        expected = model.net(x)
+
+    quantize_model_for_cpu(model, "cpu")
+
+    assert not isinstance(model.net[0], torch.nn.Linear)
+    assert not isinstance(model.net[2], torch.nn.Linear)
+    with torch.no_grad():
+        actual = model.net(x)
+    assert torch.allclose(actual, expected, atol=0.1)
+
+
+def _reset_model_caches():
+    from mineru.backend.pipeline import pipeline_analyze
+    from mineru.backend.pipeline.model_init import AtomModelSingleton
+    from mineru.utils import block_sort
+
+    AtomModelSingleton._models = OrderedDict()
+    AtomModelSingleton._model_blocks = {}
+    pipeline_analyze.ModelSingleton._models = {}
+    block_sort.ModelSingleton._models = {}
+
+
+def _run_pipeline(pdf_bytes, image_dir):
+    from mineru.backend.pipeline.pipeline_analyze import doc_analyze
+    from mineru.backend.pipeline.model_json_to_middle_json import result_to_middle_json
+    from mineru.backend.pipeline.pipeline_middle_json_mkcontent import union_make
+    from mineru.data.data_reader_writer import FileBasedDataWriter
+    from mineru.utils.enum_class import MakeMode
+
+    _reset_model_caches()
+    # 预热一次以排除模型加载耗时
+    doc_analyze([pdf_bytes], ["en"])
+    start = time.time()
+    infer_results, all_image_lists, all_pdf_docs, lang_list, ocr_enabled_list = doc_analyze([pdf_bytes], ["en"])
+    cost = time.time() - start
+
+    middle_json = result_to_middle_json(
+        infer_results[0], all_image_lists[0], all_pdf_docs[0],
+        FileBasedDataWriter(str(image_dir)), lang_list[0], ocr_enabled_list[0], True,
+    )
+    return union_make(middle_json["pdf_info"], MakeMode.MM_MD, "images"), cost
+
+
+@pytest.mark.skipif(
+    os.getenv("MINERU_CPU_QUANTIZE_BENCH") is None,
+    reason="set MINERU_CPU_QUANTIZE_BENCH=1 to compare fp32 and int8 pipeline output",
+)
+def test_quantized_pipeline_accuracy_and_throughput(monkeypatch, tmp_path):
+    from fuzzywuzzy import fuzz
+
+    monkeypatch.setenv("MINERU_DEVICE_MODE", "cpu")
+    pdf_path = Path(__file__).parent / "pdfs" / "test.pdf"
+    pdf_bytes = pdf_path.read_bytes()
+
+    monkeypatch.setenv("MINERU_CPU_QUANTIZE", "false")
+    fp32_md, fp32_cost = _run_pipeline(pdf_bytes, tmp_path / "fp32")
+    monkeypatch.setenv("MINERU_CPU_QUANTIZE", "true")
+    int8_md, int8_cost = _run_pipeline(pdf_bytes, tmp_path / "int8")
+    _reset_model_caches()
+
+    similarity = fuzz.ratio(fp32_md, int8_md)
+    logger.info(
+        f"fp32: {fp32_cost:.2f}s, int8: {int8_cost:.2f}s, "
+        f"speedup: {fp32_cost / int8_cost:.2f}x, markdown similarity: {similarity}"
+    )
+    assert similarity >= int(os.getenv("MINERU_CPU_QUANTIZE_MIN_SIMILARITY", 95))
@@ -0,0 +1,44 @@
+# Copyright (c) Opendatalab. All rights reserved.
+import os
+
+from PIL import Image
+
+from mineru.data.data_reader_writer import FileBasedDataWriter
+from mineru.utils.cut_image import cut_image_and_table, get_page_img_id
+from mineru.utils.enum_class import ContentType
+from mineru.utils.hash_utils import bytes_md5
+from mineru.utils.pdf_image_tools import load_images_from_pdf
+
+
+def _pdf_bytes():
+    with open(os.path.join(os.path.dirname(__file__), "pdfs", "test.pdf"), "rb") as f:
+        return f.read()
+
+
+def test_page_img_id_from_pdf_digest():
+    pdf_bytes = _pdf_bytes()
+    images_list, pdf_doc = load_images_from_pdf(pdf_bytes, dpi=200, threads=1)
+    pdf_doc.close()
+
+    for page_index, image_dict in enumerate(images_list):
+        assert get_page_img_id(image_dict) == f"{bytes_md5(pdf_bytes)}_{page_index}_200"
+
+
+def test_page_img_id_falls_back_to_pixels():
+    img = Image.new("RGB", (20, 10), "white")
+    assert get_page_img_id({"img_pil": img, "scale": 1}) == bytes_md5(img.tobytes())
+
+
+def test_crop_path_depends_on_identity_not_pixels(tmp_path):
+    writer = FileBasedDataWriter(str(tmp_path))
+    span = {"type": ContentType.IMAGE, "bbox": [0, 0, 10, 5]}
+
+    white = Image.new("RGB", (20, 10), "white")
+    black = Image.new("RGB", (20, 10), "black")
+    path_a = cut_image_and_table(dict(span), white, "doc_0_200", 0, writer, scale=1)["image_path"]
+    path_b = cut_image_and_table(dict(span), black, "doc_0_200", 0, writer, scale=1)["image_path"]
+    path_c = cut_image_and_table(dict(span), white, "doc_1_200", 1, writer, scale=1)["image_path"]
+
+    assert path_a == path_b
+    assert path_a != path_c
+    assert os.path.exists(tmp_path / path_a)
@@ -0,0 +1,79 @@
+# Copyright (c) Opendatalab. All rights reserved.
+import threading
+from io import BytesIO
+
+import pypdfium2 as pdfium
+import pytest
+
+from mineru.backend.pipeline import pipeline_analyze
+from mineru.utils.config_reader import device_context, get_device, get_device_slot
+
+
+def _pdf_bytes(page_num):
+    pdf = pdfium.PdfDocument.new()
+    for i in range(page_num):
+        # 用不同宽度区分页面，便于检查结果顺序
+        pdf.new_page(300 + i * 10, 400)
+    output = BytesIO()
+    pdf.save(output)
+    pdf.close()
+    return output.getvalue()
+
+
+@pytest.fixture
+def fake_batch_analyze(monkeypatch):
+    """记录每个batch在哪个设备 slot 上推理，结果中带上页面宽度"""
+    calls = []
+    lock = threading.Lock()
+
+    def fake(images_with_extra_info, formula_enable=True, table_enable=True):
+        with lock:
+            calls.append((get_device(), get_device_slot(), len(images_with_extra_info)))
+        return [[{"width": image.width}] for image, _, _ in images_with_extra_info]
+
+    monkeypatch.setattr(pipeline_analyze, "batch_image_analyze", fake)
+    return calls
+
+
+def test_device_list_parsing(monkeypatch):
+    monkeypatch.delenv("MINERU_PIPELINE_DEVICES", raising=False)
+    assert pipeline_analyze.get_data_parallel_devices() == []
+    monkeypatch.setenv("MINERU_PIPELINE_DEVICES", "cpu:0, cpu:1")
+    assert pipeline_analyze.get_data_parallel_devices() == [("cpu", "cpu:0"), ("cpu", "cpu:1")]
+    monkeypatch.setenv("MINERU_PIPELINE_DEVICES", "cuda:0,cuda:1")
+    assert pipeline_analyze.get_data_parallel_devices() == [("cuda:0", "cuda:0"), ("cuda:1", "cuda:1")]
+
+
+def test_doc_analyze_shards_pages_across_virtual_devices(monkeypatch, fake_batch_analyze):
+    monkeypatch.setenv("MINERU_PIPELINE_DEVICES", "cpu:0,cpu:1,cpu:2")
+    monkeypatch.setenv("MINERU_MIN_BATCH_INFERENCE_SIZE", "2")
+    pdf_bytes_list = [_pdf_bytes(5), _pdf_bytes(4)]
+
+    infer_results, _, all_pdf_docs, _, _ = pipeline_analyze.doc_analyze(
+        pdf_bytes_list, ["en", "en"], parse_method="txt"
+    )
+    for pdf_doc in all_pdf_docs:
+        pdf_doc.close()
+
+    # 结果按文档、页码顺序合并
+    assert [len(pages) for pages in infer_results] == [5, 4]
+    for pages in infer_results:
+        for page_idx, page in enumerate(pages):
+            assert page["page_info"]["page_no"] == page_idx
+            assert page["layout_dets"][0]["width"] == page["page_info"]["width"]
+    assert sum(batch_len for _, _, batch_len in fake_batch_analyze) == 9
+    assert {device for device, _, _ in fake_batch_analyze} == {"cpu"}
+    assert {slot for _, slot, _ in fake_batch_analyze} <= {"cpu:0", "cpu:1", "cpu:2"}
+
+
+def test_model_singleton_per_device_slot(monkeypatch):
+    monkeypatch.setattr(pipeline_analyze.ModelSingleton, "_models", {})
+    monkeypatch.setattr(pipeline_analyze, "custom_model_init", lambda **kwargs: object())
+    manager = pipeline_analyze.ModelSingleton()
+
+    with device_context("cpu", "cpu:0"):
+        model_0 = manager.get_model(lang=None, formula_enable=True, table_enable=True)
+        assert manager.get_model(lang=None, formula_enable=True, table_enable=True) is model_0
+    with device_context("cpu", "cpu:1"):
+        model_1 = manager.get_model(lang=None, formula_enable=True, table_enable=True)
+    assert model_0 is not model_1
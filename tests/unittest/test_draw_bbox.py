@@ -0,0 +1,62 @@
+# Copyright (c) Opendatalab. All rights reserved.
+from io import BytesIO
+
+import numpy as np
+import pypdfium2 as pdfium
+import pytest
+
+from mineru.utils.check_sys_env import is_windows_environment
+from mineru.utils.draw_bbox import draw_layout_bbox, draw_pages_to_pdf
+from mineru.utils.enum_class import BlockType
+
+
+def _blank_pdf(page_num, width=612, height=792):
+    pdf = pdfium.PdfDocument.new()
+    for _ in range(page_num):
+        pdf.new_page(width, height)
+    output = BytesIO()
+    pdf.save(output)
+    pdf.close()
+    return output.getvalue()
+
+
+def _page_ops(page_idx):
+    bboxes = [[50, 20 + j * 30 + page_idx, 300, 40 + j * 30 + page_idx] for j in range(5)]
+    return [(bboxes, [255, 0, 0], True, False, True), (bboxes, [0, 0, 255], False, True, False)]
+
+
+def _render(path):
+    pdf = pdfium.PdfDocument(str(path))
+    images = [np.asarray(page.render().to_pil()) for page in pdf]
+    pdf.close()
+    return images
+
+
+@pytest.mark.skipif(is_windows_environment(), reason="debug pdf pages are drawn sequentially on windows")
+def test_parallel_drawing_matches_sequential(tmp_path):
+    page_num = 5
+    page_ops_list = [_page_ops(i) for i in range(page_num)]
+
+    # 常驻进程池先后处理两份页面尺寸不同的文档，子进程不会沿用上一份文档
+    for name, pdf_bytes in [("letter", _blank_pdf(page_num)), ("a4", _blank_pdf(page_num, 595, 842))]:
+        draw_pages_to_pdf(pdf_bytes, page_ops_list, str(tmp_path), f"{name}_sequential.pdf", workers=1)
+        draw_pages_to_pdf(pdf_bytes, page_ops_list, str(tmp_path), f"{name}_parallel.pdf", workers=2)
+
+        sequential = _render(tmp_path / f"{name}_sequential.pdf")
+        parallel = _render(tmp_path / f"{name}_parallel.pdf")
+        assert len(sequential) == len(parallel) == page_num
+        for sequential_page, parallel_page in zip(sequential, parallel):
+            assert np.array_equal(sequential_page, parallel_page)
+
+
+def test_draw_layout_bbox(tmp_path):
+    pdf_bytes = _blank_pdf(2)
+    block = {"type": BlockType.TEXT, "bbox": [50, 50, 300, 80], "lines": []}
+    pdf_info = [{"para_blocks": [block], "discarded_blocks": []} for _ in range(2)]
+
+    draw_layout_bbox(pdf_info, pdf_bytes, str(tmp_path), "doc_layout.pdf")
+
+    pages = _render(tmp_path / "doc_layout.pdf")
+    assert len(pages) == 2
+    # 文本框区域被着色，页面不再是纯白
+    assert (pages[0] != 255).any()
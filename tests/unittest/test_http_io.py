@@ -0,0 +1,167 @@
+# Copyright (c) Opendatalab. All rights reserved.
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from mineru.data.io import HttpReader, HttpWriter
+
+CONTENT = os.urandom(3 * 1024 * 1024 + 123)
+ETAG = '"%s"' % hashlib.sha256(CONTENT).hexdigest()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        state = self.server.state
+        state["gets"] += 1
+        state["connections"].add(self.client_address)
+        if self.path == "/flaky" and state["gets"] <= 2:
+            return self._send(503)
+        if self.path == "/missing":
+            return self._send(404)
+        if self.path == "/no-range":
+            return self._send(200, CONTENT)
+        if self.headers.get("If-None-Match") == ETAG:
+            state["not_modified"] += 1
+            return self._send(304, headers={"ETag": ETAG})
+
+        range_header = self.headers.get("Range")
+        if range_header:
+            start, _, end = range_header[len("bytes="):].partition("-")
+            start = int(start)
+            if start >= len(CONTENT):
+                return self._send(416, headers={"Content-Range": f"bytes */{len(CONTENT)}"})
+            end = min(int(end), len(CONTENT) - 1) if end else len(CONTENT) - 1
+            return self._send(206, CONTENT[start:end + 1], {
+                "Content-Range": f"bytes {start}-{end}/{len(CONTENT)}", "ETag": ETAG,
+            })
+        return self._send(200, CONTENT, {"ETag": ETAG})
+
+    def do_POST(self):
+        state = self.server.state
+        length = int(self.headers["Content-Length"])
+        state["posts"].append((self.headers.get("Content-Type"), self.rfile.read(length)))
+        if self.path == "/flaky" and len(state["posts"]) == 2:
+            return self._send(503)
+        self._send(201)
+
+
+class _Server(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # read_at 读到足够数据后会提前断开连接
+        pass
+
+
+@pytest.fixture
+def http_server():
+    server = _Server(("127.0.0.1", 0), _Handler)
+    server.state = {"gets": 0, "not_modified": 0, "posts": [], "connections": set()}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _uploaded_file(content_type, body):
+    boundary = content_type.split("boundary=")[1].encode()
+    part = body.split(b"--" + boundary)[1]
+    headers, _, data = part.partition(b"\r\n\r\n")
+    return headers, data[:-2]
+
+
+def test_read_and_session_reuse(http_server):
+    server, base_url = http_server
+    with HttpReader() as reader:
+        assert reader.read(f"{base_url}/file") == CONTENT
+        assert reader.read(f"{base_url}/file") == CONTENT
+    # 连接池复用同一连接
+    assert len(server.state["connections"]) == 1
+
+
+@pytest.mark.parametrize("path", ["/file", "/no-range"])
+def test_read_at(http_server, path):
+    _, base_url = http_server
+    reader = HttpReader(chunk_size=64 * 1024)
+
+    assert reader.read_at(f"{base_url}{path}", 100, 50) == CONTENT[100:150]
+    assert reader.read_at(f"{base_url}{path}", len(CONTENT) - 10) == CONTENT[-10:]
+    assert reader.read_at(f"{base_url}{path}", 0, 0) == b""
+
+
+def test_read_at_past_end(http_server):
+    _, base_url = http_server
+    assert HttpReader().read_at(f"{base_url}/file", len(CONTENT) + 1, 10) == b""
+
+
+def test_read_to_file(http_server, tmp_path):
+    _, base_url = http_server
+    target = tmp_path / "sub" / "file.bin"
+
+    assert HttpReader().read_to_file(f"{base_url}/file", str(target)) == len(CONTENT)
+    assert target.read_bytes() == CONTENT
+    assert os.listdir(target.parent) == ["file.bin"]
+
+
+def test_retry_with_backoff(http_server):
+    server, base_url = http_server
+    reader = HttpReader(backoff_factor=0.01)
+
+    assert reader.read(f"{base_url}/flaky") == CONTENT
+    assert server.state["gets"] == 3
+
+
+def test_error_is_not_retried(http_server):
+    server, base_url = http_server
+    with pytest.raises(requests.HTTPError):
+        HttpReader(backoff_factor=0.01).read(f"{base_url}/missing")
+    assert server.state["gets"] == 1
+
+
+def test_cache_revalidates_with_etag(http_server, tmp_path):
+    server, base_url = http_server
+    reader = HttpReader(cache_dir=str(tmp_path))
+
+    assert reader.read(f"{base_url}/file") == CONTENT
+    assert reader.read(f"{base_url}/file") == CONTENT
+    assert server.state["not_modified"] == 1
+    assert len(list(tmp_path.glob("*.data"))) == 1
+
+    # 没有 ETag 的响应不缓存
+    assert reader.read(f"{base_url}/no-range") == CONTENT
+    assert len(list(tmp_path.glob("*.data"))) == 1
+
+
+def test_write_and_write_file(http_server, tmp_path):
+    server, base_url = http_server
+    local_file = tmp_path / "upload.bin"
+    local_file.write_bytes(CONTENT)
+
+    with HttpWriter(backoff_factor=0.01) as writer:
+        writer.write(f"{base_url}/upload", b"hello")
+        writer.write_file(f"{base_url}/flaky", str(local_file))
+
+    posts = server.state["posts"]
+    headers, data = _uploaded_file(*posts[0])
+    assert b'name="file"' in headers and data == b"hello"
+    # 失败后重试会重新发送完整文件
+    assert len(posts) == 3
+    for content_type, body in posts[1:]:
+        headers, data = _uploaded_file(content_type, body)
+        assert b'filename="upload.bin"' in headers and data == CONTENT
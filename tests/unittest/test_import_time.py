@@ -0,0 +1,75 @@
+# Copyright (c) Opendatalab. All rights reserved.
+import os
+import subprocess
+import sys
+
+# 导入耗时预算(毫秒)，可通过环境变量 MINERU_IMPORT_TIME_BUDGET_MS 调整
+IMPORT_TIME_BUDGET_MS = int(os.getenv("MINERU_IMPORT_TIME_BUDGET_MS", 1500))
+
+# 在 CLI 启动阶段不应被导入的重量级模块
+HEAVY_MODULES = [
+    "torch",
+    "transformers",
+    "ultralytics",
+    "doclayout_yolo",
+    "onnxruntime",
+    "mineru_vl_utils",
+    "modelscope",
+    "huggingface_hub",
+    "boto3",
+    "magika",
+    "pypdfium2",
+    "mineru.backend.vlm.vlm_analyze",
+    "mineru.utils.draw_bbox",
+]
+
+
+def import_time_report(module_name: str) -> dict[str, int]:
+    """在独立解释器中用 `-X importtime` 导入模块，返回 {模块名: 累计耗时(us)}"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    report = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        report[name.strip()] = int(cumulative)
+    return report
+
+
+def test_cli_import_time_budget():
+    report = import_time_report("mineru.cli.client")
+    cost_ms = report["mineru.cli.client"] / 1000
+    assert cost_ms < IMPORT_TIME_BUDGET_MS, f"mineru.cli.client import cost {cost_ms:.0f}ms"
+
+
+def test_cli_import_is_lazy():
+    report = import_time_report("mineru.cli.client")
+    loaded = [name for name in HEAVY_MODULES if name in report]
+    assert not loaded, f"heavy modules imported at cli startup: {loaded}"
+
+
+def test_pipeline_model_init_import_is_lazy():
+    report = import_time_report("mineru.backend.pipeline.model_init")
+    loaded = [name for name in HEAVY_MODULES if name in report]
+    assert not loaded, f"heavy modules imported by model_init: {loaded}"
+
+
+def test_npu_device_mode_imports_torch_npu(tmp_path, monkeypatch):
+    # torch_npu 导入时注册 torch.npu，延迟导入后选择 npu 设备时仍需导入
+    (tmp_path / "torch_npu.py").write_text("REGISTERED = True\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "torch_npu", raising=False)
+    monkeypatch.setenv("MINERU_DEVICE_MODE", "npu:0")
+    from mineru.utils.config_reader import get_device, import_torch_npu
+
+    import_torch_npu.cache_clear()
+    try:
+        assert get_device() == "npu:0"
+        assert sys.modules["torch_npu"].REGISTERED
+    finally:
+        import_torch_npu.cache_clear()
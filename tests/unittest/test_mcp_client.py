@@ -0,0 +1,157 @@
+# Copyright (c) Opendatalab. All rights reserved.
+import asyncio
+import importlib
+import importlib.machinery
+import importlib.util
+import io
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("dotenv")
+web = pytest.importorskip("aiohttp.web")
+from aiohttp.test_utils import TestServer
+
+MCP_SRC = Path(__file__).resolve().parents[2] / "projects" / "mcp" / "src" / "mineru"
+
+
+@pytest.fixture(scope="module")
+def mcp_api():
+    # mcp 项目的包名同样是 mineru，以别名加载避免与主包冲突
+    spec = importlib.machinery.ModuleSpec("mineru_mcp", None, is_package=True)
+    spec.submodule_search_locations = [str(MCP_SRC)]
+    sys.modules["mineru_mcp"] = importlib.util.module_from_spec(spec)
+    try:
+        yield importlib.import_module("mineru_mcp.api")
+    finally:
+        for name in [name for name in sys.modules if name.split(".")[0] == "mineru_mcp"]:
+            del sys.modules[name]
+
+
+@pytest.fixture
+def fast_polling(mcp_api, monkeypatch):
+    monkeypatch.setattr(mcp_api.config, "POLL_MIN_INTERVAL", 0.01)
+    monkeypatch.setattr(mcp_api.config, "POLL_MAX_INTERVAL", 0.05)
+
+
+def _zip_bytes(name):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        zf.writestr("full.md", f"# {name}\n" + "x" * (256 * 1024))
+    return buffer.getvalue()
+
+
+def _mock_app(state):
+    """模拟 MinerU 远程 API：每个文件在若干次状态查询后完成"""
+
+    def track(request):
+        state["peers"].add(request.transport.get_extra_info("peername"))
+
+    async def submit(request):
+        track(request)
+        payload = await request.json()
+        batch_id = f"batch-{len(state['batches'])}"
+        state["batches"][batch_id] = {"files": [f["url"].split("/")[-1] for f in payload["files"]], "polls": 0}
+        return web.json_response({"data": {"batch_id": batch_id}})
+
+    async def status(request):
+        track(request)
+        batch = state["batches"][request.match_info["batch_id"]]
+        batch["polls"] += 1
+        state["status_requests"].append(request.match_info["batch_id"])
+        base = f"http://{request.host}"
+        extract_result = []
+        for name in batch["files"]:
+            if batch["polls"] >= 3:
+                extract_result.append({"file_name": name, "state": "done", "full_zip_url": f"{base}/zips/{name}.zip"})
+            else:
+                extract_result.append({
+                    "file_name": name, "state": "running",
+                    "extract_progress": {"extracted_pages": batch["polls"], "total_pages": 3},
+                })
+        return web.json_response({"data": {"extract_result": extract_result}})
+
+    async def download(request):
+        track(request)
+        data = _zip_bytes(request.match_info["name"])
+        response = web.StreamResponse()
+        response.content_length = len(data)
+        await response.prepare(request)
+        for start in range(0, len(data), 64 * 1024):
+            await response.write(data[start:start + 64 * 1024])
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_post("/api/v4/extract/task/batch", submit)
+    app.router.add_get("/api/v4/extract-results/batch/{batch_id}", status)
+    app.router.add_get("/zips/{name}.zip", download)
+    return app
+
+
+def _new_client(mcp_api, api_base):
+    # MinerUClient 是单例工厂，测试直接构造底层类的新实例
+    client_cls = type(mcp_api.MinerUClient(api_key="test"))
+    return client_cls(api_base=api_base, api_key="test")
+
+
+def test_batches_share_pooled_session_and_poll_rounds(mcp_api, fast_polling, tmp_path):
+    state = {"batches": {}, "peers": set(), "status_requests": []}
+
+    async def scenario():
+        server = TestServer(_mock_app(state))
+        await server.start_server()
+        client = _new_client(mcp_api, str(server.make_url("")).rstrip("/"))
+        try:
+            urls = [[f"https://example.com/doc{i}-{j}.pdf" for j in range(3)] for i in range(2)]
+            return await asyncio.gather(*(
+                client.process_file_to_markdown(client.submit_file_url_task, batch_urls, output_dir=str(tmp_path))
+                for batch_urls in urls
+            ))
+        finally:
+            await client.aclose()
+            await server.close()
+
+    results = asyncio.run(scenario())
+
+    for result in results:
+        assert result["success_count"] == 3
+        for item in result["results"]:
+            assert item["status"] == "success"
+            assert item["content"].startswith(f"# {Path(item['extract_path']).name}")
+    # 两个批次在同一轮中查询，每个批次恰好查询到完成为止
+    assert state["status_requests"].count("batch-0") == state["status_requests"].count("batch-1") == 3
+    # 2次提交 + 6次状态查询 + 6次下载共用连接池中的少量连接
+    assert len(state["peers"]) <= 6
+
+
+def test_poller_backoff_and_reset(mcp_api):
+    async def scenario(changing):
+        loop = asyncio.get_running_loop()
+        rounds = []
+
+        async def fetch(batch_id):
+            if not rounds or loop.time() - rounds[-1] > 0.003:
+                rounds.append(loop.time())
+            state = f"running-{len(rounds)}" if changing else "running"
+            return {"data": {"extract_result": [{"file_name": batch_id, "state": state}]}}
+
+        poller = mcp_api.BatchStatusPoller(fetch, 0.01, 0.08)
+
+        async def wait(batch_id):
+            for _ in range(6):
+                await poller.wait_status(batch_id)
+
+        start = loop.time()
+        await asyncio.gather(wait("a"), wait("b"))
+        return [t - s for s, t in zip([start] + rounds, rounds)]
+
+    # 两个批次合并为 6 轮查询；无进展时间隔指数增长（有抖动），有进展时保持最小间隔
+    idle_gaps = asyncio.run(scenario(changing=False))
+    assert len(idle_gaps) == 6
+    assert idle_gaps[-1] >= 0.04 > idle_gaps[0]
+    busy_gaps = asyncio.run(scenario(changing=True))
+    assert len(busy_gaps) == 6
+    assert max(busy_gaps) < 0.04
@@ -0,0 +1,140 @@
+# Copyright (c) Opendatalab. All rights reserved.
+import os
+import subprocess
+import sys
+from io import BytesIO
+from pathlib import Path
+
+import pypdfium2 as pdfium
+import pytest
+
+from mineru.data.data_reader_writer import FileBasedDataReader
+from mineru.utils.pdf_classify import classify, extract_pages
+from mineru.utils.pdf_image_tools import load_images_from_pdf
+from mineru.utils.pdf_reader import PdfDocumentHandle, open_pdf_stream, pdf_worker_source
+
+MB = 1024 * 1024
+
+
+def _write_pdf(path, page_num=3, attachment_size=0):
+    """生成测试PDF，attachment_size 大于0时附带一个不会被解析流程读取的大附件，模拟大文件"""
+    pdf = pdfium.PdfDocument.new()
+    for i in range(page_num):
+        pdf.new_page(300 + i, 400)
+    output = BytesIO()
+    pdf.save(output)
+    pdf.close()
+    if attachment_size:
+        from pypdf import PdfReader, PdfWriter
+        writer = PdfWriter(clone_from=PdfReader(output))
+        writer.add_attachment("blob.bin", os.urandom(attachment_size))
+        output = BytesIO()
+        writer.write(output)
+    path.write_bytes(output.getvalue())
+    return path
+
+
+def test_mmap_reader_returns_memoryview(tmp_path):
+    data = os.urandom(4096)
+    (tmp_path / "data.bin").write_bytes(data)
+    (tmp_path / "empty.bin").write_bytes(b"")
+    reader = FileBasedDataReader(str(tmp_path), use_mmap=True)
+
+    view = reader.read("data.bin")
+    assert isinstance(view, memoryview) and view == data
+    assert reader.read_at("data.bin", 100, 50) == data[100:150]
+    assert reader.read_at("data.bin", 4000) == data[4000:]
+    assert reader.read("empty.bin") == b""
+    # 默认模式仍返回 bytes
+    assert FileBasedDataReader(str(tmp_path)).read("data.bin") == data
+
+
+def test_pdf_handle_from_mmap_and_path(tmp_path):
+    pdf_path = _write_pdf(tmp_path / "doc.pdf")
+    view = FileBasedDataReader(use_mmap=True).read(str(pdf_path))
+
+    handle = PdfDocumentHandle(view)
+    assert handle.page_count == 3
+    assert len(handle.pypdf_reader.pages) == 3
+    # 未截取页码区间时不复制数据
+    assert handle.to_bytes() is view
+    assert extract_pages(handle) is view
+    assert classify(handle) == "ocr"
+    handle.close()
+
+    handle = PdfDocumentHandle(pdf_path, 1, 1)
+    assert isinstance(handle.pdf_bytes, memoryview)
+    assert len(pdfium.PdfDocument(handle.to_bytes())) == 1
+    handle.close()
+
+
+def test_stream_and_worker_source(tmp_path):
+    pdf_path = _write_pdf(tmp_path / "doc.pdf")
+    view = FileBasedDataReader(use_mmap=True).read(str(pdf_path))
+
+    stream = open_pdf_stream(view)
+    stream.seek(-5, os.SEEK_END)
+    assert stream.read() == pdf_path.read_bytes()[-5:]
+    # 完整映射向子进程传递路径，切片和 bytes 传递数据
+    assert pdf_worker_source(view) == pdf_path.resolve()
+    assert pdf_worker_source(view[:10]) == pdf_path.read_bytes()[:10]
+    assert pdf_worker_source(b"%PDF") == b"%PDF"
+
+
+def test_load_images_from_mmap(tmp_path):
+    pdf_path = _write_pdf(tmp_path / "doc.pdf")
+    view = FileBasedDataReader(use_mmap=True).read(str(pdf_path))
+
+    images, pdf_doc = load_images_from_pdf(view, dpi=72, threads=2)
+    expected, expected_doc = load_images_from_pdf(pdf_path.read_bytes(), dpi=72, threads=2)
+    assert [image["img_pil"].size for image in images] == [image["img_pil"].size for image in expected]
+    assert [image["img_id"] for image in images] == [image["img_id"] for image in expected]
+    pdf_doc.close()
+    expected_doc.close()
+
+
+_PEAK_RSS_SCRIPT = r"""
+import re
+import sys
+
+from mineru.cli.common import convert_pdf_bytes_to_bytes_by_pypdfium2
+from mineru.data.data_reader_writer import FileBasedDataReader
+from mineru.utils.pdf_classify import classify
+from mineru.utils.pdf_reader import PdfDocumentHandle
+
+
+def peak_rss_kb():
+    with open("/proc/self/status") as f:
+        return int(re.search(r"VmHWM:\s+(\d+)", f.read()).group(1))
+
+
+# 重置峰值内存统计，只统计读取和解析阶段
+with open("/proc/self/clear_refs", "w") as f:
+    f.write("5")
+base = peak_rss_kb()
+pdf_bytes = FileBasedDataReader(use_mmap=sys.argv[2] == "1").read(sys.argv[1])
+pdf_bytes = convert_pdf_bytes_to_bytes_by_pypdfium2(pdf_bytes)
+handle = PdfDocumentHandle(pdf_bytes)
+assert handle.page_count == len(handle.pypdf_reader.pages) == 2
+classify(handle)
+handle.close()
+print(peak_rss_kb() - base)
+"""
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/clear_refs"), reason="peak rss reset requires linux procfs")
+def test_mmap_peak_rss(tmp_path):
+    size = 64 * MB
+    pdf_path = _write_pdf(tmp_path / "large.pdf", page_num=2, attachment_size=size)
+    env = {**os.environ, "PYTHONPATH": str(Path(__file__).resolve().parents[2])}
+
+    def peak_rss(use_mmap):
+        result = subprocess.run(
+            [sys.executable, "-c", _PEAK_RSS_SCRIPT, str(pdf_path), "1" if use_mmap else "0"],
+            capture_output=True, text=True, env=env, check=True,
+        )
+        return int(result.stdout.strip().splitlines()[-1]) * 1024
+
+    # 读入内存时峰值至少包含整份文件，内存映射只加载实际访问到的页
+    assert peak_rss(False) > size * 0.9
+    assert peak_rss(True) < size * 0.25
@@ -0,0 +1,181 @@
+# Copyright (c) Opendatalab. All rights reserved.
+from collections import OrderedDict
+
+import pytest
+
+from mineru.backend.pipeline import model_init
+from mineru.backend.pipeline.model_init import AtomModelSingleton, MineruPipelineModel
+from mineru.backend.pipeline.model_list import AtomicModel
+
+
+@pytest.fixture
+def init_calls(monkeypatch):
+    """用轻量对象替换真实模型构造，记录每个原子模型的构造次数"""
+    calls = []
+
+    def fake_atom_model_init(model_name, **kwargs):
+        calls.append(model_name)
+        return object()
+
+    monkeypatch.setenv("MINERU_DEVICE_MODE", "cpu")
+    monkeypatch.setattr(model_init, "atom_model_init", fake_atom_model_init)
+    monkeypatch.setattr(AtomModelSingleton, "_models", OrderedDict())
+    monkeypatch.setattr(AtomModelSingleton, "_model_blocks", {})
+    # 每个模型按 100MB 计，OCR 阈值变体与基础模型共享这部分内存，变体自身另计 50MB
+    monkeypatch.setattr(model_init, "get_model_memory_blocks", _fake_memory_blocks)
+    return calls
+
+
+def _fake_memory_blocks(model):
+    base = getattr(model, "base", None)
+    if base is None:
+        return {id(model): 100 * 1024 ** 2}
+    return {id(base): 100 * 1024 ** 2, id(model): 50 * 1024 ** 2}
+
+
+class FakeOCR:
+    def with_det_params(self, det_db_box_thresh, det_db_unclip_ratio, enable_merge_det_boxes=True):
+        variant = FakeOCR()
+        variant.base = self
+        variant.det_params = (det_db_box_thresh, det_db_unclip_ratio, enable_merge_det_boxes)
+        return variant
+
+
+@pytest.fixture
+def ocr_init_calls(init_calls, monkeypatch):
+    """OCR 基础模型构造为 FakeOCR，其余阈值的 OCR 经 ocr_model_init 派生自基础模型"""
+    def fake_atom_model_init(model_name, **kwargs):
+        det_params = (
+            kwargs.get("det_db_box_thresh", 0.3),
+            kwargs.get("det_db_unclip_ratio", 1.8),
+            kwargs.get("enable_merge_det_boxes", True),
+        )
+        if model_name == AtomicModel.OCR and det_params != model_init.OCR_BASE_DET_PARAMS:
+            return model_init.ocr_model_init(det_params[0], kwargs.get("lang"), det_params[1], det_params[2])
+        init_calls.append(model_name)
+        return FakeOCR() if model_name == AtomicModel.OCR else object()
+
+    monkeypatch.setattr(model_init, "atom_model_init", fake_atom_model_init)
+    return init_calls
+
+
+def _pipeline_model(formula_enable, table_enable, lang=None):
+    return MineruPipelineModel(
+        device="cpu",
+        lang=lang,
+        formula_config={"enable": formula_enable},
+        table_config={"enable": table_enable},
+    )
+
+
+def test_pipeline_model_init_is_lazy(init_calls):
+    model = _pipeline_model(True, True)
+    assert init_calls == []
+
+    model.layout_model
+    assert init_calls == [AtomicModel.Layout]
+
+
+def test_atom_models_shared_across_option_combinations(init_calls):
+    model_a = _pipeline_model(True, True)
+    model_b = _pipeline_model(False, False)
+
+    assert model_a.layout_model is model_b.layout_model
+    assert model_a.ocr_model is model_b.ocr_model
+    assert init_calls.count(AtomicModel.Layout) == 1
+    assert init_calls.count(AtomicModel.OCR) == 1
+
+
+def test_atom_model_cache_unbounded_by_default(init_calls, monkeypatch):
+    monkeypatch.delenv("MINERU_MODEL_CACHE_BUDGET_MB", raising=False)
+    manager = AtomModelSingleton()
+    for lang in ["ch", "en", "korean", "japan"]:
+        manager.get_atom_model(atom_model_name=AtomicModel.OCR, lang=lang)
+    assert len(manager._models) == 4
+
+
+def test_atom_model_cache_lru_eviction(init_calls, monkeypatch):
+    monkeypatch.setenv("MINERU_MODEL_CACHE_BUDGET_MB", "250")
+    manager = AtomModelSingleton()
+
+    ch_model = manager.get_atom_model(atom_model_name=AtomicModel.OCR, lang="ch")
+    manager.get_atom_model(atom_model_name=AtomicModel.OCR, lang="en")
+    # 访问 ch 使 en 成为最久未使用的模型
+    assert manager.get_atom_model(atom_model_name=AtomicModel.OCR, lang="ch") is ch_model
+    manager.get_atom_model(atom_model_name=AtomicModel.OCR, lang="korean")
+
+    cached_langs = [key[2] for key in manager._models]
+    assert cached_langs == ["ch", "korean"]
+    assert manager.get_memory_usage() <= 250 * 1024 ** 2
+
+    # 被淘汰的模型再次请求时重新构造
+    manager.get_atom_model(atom_model_name=AtomicModel.OCR, lang="en")
+    assert init_calls.count(AtomicModel.OCR) == 4
+
+
+def test_ocr_threshold_variants_share_base_model(ocr_init_calls):
+    init_calls = ocr_init_calls
+    manager = AtomModelSingleton()
+
+    base = manager.get_atom_model(atom_model_name=AtomicModel.OCR, det_db_box_thresh=0.3, lang="en")
+    table_ocr = manager.get_atom_model(
+        atom_model_name=AtomicModel.OCR,
+        det_db_box_thresh=0.5,
+        det_db_unclip_ratio=1.6,
+        lang="en",
+        enable_merge_det_boxes=False,
+    )
+
+    assert table_ocr.base is base
+    assert table_ocr.det_params == (0.5, 1.6, False)
+    assert init_calls == [AtomicModel.OCR]
+
+
+def test_atom_model_cache_keeps_base_shared_with_new_variant(ocr_init_calls, monkeypatch):
+    monkeypatch.setenv("MINERU_MODEL_CACHE_BUDGET_MB", "200")
+    manager = AtomModelSingleton()
+
+    base = manager.get_atom_model(atom_model_name=AtomicModel.OCR, lang="en")
+    manager.get_atom_model(atom_model_name=AtomicModel.Layout)
+    # 基础模型位于 LRU 队首，但与刚加载的变体共享权重，淘汰它不会释放内存
+    variant = manager.get_atom_model(atom_model_name=AtomicModel.OCR, det_db_box_thresh=0.5, lang="en")
+
+    assert variant.base is base
+    assert [key[0] for key in manager._models] == [AtomicModel.OCR, AtomicModel.OCR]
+    assert manager.get_memory_usage() == 150 * 1024 ** 2
+    assert manager.get_atom_model(atom_model_name=AtomicModel.OCR, lang="en") is base
+    assert ocr_init_calls == [AtomicModel.OCR, AtomicModel.Layout]
+
+
+def test_atom_model_cache_evicts_base_with_its_variants(ocr_init_calls, monkeypatch):
+    monkeypatch.setenv("MINERU_MODEL_CACHE_BUDGET_MB", "300")
+    manager = AtomModelSingleton()
+
+    manager.get_atom_model(atom_model_name=AtomicModel.OCR, lang="en")
+    manager.get_atom_model(atom_model_name=AtomicModel.OCR, det_db_box_thresh=0.5, lang="en")
+    manager.get_atom_model(atom_model_name=AtomicModel.Layout)
+    manager.get_atom_model(atom_model_name=AtomicModel.MFD)
+
+    # 基础模型和变体一同淘汰，释放 150MB
+    assert [key[0] for key in manager._models] == [AtomicModel.Layout, AtomicModel.MFD]
+    assert manager.get_memory_usage() == 200 * 1024 ** 2
+
+
+def test_onnx_sessions_counted_by_model_file_size(tmp_path):
+    ort = pytest.importorskip("onnxruntime")
+    from mineru.utils.model_utils import get_model_memory_blocks, get_model_memory_size
+
+    model_file = tmp_path / "table.onnx"
+    model_file.write_bytes(b"\0" * 4096)
+    # 只需会话对象的类型和模型路径，不加载真实模型
+    session = object.__new__(ort.InferenceSession)
+    session._model_path = str(model_file)
+
+    class TableModel:
+        def __init__(self):
+            self.session = session
+
+    wired, wireless = TableModel(), TableModel()
+    assert sum(get_model_memory_blocks(wired).values()) == 4096
+    # 共享同一个会话的模型只计算一次
+    assert get_model_memory_size(wired, wireless) == 4096
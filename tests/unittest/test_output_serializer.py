@@ -0,0 +1,94 @@
+# Copyright (c) Opendatalab. All rights reserved.
+import json
+import os
+import time
+import tracemalloc
+
+import pytest
+from loguru import logger
+
+from mineru.data.data_reader_writer import DataWriter, FileBasedDataWriter
+from mineru.utils.output_serializer import artifact_enabled, dump_json, find_output_file, read_output_text
+
+
+def _middle_json(page_num):
+    span = {"type": "text", "bbox": [10, 20, 300, 40], "content": "中文 text 内容", "score": 0.98}
+    block = {"type": "text", "bbox": [10, 20, 300, 80], "lines": [{"bbox": [10, 20, 300, 40], "spans": [span]}] * 3}
+    return {
+        "pdf_info": [{"page_idx": i, "page_size": [612, 792], "para_blocks": [block] * 20} for i in range(page_num)],
+        "_backend": "pipeline",
+    }
+
+
+class MemoryDataWriter(DataWriter):
+    def __init__(self):
+        self.files = {}
+
+    def write(self, path: str, data: bytes) -> None:
+        self.files[path] = data
+
+
+def test_pretty_output_matches_json_dumps(tmp_path):
+    obj = _middle_json(2)
+    file_name = dump_json(FileBasedDataWriter(str(tmp_path)), "doc_middle.json", obj, compact=False, compression="")
+
+    assert file_name == "doc_middle.json"
+    assert (tmp_path / file_name).read_text(encoding="utf-8") == json.dumps(obj, ensure_ascii=False, indent=4)
+
+
+@pytest.mark.parametrize("compression", ["", "gzip"])
+def test_compact_output_round_trip(tmp_path, compression):
+    obj = _middle_json(2)
+    dump_json(FileBasedDataWriter(str(tmp_path)), "doc_middle.json", obj, compact=True, compression=compression)
+
+    path = find_output_file(str(tmp_path), "doc_middle.json")
+    assert path.endswith(".gz") == (compression == "gzip")
+    text = read_output_text(path)
+    assert "\n" not in text
+    assert json.loads(text) == obj
+
+
+def test_non_file_writer_receives_bytes():
+    writer = MemoryDataWriter()
+    obj = _middle_json(1)
+    file_name = dump_json(writer, "doc_model.json", obj, compact=False, compression="gzip")
+
+    assert file_name == "doc_model.json.gz"
+    import gzip
+    assert json.loads(gzip.decompress(writer.files[file_name])) == obj
+
+
+def test_artifact_set_from_env(monkeypatch):
+    monkeypatch.delenv("MINERU_OUTPUT_ARTIFACTS", raising=False)
+    assert artifact_enabled("middle_json")
+    monkeypatch.setenv("MINERU_OUTPUT_ARTIFACTS", "md, content_list")
+    assert artifact_enabled("md") and artifact_enabled("content_list")
+    assert not artifact_enabled("middle_json") and not artifact_enabled("model_output")
+
+
+@pytest.mark.skipif(
+    os.getenv("MINERU_OUTPUT_SERIALIZE_BENCH") is None,
+    reason="set MINERU_OUTPUT_SERIALIZE_BENCH=1 to benchmark output serialization on a large document",
+)
+def test_output_serialization_benchmark(tmp_path):
+    obj = _middle_json(int(os.getenv("MINERU_OUTPUT_SERIALIZE_BENCH_PAGES", 1000)))
+    writer = FileBasedDataWriter(str(tmp_path))
+
+    def measure(fn):
+        tracemalloc.start()
+        start = time.time()
+        fn()
+        cost = time.time() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return cost, peak / 1024 ** 2
+
+    # 对照：旧实现先拼出完整的缩进字符串再写入
+    results = {
+        "indent dumps": measure(lambda: writer.write_string("old.json", json.dumps(obj, ensure_ascii=False, indent=4))),
+        "pretty": measure(lambda: dump_json(writer, "pretty.json", obj, compact=False, compression="")),
+        "compact": measure(lambda: dump_json(writer, "compact.json", obj, compact=True, compression="")),
+        "compact+gzip": measure(lambda: dump_json(writer, "compact.json", obj, compact=True, compression="gzip")),
+    }
+    for name, (cost, peak) in results.items():
+        logger.info(f"{name}: {cost:.2f}s, peak {peak:.1f}MB")
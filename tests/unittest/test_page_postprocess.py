@@ -0,0 +1,100 @@
+# Copyright (c) Opendatalab. All rights reserved.
+import copy
+import os
+from io import BytesIO
+
+import pypdfium2 as pdfium
+import pytest
+
+from mineru.backend.pipeline import model_json_to_middle_json
+from mineru.data.data_reader_writer import FileBasedDataWriter
+from mineru.utils.check_sys_env import is_windows_environment
+from mineru.utils.enum_class import CategoryId
+from mineru.utils.pdf_image_tools import load_images_from_pdf
+
+
+def _poly(x0, y0, x1, y1):
+    return [x0, y0, x1, y0, x1, y1, x0, y1]
+
+
+def _page_model_info(page_index, width, height):
+    """每页一个图片区块和一个带OCR文本的文本区块"""
+    return {
+        "layout_dets": [
+            {"category_id": CategoryId.ImageBody, "poly": _poly(100, 100, width // 2, height // 3), "score": 0.9},
+            {"category_id": CategoryId.Text, "poly": _poly(100, height // 2, width - 100, height // 2 + 60), "score": 0.9},
+            {
+                "category_id": CategoryId.OcrText,
+                "poly": _poly(100, height // 2, width - 100, height // 2 + 60),
+                "score": 0.9,
+                "text": f"page {page_index}",
+            },
+        ],
+        "page_info": {"page_no": page_index, "width": width, "height": height},
+    }
+
+
+@pytest.mark.skipif(is_windows_environment(), reason="page post-processing runs sequentially on windows")
+def test_parallel_page_blocks_match_sequential(tmp_path):
+    pdf_path = os.path.join(os.path.dirname(__file__), "pdfs", "test.pdf")
+    with open(pdf_path, "rb") as f:
+        pdf_bytes = f.read()
+    images_list, pdf_doc = load_images_from_pdf(pdf_bytes, threads=1)
+    model_list = [
+        _page_model_info(index, *image_dict["img_pil"].size) for index, image_dict in enumerate(images_list)
+    ]
+
+    sequential = [
+        model_json_to_middle_json.page_model_info_to_page_blocks(
+            copy.deepcopy(page_model_info), images_list[index], pdf_doc[index],
+            FileBasedDataWriter(str(tmp_path / "sequential")), index, ocr_enable=True
+        )
+        for index, page_model_info in enumerate(model_list)
+    ]
+    # 原始PDF数据经共享内存传递，文件路径由子进程直接打开；两次调用复用同一个进程池
+    for name, pdf_source in [("parallel_bytes", pdf_bytes), ("parallel_path", pdf_path)]:
+        parallel = model_json_to_middle_json._pages_to_page_blocks_parallel(
+            copy.deepcopy(model_list), images_list, pdf_source,
+            FileBasedDataWriter(str(tmp_path / name)), True, True, workers=2
+        )
+        assert parallel == sequential
+        assert len(os.listdir(tmp_path / name)) > 0
+        assert sorted(os.listdir(tmp_path / name)) == sorted(os.listdir(tmp_path / "sequential"))
+    pdf_doc.close()
+
+
+@pytest.mark.skipif(is_windows_environment(), reason="page post-processing runs sequentially on windows")
+def test_parallel_page_blocks_reopen_rewritten_path(tmp_path):
+    """常驻进程池的子进程不会沿用同一路径上被改写前的文档"""
+    with open(os.path.join(os.path.dirname(__file__), "pdfs", "test.pdf"), "rb") as f:
+        text_pdf = f.read()
+    blank = pdfium.PdfDocument.new()
+    blank.new_page(612, 792)
+    output = BytesIO()
+    blank.save(output)
+    blank.close()
+
+    pdf_path = tmp_path / "doc.pdf"
+    results = []
+    for name, pdf_bytes in [("text", text_pdf), ("blank", output.getvalue())]:
+        pdf_path.write_bytes(pdf_bytes)
+        images_list, pdf_doc = load_images_from_pdf(pdf_bytes, threads=1)
+        model_list = [
+            _page_model_info(index, *image_dict["img_pil"].size) for index, image_dict in enumerate(images_list)
+        ]
+        # 不启用 OCR 时文本从PDF页面中提取
+        sequential = [
+            model_json_to_middle_json.page_model_info_to_page_blocks(
+                copy.deepcopy(page_model_info), images_list[index], pdf_doc[index],
+                FileBasedDataWriter(str(tmp_path / f"{name}_sequential")), index, ocr_enable=False
+            )
+            for index, page_model_info in enumerate(model_list)
+        ]
+        parallel = model_json_to_middle_json._pages_to_page_blocks_parallel(
+            copy.deepcopy(model_list), images_list, pdf_path,
+            FileBasedDataWriter(str(tmp_path / f"{name}_parallel")), False, True, workers=2
+        )
+        pdf_doc.close()
+        assert parallel == sequential
+        results.append(sequential)
+    assert results[0] != results[1]
@@ -0,0 +1,95 @@
+# Copyright (c) Opendatalab. All rights reserved.
+import copy
+import json
+import os
+import time
+import tracemalloc
+
+import pytest
+from loguru import logger
+
+from mineru.backend.pipeline.para_split import para_split
+from mineru.utils.enum_class import BlockType, ContentType, SplitFlag
+from mineru.utils.language import detect_lang, detect_lang_batch
+
+
+def _text_block(y0, texts, x0=50, x1=550):
+    lines = []
+    for i, text in enumerate(texts):
+        bbox = [x0, y0 + i * 14, x1, y0 + i * 14 + 12]
+        lines.append({"bbox": bbox, "spans": [{"type": ContentType.TEXT, "bbox": bbox, "content": text, "score": 1.0}]})
+    return {"type": BlockType.TEXT, "bbox": [x0, y0, x1, y0 + len(texts) * 14], "lines": lines}
+
+
+def _make_doc(page_num):
+    pdf_info = []
+    for page_idx in range(page_num):
+        blocks = [
+            _text_block(50, ["and this paragraph starts on the page", "continues until the bottom of the page and"]),
+            {"type": BlockType.TITLE, "bbox": [50, 100, 550, 112], "lines": []},
+            _text_block(120, ["A paragraph under the title", "with four lines of text", "that are all flush on", "both sides of the block."]),
+            _text_block(700, ["The last paragraph runs over", "the page border and goes on"]),
+        ]
+        pdf_info.append({"preproc_blocks": blocks, "page_idx": page_idx, "page_size": [612, 792], "discarded_blocks": []})
+    return pdf_info
+
+
+def test_para_split_keeps_preproc_blocks():
+    pdf_info = _make_doc(3)
+    preproc_before = json.dumps([page_info["preproc_blocks"] for page_info in pdf_info], sort_keys=True)
+
+    para_split(pdf_info)
+
+    assert json.dumps([page_info["preproc_blocks"] for page_info in pdf_info], sort_keys=True) == preproc_before
+    for page_info in pdf_info:
+        assert len(page_info["para_blocks"]) == len(page_info["preproc_blocks"])
+        for block in page_info["para_blocks"]:
+            assert "page_num" not in block and "page_size" not in block
+
+
+def test_para_split_merges_across_pages():
+    pdf_info = _make_doc(2)
+    para_split(pdf_info)
+
+    # 第二页的首段接在第一页末段之后
+    first_page_last = pdf_info[0]["para_blocks"][-1]
+    second_page_first = pdf_info[1]["para_blocks"][0]
+    assert second_page_first.get(SplitFlag.LINES_DELETED) is True
+    assert second_page_first["lines"] == []
+    assert len(first_page_last["lines"]) == 4
+    assert first_page_last["lines"][-1]["spans"][0].get(SplitFlag.CROSS_PAGE) is True
+    # 原始span不会被打上跨页标记
+    assert SplitFlag.CROSS_PAGE not in pdf_info[1]["preproc_blocks"][0]["lines"][0]["spans"][0]
+
+
+def test_detect_lang_batch_matches_detect_lang():
+    text_list = ["This is a test.", "这个是中文测试。", "", "This is a test.", "こんにちは世界", "Bonjour le monde"]
+    assert detect_lang_batch(text_list) == [detect_lang(text) for text in text_list]
+
+
+@pytest.mark.skipif(
+    os.getenv("MINERU_PARA_SPLIT_BENCH") is None,
+    reason="set MINERU_PARA_SPLIT_BENCH=1 to benchmark para_split on a long document",
+)
+def test_para_split_long_document_benchmark():
+    pdf_info = _make_doc(int(os.getenv("MINERU_PARA_SPLIT_BENCH_PAGES", 1000)))
+
+    # 对照：旧实现先deepcopy整个文档
+    tracemalloc.start()
+    start = time.time()
+    copy.deepcopy([page_info["preproc_blocks"] for page_info in pdf_info])
+    deepcopy_cost = time.time() - start
+    _, deepcopy_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    start = time.time()
+    para_split(pdf_info)
+    cost = time.time() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    logger.info(
+        f"{len(pdf_info)} pages, para_split: {cost:.2f}s, peak {peak / 1024 ** 2:.1f}MB; "
+        f"document deepcopy alone: {deepcopy_cost:.2f}s, peak {deepcopy_peak / 1024 ** 2:.1f}MB"
+    )
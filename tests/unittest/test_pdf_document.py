@@ -0,0 +1,114 @@
+# Copyright (c) Opendatalab. All rights reserved.
+import os
+import time
+from io import BytesIO
+
+import pypdfium2 as pdfium
+import pytest
+from loguru import logger
+from PIL import Image
+
+from mineru.utils.pdf_classify import classify, extract_pages
+from mineru.utils.pdf_reader import PdfDocumentHandle
+
+
+def _blank_pdf(page_num):
+    pdf = pdfium.PdfDocument.new()
+    for i in range(page_num):
+        pdf.new_page(300 + i, 400)
+    output = BytesIO()
+    pdf.save(output)
+    pdf.close()
+    return output.getvalue()
+
+
+def _scanned_pdf(page_num, size=(1240, 1754)):
+    """每页一张整页图片，模拟扫描件"""
+    images = [Image.effect_noise(size, 64 + i % 32).convert("RGB") for i in range(min(page_num, 8))]
+    output = BytesIO()
+    images[0].save(output, format="PDF", save_all=True,
+                   append_images=[images[i % len(images)] for i in range(1, page_num)])
+    return output.getvalue()
+
+
+def test_full_range_is_not_reserialized():
+    pdf_bytes = _blank_pdf(3)
+    handle = PdfDocumentHandle(pdf_bytes)
+
+    assert handle.is_full_document()
+    assert handle.to_bytes() is pdf_bytes
+    handle.close()
+
+
+def test_page_range_view():
+    pdf_bytes = _blank_pdf(6)
+    handle = PdfDocumentHandle(pdf_bytes, start_page_id=2, end_page_id=4)
+
+    assert list(handle.page_range()) == [2, 3, 4]
+    assert [int(page.get_width()) for page in handle.pages()] == [302, 303, 304]
+
+    sliced = pdfium.PdfDocument(handle.to_bytes())
+    assert [int(sliced[i].get_width()) for i in range(len(sliced))] == [302, 303, 304]
+    sliced.close()
+    handle.close()
+
+
+def test_out_of_range_end_page_uses_last_page():
+    handle = PdfDocumentHandle(_blank_pdf(4), end_page_id=99)
+
+    assert handle.end_page_id == 3
+    assert handle.is_full_document()
+    handle.close()
+
+
+def test_classify_reuses_handle():
+    pdf_bytes = _blank_pdf(3)
+    handle = PdfDocumentHandle(pdf_bytes)
+    pdf_doc = handle.pdf_doc
+
+    # 不超过10页时抽样结果就是原始数据
+    assert extract_pages(handle) is pdf_bytes
+    assert classify(handle) == classify(pdf_bytes) == "ocr"
+    # 传入的句柄不会被关闭，仍可继续使用
+    assert handle.pdf_doc is pdf_doc
+    assert len(pdf_doc) == 3
+    handle.close()
+
+
+def test_extract_pages_samples_large_document():
+    sample = pdfium.PdfDocument(extract_pages(_blank_pdf(15)))
+    assert len(sample) == 10
+    sample.close()
+
+
+@pytest.mark.skipif(
+    os.getenv("MINERU_PDF_HANDLE_BENCH") is None,
+    reason="set MINERU_PDF_HANDLE_BENCH=1 to benchmark the document handle on a large scanned pdf",
+)
+def test_document_handle_benchmark():
+    pdf_bytes = _scanned_pdf(int(os.getenv("MINERU_PDF_HANDLE_BENCH_PAGES", 200)))
+    logger.info(f"scanned pdf size: {len(pdf_bytes) / 1024 ** 2:.1f}MB")
+
+    def old_style():
+        # 对照：旧实现即使不截取页码也重新序列化，并在分类时再次打开文档
+        pdf = pdfium.PdfDocument(pdf_bytes)
+        output_pdf = pdfium.PdfDocument.new()
+        output_pdf.import_pages(pdf, pages=list(range(len(pdf))))
+        output_buffer = BytesIO()
+        output_pdf.save(output_buffer)
+        output_pdf.close()
+        pdf.close()
+        new_bytes = output_buffer.getvalue()
+        classify(new_bytes)
+        pdfium.PdfDocument(new_bytes).close()
+
+    def handle_style():
+        handle = PdfDocumentHandle(pdf_bytes)
+        classify(handle)
+        assert handle.to_bytes() is pdf_bytes
+        handle.close()
+
+    for name, fn in [("re-serialize", old_style), ("document handle", handle_style)]:
+        start = time.time()
+        fn()
+        logger.info(f"{name}: {time.time() - start:.2f}s")
@@ -0,0 +1,105 @@
+# Copyright (c) Opendatalab. All rights reserved.
+import os
+import socket
+import time
+
+import pytest
+from loguru import logger
+
+pytest.importorskip("boto3")
+moto_server = pytest.importorskip("moto.server")
+
+from mineru.data.data_reader_writer import MultiBucketS3DataReader, MultiBucketS3DataWriter
+from mineru.data.io import S3Reader, S3Writer
+from mineru.data.utils.schemas import S3Config
+
+MB = 1024 * 1024
+AK, SK = "testing", "testing"
+
+
+@pytest.fixture(scope="module")
+def s3_endpoint():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = moto_server.ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+    server.start()
+    endpoint_url = f"http://127.0.0.1:{port}"
+
+    import boto3
+    client = boto3.client("s3", aws_access_key_id=AK, aws_secret_access_key=SK,
+                          endpoint_url=endpoint_url, region_name="us-east-1")
+    for bucket in ["bucket-a", "bucket-b"]:
+        client.create_bucket(Bucket=bucket)
+    yield endpoint_url
+    server.stop()
+
+
+def _small_parts(**kwargs):
+    return dict(part_size=5 * MB, multipart_threshold=6 * MB, max_concurrency=4, **kwargs)
+
+
+def test_small_object_round_trip(s3_endpoint):
+    writer = S3Writer("bucket-a", AK, SK, s3_endpoint, **_small_parts())
+    reader = S3Reader("bucket-a", AK, SK, s3_endpoint, **_small_parts())
+    writer.write("small.bin", b"0123456789")
+
+    assert reader.read("small.bin") == b"0123456789"
+    assert reader.read_at("small.bin", 3, 4) == b"3456"
+    assert reader.read_at("small.bin", 8) == b"89"
+    assert reader.read_at("small.bin", 3, 0) == b""
+
+
+def test_large_object_multipart_and_ranged_read(s3_endpoint):
+    data = os.urandom(17 * MB + 123)
+    writer = S3Writer("bucket-a", AK, SK, s3_endpoint, **_small_parts())
+    reader = S3Reader("bucket-a", AK, SK, s3_endpoint, **_small_parts())
+    writer.write("large.bin", data)
+
+    head = writer._s3_client.head_object(Bucket="bucket-a", Key="large.bin")
+    # 分段上传的对象 ETag 带有分段数后缀
+    assert head["ETag"].strip('"').endswith("-4")
+    assert reader.read("large.bin") == data
+    assert reader.read_at("large.bin", 3 * MB, 8 * MB) == data[3 * MB:11 * MB]
+    assert reader.read_at("large.bin", 12 * MB) == data[12 * MB:]
+    assert reader.read_at("large.bin", 16 * MB, 10 * MB) == data[16 * MB:]
+
+
+def test_clients_shared_across_buckets(s3_endpoint):
+    configs = [
+        S3Config(bucket_name=bucket, access_key=AK, secret_key=SK, endpoint_url=s3_endpoint)
+        for bucket in ["bucket-a", "bucket-b"]
+    ]
+    writer = MultiBucketS3DataWriter("bucket-a/prefix", configs)
+    reader = MultiBucketS3DataReader("bucket-a/prefix", configs)
+    writer.write("doc.txt", b"a")
+    writer.write("s3://bucket-b/doc.txt", b"b")
+
+    assert reader.read("doc.txt") == b"a"
+    assert reader.read("s3://bucket-b/doc.txt") == b"b"
+    clients = {id(client._s3_client) for client in reader._s3_clients_h.values()}
+    clients |= {id(client._s3_client) for client in writer._s3_clients_h.values()}
+    assert len(clients) == 1
+
+
+@pytest.mark.skipif(
+    os.getenv("MINERU_S3_BENCH") is None,
+    reason="set MINERU_S3_BENCH=1 to benchmark single-stream vs concurrent s3 io against a local moto server",
+)
+def test_s3_io_benchmark(s3_endpoint):
+    data = os.urandom(int(os.getenv("MINERU_S3_BENCH_MB", 256)) * MB)
+    single = dict(multipart_threshold=len(data) + 1, max_concurrency=1)
+    concurrent = dict(part_size=16 * MB, multipart_threshold=32 * MB, max_concurrency=8)
+
+    for name, settings in [("single stream", single), ("concurrent", concurrent)]:
+        writer = S3Writer("bucket-a", AK, SK, s3_endpoint, **settings)
+        reader = S3Reader("bucket-a", AK, SK, s3_endpoint, **settings)
+        start = time.time()
+        writer.write("bench.bin", data)
+        write_cost = time.time() - start
+        start = time.time()
+        assert reader.read("bench.bin") == data
+        read_cost = time.time() - start
+        logger.info(
+            f"{name}: write {len(data) / MB / write_cost:.1f}MB/s, read {len(data) / MB / read_cost:.1f}MB/s"
+        )
@@ -0,0 +1,47 @@
+# Copyright (c) Opendatalab. All rights reserved.
+from mineru.utils.enum_class import BlockType, SplitFlag
+from mineru.utils.table_merge import TableGrid, merge_table
+
+
+def _table_block(rows, header=True):
+    header_html = "<tr><th>Name</th><th>Value</th><th>Note</th></tr>" if header else ""
+    body_html = "".join(
+        f"<tr><td>{name}</td><td>{value}</td><td>n{value}</td></tr>" for name, value in rows
+    )
+    html = f"<table><tbody>{header_html}{body_html}</tbody></table>"
+    return {
+        "type": BlockType.TABLE,
+        "bbox": [50, 50, 550, 750],
+        "blocks": [{"type": BlockType.TABLE_BODY, "lines": [{"spans": [{"type": "table", "html": html}]}]}],
+    }
+
+
+def _html(table_block):
+    return table_block["blocks"][0]["lines"][0]["spans"][0]["html"]
+
+
+def test_table_grid_columns_with_spans():
+    grid = TableGrid(
+        '<table><tr><td rowspan="2">a</td><td colspan="2">b</td></tr>'
+        '<tr><td>c</td><td>d</td></tr></table>'
+    )
+    assert grid.total_columns() == 3
+    assert grid.row_effective_columns() == {0: 3, 1: 3}
+
+
+def test_merge_table_across_three_pages():
+    pages = [
+        {"para_blocks": [_table_block([("a", 1), ("b", 2)])]},
+        {"para_blocks": [_table_block([("c", 3), ("d", 4)])]},
+        {"para_blocks": [_table_block([("e", 5)])]},
+    ]
+    merge_table(pages)
+
+    first_html = _html(pages[0]["para_blocks"][0])
+    grid = TableGrid(first_html)
+    # 表头只保留一份，后续页的数据行按顺序接在第一页之后
+    assert first_html.count("<th>") == 3
+    assert [row.cells[0].text for row in grid.rows[1:]] == ["a", "b", "c", "d", "e"]
+    for page in pages[1:]:
+        for block in page["para_blocks"][0]["blocks"]:
+            assert block["lines"] == [] and block[SplitFlag.LINES_DELETED] is True
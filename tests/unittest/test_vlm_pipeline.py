@@ -0,0 +1,247 @@
+# Copyright (c) Opendatalab. All rights reserved.
+import asyncio
+import base64
+import os
+import random
+import struct
+import subprocess
+import sys
+import threading
+from io import BytesIO
+from pathlib import Path
+
+import pypdfium2 as pdfium
+import pytest
+from loguru import logger
+
+pytest.importorskip("mineru_vl_utils")
+web = pytest.importorskip("aiohttp.web")
+
+from mineru_vl_utils import MinerUClient
+
+from mineru.backend.vlm import vlm_analyze
+from mineru.utils.check_sys_env import is_windows_environment
+from mineru.utils.pdf_image_tools import PageRenderPool, load_images_from_pdf
+
+LAYOUT_OUTPUT = (
+    "<|box_start|>100 80 900 160<|box_end|><|ref_start|>title<|ref_end|><|rotate_up|>\n"
+    "<|box_start|>100 200 900 600<|box_end|><|ref_start|>text<|ref_end|><|rotate_up|>\n"
+    "<|box_start|>100 650 900 900<|box_end|><|ref_start|>text<|ref_end|><|rotate_up|>"
+)
+
+
+class MockVlmServer:
+    """OpenAI 兼容的模拟 VLM 服务，在后台线程中运行
+
+    每个请求随机延迟 latency*[0.5, 1.5) 秒，slots 限制同时处理的请求数以模拟 GPU 容量；
+    版面检测返回固定的三个块，内容识别返回截图尺寸，用于校验结果与页码的对应关系。
+    """
+
+    def __init__(self, latency=0.01, slots=None):
+        self.latency = latency
+        self.slots = slots
+        self.requests = 0
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    async def _models(self, request):
+        return web.json_response({"object": "list", "data": [{"id": "mock-vlm", "object": "model"}]})
+
+    async def _chat(self, request):
+        payload = await request.json()
+        content = payload["messages"][-1]["content"]
+        prompt = "".join(item["text"] for item in content if item["type"] == "text")
+        image_url = next(item["image_url"]["url"] for item in content if item["type"] == "image_url")
+        async with self._semaphore:
+            self.requests += 1
+            await asyncio.sleep(random.uniform(0.5, 1.5) * self.latency)
+        if "Layout Detection" in prompt:
+            text = LAYOUT_OUTPUT
+        else:
+            width, height = struct.unpack(">II", base64.b64decode(image_url.split(",", 1)[1])[16:24])
+            text = f"block {width}x{height}"
+        return web.json_response({
+            "id": "mock", "object": "chat.completion", "model": "mock-vlm",
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": text}}],
+        })
+
+    async def _start(self):
+        self._semaphore = asyncio.Semaphore(self.slots or 1 << 16)
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_get("/v1/models", self._models)
+        app.router.add_post("/v1/chat/completions", self._chat)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        return self._runner.addresses[0][1]
+
+    def __enter__(self):
+        self._thread.start()
+        port = asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    def __exit__(self, *exc):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+def _new_predictor(server, max_concurrency=100):
+    return MinerUClient(backend="http-client", server_url=server.url, max_concurrency=max_concurrency, use_tqdm=False)
+
+
+def _pdf_bytes(page_num):
+    pdf = pdfium.PdfDocument.new()
+    for i in range(page_num):
+        pdf.new_page(400 + 20 * i, 500)
+    output = BytesIO()
+    pdf.save(output)
+    pdf.close()
+    return output.getvalue()
+
+
+def _blocks(results):
+    return [[(block.type, block.bbox, block.content) for block in page] for page in results]
+
+
+def _track_inflight(predictor):
+    """统计同时处于推理中的页数"""
+    stats = {"active": 0, "max_active": 0, "calls": 0}
+    extract = predictor.aio_two_step_extract
+
+    async def tracked(*args, **kwargs):
+        stats["active"] += 1
+        stats["calls"] += 1
+        stats["max_active"] = max(stats["max_active"], stats["active"])
+        try:
+            return await extract(*args, **kwargs)
+        finally:
+            stats["active"] -= 1
+
+    predictor.aio_two_step_extract = tracked
+    return stats
+
+
+def test_pipelined_matches_batch(monkeypatch):
+    pdf_bytes = _pdf_bytes(7)
+    with MockVlmServer(latency=0.02) as server:
+        predictor = _new_predictor(server)
+        monkeypatch.setenv("MINERU_VLM_INFLIGHT_PAGES", "0")
+        expected_json, expected = vlm_analyze.doc_analyze(pdf_bytes, None, predictor=predictor)
+
+        stats = _track_inflight(predictor)
+        monkeypatch.setenv("MINERU_VLM_INFLIGHT_PAGES", "2")
+        middle_json, results = vlm_analyze.doc_analyze(pdf_bytes, None, predictor=predictor)
+        aio_json, aio_results = asyncio.run(vlm_analyze.aio_doc_analyze(pdf_bytes, None, predictor=predictor))
+
+    # 乱序完成的页面按页码组装，与整批推理的结果一致
+    assert _blocks(results) == _blocks(aio_results) == _blocks(expected)
+    assert len({blocks[1][2] for blocks in _blocks(results)}) == 7
+    assert middle_json["pdf_info"] == aio_json["pdf_info"] == expected_json["pdf_info"]
+    assert [page["page_size"] for page in middle_json["pdf_info"]] == [[400 + 20 * i, 500] for i in range(7)]
+    assert stats["calls"] == 14 and stats["max_active"] <= 2
+
+
+def test_pipelined_failure_stops_rendering(monkeypatch):
+    monkeypatch.setenv("MINERU_VLM_INFLIGHT_PAGES", "2")
+    with MockVlmServer() as server:
+        predictor = _new_predictor(server)
+        calls = []
+
+        async def failing_extract(image, **kwargs):
+            calls.append(image.size)
+            if len(calls) == 2:
+                raise RuntimeError("server error")
+            await asyncio.sleep(0.05)
+
+        predictor.aio_two_step_extract = failing_extract
+        with pytest.raises(RuntimeError, match="server error"):
+            vlm_analyze.doc_analyze(_pdf_bytes(20), None, predictor=predictor)
+    assert len(calls) < 20
+
+
+@pytest.mark.skipif(is_windows_environment(), reason="pages are rendered in threads on windows")
+def test_render_pool_switches_documents():
+    """渲染进程池跨文档复用，子进程不会沿用上一份文档"""
+    for page_num, height in [(3, 500), (3, 300)]:
+        pdf = pdfium.PdfDocument.new()
+        for i in range(page_num):
+            pdf.new_page(400 + 20 * i, height)
+        output = BytesIO()
+        pdf.save(output)
+        pdf.close()
+
+        render_pool = PageRenderPool(output.getvalue(), threads=2)
+        try:
+            images = [render_pool.submit(index).result() for index in range(page_num)]
+        finally:
+            render_pool.close()
+        expected, expected_doc = load_images_from_pdf(output.getvalue(), threads=1)
+        expected_doc.close()
+        assert [image["img_pil"].size for image in images] == [image["img_pil"].size for image in expected]
+        assert [image["img_id"] for image in images] == [image["img_id"] for image in expected]
+
+
+_BENCHMARK_SCRIPT = r"""
+import os
+import re
+import sys
+import time
+from io import BytesIO
+
+import pypdfium2 as pdfium
+
+sys.path.insert(0, os.path.dirname(sys.argv[1]))
+from test_vlm_pipeline import MockVlmServer, _new_predictor
+from mineru.backend.vlm import vlm_analyze
+
+
+def peak_rss_kb():
+    with open("/proc/self/status") as f:
+        return int(re.search(r"VmHWM:\s+(\d+)", f.read()).group(1))
+
+
+src = pdfium.PdfDocument(sys.argv[2])
+doc = pdfium.PdfDocument.new()
+for _ in range(int(sys.argv[3])):
+    doc.import_pages(src)
+output = BytesIO()
+doc.save(output)
+pdf_bytes = output.getvalue()
+
+with MockVlmServer(latency=0.2, slots=8) as server:
+    predictor = _new_predictor(server)
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    base = peak_rss_kb()
+    start = time.perf_counter()
+    vlm_analyze.doc_analyze(pdf_bytes, None, predictor=predictor)
+    print(time.perf_counter() - start, peak_rss_kb() - base)
+"""
+
+
+@pytest.mark.skipif(
+    os.getenv("MINERU_VLM_BENCH") is None,
+    reason="set MINERU_VLM_BENCH=1 to benchmark pipelined vs batch vlm analyze against a local mock server",
+)
+@pytest.mark.skipif(not os.path.exists("/proc/self/clear_refs"), reason="peak rss reset requires linux procfs")
+def test_pipelined_benchmark():
+    """模拟服务每个请求约0.2秒、同时处理8个请求；整批模式需先渲染全部页面并保留所有页面图片"""
+    demo_pdf = Path(__file__).resolve().parents[2] / "demo" / "pdfs" / "demo1.pdf"
+    env = {**os.environ, "PYTHONPATH": str(Path(__file__).resolve().parents[2])}
+
+    def run(inflight_pages):
+        result = subprocess.run(
+            [sys.executable, "-c", _BENCHMARK_SCRIPT, __file__, str(demo_pdf), os.getenv("MINERU_VLM_BENCH_COPIES", "2")],
+            capture_output=True, text=True, check=True,
+            env={**env, "MINERU_VLM_INFLIGHT_PAGES": str(inflight_pages)},
+        )
+        elapsed, peak_kb = result.stdout.strip().splitlines()[-1].split()
+        return float(elapsed), int(peak_kb) / 1024
+
+    # 整批模式保留全部页面图片，边渲染边推理只保留处理中的页面
+    for name, inflight_pages in [("batch", 0), ("pipelined", 8)]:
+        elapsed, peak_mb = run(inflight_pages)
+        logger.info(f"{name}: {elapsed:.2f}s, peak rss +{peak_mb:.0f}MB")